@@ -0,0 +1,44 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # sin orjson se usa el JSONRenderer de DRF
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` de DRF con orjson.
+
+    orjson escribe en C los tipos básicos (dict, list, str, int, float, bool,
+    None); el resto pasa por el mismo ``JSONEncoder.default`` de DRF, de modo
+    que fechas, ``Decimal`` o ``QuerySet`` sin serializar salen igual que con
+    el renderizador original. Las fechas se delegan también a ese encoder
+    (``OPT_PASSTHROUGH_DATETIME``) para conservar su formato (milisegundos y
+    ``Z`` en UTC).
+    """
+
+    OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    _encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        option = self.OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            option |= orjson.OPT_INDENT_2
+        try:
+            ret = orjson.dumps(data, default=self._encoder.default, option=option)
+        except orjson.JSONEncodeError:
+            # Casos que orjson no admite (p. ej. enteros de más de 64 bits)
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que DRF: JSON válido también como subconjunto de JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
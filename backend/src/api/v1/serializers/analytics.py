@@ -0,0 +1,34 @@
+from rest_framework import serializers
+
+
+class OccupancyQuerySerializer(serializers.Serializer):
+    months = serializers.IntegerField(min_value=1, max_value=24, default=3)
+    end = serializers.DateField(required=False)
+    refresh = serializers.BooleanField(default=False)
+
+
+class MassagistForecastQuerySerializer(serializers.Serializer):
+    weeks = serializers.IntegerField(min_value=1, max_value=12, default=4)
+    history_weeks = serializers.IntegerField(min_value=2, max_value=104, default=26)
+    half_life = serializers.FloatField(min_value=0.5, max_value=52, default=4.0)
+    safety = serializers.FloatField(min_value=0, max_value=5, default=1.0)
+    target_utilization = serializers.FloatField(min_value=0.1, max_value=1, default=0.85)
+
+
+class MassagistForecastExportSerializer(MassagistForecastQuerySerializer):
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=7), required=False, allow_empty=False
+    )
+    effective_date = serializers.DateField(required=False)
+
+
+class MassagistForecastPublishSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=50)
+
+
+class MassagistBacktestQuerySerializer(serializers.Serializer):
+    folds = serializers.IntegerField(min_value=1, max_value=52, default=8)
+    history_weeks = serializers.IntegerField(min_value=2, max_value=104, default=26)
+    half_life = serializers.FloatField(min_value=0.5, max_value=52, default=4.0)
+    safety = serializers.FloatField(min_value=0, max_value=5, default=1.0)
+    target_utilization = serializers.FloatField(min_value=0.1, max_value=1, default=0.85)
@@ -19,6 +19,8 @@ class AvailabilitySerializer(serializers.Serializer):
     type = serializers.ChoiceField(choices=[AvailabilityDTO.TYPE_WEEKDAY, AvailabilityDTO.TYPE_PUNCTUAL])
     punctual_day = serializers.DateField(required=False, allow_null=True)
     weekday = serializers.IntegerField(required=False, allow_null=True, min_value=1, max_value=7)
+    source = serializers.CharField(read_only=True)
+    is_draft = serializers.BooleanField(read_only=True)
 
     ranges = AvailabilityRangeSerializer(many=True)
 
@@ -0,0 +1,61 @@
+from rest_framework import serializers
+
+from reservations.services.billing import BillingService
+
+
+class BillingQuerySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    granularity = serializers.ChoiceField(
+        choices=list(BillingService.GRANULARITIES), default=BillingService.GRANULARITY_MONTH
+    )
+
+    def validate(self, attrs):
+        if attrs['start'] > attrs['end']:
+            raise serializers.ValidationError("La fecha de inicio debe ser anterior a la de fin")
+        return attrs
+
+
+class BillingBookingFiguresSerializer(serializers.Serializer):
+    bookings = serializers.IntegerField()
+    people = serializers.IntegerField()
+    revenue_paid = serializers.DecimalField(max_digits=12, decimal_places=2)
+    revenue_pending = serializers.DecimalField(max_digits=12, decimal_places=2)
+    vouchers_redeemed = serializers.IntegerField()
+    vouchers_redeemed_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class BillingFiguresSerializer(BillingBookingFiguresSerializer):
+    vouchers_sold = serializers.IntegerField()
+    vouchers_sold_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class BillingPeriodSerializer(BillingFiguresSerializer):
+    period = serializers.DateField()
+
+
+class BillingProductSerializer(BillingBookingFiguresSerializer):
+    product_id = serializers.IntegerField()
+    product_name = serializers.CharField()
+
+
+class BillingCreatorSerializer(BillingBookingFiguresSerializer):
+    creator_type_id = serializers.IntegerField(allow_null=True)
+    creator_kind = serializers.CharField()
+
+
+class BillingAgentSerializer(BillingBookingFiguresSerializer):
+    agent_id = serializers.IntegerField()
+    agent_name = serializers.CharField(allow_null=True)
+
+
+class BillingReportSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    granularity = serializers.CharField()
+    totals = BillingFiguresSerializer()
+    by_period = BillingPeriodSerializer(many=True)
+    by_product = BillingProductSerializer(many=True)
+    by_creator = BillingCreatorSerializer(many=True)
+    by_agent = BillingAgentSerializer(many=True)
+    stale_days = serializers.IntegerField()
@@ -32,4 +32,22 @@ class ClientSerializer(serializers.Serializer):
         # Construir DTO de actualización
         dto = ClientDTO(id=instance.id, **validated_data)
         dto.validate_for_update()
-        return ClientManager.update_client(dto) 
\ No newline at end of file
+        return ClientManager.update_client(dto) 
+
+class ClientUnificationJobSerializer(serializers.Serializer):
+    """Serializer de sólo lectura para el progreso de una unificación."""
+
+    id = serializers.IntegerField(read_only=True)
+    status = serializers.CharField(read_only=True)
+    progress = serializers.FloatField(read_only=True)
+    total_groups = serializers.IntegerField(read_only=True)
+    processed_groups = serializers.IntegerField(read_only=True)
+    # Mismos nombres que el resultado de la unificación síncrona
+    unified_groups = serializers.IntegerField(source='processed_groups', read_only=True)
+    clients_removed = serializers.IntegerField(read_only=True)
+    books_updated = serializers.IntegerField(read_only=True)
+    gift_vouchers_updated = serializers.IntegerField(read_only=True)
+    error = serializers.CharField(read_only=True, allow_null=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
+    finished_at = serializers.DateTimeField(read_only=True, allow_null=True)
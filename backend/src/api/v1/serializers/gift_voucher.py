@@ -1,7 +1,10 @@
 from rest_framework import serializers
 
-from reservations.dtos.gift_voucher import GiftVoucherDTO, GiftVoucherWithDetailsDTO, StaffGiftVoucherPayloadDTO
+from reservations.dtos.gift_voucher import (
+    GiftVoucherDTO, GiftVoucherWithDetailsDTO, StaffGiftVoucherPayloadDTO, StaffBulkGiftVoucherPayloadDTO,
+)
 from reservations.dtos.book import StaffBathRequestDTO
+from reservations.managers.client import ClientManager
 from reservations.managers.gift_voucher import GiftVoucherManager
 
 
@@ -30,6 +33,8 @@ class GiftVoucherSerializer(serializers.Serializer):
     # ------------------------------------------------------------------
 
     def create(self, validated_data):
+        # ``used`` se mantiene por compatibilidad; el estado real va en ``status``
+        validated_data.pop('used', None)
         dto = GiftVoucherDTO(**validated_data)
         dto.validate_for_create()
         voucher_dto = GiftVoucherManager.create_voucher(dto)
@@ -40,6 +45,7 @@ class GiftVoucherSerializer(serializers.Serializer):
     # ------------------------------------------------------------------
 
     def update(self, instance, validated_data):
+        validated_data.pop('used', None)
         dto = GiftVoucherDTO(id=instance.id, **validated_data)
         dto.validate_for_update()
         updated = GiftVoucherManager.update_voucher(dto)
@@ -76,6 +82,21 @@ class GiftVoucherWithDetailsSerializer(serializers.Serializer):
     product_name = serializers.CharField(read_only=True)
 
 
+class GiftVoucherSummarySerializer(serializers.Serializer):
+    """Serializer compacto para la tabla de cheques (``?compact=1``)."""
+    id = serializers.IntegerField(read_only=True)
+    code = serializers.CharField(read_only=True)
+    status = serializers.CharField(read_only=True)
+    price = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True)
+    people = serializers.IntegerField(read_only=True)
+    bought_date = serializers.DateTimeField(read_only=True)
+    created_at = serializers.DateTimeField(read_only=True)
+    buyer_client_id = serializers.IntegerField(read_only=True)
+    buyer_name = serializers.CharField(read_only=True)
+    buyer_surname = serializers.CharField(read_only=True)
+    product_name = serializers.CharField(read_only=True)
+
+
 # ------------------------------------------------------------------
 # Serializer para masajes
 # ------------------------------------------------------------------
@@ -115,6 +136,7 @@ class StaffGiftVoucherSerializer(serializers.Serializer):
     
     # Otros
     send_whatsapp_buyer = serializers.BooleanField(required=False, default=False)
+    client_match = serializers.ChoiceField(choices=ClientManager.MATCH_POLICIES, required=False, allow_null=True)
 
     def validate(self, data):
         """Validar que la cantidad de masajes no exceda el número de personas."""
@@ -152,117 +174,38 @@ class StaffGiftVoucherSerializer(serializers.Serializer):
         
         # Crear cheque regalo
         voucher_dto = GiftVoucherManager.create_gift_voucher_from_staff(payload)
-        return voucher_dto 
-        dto = GiftVoucherDTO(id=instance.id, **validated_data)
-        dto.validate_for_update()
-        updated = GiftVoucherManager.update_voucher(dto)
-        return updated
-
-
-class GiftVoucherWithDetailsSerializer(serializers.Serializer):
-    """Serializer para mostrar cheques regalo con detalles completos."""
-    id = serializers.IntegerField(read_only=True)
-    code = serializers.CharField(read_only=True)
-    price = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True)
-    used = serializers.BooleanField(read_only=True)
-    status = serializers.CharField(read_only=True)
-    payment_date = serializers.DateTimeField(read_only=True)
-    people = serializers.IntegerField(read_only=True)
-    buyer_client_id = serializers.IntegerField(read_only=True)
-    product_id = serializers.IntegerField(read_only=True)
-    recipients_email = serializers.CharField(read_only=True)
-    recipients_name = serializers.CharField(read_only=True)
-    recipients_surname = serializers.CharField(read_only=True)
-    gift_name = serializers.CharField(read_only=True)
-    gift_description = serializers.CharField(read_only=True)
-    created_at = serializers.DateTimeField(read_only=True)
-    bought_date = serializers.DateTimeField(read_only=True)
-    
-    # Información del cliente comprador
-    buyer_name = serializers.CharField(read_only=True)
-    buyer_surname = serializers.CharField(read_only=True)
-    buyer_phone = serializers.CharField(read_only=True)
-    buyer_email = serializers.CharField(read_only=True)
-    buyer_client_created_at = serializers.DateTimeField(read_only=True)
-    
-    # Información del producto
-    product_name = serializers.CharField(read_only=True)
+        return voucher_dto
 
 
 # ------------------------------------------------------------------
-# Serializer para masajes
+# Serializer para emisión masiva de cheques (pedidos de empresa)
 # ------------------------------------------------------------------
 
-class StaffBathRequestSerializer(serializers.Serializer):
-    massage_type = serializers.CharField()
-    minutes = serializers.CharField()
-    quantity = serializers.IntegerField(min_value=0)
+class BulkRecipientSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    surname = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    email = serializers.EmailField(required=False, allow_blank=True)
 
-    def to_dto(self):
-        return StaffBathRequestDTO(**self.validated_data)
 
-
-# ------------------------------------------------------------------
-# Serializer para crear cheques regalo desde staff
-# ------------------------------------------------------------------
-
-class StaffGiftVoucherSerializer(serializers.Serializer):
-    # Datos del comprador
-    buyer_name = serializers.CharField(max_length=255)
-    buyer_surname = serializers.CharField(max_length=255, required=False, allow_blank=True)
-    buyer_phone = serializers.CharField(max_length=50, required=False, allow_blank=True)
-    buyer_email = serializers.EmailField()
-    
-    # Datos del destinatario (opcionales)
-    recipient_name = serializers.CharField(max_length=255, required=False, allow_blank=True)
-    recipient_surname = serializers.CharField(max_length=255, required=False, allow_blank=True)
-    recipient_email = serializers.EmailField(required=False, allow_blank=True, allow_null=True)
-    
-    # Datos del cheque regalo
-    gift_name = serializers.CharField(max_length=255)
-    gift_description = serializers.CharField(required=False, allow_blank=True)
-    people = serializers.IntegerField(min_value=1)
-    
-    # Masajes
-    baths = StaffBathRequestSerializer(many=True)
-    
-    # Otros
-    send_whatsapp_buyer = serializers.BooleanField(required=False, default=False)
+class StaffBulkGiftVoucherSerializer(StaffGiftVoucherSerializer):
+    quantity = serializers.IntegerField(min_value=1, max_value=GiftVoucherManager.MAX_BULK_QUANTITY)
+    recipients = BulkRecipientSerializer(many=True, required=False)
+    status = serializers.ChoiceField(choices=['pending_payment', 'paid'], required=False, default='pending_payment')
 
     def validate(self, data):
-        """Validar que la cantidad de masajes no exceda el número de personas."""
-        people = data.get('people')
-        baths_data = data.get('baths', [])
-        
-        if people and baths_data:
-            total_baths = sum(
-                bath['quantity'] for bath in baths_data 
-                if bath.get('massage_type') != 'none'
-            )
-            
-            if total_baths > people:
-                raise serializers.ValidationError(
-                    f"Hay más masajes ({total_baths}) que personas ({people}). "
-                    f"Reduce la cantidad de masajes o aumenta el número de personas."
-                )
-        
+        data = super().validate(data)
+        if len(data.get('recipients') or []) > data['quantity']:
+            raise serializers.ValidationError("Hay más destinatarios que cheques")
         return data
 
     def create(self, validated_data):
-        # Convertir baths de dict a DTOs
         baths_data = validated_data.pop('baths', [])
-        bath_dtos = []
-        for bath_data in baths_data:
-            bath_serializer = StaffBathRequestSerializer(data=bath_data)
-            bath_serializer.is_valid(raise_exception=True)
-            bath_dtos.append(bath_serializer.to_dto())
-        
-        # Crear payload DTO
-        payload = StaffGiftVoucherPayloadDTO(
+        bath_dtos = [StaffBathRequestDTO(**bath_data) for bath_data in baths_data]
+        recipients = [dict(recipient) for recipient in validated_data.pop('recipients', None) or []]
+
+        payload = StaffBulkGiftVoucherPayloadDTO(
             baths=bath_dtos,
+            recipients=recipients,
             **validated_data
         )
-        
-        # Crear cheque regalo
-        voucher_dto = GiftVoucherManager.create_gift_voucher_from_staff(payload)
-        return voucher_dto 
\ No newline at end of file
+        return GiftVoucherManager.create_gift_vouchers_bulk(payload)
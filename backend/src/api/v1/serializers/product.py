@@ -103,6 +103,6 @@ class ProductSerializer(serializers.Serializer):
                 ) for h in hostings_data
             ]
 
-        dto = ProductCreateDTO(id=instance.id, **kwargs)  # type: ignore
+        dto = ProductCreateDTO(**kwargs)
         product = ProductManager.update_product(instance.id, dto)
         return product 
\ No newline at end of file
@@ -0,0 +1,33 @@
+from rest_framework import serializers
+
+
+class QuoteBathSerializer(serializers.Serializer):
+    massage_type = serializers.CharField()
+    minutes = serializers.CharField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
+class QuoteCartSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False, allow_null=True)
+    baths = QuoteBathSerializer(many=True)
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    carts = QuoteCartSerializer(many=True, allow_empty=False)
+
+
+class QuoteLineSerializer(serializers.Serializer):
+    bath_type_id = serializers.IntegerField()
+    massage_type = serializers.CharField()
+    minutes = serializers.CharField()
+    quantity = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    subtotal = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class QuoteSerializer(serializers.Serializer):
+    id = serializers.CharField(allow_null=True)
+    total = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    product_id = serializers.IntegerField(allow_null=True)
+    lines = QuoteLineSerializer(many=True)
+    error = serializers.CharField(allow_null=True)
@@ -0,0 +1,146 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+@lru_cache(maxsize=None)
+def readable_fields(serializer_class, exclude: frozenset = frozenset()) -> Tuple[str, ...]:
+    """Claves de la salida de ``serializer_class`` (sin los campos de sólo escritura ni ``exclude``)."""
+    return tuple(
+        name for name, field in serializer_class().fields.items()
+        if not field.write_only and name not in exclude
+    )
+
+
+def requested_fields(request, serializer_class, exclude: Iterable[str] = ()) -> Optional[Tuple[str, ...]]:
+    """
+    Lee el parámetro ``?fields=a,b`` (campos dispersos) de una petición.
+
+    Devuelve las claves pedidas en el orden del serializer, o ``None`` si no
+    se pide ninguna selección (respuesta completa). Los managers reciben esta
+    tupla para leer sólo esas columnas y saltarse los JOIN que no se usan.
+
+    Raises:
+        ValueError: Si se pide un campo que el serializer no devuelve
+    """
+    raw = request.query_params.get('fields')
+    if raw is None:
+        return None
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    available = readable_fields(serializer_class, frozenset(exclude))
+    unknown = sorted(names.difference(available))
+    if unknown:
+        raise ValueError(f"Campos desconocidos en 'fields': {', '.join(unknown)}")
+    if not names:
+        raise ValueError("El parámetro 'fields' no puede estar vacío")
+    return tuple(name for name in available if name in names)
+
+
+class RowSerializer:
+    """
+    Representación rápida de filas ``values()`` para los listados grandes.
+
+    Produce la misma salida que ``serializer_class(many=True).data`` sin pasar
+    por los campos de DRF fila a fila: la primera vez se compila, a partir de
+    los campos del serializer, la lista de claves y la conversión de cada una
+    (``Decimal`` a texto con sus decimales, fechas a ISO 8601 en la zona
+    horaria actual). Los campos que DRF devuelve tal cual (enteros, textos,
+    booleanos) no se tocan. Los tipos sin conversión rápida usan el
+    ``to_representation`` del propio campo.
+
+    Las filas deben traer las claves con los nombres del serializer (ver los
+    ``*_ROW_FIELDS`` de los managers). Sólo sirve para lectura: la validación
+    de escrituras sigue en el serializer. Con ``fields`` (ver
+    ``requested_fields``) sólo se devuelven esas claves.
+    """
+
+    # Campos cuya representación es el propio valor leído de la base de datos
+    PASSTHROUGH = (
+        serializers.IntegerField, serializers.CharField, serializers.BooleanField, serializers.FloatField,
+    )
+
+    def __init__(self, serializer_class, exclude: Iterable[str] = ()):
+        self.serializer_class = serializer_class
+        self.exclude = frozenset(exclude)
+        self._fields = None
+
+    def _compile(self) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, Any], ...]]:
+        if self._fields is None:
+            names = readable_fields(self.serializer_class, self.exclude)
+            fields = [(name, field) for name, field in self.serializer_class().fields.items() if name in names]
+            self._fields = (
+                tuple(name for name, _ in fields),
+                tuple((name, field) for name, field in fields if not isinstance(field, self.PASSTHROUGH)),
+            )
+        return self._fields
+
+    @staticmethod
+    def _iso(field, default_format: str) -> bool:
+        output_format = getattr(field, 'format', default_format)
+        return output_format is not None and output_format.lower() == ISO_8601
+
+    @staticmethod
+    def _converter(field, tz) -> Callable[[Any], Any]:
+        """Conversión equivalente a ``field.to_representation`` para valores no nulos."""
+        slow = field.to_representation
+        if isinstance(field, serializers.DateTimeField) and settings.USE_TZ and RowSerializer._iso(
+            field, api_settings.DATETIME_FORMAT
+        ):
+            field_tz = getattr(field, 'timezone', tz)
+
+            def convert_datetime(value):
+                if isinstance(value, datetime) and value.utcoffset() is not None:
+                    return RowSerializer._iso_datetime(value.astimezone(field_tz))
+                return slow(value)
+            return convert_datetime
+        if (
+            isinstance(field, serializers.DateField) and RowSerializer._iso(field, api_settings.DATE_FORMAT)
+            or isinstance(field, serializers.TimeField) and RowSerializer._iso(field, api_settings.TIME_FORMAT)
+        ):
+            return lambda value: value.isoformat() if isinstance(value, (date, time)) else slow(value)
+        if (
+            isinstance(field, serializers.DecimalField)
+            and getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+            and not field.localize and field.decimal_places is not None
+        ):
+            quantize = field.quantize
+            return lambda value: '{:f}'.format(quantize(value)) if isinstance(value, Decimal) else slow(value)
+        return slow
+
+    @staticmethod
+    def _iso_datetime(value) -> str:
+        representation = value.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+
+    def requested_fields(self, request) -> Optional[Tuple[str, ...]]:
+        """``requested_fields`` con el serializer y las exclusiones de esta instancia."""
+        return requested_fields(request, self.serializer_class, self.exclude)
+
+    def to_representation(
+        self, rows: Iterable[Dict[str, Any]], fields: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        names, converted = self._compile()
+        if fields is not None:
+            wanted = set(fields)
+            names = tuple(name for name in names if name in wanted)
+            converted = tuple((name, field) for name, field in converted if name in wanted)
+        tz = timezone.get_current_timezone()
+        conversions = [(name, self._converter(field, tz)) for name, field in converted]
+
+        result = []
+        for row in rows:
+            item = {name: row.get(name) for name in names}
+            for name, convert in conversions:
+                value = item[name]
+                if value is not None:
+                    item[name] = convert(value)
+            result.append(item)
+        return result
@@ -12,6 +12,10 @@ from api.v1.views.capacity import CapacityViewSet
 from api.v1.views.bath_type import BathTypeViewSet
 from api.v1.views.constraint import ConstraintViewSet
 from api.v1.views.general_search import GeneralSearchView
+from api.v1.views.quote import QuoteViewSet
+from api.v1.views.billing import BillingViewSet
+from api.v1.views.analytics import AnalyticsViewSet
+from api.v1.views.changes import ChangesView
 
 router = DefaultRouter()
 router.register(r'clientes', ClientViewSet, basename='client')
@@ -24,8 +28,12 @@ router.register(r'cheques', GiftVoucherViewSet, basename='gift-voucher')
 router.register(r'capacity', CapacityViewSet, basename='capacity')
 router.register(r'bath-types', BathTypeViewSet, basename='bath-type')
 router.register(r'restricciones', ConstraintViewSet, basename='constraint')
+router.register(r'quotes', QuoteViewSet, basename='quote')
+router.register(r'facturacion', BillingViewSet, basename='billing')
+router.register(r'analitica', AnalyticsViewSet, basename='analytics')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('busqueda-general/', GeneralSearchView.as_view(), name='general-search'),
+    path('changes/', ChangesView.as_view(), name='changes'),
 ] 
\ No newline at end of file
@@ -0,0 +1,90 @@
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from api.v1.serializers.analytics import (
+    OccupancyQuerySerializer, MassagistForecastQuerySerializer,
+    MassagistForecastExportSerializer, MassagistForecastPublishSerializer, MassagistBacktestQuerySerializer,
+)
+from reservations.managers.availability import AvailabilityManager
+from reservations.services.forecast import MassagistForecastService
+from reservations.services.occupancy import OccupancyService
+
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """Analítica de ocupación para ajustar aforo y horarios de masajistas."""
+
+    @action(detail=False, methods=['get'], url_path='ocupacion')
+    def ocupacion(self, request):
+        """
+        GET /api/v1/analitica/ocupacion/?months=3&end=YYYY-MM-DD&refresh=1
+
+        Matrices 7 × tramos (lunes a domingo × franjas de 30 minutos) con la
+        media, percentiles y máximo de personas, el uso del aforo y el de los
+        masajistas. El resultado se cachea; ``refresh=1`` lo recalcula.
+        """
+        serializer = OccupancyQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(OccupancyService.get_heatmap(**serializer.validated_data))
+
+    @action(detail=False, methods=['get'], url_path='prevision-masajistas')
+    def prevision_masajistas(self, request):
+        """
+        GET /api/v1/analitica/prevision-masajistas/?weeks=4&history_weeks=26
+
+        Demanda prevista de masajes por día de la semana y tramo, y masajistas
+        recomendados para cada rango de la disponibilidad vigente.
+        """
+        serializer = MassagistForecastQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(MassagistForecastService.forecast(**serializer.validated_data))
+
+    @action(detail=False, methods=['post'], url_path='prevision-masajistas/exportar')
+    def exportar_prevision(self, request):
+        """
+        POST /api/v1/analitica/prevision-masajistas/exportar/
+
+        Body (todo opcional): ``{"weekdays": [1, 2], "effective_date": "YYYY-MM-DD", "weeks": 4, ...}``
+
+        Crea un borrador de versión por weekday con los masajistas recomendados,
+        efectivo por defecto desde el próximo lunes. Los borradores no aplican
+        hasta publicarlos con ``prevision-masajistas/publicar/``. Repetir la
+        exportación para la misma fecha sustituye las versiones de la previsión
+        de esos weekdays; las creadas a mano no se tocan.
+        """
+        serializer = MassagistForecastExportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = dict(serializer.validated_data)
+        weekdays = params.pop('weekdays', None)
+        effective_date = params.pop('effective_date', None)
+        forecast = MassagistForecastService.forecast(**params)
+        created = MassagistForecastService.export_draft_versions(forecast, weekdays, effective_date)
+        return Response(
+            {
+                "created": [
+                    {"id": av.id, "weekday": av.weekday, "created_at": av.created_at, "is_draft": av.is_draft}
+                    for av in created
+                ],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=['post'], url_path='prevision-masajistas/publicar')
+    def publicar_prevision(self, request):
+        """
+        POST /api/v1/analitica/prevision-masajistas/publicar/
+
+        Body: ``{"ids": [12, 13]}`` con los borradores devueltos al exportar.
+        Los publicados con fecha efectiva ya pasada aplican desde hoy.
+        """
+        serializer = MassagistForecastPublishSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        published = AvailabilityManager.publish_draft_versions(serializer.validated_data['ids'])
+        return Response({"published": published})
+
+    @action(detail=False, methods=['get'], url_path='prevision-masajistas/backtest')
+    def backtest_prevision(self, request):
+        """GET /api/v1/analitica/prevision-masajistas/backtest/?folds=8 — precisión del modelo en semanas pasadas."""
+        serializer = MassagistBacktestQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(MassagistForecastService.backtest(**serializer.validated_data))
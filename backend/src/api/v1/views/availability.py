@@ -4,8 +4,10 @@ from rest_framework.decorators import action
 from datetime import date
 
 from api.v1.serializers.availability import AvailabilitySerializer, AvailabilityRangeSerializer
+from api.v1.views.conditional import catalog_conditional
 from reservations.models import Availability
 from reservations.managers.availability import AvailabilityManager
+from reservations.services.catalog_version import CatalogVersionService
 
 
 class AvailabilityViewSet(viewsets.ViewSet):
@@ -31,6 +33,8 @@ class AvailabilityViewSet(viewsets.ViewSet):
             "type": av.type,
             "punctual_day": av.punctual_day,
             "weekday": av.weekday,
+            "source": av.source,
+            "is_draft": av.is_draft,
             "ranges": ranges_payload,
         }
 
@@ -38,6 +42,7 @@ class AvailabilityViewSet(viewsets.ViewSet):
     # Listar
     # ------------------------------------------------------------------
 
+    @catalog_conditional(CatalogVersionService.AVAILABILITY)
     def list(self, request):
         availabilities = Availability.objects.prefetch_related("availabilityrange_set").all()
         payload = [self._model_to_payload(a) for a in availabilities]
@@ -59,6 +64,7 @@ class AvailabilityViewSet(viewsets.ViewSet):
     # Retrieve
     # ------------------------------------------------------------------
 
+    @catalog_conditional(CatalogVersionService.AVAILABILITY)
     def retrieve(self, request, pk=None):
         try:
             av = Availability.objects.prefetch_related("availabilityrange_set").get(id=pk)
@@ -95,6 +101,7 @@ class AvailabilityViewSet(viewsets.ViewSet):
     # ------------------------------------------------------------------
 
     @action(detail=False, methods=["get"], url_path="history/(?P<target_date>[^/.]+)")
+    @catalog_conditional(CatalogVersionService.AVAILABILITY)
     def history(self, request, target_date=None):
         """Obtiene el historial completo de disponibilidades para un día específico."""
         try:
@@ -114,6 +121,7 @@ class AvailabilityViewSet(viewsets.ViewSet):
             )
 
     @action(detail=False, methods=["get"], url_path="by-id/(?P<availability_id>[^/.]+)")
+    @catalog_conditional(CatalogVersionService.AVAILABILITY)
     def by_id(self, request, availability_id=None):
         """Obtiene una disponibilidad específica por ID."""
         try:
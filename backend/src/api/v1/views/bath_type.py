@@ -2,18 +2,22 @@ from rest_framework import status, viewsets
 from rest_framework.response import Response
 
 from api.v1.serializers.bath_type import BathTypeSerializer
+from api.v1.views.conditional import catalog_conditional
 from reservations.models import BathType
 from reservations.managers.product import ProductManager
+from reservations.services.catalog_version import CatalogVersionService
 
 
 class BathTypeViewSet(viewsets.ViewSet):
     """Endpoints de sólo lectura + actualización de precio para BathType."""
 
+    @catalog_conditional(CatalogVersionService.BATH_TYPES)
     def list(self, request):
         bath_types = ProductManager.list_bath_types()
         serializer = BathTypeSerializer(bath_types, many=True)
         return Response(serializer.data)
 
+    @catalog_conditional(CatalogVersionService.BATH_TYPES)
     def retrieve(self, request, pk=None):
         try:
             bath_type = BathType.objects.get(id=pk)
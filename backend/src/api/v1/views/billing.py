@@ -0,0 +1,30 @@
+from datetime import date
+
+from rest_framework import viewsets
+from rest_framework.response import Response
+
+from api.v1.serializers.billing import BillingQuerySerializer, BillingReportSerializer
+from reservations.services.billing import BillingService
+
+
+class BillingViewSet(viewsets.ViewSet):
+    """Agregados de facturación para la página de Facturación."""
+
+    def list(self, request):
+        """
+        GET /api/v1/facturacion/?start=YYYY-MM-DD&end=YYYY-MM-DD&granularity=day|week|month
+
+        Sin fechas devuelve el año natural en curso agrupado por meses. No
+        recalcula el resumen diario: ``stale_days`` indica cuántos días del
+        rango tienen cambios que la tarea periódica aún no ha incorporado.
+        """
+        today = date.today()
+        params = {
+            'start': date(today.year, 1, 1).isoformat(),
+            'end': date(today.year, 12, 31).isoformat(),
+            **request.query_params.dict(),
+        }
+        serializer = BillingQuerySerializer(data=params)
+        serializer.is_valid(raise_exception=True)
+        report = BillingService.get_report(**serializer.validated_data)
+        return Response(BillingReportSerializer(report).data)
@@ -1,3 +1,5 @@
+import logging
+
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -6,19 +8,33 @@ from django.utils.decorators import method_decorator
 from django.contrib.contenttypes.models import ContentType
 
 from api.v1.serializers.book import BookingSerializer, BookLogSerializer, BookDetailSerializer, BookMassageUpdateSerializer
+from api.v1.serializers.client import ClientSerializer
+from api.v1.serializers.rows import RowSerializer, requested_fields
 from reservations.managers.book import BookManager
+from reservations.managers.client import ClientMatchSuggestion
 from reservations.dtos.book import StaffBathRequestDTO, StaffBookingPayloadDTO
 from reservations.models import GiftVoucher
 
+logger = logging.getLogger(__name__)
+
 
 @method_decorator(csrf_exempt, name='dispatch')
 class BookViewSet(viewsets.ViewSet):
     """CRUD endpoints para reservas (Book) usando DTO + manager."""
 
+    # Sólo IDs numéricos: ``/reservas/abc/`` responde 404 sin llegar a ``int(pk)``
+    lookup_value_regex = r'\d+'
+
+    # Listados de lectura: filas ``values()`` con la salida de ``BookingSerializer``
+    rows = RowSerializer(BookingSerializer)
+
     def list(self, request):
-        dtos = BookManager.list_bookings()
-        serializer = BookingSerializer(dtos, many=True)
-        return Response(serializer.data)
+        """Lista las reservas. ``?fields=id,hour`` limita las claves (y columnas) devueltas."""
+        try:
+            fields = self.rows.requested_fields(request)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+        return Response(self.rows.to_representation(BookManager.list_booking_rows(fields=fields), fields))
 
     @action(detail=False, methods=["get"], url_path="by-date")
     def by_date(self, request):
@@ -28,9 +44,13 @@ class BookViewSet(viewsets.ViewSet):
             return Response({"detail": "Se requiere el parámetro 'date' (YYYY-MM-DD)"}, status=400)
         
         try:
-            dtos = BookManager.list_bookings_by_date(date_str)
-            serializer = BookingSerializer(dtos, many=True)
-            return Response(serializer.data)
+            fields = self.rows.requested_fields(request)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        try:
+            rows = BookManager.list_booking_rows(booking_date=date_str, fields=fields)
+            return Response(self.rows.to_representation(rows, fields))
         except Exception as e:
             return Response({"detail": f"Error al obtener reservas: {str(e)}"}, status=400)
 
@@ -41,13 +61,13 @@ class BookViewSet(viewsets.ViewSet):
         return Response(BookingSerializer(dto_created).data, status=status.HTTP_201_CREATED)
 
     def retrieve(self, request, pk=None):
-        dto = next((b for b in BookManager.list_bookings() if str(b.id) == str(pk)), None)
+        dto = BookManager.get_booking(int(pk))
         if dto is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
         return Response(BookingSerializer(dto).data)
 
     def update(self, request, pk=None):
-        dto_current = next((b for b in BookManager.list_bookings() if str(b.id) == str(pk)), None)
+        dto_current = BookManager.get_booking(int(pk))
         if dto_current is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
         serializer = BookingSerializer(dto_current, data=request.data)
@@ -77,6 +97,7 @@ class BookViewSet(viewsets.ViewSet):
                 surname=data.get("surname", ""),
                 phone_number=data.get("phone_number", ""),
                 email=data.get("email", ""),
+                client_match=data.get("client_match"),
                 date=data["date"],
                 hour=data["hour"],
                 people=data["people"],
@@ -95,6 +116,7 @@ class BookViewSet(viewsets.ViewSet):
                 surname=payload.surname,
                 phone=payload.phone_number,
                 email=payload.email,
+                client_match=payload.client_match,
                 date=payload.date,
                 hour=payload.hour,
                 people=payload.people,
@@ -106,6 +128,11 @@ class BookViewSet(viewsets.ViewSet):
             return Response(BookingSerializer(dto_created).data, status=status.HTTP_201_CREATED)
         except KeyError as e:
             return Response({"detail": f"Campo requerido faltante: {e.args[0]}"}, status=400)
+        except ClientMatchSuggestion as e:
+            return Response(
+                {"detail": str(e), "candidates": ClientSerializer(e.candidates, many=True).data},
+                status=status.HTTP_409_CONFLICT,
+            )
         except Exception as e:
             return Response({"detail": f"Error al crear reserva staff: {str(e)}"}, status=400)
 
@@ -128,15 +155,8 @@ class BookViewSet(viewsets.ViewSet):
     @action(detail=True, methods=["get", "put", "options"], url_path="detail")
     def manage_detail(self, request, pk=None):
         """Obtiene los detalles completos de una reserva (GET) o actualiza una reserva (PUT)."""
-        # Agregar headers CORS y logging para debug
-        from django.http import JsonResponse
-        import json
-        import logging
-        
-        logger = logging.getLogger(__name__)
-        logger.info(f"manage_detail called with method: {request.method}, pk: {pk}")
-        logger.info(f"Request data: {request.data if hasattr(request, 'data') else 'No data'}")
-        
+        logger.debug("manage_detail %s reserva %s", request.method, pk)
+
         # Manejar CORS preflight requests
         if request.method == "OPTIONS":
             response = Response(status=200)
@@ -147,10 +167,20 @@ class BookViewSet(viewsets.ViewSet):
             return response
         
         if request.method == "GET":
+            # ``?fields=`` limita las claves de la respuesta y lo que se consulta
             try:
-                detail_dto = BookManager.get_book_detail(int(pk))
-                serializer = BookDetailSerializer(detail_dto)
-                response = Response(serializer.data)
+                fields = requested_fields(request, BookDetailSerializer)
+            except ValueError as e:
+                response = Response({"detail": str(e)}, status=400)
+                response["Access-Control-Allow-Origin"] = "*"
+                return response
+
+            try:
+                detail_dto = BookManager.get_book_detail(int(pk), fields)
+                data = BookDetailSerializer(detail_dto).data
+                if fields is not None:
+                    data = {name: data[name] for name in fields}
+                response = Response(data)
                 # Agregar headers CORS explícitos
                 response["Access-Control-Allow-Origin"] = "*"
                 response["Access-Control-Allow-Methods"] = "GET, PUT, OPTIONS"
@@ -161,25 +191,21 @@ class BookViewSet(viewsets.ViewSet):
                 response["Access-Control-Allow-Origin"] = "*"
                 return response
             except Exception as e:
-                logger.error(f"Error en GET detail: {str(e)}")
+                logger.exception("Error al obtener el detalle de la reserva %s", pk)
                 response = Response({"detail": f"Error al obtener detalles: {str(e)}"}, status=400)
                 response["Access-Control-Allow-Origin"] = "*"
                 return response
         
         elif request.method == "PUT":
             try:
-                logger.info(f"Processing PUT request for book {pk}")
-                
                 # Obtener los detalles actuales
                 current_detail = BookManager.get_book_detail(int(pk))
                 
                 # Validar datos de entrada
-                logger.info(f"Validating data with serializer...")
                 serializer = BookDetailSerializer(current_detail, data=request.data, partial=True)
                 serializer.is_valid(raise_exception=True)
                 
                 # Actualizar con log automático
-                logger.info(f"Saving updated details...")
                 updated_detail = serializer.save()
                 
                 # Devolver detalles actualizados
@@ -189,15 +215,15 @@ class BookViewSet(viewsets.ViewSet):
                 response["Access-Control-Allow-Origin"] = "*"
                 response["Access-Control-Allow-Methods"] = "GET, PUT, OPTIONS"
                 response["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-                logger.info(f"PUT request completed successfully")
+                logger.info("Reserva %s actualizada desde el detalle", pk)
                 return response
             except ValueError as e:
-                logger.error(f"ValueError en PUT detail: {str(e)}")
+                logger.warning("Reserva %s no actualizada: %s", pk, e)
                 response = Response({"detail": str(e)}, status=404)
                 response["Access-Control-Allow-Origin"] = "*"
                 return response
             except Exception as e:
-                logger.error(f"Error general en PUT detail: {str(e)}")
+                logger.exception("Error al actualizar la reserva %s", pk)
                 response = Response({"detail": f"Error al actualizar reserva: {str(e)}"}, status=400)
                 response["Access-Control-Allow-Origin"] = "*"
                 return response
@@ -2,7 +2,9 @@ from rest_framework import status, viewsets
 from rest_framework.response import Response
 
 from api.v1.serializers.capacity import CapacitySerializer
+from api.v1.views.conditional import catalog_conditional
 from reservations.models import Capacity
+from reservations.services.catalog_version import CatalogVersionService
 
 
 class CapacityViewSet(viewsets.ViewSet):
@@ -11,6 +13,7 @@ class CapacityViewSet(viewsets.ViewSet):
     # ------------------------------------------------------------------
     # Obtener listado (por si se necesita)
     # ------------------------------------------------------------------
+    @catalog_conditional(CatalogVersionService.CAPACITY)
     def list(self, request):
         cap = Capacity.objects.first()
         if not cap:
@@ -20,6 +23,7 @@ class CapacityViewSet(viewsets.ViewSet):
     # ------------------------------------------------------------------
     # Obtener por ID
     # ------------------------------------------------------------------
+    @catalog_conditional(CatalogVersionService.CAPACITY)
     def retrieve(self, request, pk=None):
         cap = Capacity.objects.first()
         if not cap:
@@ -0,0 +1,63 @@
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.v1.serializers.book import BookingSerializer
+from api.v1.serializers.client import ClientSerializer
+from api.v1.serializers.gift_voucher import GiftVoucherWithDetailsSerializer
+from api.v1.serializers.rows import RowSerializer
+from reservations.services.change_feed import ChangeFeedService, CursorExpired
+
+
+class ChangesView(APIView):
+    """Feed de cambios para mantener una caché local en el frontend de staff."""
+
+    # Mismas claves que los listados de cada tipo
+    rows = {
+        'bookings': RowSerializer(BookingSerializer),
+        'clients': RowSerializer(ClientSerializer),
+        'gift_vouchers': RowSerializer(GiftVoucherWithDetailsSerializer, exclude=('used',)),
+    }
+    # Además, ``updated_at`` en todas: el cliente ordena los ``upsert`` con él
+    updated_at = serializers.DateTimeField()
+
+    def get(self, request):
+        """
+        Devuelve las reservas, clientes y cheques modificados y los borrados
+        desde ``since``.
+
+        ``{"bookings": [...], "clients": [...], "gift_vouchers": [...],
+        "deleted": {"bookings": [ids], ...}, "cursor": "...", "has_more": false}``
+
+        Cada fila trae las claves del listado de su tipo más ``updated_at``.
+
+        Sin ``since`` devuelve todos los datos (carga inicial). El ``cursor`` de
+        la respuesta se envía como ``since`` en la siguiente petición; mientras
+        ``has_more`` sea ``true`` hay más cambios pendientes. Los cambios
+        recientes pueden repetirse: se aplican como ``upsert`` por ``id``.
+
+        Query params:
+            since: ``cursor`` de la respuesta anterior
+            page_size: Filas máximas por tipo (máximo ``ChangeFeedService.PAGE_SIZE``)
+
+        Respuestas:
+            400: Cursor o ``page_size`` inválidos
+            410: Cursor anterior a los borrados conservados; hay que recargar sin ``since``
+        """
+        params = request.query_params
+        try:
+            changes = ChangeFeedService.changes(
+                cursor=params.get('since') or None,
+                page_size=int(params['page_size']) if params.get('page_size') else None,
+            )
+        except CursorExpired as e:
+            return Response({'detail': str(e)}, status=status.HTTP_410_GONE)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        for kind, serializer in self.rows.items():
+            rows = changes[kind]
+            changes[kind] = serializer.to_representation(rows)
+            for item, row in zip(changes[kind], rows):
+                item['updated_at'] = self.updated_at.to_representation(row['updated_at'])
+        return Response(changes)
@@ -2,17 +2,25 @@ from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import action
 
-from api.v1.serializers.client import ClientSerializer
+from api.v1.serializers.client import ClientSerializer, ClientUnificationJobSerializer
+from api.v1.serializers.rows import RowSerializer
 from reservations.managers.client import ClientManager
+from reservations.models import ClientUnificationJob
 
 
 class ClientViewSet(viewsets.ViewSet):
     """Endpoints CRUD para clientes usando DTO/Manager."""
 
+    # Listado de lectura: filas ``values()`` con la salida de ``ClientSerializer``
+    rows = RowSerializer(ClientSerializer)
+
     def list(self, request):
-        dtos = ClientManager.list_clients()
-        serializer = ClientSerializer(dtos, many=True)
-        return Response(serializer.data)
+        """Lista los clientes. ``?fields=id,name`` limita las claves (y columnas) devueltas."""
+        try:
+            fields = self.rows.requested_fields(request)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.rows.to_representation(ClientManager.list_client_rows(fields=fields), fields))
 
     def create(self, request):
         serializer = ClientSerializer(data=request.data)
@@ -49,10 +57,12 @@ class ClientViewSet(viewsets.ViewSet):
         """
         Obtiene una vista previa de los clientes duplicados sin realizar cambios.
         
-        GET /api/v1/clientes/duplicados-preview/
+        GET /api/v1/clientes/duplicados-preview/?page=1&page_size=50
         """
         try:
-            preview_data = ClientManager.get_duplicate_clients_preview()
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', 50))
+            preview_data = ClientManager.get_duplicate_clients_preview(page=page, page_size=page_size)
             return Response(preview_data)
         except Exception as e:
             return Response(
@@ -60,86 +70,88 @@ class ClientViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-    @action(detail=False, methods=["post"], url_path="unificar")
-    def unify_clients(self, request):
+    @action(detail=False, methods=["get"], url_path="duplicados-similares")
+    def preview_fuzzy_duplicates(self, request):
         """
-        Unifica todos los clientes duplicados encontrados en el sistema.
+        Obtiene posibles duplicados no exactos (acentos, erratas, prefijos de teléfono).
         
-        POST /api/v1/clientes/unificar/
+        GET /api/v1/clientes/duplicados-similares/?threshold=0.85&limit=100
         """
         try:
-            result = ClientManager.unify_duplicate_clients()
-            return Response(result, status=status.HTTP_200_OK)
+            threshold = request.query_params.get('threshold')
+            limit = int(request.query_params.get('limit', 100))
+            preview_data = ClientManager.get_fuzzy_duplicate_clients_preview(
+                threshold=float(threshold) if threshold else None,
+                limit=limit,
+            )
+            return Response(preview_data)
         except Exception as e:
             return Response(
-                {"detail": f"Error durante la unificación de clientes: {str(e)}"}, 
+                {"detail": f"Error obteniendo duplicados similares: {str(e)}"}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-    @action(detail=False, methods=["get"], url_path="buscar-similares")
-    def find_similar_clients(self, request):
+    @action(detail=False, methods=["post"], url_path="unificar")
+    def unify_clients(self, request):
         """
-        Busca clientes similares basándose en criterios de búsqueda.
+        Unifica todos los clientes duplicados encontrados en el sistema.
         
-        GET /api/v1/clientes/buscar-similares/?name=X&surname=Y&email=Z&phone_number=W
+        POST /api/v1/clientes/unificar/
+
+        La unificación completa se ejecuta en segundo plano (Celery) y la
+        respuesta (202) incluye el proceso creado; su progreso se consulta en
+        ``unificacion/<id>/``.
+
+        Con ``{"groups": [[id, id, ...], ...]}`` en el cuerpo unifica sólo esos
+        grupos (por ejemplo, los candidatos de ``duplicados-similares``) de
+        forma inmediata, hasta ``ClientManager.MAX_EXPLICIT_GROUPS`` por
+        petición (400 si se envían más).
         """
         try:
-            name = request.query_params.get('name')
-            surname = request.query_params.get('surname') 
-            email = request.query_params.get('email')
-            phone_number = request.query_params.get('phone_number')
-            
-            dtos = ClientManager.find_similar_clients(
-                name=name,
-                surname=surname,
-                email=email,
-                phone_number=phone_number
-            )
-            
-            serializer = ClientSerializer(dtos, many=True)
-            return Response(serializer.data)
-            
+            groups = request.data.get('groups') if hasattr(request.data, 'get') else None
+            if groups:
+                result = ClientManager.unify_client_groups(groups)
+                return Response(result, status=status.HTTP_200_OK)
+
+            job_dto = ClientManager.start_unification_job()
+            data = ClientUnificationJobSerializer(job_dto).data
+            data.update({
+                "success": True,
+                "message": f"Unificación #{job_dto.id} iniciada. {job_dto.total_groups} grupos pendientes.",
+            })
+            return Response(data, status=status.HTTP_202_ACCEPTED)
         except Exception as e:
             return Response(
-                {"detail": f"Error buscando clientes similares: {str(e)}"}, 
+                {"detail": f"Error durante la unificación de clientes: {str(e)}"}, 
                 status=status.HTTP_400_BAD_REQUEST
-            ) 
-
-    # ------------------------------------------------------------------
-    # Endpoints para unificación de clientes
-    # ------------------------------------------------------------------
+            )
 
-    @action(detail=False, methods=["get"], url_path="duplicados-preview")
-    def preview_duplicates(self, request):
+    @action(detail=False, methods=["get"], url_path=r"unificacion/(?P<job_id>[0-9]+)")
+    def unification_progress(self, request, job_id=None):
         """
-        Obtiene una vista previa de los clientes duplicados sin realizar cambios.
+        Obtiene el progreso de una unificación en segundo plano.
         
-        GET /api/v1/clientes/duplicados-preview/
+        GET /api/v1/clientes/unificacion/<id>/
         """
-        try:
-            preview_data = ClientManager.get_duplicate_clients_preview()
-            return Response(preview_data)
-        except Exception as e:
-            return Response(
-                {"detail": f"Error obteniendo vista previa de duplicados: {str(e)}"}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        job_dto = ClientManager.get_unification_job(int(job_id))
+        if job_dto is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(ClientUnificationJobSerializer(job_dto).data)
 
-    @action(detail=False, methods=["post"], url_path="unificar")
-    def unify_clients(self, request):
+    @action(detail=False, methods=["post"], url_path=r"unificacion/(?P<job_id>[0-9]+)/reanudar")
+    def resume_unification(self, request, job_id=None):
         """
-        Unifica todos los clientes duplicados encontrados en el sistema.
+        Reanuda una unificación interrumpida desde su último checkpoint.
         
-        POST /api/v1/clientes/unificar/
+        POST /api/v1/clientes/unificacion/<id>/reanudar/
         """
         try:
-            result = ClientManager.unify_duplicate_clients()
-            return Response(result, status=status.HTTP_200_OK)
-        except Exception as e:
-            return Response(
-                {"detail": f"Error durante la unificación de clientes: {str(e)}"}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            job_dto = ClientManager.resume_unification_job(int(job_id))
+            return Response(ClientUnificationJobSerializer(job_dto).data, status=status.HTTP_202_ACCEPTED)
+        except ClientUnificationJob.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=["get"], url_path="buscar-similares")
     def find_similar_clients(self, request):
@@ -168,4 +180,4 @@ class ClientViewSet(viewsets.ViewSet):
             return Response(
                 {"detail": f"Error buscando clientes similares: {str(e)}"}, 
                 status=status.HTTP_400_BAD_REQUEST
-            ) 
\ No newline at end of file
+            )
@@ -0,0 +1,40 @@
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from reservations.services.catalog_version import CatalogVersionService
+
+
+def catalog_conditional(*catalogs: str):
+    """
+    Añade ETag / Last-Modified a un método GET de un ViewSet de catálogo.
+
+    La versión se obtiene de ``CatalogVersionService`` (una consulta). Si el
+    cliente envía ``If-None-Match`` / ``If-Modified-Since`` y el catálogo no ha
+    cambiado, se responde 304 sin consultar ni serializar los datos.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            version, last_modified = CatalogVersionService.get(catalogs)
+            etag = quote_etag(version)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if not_modified is not None:
+                return not_modified
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                response['ETag'] = etag
+                if timestamp is not None:
+                    response['Last-Modified'] = http_date(timestamp)
+                # El navegador puede guardar la respuesta pero debe revalidarla siempre
+                response['Cache-Control'] = 'no-cache'
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,18 +1,94 @@
+import csv
+from datetime import datetime
+
+from django.http import StreamingHttpResponse
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from api.v1.serializers.gift_voucher import GiftVoucherSerializer, GiftVoucherWithDetailsSerializer, StaffGiftVoucherSerializer
+from api.v1.serializers.gift_voucher import (
+    GiftVoucherSerializer, GiftVoucherWithDetailsSerializer, GiftVoucherSummarySerializer, StaffGiftVoucherSerializer,
+    StaffBulkGiftVoucherSerializer,
+)
+from api.v1.serializers.client import ClientSerializer
+from api.v1.serializers.rows import RowSerializer, requested_fields
+from reservations.managers.client import ClientMatchSuggestion
 from reservations.managers.gift_voucher import GiftVoucherManager  # asegúrate de implementarlo
 
 
 class GiftVoucherViewSet(viewsets.ViewSet):
     """CRUD endpoints para cheques regalo."""
 
+    # Parámetros que activan el listado paginado por cursor
+    PAGINATION_PARAMS = ('cursor', 'page_size', 'compact', 'status', 'bought_from', 'bought_to', 'buyer_id', 'buyer')
+
+    # Listado completo de lectura: filas ``values()`` con la salida de
+    # ``GiftVoucherWithDetailsSerializer`` (el DTO no tiene ``used``)
+    rows = RowSerializer(GiftVoucherWithDetailsSerializer, exclude=('used',))
+
     def list(self, request):
-        vouchers = GiftVoucherManager.list_vouchers_with_details()
-        serializer = GiftVoucherWithDetailsSerializer(vouchers, many=True)
-        return Response(serializer.data)
+        """
+        Lista los cheques regalo.
+
+        Sin parámetros devuelve todos los cheques (compatibilidad con clientes
+        antiguos; el frontend de staff pagina). Con cualquiera de
+        ``PAGINATION_PARAMS`` devuelve una página:
+        ``{"results": [...], "next_cursor": "...", "page_size": 50}``.
+
+        Query params:
+            status: Uno o varios estados separados por comas (400 si alguno no existe)
+            bought_from / bought_to: Rango de fecha de compra (YYYY-MM-DD)
+            buyer_id: ID del cliente comprador
+            buyer: Texto a buscar en los datos del comprador
+            cursor: ``next_cursor`` de la página anterior
+            page_size: Elementos por página
+            compact: ``1`` para la proyección reducida de la tabla
+            fields: Claves a devolver separadas por comas (todas si se omite)
+        """
+        params = request.query_params
+        compact = params.get('compact', '').lower() in ('1', 'true', 'yes')
+        try:
+            fields = requested_fields(
+                request, GiftVoucherSummarySerializer if compact else GiftVoucherWithDetailsSerializer,
+                exclude=() if compact else self.rows.exclude,
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not any(name in params for name in self.PAGINATION_PARAMS):
+            return Response(self.rows.to_representation(GiftVoucherManager.list_voucher_detail_rows(fields=fields), fields))
+
+        try:
+            bought_from = params.get('bought_from')
+            bought_to = params.get('bought_to')
+            page = GiftVoucherManager.list_vouchers_page(
+                status=[s for s in params.get('status', '').split(',') if s] or None,
+                bought_from=datetime.strptime(bought_from, '%Y-%m-%d').date() if bought_from else None,
+                bought_to=datetime.strptime(bought_to, '%Y-%m-%d').date() if bought_to else None,
+                buyer_id=int(params['buyer_id']) if params.get('buyer_id') else None,
+                buyer=params.get('buyer') or None,
+                cursor=params.get('cursor') or None,
+                page_size=int(params['page_size']) if params.get('page_size') else None,
+                compact=compact,
+                fields=None if compact else fields,
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if compact:
+            # La proyección compacta ya lee sólo las columnas de la tabla
+            results = GiftVoucherSummarySerializer(page.results, many=True).data
+            if fields is not None:
+                results = [{name: item[name] for name in fields} for item in results]
+        elif fields is not None:
+            results = self.rows.to_representation(page.results, fields)
+        else:
+            results = GiftVoucherWithDetailsSerializer(page.results, many=True).data
+        return Response({
+            'results': results,
+            'next_cursor': page.next_cursor,
+            'page_size': page.page_size,
+        })
 
     def create(self, request):
         serializer = GiftVoucherSerializer(data=request.data)
@@ -48,6 +124,11 @@ class GiftVoucherViewSet(viewsets.ViewSet):
         try:
             dto_created = serializer.save()
             return Response(GiftVoucherSerializer(dto_created).data, status=status.HTTP_201_CREATED)
+        except ClientMatchSuggestion as e:
+            return Response(
+                {'error': str(e), 'candidates': ClientSerializer(e.candidates, many=True).data},
+                status=status.HTTP_409_CONFLICT
+            )
         except ValueError as e:
             return Response(
                 {'error': str(e)}, 
@@ -59,23 +140,55 @@ class GiftVoucherViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['post'], url_path='bulk-create-from-staff')
+    def bulk_create_from_staff(self, request):
+        """
+        Emite varios cheques iguales para un mismo comprador (pedidos de empresa).
 
-    @action(detail=False, methods=['post'], url_path='create-from-staff')
-    def create_from_staff(self, request):
-        """Crear cheque regalo desde staff con masajes y datos completos."""
-        serializer = StaffGiftVoucherSerializer(data=request.data)
+        Mismo cuerpo que ``create-from-staff`` más ``quantity``, ``recipients``
+        (opcional, uno por cheque) y ``status`` inicial. Con ``?output=csv`` la
+        respuesta es un CSV en streaming listo para imprimir o generar PDFs.
+        """
+        serializer = StaffBulkGiftVoucherSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        
+
         try:
-            dto_created = serializer.save()
-            return Response(GiftVoucherSerializer(dto_created).data, status=status.HTTP_201_CREATED)
-        except ValueError as e:
+            dtos_created = serializer.save()
+        except ClientMatchSuggestion as e:
             return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': str(e), 'candidates': ClientSerializer(e.candidates, many=True).data},
+                status=status.HTTP_409_CONFLICT
             )
-        except Exception as e:
-            return Response(
-                {'error': f'Error interno del servidor: {str(e)}'}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get('output') == 'csv':
+            response = StreamingHttpResponse(
+                self._vouchers_csv_rows(dtos_created),
+                content_type='text/csv; charset=utf-8',
+                status=status.HTTP_201_CREATED,
             )
+            response['Content-Disposition'] = 'attachment; filename="cheques.csv"'
+            return response
+
+        return Response(GiftVoucherSerializer(dtos_created, many=True).data, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def _vouchers_csv_rows(dtos):
+        """Genera el CSV línea a línea sin construirlo entero en memoria."""
+
+        class _Echo:
+            def write(self, value):
+                return value
+
+        writer = csv.writer(_Echo())
+        yield writer.writerow([
+            'codigo', 'precio', 'estado', 'personas', 'regalo',
+            'destinatario_nombre', 'destinatario_apellidos', 'destinatario_email', 'fecha',
+        ])
+        for dto in dtos:
+            yield writer.writerow([
+                dto.code, dto.price, dto.status, dto.people, dto.gift_name,
+                dto.recipients_name, dto.recipients_surname, dto.recipients_email,
+                dto.created_at.strftime('%d/%m/%Y') if dto.created_at else '',
+            ])
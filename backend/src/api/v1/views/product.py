@@ -4,13 +4,16 @@ from rest_framework.decorators import action
 
 from api.v1.serializers.product import ProductSerializer
 from api.v1.serializers.bath_type import BathTypeSerializer
+from api.v1.views.conditional import catalog_conditional
 from reservations.models import Product
 from reservations.managers.product import ProductManager
+from reservations.services.catalog_version import CatalogVersionService
 
 
 class ProductViewSet(viewsets.ViewSet):
     """CRUD endpoints para productos."""
 
+    @catalog_conditional(CatalogVersionService.PRODUCTS)
     def list(self, request):
         products = Product.objects.all().prefetch_related("baths", "hostings")
         serializer = ProductSerializer(products, many=True)
@@ -22,6 +25,7 @@ class ProductViewSet(viewsets.ViewSet):
         product = serializer.save()
         return Response(ProductSerializer(product).data, status=status.HTTP_201_CREATED)
 
+    @catalog_conditional(CatalogVersionService.PRODUCTS)
     def retrieve(self, request, pk=None):
         try:
             product = Product.objects.get(id=pk)
@@ -44,6 +48,7 @@ class ProductViewSet(viewsets.ViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=True, methods=['get'])
+    @catalog_conditional(CatalogVersionService.PRODUCTS)
     def baths(self, request, pk=None):
         """Obtiene los tipos de baño asociados a un producto."""
         try:
@@ -0,0 +1,26 @@
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+
+from api.v1.serializers.quote import QuoteRequestSerializer, QuoteSerializer
+from reservations.services.pricing import PricingService
+
+
+class QuoteViewSet(viewsets.ViewSet):
+    """Presupuestos de varios carritos de baños/masajes en una sola petición."""
+
+    def create(self, request):
+        """
+        POST /api/v1/quotes/
+
+        Body: ``{"carts": [{"id": "a", "baths": [{"massage_type": "relax", "minutes": "30", "quantity": 2}]}]}``
+
+        Devuelve ``{"quotes": [...]}`` con el total, el desglose, el producto
+        existente equivalente y, si el carrito no es válido, el error.
+        """
+        serializer = QuoteRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            quotes = PricingService.quote_carts(serializer.validated_data['carts'])
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"quotes": QuoteSerializer(quotes, many=True).data})
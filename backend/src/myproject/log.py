@@ -0,0 +1,145 @@
+"""
+Piezas de la configuración de logging (``LOGGING`` en settings).
+
+Los registros se encolan en el hilo que los emite (``QueueListenerHandler``)
+y un hilo aparte los formatea y escribe, de modo que una petición no espera
+a la E/S de la consola. En el hilo emisor sólo se ejecutan los filtros:
+
+- ``RequestIdFilter`` añade ``request_id`` (lo fija ``RequestIdMiddleware``);
+- ``SamplingFilter`` deja pasar 1 de cada N registros de eventos frecuentes.
+
+``JsonFormatter`` escribe una línea JSON por registro con los campos pasados
+en ``extra``.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import queue
+import threading
+from logging.config import ConvertingList
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Identificador de la petición en curso ('-' fuera de una petición)
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar('request_id', default='-')
+
+# Atributos estándar de ``LogRecord``; el resto viene de ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class RequestIdFilter(logging.Filter):
+    """Añade ``record.request_id`` con el identificador de la petición en curso."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Muestreo determinista de eventos frecuentes: de cada ``round(1 / rate)``
+    registros con el mismo logger y mensaje sólo pasa el primero.
+
+    La proporción sale de ``extra={'sample_rate': ...}`` o, si no, del prefijo
+    de logger más largo en ``rates``. Los avisos y errores nunca se muestrean.
+    El registro que pasa lleva ``sampled`` (N) para poder reescalar recuentos.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, name: str = ''):
+        super().__init__(name)
+        self.rates = dict(rates or {})
+        self._counts: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def _rate(self, record: logging.LogRecord) -> float:
+        rate = getattr(record, 'sample_rate', None)
+        if rate is not None:
+            return rate
+        name = record.name
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        every = round(1 / rate)
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        record.sampled = every
+        return count % every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro, con ``request_id`` y los campos de ``extra``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+        }
+        entry.update({
+            key: value for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS and key not in entry
+        })
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    ``QueueHandler`` que arranca su propio ``QueueListener`` con los handlers
+    indicados (``'cfg://handlers.console'`` en ``LOGGING``).
+
+    Python 3.11 no admite ``listener`` en ``dictConfig``; esta clase cubre ese
+    hueco. El listener se detiene (vaciando la cola) al salir el proceso.
+    """
+
+    def __init__(self, handlers, queue_size: int = 10000, respect_handler_level: bool = True):
+        super().__init__(queue.Queue(queue_size))
+        if isinstance(handlers, ConvertingList):
+            handlers = [handlers[i] for i in range(len(handlers))]
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=respect_handler_level)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Resuelve el mensaje y la traza en el hilo emisor (los argumentos pueden
+        cambiar después), pero sin formatear: decide el handler de destino.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Con la cola llena se descarta el registro en lugar de bloquear la petición."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+    def stop(self) -> None:
+        if self.listener._thread is not None:
+            self.listener.stop()
@@ -1,6 +1,8 @@
 from pathlib import Path
 import os
-import logging.config  # noqa: E402
+
+from celery.schedules import crontab
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -27,10 +29,13 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django_celery_results',
     'reservations',
 ]
 
 MIDDLEWARE = [
+    'reservations.middleware.MetricsMiddleware',
+    'reservations.middleware.RequestIdMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -39,6 +44,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'reservations.middleware.RequestProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'myproject.urls'
@@ -106,6 +112,18 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# ------------------------------------------------------------------
+# Django REST framework
+# ------------------------------------------------------------------
+
+# JSON con orjson (misma salida que el renderizador de DRF) y la API navegable
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.v1.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
 # ------------------------------------------------------------------
 # CORS (solo para entorno de desarrollo)
 # ------------------------------------------------------------------
@@ -113,48 +131,151 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Permitimos todas las origins para simplificar en local.
 # En producción conviene limitarlo a los dominios necesarios.
 CORS_ALLOW_ALL_ORIGINS = True
+# Cabeceras de perfilado (X-Profile) y de correlación de logs (X-Request-ID)
+CORS_ALLOW_HEADERS = (*default_headers, 'x-profile', 'x-request-id')
+CORS_EXPOSE_HEADERS = ['X-Profile-Id', 'X-Request-ID']
+
+# ------------------------------------------------------------------
+# Celery (tareas en segundo plano)
+# ------------------------------------------------------------------
+
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/0')
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'django-db')
+CELERY_TIMEZONE = TIME_ZONE
+# Confirmar la tarea al terminar: si el worker muere, la tarea se reentrega
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+CELERY_BEAT_SCHEDULE = {
+    'expire-gift-vouchers': {
+        'task': 'reservations.tasks.expire_gift_vouchers_task',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'compact-hidden-products': {
+        'task': 'reservations.tasks.compact_hidden_products_task',
+        'schedule': crontab(hour=4, minute=0, day_of_week='mon'),
+    },
+    # Sólo recalcula los días marcados; el informe de facturación ya no lo hace
+    'refresh-daily-stats': {
+        'task': 'reservations.tasks.refresh_daily_stats_task',
+        'schedule': crontab(minute='*/10'),
+    },
+    'prune-change-tombstones': {
+        'task': 'reservations.tasks.prune_change_tombstones_task',
+        'schedule': crontab(hour=4, minute=30),
+    },
+}
+
+# Grupos de duplicados procesados por transacción en la unificación de clientes
+CLIENT_UNIFICATION_CHUNK_SIZE = 50
+
+# Qué hacer al crear reservas/cheques desde staff con un email o teléfono ya
+# registrado: 'auto_attach' (reutilizar el cliente), 'suggest' (devolver los
+# candidatos para que el staff elija) o 'never' (crear siempre uno nuevo)
+CLIENT_MATCH_POLICY = os.environ.get('CLIENT_MATCH_POLICY', 'auto_attach')
+
+# Caducidad de cheques regalo (barrido nocturno con Celery beat o con el
+# comando ``expire_gift_vouchers``). Los días cuentan desde la creación del
+# cheque; la caducidad de cheques pagados está desactivada si no se indica.
+GIFT_VOUCHER_PENDING_TTL_DAYS = int(os.environ.get('GIFT_VOUCHER_PENDING_TTL_DAYS', '30'))
+GIFT_VOUCHER_VALIDITY_DAYS = int(os.environ['GIFT_VOUCHER_VALIDITY_DAYS']) if os.environ.get('GIFT_VOUCHER_VALIDITY_DAYS') else None
+GIFT_VOUCHER_SWEEP_BATCH_SIZE = 500
+
+# Días que se conservan los borrados del feed de cambios (/api/v1/changes);
+# un cursor más antiguo recibe 410 y el cliente debe volver a cargar los datos
+CHANGE_FEED_TOMBSTONE_DAYS = int(os.environ.get('CHANGE_FEED_TOMBSTONE_DAYS', '30'))
+
+# ------------------------------------------------------------------
+# Métricas (/metrics, formato Prometheus)
+# ------------------------------------------------------------------
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+# Directorio compartido por los workers de gunicorn para sumar sus métricas;
+# sin él cada proceso sólo expone las suyas
+METRICS_DIR = os.environ.get('METRICS_DIR') or None
+METRICS_FLUSH_SECONDS = 1.0
+# Si se define, /metrics exige ``Authorization: Bearer <token>``
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
 
 # ------------------------------------------------------------------
-# Logging (muestra DEBUG de la aplicación en consola)
+# Perfilado bajo demanda
 # ------------------------------------------------------------------
 
+# Un usuario staff puede perfilar una petición con la cabecera
+# ``X-Profile: cprofile|sample`` o ``?_profile=cprofile|sample``. El informe
+# (pstats o pilas plegadas y consultas SQL) se descarga desde el admin.
+REQUEST_PROFILING_ENABLED = os.environ.get('REQUEST_PROFILING_ENABLED', '1') == '1'
+REQUEST_PROFILE_KEEP = 200
+REQUEST_PROFILE_MAX_QUERIES = 2000
+REQUEST_PROFILE_SAMPLE_INTERVAL = 0.005
+
+# ------------------------------------------------------------------
+# Logging
+# ------------------------------------------------------------------
+
+# Los registros pasan por una cola (``myproject.log.QueueListenerHandler``) y
+# un hilo aparte los escribe en consola, con el ``request_id`` de la petición.
+# ``LOG_FORMAT=json`` escribe una línea JSON por registro.
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+# Niveles por módulo; ``LOG_LEVELS="reservations.managers.availability=DEBUG,api=INFO"``
+# añade o sustituye entradas sin tocar este fichero
+LOG_LEVELS = {
+    'reservations': LOG_LEVEL,
+    'api': LOG_LEVEL,
+    'django': 'INFO',
+    'django.db.backends': 'WARNING',
+    'celery': 'INFO',
+}
+LOG_LEVELS.update(
+    item.split('=', 1) for item in os.environ.get('LOG_LEVELS', '').split(',') if '=' in item
+)
+
+# Proporción de registros DEBUG/INFO que se conservan por logger (eventos frecuentes)
+LOG_SAMPLE_RATES = {
+    'reservations.managers.availability': 0.1,
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {
+            '()': 'myproject.log.RequestIdFilter',
+        },
+        'sampling': {
+            '()': 'myproject.log.SamplingFilter',
+            'rates': LOG_SAMPLE_RATES,
+        },
+    },
     'formatters': {
-        'simple': {
-            'format': '[{levelname}] {asctime} {name}: {message}',
+        'text': {
+            'format': '[{levelname}] {asctime} {name} [{request_id}]: {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'myproject.log.JsonFormatter',
+        },
     },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
-            'formatter': 'simple',
+            'formatter': LOG_FORMAT,
+        },
+        'queue': {
+            '()': 'myproject.log.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console'],
+            'filters': ['request_id', 'sampling'],
         },
     },
     'root': {
-        'handlers': ['console'],
-        'level': 'DEBUG',
+        'handlers': ['queue'],
+        'level': 'WARNING',
     },
-    # Loggers específicos de la app. Ajusta el nivel según necesidades.
     'loggers': {
-        # Todos los módulos bajo "reservations." (managers, services, etc.)
-        'reservations': {
-            'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': False,
-        },
-        'reservations.managers.availability': {
-            'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': False,
-        },
-        # Ajusta el nivel de Django para evitar demasiado ruido.
-        'django': {
-            'handlers': ['console'],
-            'level': 'INFO',
-            'propagate': False,
-        },
+        name: {'handlers': ['queue'], 'level': level, 'propagate': False}
+        for name, level in LOG_LEVELS.items()
     },
-} 
\ No newline at end of file
+}
@@ -0,0 +1,134 @@
+"""
+Perfil de producción: ``DJANGO_SETTINGS_MODULE=myproject.settings.prod``.
+
+Parte de ``dev`` y cambia lo que cuesta en cada petición: ``DEBUG``
+(guarda todas las consultas SQL en memoria), una conexión nueva a
+PostgreSQL por petición, el renderizador navegable de DRF y la caché por
+defecto de cada proceso. Los valores se leen del entorno (``.env``).
+
+    python manage.py benchmark_settings   # coste por petición frente a dev
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .dev import *  # noqa: F401,F403
+from .dev import DATABASES, LOGGING, TEMPLATES
+
+DEBUG = os.environ.get('DEBUG', '0') == '1'
+
+# Sin valor por defecto: la clave de dev es pública
+SECRET_KEY = os.environ.get('SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured("El perfil prod requiere la variable de entorno SECRET_KEY")
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('ALLOWED_HOSTS', 'localhost').split(',') if host.strip()]
+
+# ------------------------------------------------------------------
+# Base de datos
+# ------------------------------------------------------------------
+
+# Conexiones persistentes: cada worker reutiliza su conexión durante
+# ``DB_CONN_MAX_AGE`` segundos y la comprueba antes de usarla tras un error
+# o un reinicio de PostgreSQL, en lugar de abrir una por petición.
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_NAME', DATABASES['default']['NAME']),
+        'USER': os.environ.get('DB_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get('DB_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.environ.get('DB_HOST', DATABASES['default']['HOST']),
+        'PORT': os.environ.get('DB_PORT', DATABASES['default']['PORT']),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Para agrupar conexiones entre workers la opción soportada es PgBouncer
+# delante de PostgreSQL (``DB_HOST``/``DB_PORT`` apuntando a PgBouncer). El
+# pool propio de Django necesita Django 5.1+ y psycopg 3, y el proyecto usa
+# Django 5.0 con psycopg2. En modo ``pool_mode = transaction`` los cursores
+# con nombre de ``QuerySet.iterator()`` no sobreviven entre transacciones:
+# hay que poner ``DB_PGBOUNCER_TRANSACTION=1``.
+if os.environ.get('DB_PGBOUNCER_TRANSACTION', '0') == '1':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# ------------------------------------------------------------------
+# Plantillas y caché
+# ------------------------------------------------------------------
+
+# Plantillas compiladas una vez por proceso (admin y correos)
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# ``CACHE_BACKEND=redis`` comparte la caché (heatmap de ocupación, sesiones)
+# entre workers; ``locmem`` la mantiene en cada proceso.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get(
+                'CACHE_REDIS_URL',
+                f"redis://{os.environ.get('REDIS_HOST', 'redis')}:{os.environ.get('REDIS_PORT', '6379')}/1",
+            ),
+            'KEY_PREFIX': 'banos',
+            'TIMEOUT': 300,
+        }
+    }
+elif CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'banos',
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"CACHE_BACKEND desconocido: {CACHE_BACKEND} (locmem o redis)")
+
+# Sesiones del admin leídas de la caché (y guardadas también en base de datos)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# ------------------------------------------------------------------
+# Django REST framework
+# ------------------------------------------------------------------
+
+# Sólo JSON: sin el renderizador navegable (plantillas y formularios en cada
+# respuesta a un navegador) ni el parser multipart, que la API no usa.
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': ['api.v1.renderers.ORJSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+    ],
+}
+
+# ------------------------------------------------------------------
+# CORS, logging y perfilado
+# ------------------------------------------------------------------
+
+# Orígenes permitidos separados por comas; sin definir no se admite ninguno
+# (la API sólo responde a peticiones del mismo origen)
+CORS_ALLOWED_ORIGINS = [
+    origin.strip() for origin in os.environ.get('CORS_ALLOWED_ORIGINS', '').split(',') if origin.strip()
+]
+CORS_ALLOW_ALL_ORIGINS = False
+
+LOGGING['handlers']['console']['formatter'] = os.environ.get('LOG_FORMAT', 'json')
+
+# El perfilado bajo demanda se activa explícitamente en producción
+REQUEST_PROFILING_ENABLED = os.environ.get('REQUEST_PROFILING_ENABLED', '0') == '1'
@@ -3,8 +3,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from reservations.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path('', include('reservations.urls')),
     path('api/v1/', include('api.v1.urls')),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
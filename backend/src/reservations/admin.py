@@ -1,18 +1,21 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from django.urls import reverse
+from django.urls import path, reverse
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
 from django.utils.safestring import mark_safe
 from .models import (
     Admin, Agent, Client, GiftVoucher,
     Product, BathType, HostingType, Availability, AvailabilityRange, Capacity,
     Book, ProductBaths, ProductHosting,
-    WebBooking, BookLogs, Constraint, ConstraintRange
+    WebBooking, BookLogs, Constraint, ConstraintRange, ClientUnificationJob, RequestProfile
 )
 from django.db import models
 from django import forms
 from django.utils import timezone
 from datetime import datetime
 from django.contrib.contenttypes.models import ContentType
+from reservations.services.profiling import RequestProfilingService
 
 # ============================================================================
 # CONFIGURACIÓN BÁSICA - TIPOS REUTILIZABLES
@@ -59,6 +62,10 @@ class ProductAdmin(admin.ModelAdmin):
     inlines = [ProductBathsInline, ProductHostingInline]
     ordering = ('-created_at',)
 
+    def get_queryset(self, request):
+        # Los resúmenes de baños y alojamientos del listado sin una consulta por fila
+        return super().get_queryset(request).prefetch_related('baths__bath_type', 'hostings__hosting_type')
+
     def baths_summary(self, obj):
         baths = obj.baths.all()
         if not baths:
@@ -282,6 +289,7 @@ class BookAdmin(admin.ModelAdmin):
     search_fields = ('internal_order_id', 'client__name', 'client__surname', 'comment')
     readonly_fields = ('created_at', 'creator_type_display', 'internal_order_id', 'hour')
     ordering = ('-created_at',)
+    list_select_related = ('client', 'product')
     autocomplete_fields = ['client']
 
     def created_at_display(self, obj):
@@ -375,6 +383,7 @@ class GiftVoucherAdmin(admin.ModelAdmin):
     search_fields = ('code', 'gift_name', 'buyer_client__name', 'recipients_name')
     readonly_fields = ('created_at', 'updated_at')
     ordering = ('-created_at',)
+    list_select_related = ('buyer_client',)
     autocomplete_fields = ['buyer_client']
     form = GiftVoucherForm
 
@@ -445,6 +454,78 @@ class ClientAdmin(admin.ModelAdmin):
             )
         return queryset, use_distinct
 
+@admin.register(ClientUnificationJob)
+class ClientUnificationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'processed_groups', 'total_groups', 'clients_removed', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    readonly_fields = (
+        'status', 'total_groups', 'processed_groups', 'clients_removed', 'books_updated',
+        'gift_vouchers_updated', 'last_email', 'last_phone', 'error', 'created_at', 'updated_at', 'finished_at',
+    )
+    ordering = ('-created_at',)
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        'created_at', 'method', 'path', 'status_code', 'duration_ms', 'query_count',
+        'duplicate_query_count', 'similar_query_count', 'mode', 'user',
+    )
+    list_filter = ('mode', 'method', 'created_at')
+    search_fields = ('path', 'user')
+    readonly_fields = (
+        'method', 'path', 'query_string', 'user', 'mode', 'status_code', 'duration_ms', 'sql_ms',
+        'query_count', 'duplicate_query_count', 'similar_query_count', 'downloads', 'summary_block',
+        'created_at',
+    )
+    exclude = ('summary', 'profile_data', 'queries')
+    ordering = ('-created_at',)
+
+    def get_queryset(self, request):
+        # El listado no necesita los volcados, que pueden ocupar varios MB
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.defer('summary', 'profile_data', 'queries')
+        return queryset
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path('<int:pk>/descargar/', self.admin_site.admin_view(self.download_profile),
+                 name='reservations_requestprofile_download'),
+            path('<int:pk>/consultas/', self.admin_site.admin_view(self.download_queries),
+                 name='reservations_requestprofile_queries'),
+        ]
+        return urls + super().get_urls()
+
+    def download_profile(self, request, pk):
+        content, content_type, filename = RequestProfilingService.download(get_object_or_404(RequestProfile, pk=pk))
+        response = HttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def download_queries(self, request, pk):
+        report = get_object_or_404(RequestProfile, pk=pk)
+        response = JsonResponse(report.queries, safe=False, json_dumps_params={'indent': 2})
+        response['Content-Disposition'] = f'attachment; filename="profile-{report.id}-queries.json"'
+        return response
+
+    def downloads(self, obj):
+        return format_html(
+            '<a href="{}">Volcado del perfilador</a> · <a href="{}">Consultas SQL (JSON)</a>',
+            reverse('admin:reservations_requestprofile_download', args=[obj.pk]),
+            reverse('admin:reservations_requestprofile_queries', args=[obj.pk]),
+        )
+    downloads.short_description = "Descargas"
+
+    def summary_block(self, obj):
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', obj.summary)
+    summary_block.short_description = "Resumen"
+
 # ============================================================================
 # CONFIGURACIÓN TÉCNICA (OCULTA O MINIMIZADA)
 # ============================================================================
@@ -452,23 +533,26 @@ class ClientAdmin(admin.ModelAdmin):
 @admin.register(WebBooking)
 class WebBookingAdmin(admin.ModelAdmin):
     list_display = ('book', 'created_at')
+    list_select_related = ('book',)
     readonly_fields = ('created_at',)
     ordering = ('-created_at',)
 
 @admin.register(ProductBaths)
 class ProductBathsAdmin(admin.ModelAdmin):
     list_display = ('product', 'bath_type', 'quantity')
+    list_select_related = ('product', 'bath_type')
     list_filter = ('bath_type',)
 
 @admin.register(ProductHosting)
 class ProductHostingAdmin(admin.ModelAdmin):
     list_display = ('product', 'hosting_type', 'quantity')
+    list_select_related = ('product', 'hosting_type')
     list_filter = ('hosting_type',)
 
 @admin.register(Availability)
 class AvailabilityAdmin(admin.ModelAdmin):
-    list_display = ('type', 'punctual_day', 'weekday_display')
-    list_filter = ('type', 'weekday')
+    list_display = ('type', 'punctual_day', 'weekday_display', 'source', 'is_draft')
+    list_filter = ('type', 'weekday', 'source', 'is_draft')
     search_fields = ('type',)
 
     def weekday_display(self, obj):
@@ -492,6 +576,7 @@ class AvailabilityRangeForm(forms.ModelForm):
 @admin.register(AvailabilityRange)
 class AvailabilityRangeAdmin(admin.ModelAdmin):
     list_display = ('availability', 'initial_time', 'end_time', 'massagists_availability')
+    list_select_related = ('availability',)
     list_filter = ('availability',)
     search_fields = ('availability__type', 'initial_time', 'end_time')
     autocomplete_fields = ['availability']
@@ -518,6 +603,7 @@ class CapacityAdmin(admin.ModelAdmin):
 @admin.register(BookLogs)
 class BookLogsAdmin(admin.ModelAdmin):
     list_display = ('book', 'datetime', 'comment_preview')
+    list_select_related = ('book',)
     list_filter = ('datetime', 'book__book_date')
     search_fields = ('book__internal_order_id', 'comment')
     readonly_fields = ('datetime',)
@@ -551,8 +637,11 @@ class ConstraintAdmin(admin.ModelAdmin):
     ordering = ('day',)
     inlines = [ConstraintRangeInline]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_ranges_count=models.Count('constraintrange'))
+
     def ranges_count(self, obj):
-        return obj.constraintrange_set.count()
+        return obj._ranges_count
     ranges_count.short_description = "Rangos de restricción"
 
     fieldsets = (
@@ -565,6 +654,7 @@ class ConstraintAdmin(admin.ModelAdmin):
 @admin.register(ConstraintRange)
 class ConstraintRangeAdmin(admin.ModelAdmin):
     list_display = ('constraint', 'initial_time', 'end_time')
+    list_select_related = ('constraint',)
     list_filter = ('constraint__day', 'initial_time', 'end_time')
     search_fields = ('constraint__day',)
     autocomplete_fields = ['constraint']
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class ReservationsConfig(AppConfig):
+    name = 'reservations'
+
+    def ready(self):
+        from reservations.services.catalog_version import CatalogVersionService
+        from reservations.services.change_feed import ChangeFeedService
+        from reservations.services.daily_stats import DailyStatsService
+        CatalogVersionService.connect_signals()
+        ChangeFeedService.connect_signals()
+        DailyStatsService.connect_signals()
@@ -25,6 +25,9 @@ class AvailabilityDTO:
     TYPE_WEEKDAY = "weekday"
     TYPE_PUNCTUAL = "punctual"
 
+    SOURCE_MANUAL = "manual"
+    SOURCE_FORECAST = "forecast"
+
     type: str  # "weekday" o "punctual"
     punctual_day: Optional[date] = None
     weekday: Optional[int] = None  # 1=Lunes, 7=Domingo
@@ -87,6 +87,7 @@ class StaffBookingPayloadDTO:
     surname: str = ""
     phone_number: str = ""
     email: str = ""
+    client_match: Optional[str] = None  # Política de coincidencia de clientes (None = settings)
     # Datos reserva
     date: str = ""
     hour: str = ""
@@ -33,4 +33,31 @@ class ClientDTO:
 
     def validate_for_update(self):
         if not self.id:
-            raise ValueError("Se requiere 'id' para actualizar un cliente")
\ No newline at end of file
+            raise ValueError("Se requiere 'id' para actualizar un cliente")
+
+# ---------------------------------------------------------------------------
+# DTO de unificación en segundo plano
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ClientUnificationJobDTO:
+    """Estado y progreso de un proceso de unificación de clientes."""
+
+    id: Optional[int] = None
+    status: Optional[str] = None
+    total_groups: int = 0
+    processed_groups: int = 0
+    clients_removed: int = 0
+    books_updated: int = 0
+    gift_vouchers_updated: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        """Porcentaje de grupos procesados (0-100)."""
+        if not self.total_groups:
+            return 100.0 if self.status == 'completed' else 0.0
+        return round(min(self.processed_groups, self.total_groups) * 100 / self.total_groups, 1)
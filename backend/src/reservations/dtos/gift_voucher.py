@@ -76,6 +76,30 @@ class GiftVoucherWithDetailsDTO:
     product_name: Optional[str] = None
 
 
+@dataclass
+class GiftVoucherSummaryDTO:
+    """Proyección compacta de un cheque regalo para la tabla del listado."""
+    id: int
+    code: str
+    status: str
+    price: Decimal
+    people: int
+    bought_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    buyer_client_id: Optional[int] = None
+    buyer_name: Optional[str] = None
+    buyer_surname: Optional[str] = None
+    product_name: Optional[str] = None
+
+
+@dataclass
+class GiftVoucherPageDTO:
+    """Página de un listado de cheques paginado por cursor."""
+    results: List = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    page_size: int = 0
+
+
 # ---------------------------------------------------------------------------
 # DTO para crear cheques regalo desde staff
 # ---------------------------------------------------------------------------
@@ -106,6 +130,7 @@ class StaffGiftVoucherPayloadDTO:
     
     # Otros
     send_whatsapp_buyer: bool = False
+    client_match: Optional[str] = None  # Política de coincidencia de clientes (None = settings)
     
     def validate(self):
         if not self.buyer_name:
@@ -120,3 +145,25 @@ class StaffGiftVoucherPayloadDTO:
             raise ValueError("Debe indicar al menos un tipo de baño/masaje")
 
 
+# ---------------------------------------------------------------------------
+# DTO para emisión masiva (pedidos de empresa)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class StaffBulkGiftVoucherPayloadDTO(StaffGiftVoucherPayloadDTO):
+    """Emisión de ``quantity`` cheques iguales para un mismo comprador."""
+
+    quantity: int = 1
+    # Destinatarios opcionales, uno por cheque (``name``, ``surname``, ``email``)
+    recipients: Optional[List[dict]] = None
+    # Estado inicial (p.ej. 'paid' si la empresa ya ha pagado el pedido)
+    status: str = 'pending_payment'
+
+    def validate(self):
+        super().validate()
+        if self.quantity <= 0:
+            raise ValueError("La cantidad de cheques debe ser mayor que 0")
+        if self.recipients and len(self.recipients) > self.quantity:
+            raise ValueError("Hay más destinatarios que cheques")
+        if self.status not in ('pending_payment', 'paid'):
+            raise ValueError("El estado inicial debe ser 'pending_payment' o 'paid'")
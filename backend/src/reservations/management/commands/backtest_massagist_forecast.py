@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reservations.services.forecast import MassagistForecastService
+
+
+class Command(BaseCommand):
+    help = "Mide la precisión de la previsión de masajistas en las últimas semanas (origen móvil)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--folds', type=int, default=8, help="Semanas evaluadas")
+        parser.add_argument('--history-weeks', type=int, default=MassagistForecastService.HISTORY_WEEKS,
+                            help="Semanas de historia para cada ajuste")
+        parser.add_argument('--half-life', type=float, default=MassagistForecastService.HALF_LIFE_WEEKS,
+                            help="Semivida en semanas de los pesos")
+        parser.add_argument('--safety', type=float, default=MassagistForecastService.SAFETY,
+                            help="Desviaciones típicas añadidas a la demanda prevista")
+        parser.add_argument('--target-utilization', type=float, default=MassagistForecastService.TARGET_UTILIZATION,
+                            help="Ocupación objetivo por masajista")
+        parser.add_argument('--json', action='store_true', help="Imprime el resultado completo en JSON")
+
+    def handle(self, *args, **options):
+        result = MassagistForecastService.backtest(
+            folds=options['folds'],
+            history_weeks=options['history_weeks'],
+            half_life=options['half_life'],
+            safety=options['safety'],
+            target_utilization=options['target_utilization'],
+        )
+        if options['json']:
+            self.stdout.write(json.dumps(result, cls=DjangoJSONEncoder, indent=2))
+            return
+        for week in result['weeks']:
+            self.stdout.write(
+                f"{week['week']}: minutos={week['actual_minutes']:.0f} "
+                f"MAE={week['model']['mae']} (ingenuo {week['naive']['mae']}) "
+                f"WAPE={week['model']['wape']} cobertura={week['coverage']}"
+            )
+        summary = result['summary']
+        self.stdout.write(self.style.SUCCESS(
+            f"MAE {summary['model_mae']} vs ingenuo {summary['naive_mae']}, "
+            f"WAPE {summary['model_wape']} vs ingenuo {summary['naive_wape']}, "
+            f"cobertura {summary['coverage']}, exceso medio {summary['overstaffing']}"
+        ))
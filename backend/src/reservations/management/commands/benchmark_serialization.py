@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from reservations.services.benchmark import BenchmarkService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara en listados grandes la ruta DTO + serializer de DRF con la ruta rápida "
+        "(values() + RowSerializer + orjson). Conviene generar antes al menos --rows filas "
+        "con generate_synthetic_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=BenchmarkService.SERIALIZATION_ROWS,
+                            help="Filas por listado")
+        parser.add_argument('--repeat', type=int, default=BenchmarkService.REPEAT, help="Ejecuciones medidas")
+        parser.add_argument('--warmup', type=int, default=BenchmarkService.WARMUP, help="Ejecuciones previas sin medir")
+        parser.add_argument('--output', '-o', default=None, help="Fichero JSON donde guardar el informe")
+
+    def handle(self, *args, **options):
+        report = BenchmarkService.serialization(options['rows'], options['repeat'], options['warmup'])
+        for name, entry in report['results'].items():
+            legacy, fast = entry['legacy'], entry['fast']
+            self.stdout.write(
+                f"{name} ({entry['rows']} filas, {entry['bytes'] / 1024:.0f} KiB): "
+                f"{legacy['median_ms']:.1f} → {fast['median_ms']:.1f} ms, "
+                f"{legacy['rows_per_second']} → {fast['rows_per_second']} filas/s (×{entry['speedup']})"
+            )
+        if options['output']:
+            path = BenchmarkService.save(report, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Informe guardado en {path}"))
@@ -0,0 +1,65 @@
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reservations.services.benchmark import BenchmarkService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el coste por petición de los endpoints de lectura entre dos perfiles de settings "
+        "(por defecto dev y prod). Cada perfil se mide en un proceso aparte con el WSGIHandler, "
+        "de modo que cuentan DEBUG, CONN_MAX_AGE, la caché y los renderizadores. Ambos perfiles "
+        "deben apuntar a la misma base de datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baseline', default='myproject.settings.dev', help="Módulo de settings de referencia")
+        parser.add_argument('--candidate', default='myproject.settings.prod', help="Módulo de settings a comparar")
+        parser.add_argument('--repeat', type=int, default=20, help="Peticiones medidas por endpoint")
+        parser.add_argument('--warmup', type=int, default=3, help="Peticiones previas sin medir")
+        parser.add_argument('--only', nargs='*', default=['GET'], help="Sólo los casos que contengan estas cadenas")
+        parser.add_argument('--output-dir', default='benchmarks', help="Directorio de los informes JSON")
+
+    def handle(self, *args, **options):
+        output_dir = Path(options['output_dir'])
+        reports = []
+        for module in (options['baseline'], options['candidate']):
+            path = output_dir / f"settings-{module.rsplit('.', 1)[-1]}.json"
+            self.stdout.write(f"Midiendo {module}...")
+            result = subprocess.run(
+                [
+                    sys.executable, 'manage.py', 'run_benchmark', '--transport', 'wsgi',
+                    '--repeat', str(options['repeat']), '--warmup', str(options['warmup']),
+                    '--output', str(path), '--only', *options['only'],
+                ],
+                cwd=settings.BASE_DIR,
+                env={**os.environ, 'DJANGO_SETTINGS_MODULE': module},
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(f"run_benchmark con {module} falló:\n{result.stderr[-2000:]}")
+            reports.append(BenchmarkService.load(path))
+
+        baseline, candidate = reports
+        rows = BenchmarkService.compare(candidate, baseline)
+        for row in rows:
+            saved = row['baseline_ms'] - row['current_ms']
+            self.stdout.write(
+                f"{row['case']}: {row['baseline_ms']:.2f} → {row['current_ms']:.2f} ms "
+                f"({saved:.2f} ms menos por petición)"
+            )
+        if rows:
+            # La mediana de los ahorros aproxima el coste fijo por petición; los
+            # endpoints pesados varían más entre ejecuciones que ese coste
+            savings = [row['baseline_ms'] - row['current_ms'] for row in rows]
+            self.stdout.write(self.style.SUCCESS(
+                f"Ahorro mediano por petición: {statistics.median(savings):.2f} ms "
+                f"({len(rows)} endpoints)"
+            ))
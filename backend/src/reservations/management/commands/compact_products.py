@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from reservations.managers.product import ProductManager
+
+
+class Command(BaseCommand):
+    help = "Unifica los productos ocultos con la misma composición y borra los que quedan sin uso."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Sólo muestra lo que se haría, sin modificar nada",
+        )
+
+    def handle(self, *args, **options):
+        stats = ProductManager.compact_hidden_products(dry_run=options['dry_run'])
+        prefix = "[dry-run] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{stats['groups']} grupos, {stats['products_merged']} productos unificados, "
+            f"{stats['books_updated']} reservas y {stats['gift_vouchers_updated']} cheques reasignados, "
+            f"{stats['products_deleted']} productos borrados"
+        ))
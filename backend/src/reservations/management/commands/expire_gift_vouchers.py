@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from reservations.managers.gift_voucher import GiftVoucherManager
+
+
+class Command(BaseCommand):
+    help = "Caduca los cheques regalo sin pagar y los pagados fuera de validez (por lotes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pending-ttl-days', type=int, default=None,
+            help="Días tras los que caduca un cheque sin pagar (por defecto GIFT_VOUCHER_PENDING_TTL_DAYS)",
+        )
+        parser.add_argument(
+            '--validity-days', type=int, default=None,
+            help="Días de validez de un cheque pagado (por defecto GIFT_VOUCHER_VALIDITY_DAYS)",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help="Cheques actualizados por transacción (por defecto GIFT_VOUCHER_SWEEP_BATCH_SIZE)",
+        )
+
+    def handle(self, *args, **options):
+        result = GiftVoucherManager.expire_stale_vouchers(
+            pending_ttl_days=options['pending_ttl_days'],
+            validity_days=options['validity_days'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Cheques caducados: {result['pending_expired']} sin pagar, {result['paid_expired']} pagados"
+        ))
@@ -0,0 +1,56 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reservations.services.synthetic_data import SyntheticDataService
+
+
+class Command(BaseCommand):
+    help = "Genera un conjunto de datos sintético y realista (clientes, reservas, cheques, disponibilidad) para pruebas de carga."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=1000, help="Clientes únicos")
+        parser.add_argument('--duplicate-ratio', type=float, default=0.05,
+                            help="Proporción de clientes duplicados (exactos y aproximados)")
+        parser.add_argument('--bookings', type=int, default=20000, help="Reservas")
+        parser.add_argument('--vouchers', type=int, default=2000, help="Cheques regalo")
+        parser.add_argument('--from', dest='start', type=date.fromisoformat, default=None,
+                            help="Primer día de reservas (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='end', type=date.fromisoformat, default=None,
+                            help="Último día de reservas (YYYY-MM-DD)")
+        parser.add_argument('--admins', type=int, default=3, help="Administradores creadores de reservas")
+        parser.add_argument('--agents', type=int, default=5, help="Agentes creadores de reservas")
+        parser.add_argument('--availability-versions', type=int, default=3,
+                            help="Versiones de disponibilidad por día de la semana")
+        parser.add_argument('--constraints', type=int, default=30, help="Días con restricciones")
+        parser.add_argument('--seed', type=int, default=42, help="Semilla (mismos parámetros, mismos datos)")
+        parser.add_argument('--prefix', default=SyntheticDataService.DEFAULT_PREFIX,
+                            help="Prefijo de los identificadores de reservas y cheques")
+        parser.add_argument('--batch-size', type=int, default=SyntheticDataService.BATCH_SIZE,
+                            help="Filas por bulk_create")
+        parser.add_argument('--skip-stats', action='store_true',
+                            help="No recalcula DailyStats del periodo generado")
+
+    def handle(self, *args, **options):
+        try:
+            counts = SyntheticDataService.generate(
+                clients=options['clients'],
+                duplicate_ratio=options['duplicate_ratio'],
+                bookings=options['bookings'],
+                vouchers=options['vouchers'],
+                start=options['start'],
+                end=options['end'],
+                admins=options['admins'],
+                agents=options['agents'],
+                availability_versions=options['availability_versions'],
+                constraints=options['constraints'],
+                seed=options['seed'],
+                prefix=options['prefix'],
+                batch_size=options['batch_size'],
+                refresh_stats=not options['skip_stats'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        for name, count in counts.items():
+            self.stdout.write(f"{name}: {count}")
+        self.stdout.write(self.style.SUCCESS("Datos sintéticos generados"))
@@ -0,0 +1,27 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reservations.services.daily_stats import DailyStatsService
+
+
+class Command(BaseCommand):
+    help = "Recalcula el resumen diario (DailyStats): los días marcados o, con --from/--to, un rango completo."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', type=date.fromisoformat, default=None,
+                            help="Primer día (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='end', type=date.fromisoformat, default=None,
+                            help="Último día (YYYY-MM-DD)")
+        parser.add_argument('--all', action='store_true',
+                            help="Recalcula todos los días del rango aunque no estén marcados")
+
+    def handle(self, *args, **options):
+        start, end = options['start'], options['end']
+        if options['all']:
+            if start is None or end is None:
+                raise CommandError("--all requiere --from y --to")
+            days = DailyStatsService.rebuild(start, end)
+        else:
+            days = DailyStatsService.refresh(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Días recalculados: {days}"))
@@ -0,0 +1,60 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from reservations.services.benchmark import BenchmarkService
+
+
+class Command(BaseCommand):
+    help = "Mide managers y endpoints de lectura y guarda el resultado en JSON para comparar entre commits."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', default=None,
+                            help="Fichero JSON de salida (por defecto benchmarks/<commit>.json)")
+        parser.add_argument('--compare', default=None, help="Informe JSON anterior con el que comparar")
+        parser.add_argument('--repeat', type=int, default=BenchmarkService.REPEAT, help="Ejecuciones medidas por caso")
+        parser.add_argument('--warmup', type=int, default=BenchmarkService.WARMUP, help="Ejecuciones previas sin medir")
+        parser.add_argument('--day', type=date.fromisoformat, default=None,
+                            help="Día de referencia (por defecto el de más reservas)")
+        parser.add_argument('--only', nargs='*', default=None, help="Sólo los casos que contengan estas cadenas")
+        parser.add_argument('--no-http', action='store_true', help="Sólo managers y servicios")
+        parser.add_argument('--transport', choices=BenchmarkService.TRANSPORTS, default='client',
+                            help="Cliente de pruebas de Django o WSGIHandler (cierra conexiones como gunicorn)")
+        parser.add_argument('--threshold', type=float, default=BenchmarkService.REGRESSION_THRESHOLD,
+                            help="Variación de la mediana considerada regresión (proporción)")
+
+    def handle(self, *args, **options):
+        report = BenchmarkService.run(
+            repeat=options['repeat'],
+            warmup=options['warmup'],
+            day=options['day'],
+            only=options['only'],
+            include_http=not options['no_http'],
+            transport=options['transport'],
+        )
+        for name, result in sorted(report['results'].items()):
+            if 'error' in result:
+                self.stdout.write(self.style.ERROR(f"{name}: {result['error']}"))
+            else:
+                self.stdout.write(
+                    f"{name}: mediana {result['median_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+                    f"{result['queries']} consultas"
+                )
+
+        output = options['output'] or f"benchmarks/{report['meta']['commit'] or 'local'}.json"
+        path = BenchmarkService.save(report, output)
+        self.stdout.write(self.style.SUCCESS(f"Informe guardado en {path}"))
+
+        if options['compare']:
+            baseline = BenchmarkService.load(options['compare'])
+            for row in BenchmarkService.compare(report, baseline, options['threshold']):
+                line = (
+                    f"{row['case']}: {row['baseline_ms']:.1f} → {row['current_ms']:.1f} ms "
+                    f"(×{row['ratio']}), consultas {row['baseline_queries']} → {row['current_queries']}"
+                )
+                if row['status'] == 'regression':
+                    self.stdout.write(self.style.ERROR(line))
+                elif row['status'] == 'improvement':
+                    self.stdout.write(self.style.SUCCESS(line))
+                else:
+                    self.stdout.write(line)
@@ -1,3 +1,4 @@
+import logging
 from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict, Any
 
@@ -6,6 +7,9 @@ from django.utils import timezone
 
 from reservations.dtos.availability import AvailabilityDTO, AvailabilityRangeDTO
 from reservations.models import Availability, AvailabilityRange
+from reservations.services.catalog_version import CatalogVersionService
+
+logger = logging.getLogger(__name__)
 
 
 
@@ -21,8 +25,10 @@ class AvailabilityManager:
         """Devuelve la lista de rangos para un día concreto.
 
         - Primero busca una Availability puntual (type='punctual').
-        - Si no existe, busca la Availability del día de la semana correspondiente.
+        - Si no existe, busca la versión del día de la semana vigente en esa fecha.
         - Si no hay ninguna, devuelve lista vacía.
+
+        Los borradores (``is_draft``) no cuentan hasta que se publican.
         """
         def to_local_date(value: date | datetime) -> date:
             """
@@ -43,28 +49,32 @@ class AvailabilityManager:
     # Lectura
     # --------------------- ---------------------------------------------
         
-        print("target_day: %s" % target_day)
         # 0) Convertir a date
         target_day = to_local_date(target_day)
-        print("target_day: %s" % target_day, "weekday=%s" % target_day.isoweekday())
+        logger.debug("Rangos para %s (weekday=%s)", target_day, target_day.isoweekday())
         
         # 1) Availability puntual
         availability: Optional[Availability] = (
             Availability.objects
             .prefetch_related("availabilityrange_set")
-            .filter(type=AvailabilityDTO.TYPE_PUNCTUAL, punctual_day=target_day)
+            .filter(type=AvailabilityDTO.TYPE_PUNCTUAL, punctual_day=target_day, is_draft=False)
             .order_by('-created_at')  # Obtener la más reciente
             .first()
         )
 
         if availability is None:
             weekday = target_day.isoweekday()  # 1=Lunes ... 7=Domingo
-            availability = (
+            versions = (
                 Availability.objects
                 .prefetch_related("availabilityrange_set")
-                .filter(type=AvailabilityDTO.TYPE_WEEKDAY, weekday=weekday)
-                .order_by('-created_at')  # Obtener la más reciente
-                .first()
+                .filter(type=AvailabilityDTO.TYPE_WEEKDAY, weekday=weekday, is_draft=False)
+            )
+            # La versión más reciente ya vigente ese día; las versiones con fecha
+            # efectiva futura aún no aplican
+            next_day = timezone.make_aware(datetime.combine(target_day + timedelta(days=1), datetime.min.time()))
+            availability = (
+                versions.filter(created_at__lt=next_day).order_by('-created_at').first()
+                or versions.order_by('created_at').first()
             )
 
         if availability is None:
@@ -101,7 +111,7 @@ class AvailabilityManager:
         punctual_availabilities = (
             Availability.objects
             .prefetch_related("availabilityrange_set")
-            .filter(type=AvailabilityDTO.TYPE_PUNCTUAL, punctual_day=target_day)
+            .filter(type=AvailabilityDTO.TYPE_PUNCTUAL, punctual_day=target_day, is_draft=False)
             .order_by('created_at')
         )
         
@@ -109,7 +119,7 @@ class AvailabilityManager:
         weekday_availabilities = (
             Availability.objects
             .prefetch_related("availabilityrange_set")
-            .filter(type=AvailabilityDTO.TYPE_WEEKDAY, weekday=weekday)
+            .filter(type=AvailabilityDTO.TYPE_WEEKDAY, weekday=weekday, is_draft=False)
             .order_by('created_at')
         )
         
@@ -163,6 +173,47 @@ class AvailabilityManager:
         
         return history
 
+    @staticmethod
+    def get_ranges_for_period(start: date, end: date) -> Dict[date, List[AvailabilityRange]]:
+        """Devuelve los rangos vigentes de cada día entre ``start`` y ``end`` (dos consultas).
+
+        Misma regla que ``get_ranges_for_day`` para todo el periodo: para cada
+        día se usa la Availability puntual más reciente o, si no la hay, la
+        versión por weekday creada ese día o antes (la más antigua cubre también
+        el pasado anterior a su creación). Los borradores no cuentan.
+        """
+        punctual = {}
+        for av in (
+            Availability.objects
+            .prefetch_related("availabilityrange_set")
+            .filter(type=AvailabilityDTO.TYPE_PUNCTUAL, punctual_day__range=(start, end), is_draft=False)
+            .order_by('created_at')
+        ):
+            punctual[av.punctual_day] = av  # la más reciente sobrescribe
+
+        versions: Dict[int, List[Availability]] = {}
+        for av in (
+            Availability.objects
+            .prefetch_related("availabilityrange_set")
+            .filter(type=AvailabilityDTO.TYPE_WEEKDAY, is_draft=False)
+            .order_by('created_at')
+        ):
+            versions.setdefault(av.weekday, []).append(av)
+
+        result = {}
+        day = start
+        while day <= end:
+            availability = punctual.get(day)
+            if availability is None and versions.get(day.isoweekday()):
+                candidates = versions[day.isoweekday()]
+                availability = candidates[0]
+                for av in candidates:
+                    if timezone.localtime(av.created_at).date() <= day:
+                        availability = av
+            result[day] = list(availability.availabilityrange_set.all()) if availability else []
+            day += timedelta(days=1)
+        return result
+
     @staticmethod
     def get_availability_by_id(availability_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene una disponibilidad específica por ID con sus rangos."""
@@ -176,6 +227,8 @@ class AvailabilityManager:
                 'punctual_day': av.punctual_day,
                 'weekday': av.weekday,
                 'created_at': av.created_at,
+                'source': av.source,
+                'is_draft': av.is_draft,
                 'ranges': [
                     {
                         'initial_time': r.initial_time,
@@ -193,7 +246,9 @@ class AvailabilityManager:
     def create_new_weekday_availability_version(
         weekday: int,
         ranges: List[AvailabilityRangeDTO],
-        effective_date: Optional[date] = None
+        effective_date: Optional[date] = None,
+        source: str = AvailabilityDTO.SOURCE_MANUAL,
+        is_draft: bool = False,
     ) -> Availability:
         """Crea una nueva versión de disponibilidad para un día de la semana.
         
@@ -201,6 +256,8 @@ class AvailabilityManager:
             weekday: El día de la semana (1=Lunes, 2=Martes, ..., 7=Domingo)
             ranges: Los rangos horarios de la nueva disponibilidad
             effective_date: Fecha efectiva (si no se proporciona, usa hoy)
+            source: Origen de la versión (manual o previsión)
+            is_draft: Si es un borrador que no aplica hasta publicarlo
         """
         if effective_date is None:
             effective_date = timezone.now().date()
@@ -213,18 +270,67 @@ class AvailabilityManager:
             )
         )
         
-        availability = Availability.objects.create(
-            type=AvailabilityDTO.TYPE_WEEKDAY,
-            weekday=weekday,
-            punctual_day=None,
-            created_at=local_datetime
-        )
-        
-        # Crear los rangos
-        AvailabilityManager._create_related_ranges(availability, ranges)
+        with CatalogVersionService.batch():
+            availability = Availability.objects.create(
+                type=AvailabilityDTO.TYPE_WEEKDAY,
+                weekday=weekday,
+                punctual_day=None,
+                created_at=local_datetime,
+                source=source,
+                is_draft=is_draft,
+            )
+
+            # Crear los rangos
+            AvailabilityManager._create_related_ranges(availability, ranges)
         
         return availability
 
+    @staticmethod
+    def delete_forecast_versions(weekdays: List[int], effective_date: date) -> int:
+        """Borra las versiones por weekday de la previsión programadas para ``effective_date``.
+
+        Nunca toca las versiones creadas a mano. Los borradores se borran
+        siempre (no han llegado a aplicar); las ya publicadas, sólo si aún no
+        están vigentes.
+
+        Returns:
+            Número de versiones borradas
+        """
+        start = timezone.make_aware(datetime.combine(effective_date, datetime.min.time()))
+        versions = Availability.objects.filter(
+            type=AvailabilityDTO.TYPE_WEEKDAY,
+            source=AvailabilityDTO.SOURCE_FORECAST,
+            weekday__in=weekdays,
+            created_at__gte=start,
+            created_at__lt=start + timedelta(days=1),
+        )
+        if start <= timezone.now():
+            versions = versions.filter(is_draft=True)
+
+        with CatalogVersionService.batch():
+            _, deleted = versions.delete()
+        return deleted.get(Availability._meta.label, 0)
+
+    @staticmethod
+    @transaction.atomic
+    def publish_draft_versions(availability_ids: List[int]) -> int:
+        """Publica los borradores indicados para que empiecen a aplicar.
+
+        Un borrador cuya fecha efectiva ya ha pasado se publica con fecha de
+        hoy: no cambia retroactivamente la disponibilidad de días pasados.
+
+        Returns:
+            Número de versiones publicadas
+        """
+        today = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+        drafts = Availability.objects.filter(id__in=availability_ids, is_draft=True)
+        published = drafts.filter(created_at__lt=today).update(is_draft=False, created_at=today)
+        published += drafts.update(is_draft=False)
+        if published:
+            # QuerySet.update no emite señales
+            CatalogVersionService.bump(CatalogVersionService.AVAILABILITY)
+        return published
+
     @staticmethod
     @transaction.atomic
     def create_new_availability_version(
@@ -253,15 +359,16 @@ class AvailabilityManager:
             )
         )
         
-        availability = Availability.objects.create(
-            type=AvailabilityDTO.TYPE_PUNCTUAL,
-            punctual_day=target_day,
-            weekday=None,
-            created_at=local_datetime
-        )
-        
-        # Crear los rangos
-        AvailabilityManager._create_related_ranges(availability, ranges)
+        with CatalogVersionService.batch():
+            availability = Availability.objects.create(
+                type=AvailabilityDTO.TYPE_PUNCTUAL,
+                punctual_day=target_day,
+                weekday=None,
+                created_at=local_datetime
+            )
+
+            # Crear los rangos
+            AvailabilityManager._create_related_ranges(availability, ranges)
         
         return availability
 
@@ -285,13 +392,15 @@ class AvailabilityManager:
         else:
             availability.weekday = dto.weekday
             availability.punctual_day = None
-        availability.save()
 
-        # Limpiar rangos anteriores
-        AvailabilityRange.objects.filter(availability=availability).delete()
+        with CatalogVersionService.batch():
+            availability.save()
+
+            # Limpiar rangos anteriores
+            AvailabilityRange.objects.filter(availability=availability).delete()
 
-        # Crear los nuevos rangos
-        AvailabilityManager._create_related_ranges(availability, dto.ranges)
+            # Crear los nuevos rangos
+            AvailabilityManager._create_related_ranges(availability, dto.ranges)
 
         return availability
 
@@ -306,18 +415,19 @@ class AvailabilityManager:
 
         dto.validate()
 
-        if dto.type == AvailabilityDTO.TYPE_PUNCTUAL:
-            availability = Availability.objects.create(
-                type=dto.type,
-                punctual_day=dto.punctual_day,
-            )
-        else:
-            availability = Availability.objects.create(
-                type=dto.type,
-                weekday=dto.weekday,
-            )
+        with CatalogVersionService.batch():
+            if dto.type == AvailabilityDTO.TYPE_PUNCTUAL:
+                availability = Availability.objects.create(
+                    type=dto.type,
+                    punctual_day=dto.punctual_day,
+                )
+            else:
+                availability = Availability.objects.create(
+                    type=dto.type,
+                    weekday=dto.weekday,
+                )
 
-        AvailabilityManager._create_related_ranges(availability, dto.ranges)
+            AvailabilityManager._create_related_ranges(availability, dto.ranges)
 
         return availability
 
@@ -327,12 +437,17 @@ class AvailabilityManager:
 
     @staticmethod
     def _create_related_ranges(availability: Availability, ranges_dto: List[AvailabilityRangeDTO]) -> None:
-        """Crea AvailabilityRange a partir de los DTO proporcionados."""
+        """Crea AvailabilityRange a partir de los DTO proporcionados (un único INSERT)."""
         for r in ranges_dto:
             r.validate()
-            AvailabilityRange.objects.create(
+        AvailabilityRange.objects.bulk_create([
+            AvailabilityRange(
                 availability=availability,
                 initial_time=r.initial_time,
                 end_time=r.end_time,
                 massagists_availability=r.massagists_availability,
             )
+            for r in ranges_dto
+        ])
+        # bulk_create no emite post_save
+        CatalogVersionService.bump(CatalogVersionService.AVAILABILITY)
@@ -5,17 +5,25 @@ Serializers funcionen sin lanzar ImportError. Las reglas de negocio completas
 deberán desarrollarse más adelante (por ejemplo, gestión de ProductsInBook,
 control de disponibilidad, etc.)."""
 
-from typing import List
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import random
 from decimal import Decimal
 
 from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
 
 from reservations.dtos.book import BookDTO, StaffBathRequestDTO, BookLogDTO, BookDetailDTO, BookMassageUpdateDTO
 from reservations.models import Book, Product, BathType, ProductBaths, Client, BookLogs, Admin, Agent, GiftVoucher, WebBooking
+from reservations.managers.client import ClientManager
+from reservations.managers.gift_voucher import GiftVoucherManager
+from reservations.services.catalog_version import CatalogVersionService
+from reservations.services.metrics import MetricsService
+
+logger = logging.getLogger(__name__)
 
 
 class BookManager:
@@ -25,6 +33,25 @@ class BookManager:
     disponibilidad, cálculos de importes, etc.) quedan pendientes.
     """
 
+    # Columnas de ``BookDTO`` leídas tal cual por los listados en filas
+    # (``list_booking_rows``); ``booking_date`` se renombra desde ``book_date``
+    ROW_FIELDS = (
+        'id', 'internal_order_id', 'created_at', 'hour', 'people', 'comment', 'observation',
+        'amount_paid', 'amount_pending', 'payment_date', 'checked_in', 'checked_out', 'client_id', 'product_id',
+    )
+
+    # Claves de ``BookDetailDTO`` → atributo de Book
+    DETAIL_COLUMNS = {
+        'id': 'id', 'internal_order_id': 'internal_order_id', 'booking_date': 'book_date', 'hour': 'hour',
+        'people': 'people', 'comment': 'comment', 'observation': 'observation',
+        'amount_paid': 'amount_paid', 'amount_pending': 'amount_pending', 'payment_date': 'payment_date',
+        'checked_in': 'checked_in', 'checked_out': 'checked_out', 'client_id': 'client_id',
+        'product_id': 'product_id', 'created_at': 'created_at',
+    }
+    # Claves de ``BookDetailDTO`` que requieren leer el cliente o el creador
+    DETAIL_CLIENT_FIELDS = ('client_name', 'client_surname', 'client_phone', 'client_email', 'client_created_at')
+    DETAIL_CREATOR_FIELDS = ('creator_type_name', 'creator_name')
+
     # ------------------------------------------------------------------
     # Conversión helper
     # ------------------------------------------------------------------
@@ -55,15 +82,51 @@ class BookManager:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def list_bookings() -> List[BookDTO]:
+    def list_bookings(limit: Optional[int] = None) -> List[BookDTO]:
         """Devuelve todas las reservas ordenadas por creación."""
-        return [BookManager._to_dto(b) for b in Book.objects.all().order_by("-created_at")]
+        return [BookManager._to_dto(b) for b in Book.objects.all().order_by("-created_at")[:limit]]
 
     @staticmethod
     def list_bookings_by_date(booking_date: str) -> List[BookDTO]:
         """Devuelve todas las reservas de una fecha específica ordenadas por hora."""
         return [BookManager._to_dto(b) for b in Book.objects.filter(book_date=booking_date).order_by("hour")]
 
+    @staticmethod
+    def list_booking_rows(
+        booking_date: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Igual que ``list_bookings`` (o ``list_bookings_by_date`` con ``booking_date``)
+        pero en diccionarios con las claves de ``BookDTO``, leídos con ``values()``
+        sin instanciar modelos ni DTOs. Para listados de sólo lectura.
+
+        Args:
+            fields: Claves de ``BookDTO`` a leer (``None``: todas); el resto de
+                columnas no se piden a la base de datos
+        """
+        wanted = None if fields is None else set(fields)
+        columns = [name for name in BookManager.ROW_FIELDS if wanted is None or name in wanted]
+        renamed = {'booking_date': F('book_date')} if wanted is None or 'booking_date' in wanted else {}
+
+        bookings = Book.objects.all()
+        if booking_date is not None:
+            bookings = bookings.filter(book_date=booking_date).order_by("hour")
+        else:
+            bookings = bookings.order_by("-created_at")
+        if not columns and not renamed:
+            columns = ['id']  # ``values()`` sin columnas leería todas
+        return list(bookings.values(*columns, **renamed)[:limit])
+
+    @staticmethod
+    def get_booking(book_id: int) -> Optional[BookDTO]:
+        """Devuelve el DTO de una reserva o ``None`` si no existe."""
+        book = Book.objects.filter(id=book_id).first()
+        if book is None:
+            return None
+        return BookManager._to_dto(book)
+
     # ------------------------------------------------------------------
     # Creación
     # ------------------------------------------------------------------
@@ -135,17 +198,26 @@ class BookManager:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _handle_gift_voucher_usage(creator_type_id: int, creator_id: int):
-        """Marca un cheque regalo como usado si la reserva se crea desde uno."""
-        if creator_type_id and creator_id:
-            try:
-                content_type = ContentType.objects.get(id=creator_type_id)
-                if content_type.model == 'giftvoucher':
-                    from reservations.managers.gift_voucher import GiftVoucherManager
-                    GiftVoucherManager.mark_as_used(creator_id)
-            except Exception as e:
-                # Log el error pero no fallar la creación de la reserva
-                print(f"Error marcando cheque regalo como usado: {e}")
+    def _redeem_gift_voucher(creator_type_id: int, creator_id: int):
+        """
+        Canjea el cheque regalo si la reserva se crea desde uno.
+
+        Returns:
+            El ``GiftVoucher`` canjeado o ``None`` si el creador no es un cheque
+
+        Raises:
+            ValueError: Si el cheque no existe, no está pagado o ya se ha usado
+                (p.ej. otro canje simultáneo); la reserva no debe crearse
+        """
+        if not (creator_type_id and creator_id):
+            return None
+        try:
+            content_type = ContentType.objects.get_for_id(creator_type_id)
+        except ContentType.DoesNotExist:
+            raise ValueError(f"No existe el tipo de creador con ID {creator_type_id}")
+        if content_type.model != 'giftvoucher':
+            return None
+        return GiftVoucherManager.redeem(creator_id)
 
     @staticmethod
     def _generate_internal_order_id() -> str:
@@ -211,6 +283,7 @@ class BookManager:
         creator_type_id: int = None,
         creator_id: int = None,
         client_id: int = None,  # Nuevo parámetro opcional
+        client_match: str = None,  # Política de coincidencia de clientes (None = settings)
     ) -> BookDTO:
         # ===== VALIDACIONES DE DISPONIBILIDAD =====
         if not force:
@@ -247,12 +320,13 @@ class BookManager:
                     # Verificar si la nueva reserva excedería el aforo
                     total_people_after_booking = existing_people_at_hour + people
                     if total_people_after_booking > capacity.value:
+                        MetricsService.inc('booking_capacity_rejections_total')
                         raise ValueError(f"No hay suficiente aforo disponible. Aforo máximo: {capacity.value}, Ya ocupado: {existing_people_at_hour}, Solicitado: {people}, Total resultante: {total_people_after_booking}")
             except Exception as e:
                 if "No hay suficiente aforo" in str(e):
                     raise e  # Re-lanzar errores de aforo
                 # Si hay error obteniendo capacidad, continuar sin validar aforo
-                print(f"Advertencia: No se pudo validar aforo: {e}")
+                logger.warning("No se pudo validar aforo: %s", e)
         
         # ===== FIN VALIDACIONES DE DISPONIBILIDAD =====
         
@@ -263,33 +337,27 @@ class BookManager:
             except Client.DoesNotExist:
                 raise ValueError(f"No existe un cliente con ID {client_id}")
         else:
-            # Si no se proporciona client_id, crear cliente nuevo con los datos proporcionados
-            if not name:
-                raise ValueError("Se requiere 'name' para crear un nuevo cliente")
-            
-            client = Client.objects.create(
+            # Si no, reutilizar el cliente con el mismo email/teléfono o crear uno nuevo
+            client, _ = ClientManager.resolve_or_create_client(
                 name=name,
-                surname=surname or "",
-                phone_number=phone or "",
-                email=email or "",
+                surname=surname,
+                phone_number=phone,
+                email=email,
+                policy=client_match,
             )
         
-        # Verificar si viene de un cheque regalo
+        # Si viene de un cheque regalo, canjearlo antes de crear la reserva. El
+        # canje forma parte de esta transacción: si falla (cheque ya usado por
+        # otra petición simultánea, no pagado...) no se crea la reserva.
         is_from_gift_voucher = False
         gift_voucher_product_id = None
         gift_voucher_price = Decimal("0")
         
-        if creator_type_id and creator_id:
-            try:
-                content_type = ContentType.objects.get(id=creator_type_id)
-                if content_type.model == 'giftvoucher':
-                    from reservations.models import GiftVoucher
-                    gift_voucher = GiftVoucher.objects.select_related('product').get(id=creator_id)
-                    is_from_gift_voucher = True
-                    gift_voucher_product_id = gift_voucher.product_id
-                    gift_voucher_price = gift_voucher.price
-            except Exception as e:
-                print(f"Error obteniendo información del cheque regalo: {e}")
+        gift_voucher = BookManager._redeem_gift_voucher(creator_type_id, creator_id)
+        if gift_voucher is not None:
+            is_from_gift_voucher = True
+            gift_voucher_product_id = gift_voucher.product_id
+            gift_voucher_price = gift_voucher.price
         
         # Si se pasa product_id, usarlo directamente
         if product_id:
@@ -320,9 +388,6 @@ class BookManager:
             
             book = Book.objects.create(**book_data)
             
-            # Si la reserva se crea desde un cheque regalo, marcarlo como usado
-            BookManager._handle_gift_voucher_usage(creator_type_id, creator_id)
-            
             return BookManager._to_dto(book)
         
         # Si viene de cheque regalo pero no se pasó product_id, usar el producto del cheque
@@ -343,9 +408,6 @@ class BookManager:
             
             book = Book.objects.create(**book_data)
             
-            # Marcar cheque regalo como usado
-            BookManager._handle_gift_voucher_usage(creator_type_id, creator_id)
-            
             return BookManager._to_dto(book)
         # Si no, crear producto nuevo o buscar uno idéntico
         if not baths:
@@ -354,85 +416,41 @@ class BookManager:
         # Asegurar que existen todos los BathTypes necesarios
         BookManager.ensure_bath_types_exist()
         
-        # Calcular precio total basándose en los BathTypes existentes
-        final_price = Decimal("0")
-        bath_type_details = []
-        
         for br in baths:
             br.validate()
-            
-            try:
-                # Buscar el BathType existente en la base de datos
-                bath_type = BathType.objects.get(
-                    massage_type=br.massage_type,
-                    massage_duration=br.minutes
-                )
-                
-                # Calcular precio: bathtype.price x quantity
-                bath_total_price = bath_type.price * br.quantity
-                final_price += bath_total_price
-                
-                bath_type_details.append({
-                    'bath_type': bath_type,
-                    'quantity': br.quantity,
-                    'massage_type': br.massage_type,
-                    'duration': br.minutes
-                })
-                
-            except BathType.DoesNotExist:
-                raise ValueError(f"No existe el tipo de baño: {br.massage_type} de {br.minutes} minutos")
-        
+
+        # Calcular precio total basándose en los BathTypes existentes
+        final_price, bath_type_details = BookManager._resolve_bath_types(baths)
+
         # Buscar producto idéntico (mismos baths y precio calculado)
-        from reservations.models import ProductBaths
-        
-        # Crear signature de los tipos de baño para comparación
-        bath_types_signature = sorted([
-            (detail['massage_type'], detail['duration'], detail['quantity']) 
-            for detail in bath_type_details
-        ])
-        
-        # Buscar productos con el mismo precio calculado
-        candidates = Product.objects.filter(price=final_price)
-        for prod in candidates:
-            # Obtener los bath_types del producto candidato
-            prod_baths = list(prod.baths.values_list(
-                'bath_type__massage_type', 
-                'bath_type__massage_duration', 
-                'quantity'
-            ))
-            prod_baths_signature = sorted(prod_baths)
-            
-            # Si coinciden exactamente los tipos de baño y cantidades
-            if bath_types_signature == prod_baths_signature:
-                # ¡Producto encontrado! Usar el existente
-                book_data = {
-                    'internal_order_id': BookManager._generate_internal_order_id(),
-                    'book_date': date,
-                    'hour': hour,
-                    'people': people,
-                    'comment': comment,
-                    'amount_paid': Decimal("0"),
-                    'amount_pending': final_price,
-                    'client': client,
-                    'product': prod,
-                }
-                
-                # Agregar creator si se proporciona
-                if creator_type_id and creator_id:
-                    book_data['creator_type_id'] = creator_type_id
-                    book_data['creator_id'] = creator_id
-                
-                book = Book.objects.create(**book_data)
-                
-                # Si la reserva se crea desde un cheque regalo, marcarlo como usado
-                BookManager._handle_gift_voucher_usage(creator_type_id, creator_id)
-                
-                return BookManager._to_dto(book)
-        
+        prod = BookManager._find_matching_product(final_price, bath_type_details)
+        if prod is not None:
+            # ¡Producto encontrado! Usar el existente
+            book_data = {
+                'internal_order_id': BookManager._generate_internal_order_id(),
+                'book_date': date,
+                'hour': hour,
+                'people': people,
+                'comment': comment,
+                'amount_paid': Decimal("0"),
+                'amount_pending': final_price,
+                'client': client,
+                'product': prod,
+            }
+
+            # Agregar creator si se proporciona
+            if creator_type_id and creator_id:
+                book_data['creator_type_id'] = creator_type_id
+                book_data['creator_id'] = creator_id
+
+            book = Book.objects.create(**book_data)
+
+            return BookManager._to_dto(book)
+
         # Si no existe, crear producto nuevo con precio calculado
         # Generar nombre descriptivo basado en los baños
         product_name = BookManager._generate_product_name_from_baths(baths)
-        
+
         product = Product.objects.create(
             name=product_name,
             price=final_price,
@@ -441,13 +459,8 @@ class BookManager:
             visible=False,
         )
         # Crear los ProductBaths asociados usando bath_type_details
-        for detail in bath_type_details:
-            ProductBaths.objects.create(
-                product=product,
-                bath_type=detail['bath_type'],
-                quantity=detail['quantity']
-            )
-        
+        BookManager._create_product_baths(product, bath_type_details)
+
         book_data = {
             'internal_order_id': BookManager._generate_internal_order_id(),
             'book_date': date,
@@ -467,9 +480,6 @@ class BookManager:
         
         book = Book.objects.create(**book_data)
         
-        # Si la reserva se crea desde un cheque regalo, marcarlo como usado
-        BookManager._handle_gift_voucher_usage(creator_type_id, creator_id)
-        
         return BookManager._to_dto(book)
 
     # ------------------------------------------------------------------
@@ -508,80 +518,172 @@ class BookManager:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _build_book_detail_dto(book: Book) -> BookDetailDTO:
-        """Construye un BookDetailDTO a partir de un objeto Book."""
+    def _build_book_detail_dto(book: Book, fields: Optional[Iterable[str]] = None) -> BookDetailDTO:
+        """
+        Construye un BookDetailDTO a partir de un objeto Book.
+
+        Con ``fields`` sólo se rellenan esas claves (y ``id``): el cliente, el
+        creador y los baños del producto se consultan únicamente si se piden.
+        """
+        wanted = None if fields is None else set(fields)
+
+        def wants(names) -> bool:
+            return wanted is None or not wanted.isdisjoint(names)
+
+        values = {
+            name: getattr(book, attr) for name, attr in BookManager.DETAIL_COLUMNS.items()
+            if name == 'id' or wants((name,))
+        }
+
+        if wants(BookManager.DETAIL_CLIENT_FIELDS):
+            values.update(
+                client_name=book.client.name,
+                client_surname=book.client.surname or "",
+                client_phone=book.client.phone_number or "",
+                client_email=book.client.email or "",
+                client_created_at=book.client.created_at,
+            )
+
         # Obtener información del creador
-        creator_type_name = "Sin creador"
-        creator_name = "Sin creador"
-        
-        if book.creator_type and book.creator_id:
-            try:
-                model_class = book.creator_type.model_class()
-                creator_obj = model_class.objects.get(id=book.creator_id)
-                
-                if isinstance(creator_obj, Admin):
-                    creator_type_name = "Administrador"
-                    creator_name = f"{creator_obj.name} {creator_obj.surname}"
-                elif isinstance(creator_obj, Agent):
-                    creator_type_name = "Agente"
-                    creator_name = creator_obj.name
-                elif isinstance(creator_obj, GiftVoucher):
-                    creator_type_name = "Cheque regalo"
-                    creator_name = f"Vale #{creator_obj.code} - {creator_obj.gift_name}"
-                elif isinstance(creator_obj, WebBooking):
-                    creator_type_name = "Reserva web"
-                    creator_name = f"Reserva web #{creator_obj.id}"
-            except Exception:
-                # Si hay error al obtener el creador, mantener valores por defecto
-                pass
+        if wants(BookManager.DETAIL_CREATOR_FIELDS):
+            creator_type_name = "Sin creador"
+            creator_name = "Sin creador"
+
+            if book.creator_type and book.creator_id:
+                try:
+                    model_class = book.creator_type.model_class()
+                    creator_obj = model_class.objects.get(id=book.creator_id)
+
+                    if isinstance(creator_obj, Admin):
+                        creator_type_name = "Administrador"
+                        creator_name = f"{creator_obj.name} {creator_obj.surname}"
+                    elif isinstance(creator_obj, Agent):
+                        creator_type_name = "Agente"
+                        creator_name = creator_obj.name
+                    elif isinstance(creator_obj, GiftVoucher):
+                        creator_type_name = "Cheque regalo"
+                        creator_name = f"Vale #{creator_obj.code} - {creator_obj.gift_name}"
+                    elif isinstance(creator_obj, WebBooking):
+                        creator_type_name = "Reserva web"
+                        creator_name = f"Reserva web #{creator_obj.id}"
+                except Exception:
+                    # Si hay error al obtener el creador, mantener valores por defecto
+                    pass
+            values.update(creator_type_name=creator_type_name, creator_name=creator_name)
 
         # Obtener información de los baños del producto
-        product_baths = []
-        if book.product:
-            for product_bath in book.product.baths.select_related('bath_type').all():
-                product_baths.append({
-                    'massage_type': product_bath.bath_type.massage_type,
-                    'massage_duration': product_bath.bath_type.massage_duration,
-                    'quantity': product_bath.quantity,
-                    'name': product_bath.bath_type.name,
-                    'price': str(product_bath.bath_type.price),
-                })
-
-        return BookDetailDTO(
-            id=book.id,
-            internal_order_id=book.internal_order_id,
-            booking_date=book.book_date,
-            hour=book.hour,
-            people=book.people,
-            comment=book.comment,
-            observation=book.observation,
-            amount_paid=book.amount_paid,
-            amount_pending=book.amount_pending,
-            payment_date=book.payment_date,
-            checked_in=book.checked_in,
-            checked_out=book.checked_out,
-            client_id=book.client_id,
-            product_id=book.product_id,
-            created_at=book.created_at,
-            client_name=book.client.name,
-            client_surname=book.client.surname or "",
-            client_phone=book.client.phone_number or "",
-            client_email=book.client.email or "",
-            client_created_at=book.client.created_at,
-            creator_type_name=creator_type_name,
-            creator_name=creator_name,
-            product_baths=product_baths,
-        )
+        if wants(('product_baths',)):
+            product_baths = []
+            if book.product_id:
+                for product_bath in ProductBaths.objects.filter(product_id=book.product_id).select_related('bath_type'):
+                    product_baths.append({
+                        'massage_type': product_bath.bath_type.massage_type,
+                        'massage_duration': product_bath.bath_type.massage_duration,
+                        'quantity': product_bath.quantity,
+                        'name': product_bath.bath_type.name,
+                        'price': str(product_bath.bath_type.price),
+                    })
+            values['product_baths'] = product_baths
+
+        return BookDetailDTO(**values)
 
     @staticmethod
-    def get_book_detail(book_id: int) -> BookDetailDTO:
-        """Obtiene los detalles completos de una reserva incluyendo cliente y creador."""
+    def get_book_detail(book_id: int, fields: Optional[Iterable[str]] = None) -> BookDetailDTO:
+        """
+        Obtiene los detalles completos de una reserva incluyendo cliente y creador.
+
+        Args:
+            fields: Claves de ``BookDetailDTO`` necesarias (``None``: todas). Sólo
+                se leen sus columnas y se omiten los JOIN y consultas del resto.
+        """
+        wanted = None if fields is None else set(fields)
+        books = Book.objects.all()
+        if wanted is None or not wanted.isdisjoint(BookManager.DETAIL_CLIENT_FIELDS):
+            books = books.select_related('client')
+        if wanted is None or not wanted.isdisjoint(BookManager.DETAIL_CREATOR_FIELDS):
+            books = books.select_related('creator_type')
+        if wanted is not None:
+            books = books.only(
+                'id', 'client', 'product', 'creator_type', 'creator_id',
+                *(attr for name, attr in BookManager.DETAIL_COLUMNS.items() if name in wanted),
+            )
         try:
-            book = Book.objects.select_related('client', 'product', 'creator_type').get(id=book_id)
+            book = books.get(id=book_id)
         except Book.DoesNotExist:
             raise ValueError(f"Reserva con ID {book_id} no encontrada")
-        
-        return BookManager._build_book_detail_dto(book)
+
+        return BookManager._build_book_detail_dto(book, fields)
+
+    # ------------------------------------------------------------------
+    # Resolución de tipos de baño y productos a partir de los masajes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _resolve_bath_types(baths: List[StaffBathRequestDTO]) -> Tuple[Decimal, List[Dict[str, Any]]]:
+        """
+        Lee en una consulta los BathTypes de las líneas y calcula el precio total.
+
+        Returns:
+            Tupla ``(precio_total, detalles)`` con un detalle por línea
+        """
+        type_filter = Q()
+        for br in baths:
+            type_filter |= Q(massage_type=br.massage_type, massage_duration=br.minutes)
+        bath_types = {
+            (bt.massage_type, bt.massage_duration): bt
+            for bt in BathType.objects.filter(type_filter)
+        } if baths else {}
+
+        final_price = Decimal("0")
+        bath_type_details = []
+        for br in baths:
+            bath_type = bath_types.get((br.massage_type, br.minutes))
+            if bath_type is None:
+                raise ValueError(f"No existe el tipo de baño: {br.massage_type} de {br.minutes} minutos")
+            # Calcular precio: bathtype.price x quantity
+            final_price += bath_type.price * br.quantity
+            bath_type_details.append({
+                'bath_type': bath_type,
+                'quantity': br.quantity,
+                'massage_type': br.massage_type,
+                'duration': br.minutes
+            })
+        return final_price, bath_type_details
+
+    @staticmethod
+    def _find_matching_product(final_price: Decimal, bath_type_details: List[Dict[str, Any]]) -> Optional[Product]:
+        """
+        Producto con el mismo precio y exactamente los mismos tipos de baño y cantidades.
+
+        Los baños de todos los candidatos se leen en una única consulta.
+        """
+        bath_types_signature = sorted(
+            (detail['massage_type'], detail['duration'], detail['quantity'])
+            for detail in bath_type_details
+        )
+        candidate_signatures = {}
+        candidate_rows = ProductBaths.objects.filter(product__price=final_price).values_list(
+            'product_id', 'bath_type__massage_type', 'bath_type__massage_duration', 'quantity'
+        ).order_by('product_id')
+        for product_id, massage_type, duration, quantity in candidate_rows:
+            candidate_signatures.setdefault(product_id, []).append((massage_type, duration, quantity))
+
+        for product_id, signature in candidate_signatures.items():
+            if sorted(signature) == bath_types_signature:
+                MetricsService.inc('product_signature_lookups_total', source='booking', result='hit')
+                return Product.objects.get(id=product_id)
+        MetricsService.inc('product_signature_lookups_total', source='booking', result='miss')
+        return None
+
+    @staticmethod
+    def _create_product_baths(product: Product, bath_type_details: List[Dict[str, Any]]) -> None:
+        """Crea los ProductBaths de un producto nuevo en una sola inserción."""
+        ProductBaths.objects.bulk_create([
+            ProductBaths(product=product, bath_type=detail['bath_type'], quantity=detail['quantity'])
+            for detail in bath_type_details
+        ])
+        # bulk_create no emite señales
+        CatalogVersionService.bump(CatalogVersionService.PRODUCTS)
 
     # ------------------------------------------------------------------
     # Helper para asegurar BathTypes necesarios
@@ -646,7 +748,11 @@ class BookManager:
             },
         ]
         
+        # Una consulta para los existentes; sólo se crean los que falten
+        existing = set(BathType.objects.values_list('massage_type', 'massage_duration'))
         for bath_data in required_bath_types:
+            if (bath_data['massage_type'], bath_data['massage_duration']) in existing:
+                continue
             BathType.objects.get_or_create(
                 massage_type=bath_data['massage_type'],
                 massage_duration=bath_data['massage_duration'],
@@ -678,72 +784,32 @@ class BookManager:
         baths = massages.to_staff_bath_requests()
         
         # 1. Buscar los tipos de baños en la base de datos y calcular precio total
-        final_price = Decimal("0")
-        bath_type_details = []
-        
-        for br in baths:
-            try:
-                # Buscar el BathType existente en la base de datos
-                bath_type = BathType.objects.get(
-                    massage_type=br.massage_type,
-                    massage_duration=br.minutes
-                )
-                
-                # Calcular precio: bathtype.price x quantity
-                bath_total_price = bath_type.price * br.quantity
-                final_price += bath_total_price
-                
-                bath_type_details.append({
-                    'bath_type': bath_type,
-                    'quantity': br.quantity,
-                    'massage_type': br.massage_type,
-                    'duration': br.minutes
-                })
-                
-            except BathType.DoesNotExist:
-                raise ValueError(f"No existe el tipo de baño: {br.massage_type} de {br.minutes} minutos")
-        
+        final_price, bath_type_details = BookManager._resolve_bath_types(baths)
+
         # 2. Buscar producto existente con mismo precio y mismos BathTypes
-        bath_types_signature = sorted([
-            (detail['massage_type'], detail['duration'], detail['quantity']) 
-            for detail in bath_type_details
-        ])
-        
-        # Buscar productos con el mismo precio calculado
-        candidates = Product.objects.filter(price=final_price)
-        
-        for prod in candidates:
-            # Obtener los bath_types del producto candidato
-            prod_baths = list(prod.baths.values_list(
-                'bath_type__massage_type', 
-                'bath_type__massage_duration', 
-                'quantity'
-            ))
-            prod_baths_signature = sorted(prod_baths)
-            
-            # Si coinciden exactamente los tipos de baño y cantidades
-            if bath_types_signature == prod_baths_signature:
-                # ¡Producto encontrado! Calcular nueva cantidad pendiente
-                amount_already_paid = book.amount_paid
-                new_amount_pending = final_price - amount_already_paid
-                
-                book.product = prod
-                book.amount_pending = new_amount_pending
-                book.save(update_fields=['product_id', 'amount_pending'])
-                
-                # Crear log con información detallada del cambio de precio
-                if new_amount_pending < 0:
-                    log_message = f"Masajes actualizados. Producto existente: {prod.name} (€{final_price}). Hay €{abs(new_amount_pending)} a devolver al cliente."
-                elif new_amount_pending > 0:
-                    log_message = f"Masajes actualizados. Producto existente: {prod.name} (€{final_price}). Quedan €{new_amount_pending} pendientes de pago."
-                else:
-                    log_message = f"Masajes actualizados. Producto existente: {prod.name} (€{final_price}). Pago completado."
-                
-                log_dto = BookLogDTO(book_id=book_id, comment=log_message)
-                BookManager.create_book_log(log_dto)
-                
-                return BookManager._build_book_detail_dto(book)
-        
+        prod = BookManager._find_matching_product(final_price, bath_type_details)
+        if prod is not None:
+            # ¡Producto encontrado! Calcular nueva cantidad pendiente
+            amount_already_paid = book.amount_paid
+            new_amount_pending = final_price - amount_already_paid
+
+            book.product = prod
+            book.amount_pending = new_amount_pending
+            book.save(update_fields=['product_id', 'amount_pending'])
+
+            # Crear log con información detallada del cambio de precio
+            if new_amount_pending < 0:
+                log_message = f"Masajes actualizados. Producto existente: {prod.name} (€{final_price}). Hay €{abs(new_amount_pending)} a devolver al cliente."
+            elif new_amount_pending > 0:
+                log_message = f"Masajes actualizados. Producto existente: {prod.name} (€{final_price}). Quedan €{new_amount_pending} pendientes de pago."
+            else:
+                log_message = f"Masajes actualizados. Producto existente: {prod.name} (€{final_price}). Pago completado."
+
+            log_dto = BookLogDTO(book_id=book_id, comment=log_message)
+            BookManager.create_book_log(log_dto)
+
+            return BookManager._build_book_detail_dto(book)
+
         # 3. No existe producto, crear uno nuevo con visible=False
         # Generar nombre descriptivo basado en los masajes
         massage_descriptions = []
@@ -802,13 +868,7 @@ class BookManager:
         )
         
         # Crear los ProductBaths asociados
-        from reservations.models import ProductBaths
-        for detail in bath_type_details:
-            ProductBaths.objects.create(
-                product=product,
-                bath_type=detail['bath_type'],
-                quantity=detail['quantity']
-            )
+        BookManager._create_product_baths(product, bath_type_details)
         
         # 4. Actualizar la reserva con el nuevo producto
         amount_already_paid = book.amount_paid
@@ -1,16 +1,54 @@
-from typing import List, Dict, Any
-from collections import defaultdict
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from itertools import groupby
 
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import BooleanField, Case, Count, F, IntegerField, Q, Sum, Value, When, Window
+from django.db.models.functions import Lower, Trim
+from django.utils import timezone
 
-from reservations.dtos.client import ClientDTO
-from reservations.models import Client, Book, GiftVoucher
+from reservations.dtos.client import ClientDTO, ClientUnificationJobDTO
+from reservations.models import Client, Book, GiftVoucher, ClientUnificationJob
+from reservations.services.change_feed import ChangeFeedService
+from reservations.services.client_matching import ClientMatchingService
+from reservations.services.daily_stats import DailyStatsService
+
+
+class ClientMatchSuggestion(ValueError):
+    """
+    Se lanza con la política ``suggest`` cuando los datos de contacto de un
+    cliente nuevo coinciden con clientes existentes. ``candidates`` contiene los
+    ``ClientDTO`` encontrados para que el staff elija uno (``client_id``) o
+    fuerce la creación.
+    """
+
+    def __init__(self, candidates: List[ClientDTO]):
+        self.candidates = candidates
+        super().__init__(
+            f"Ya existen {len(candidates)} cliente(s) con el mismo email o teléfono. "
+            "Indique 'client_id' para usar uno de ellos o 'client_match': 'never' para crear uno nuevo."
+        )
 
 
 class ClientManager:
     """Gestor de operaciones CRUD para clientes."""
 
+    # Límite de grupos por página en la vista previa de duplicados
+    MAX_PREVIEW_PAGE_SIZE = 200
+
+    # Grupos por petición en ``unify_client_groups``; la unificación completa
+    # va por el proceso en segundo plano
+    MAX_EXPLICIT_GROUPS = 50
+
+    # Columnas de ``ClientDTO`` leídas por ``list_client_rows``
+    ROW_FIELDS = ('id', 'name', 'surname', 'phone_number', 'email', 'created_at')
+
+    # Políticas al crear un cliente cuyo email/teléfono ya existe
+    MATCH_POLICY_AUTO_ATTACH = 'auto_attach'
+    MATCH_POLICY_SUGGEST = 'suggest'
+    MATCH_POLICY_NEVER = 'never'
+    MATCH_POLICIES = (MATCH_POLICY_AUTO_ATTACH, MATCH_POLICY_SUGGEST, MATCH_POLICY_NEVER)
+
     # ------------------------------------------------------------------
     # Crear
     # ------------------------------------------------------------------
@@ -58,8 +96,20 @@ class ClientManager:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def list_clients() -> List[ClientDTO]:
-        return [ClientManager._to_dto(c) for c in Client.objects.all().order_by("-created_at")]
+    def list_clients(limit: Optional[int] = None) -> List[ClientDTO]:
+        return [ClientManager._to_dto(c) for c in Client.objects.all().order_by("-created_at")[:limit]]
+
+    @staticmethod
+    def list_client_rows(limit: Optional[int] = None, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        ``list_clients`` en diccionarios con las claves de ``ClientDTO`` (``values()``).
+        Con ``fields`` sólo se leen esas columnas.
+        """
+        columns = ClientManager.ROW_FIELDS
+        if fields is not None:
+            wanted = set(fields)
+            columns = [name for name in columns if name in wanted] or ['id']
+        return list(Client.objects.order_by("-created_at").values(*columns)[:limit])
 
     # ------------------------------------------------------------------
     # Eliminar
@@ -68,7 +118,10 @@ class ClientManager:
     @staticmethod
     @transaction.atomic
     def delete_client(client_id: int) -> None:
-        Client.objects.filter(id=client_id).delete()
+        # El borrado en cascada de reservas y cheques marca cada día una vez y
+        # registra sus borrados para el feed de cambios en un solo INSERT
+        with DailyStatsService.batch(), ChangeFeedService.batch():
+            Client.objects.filter(id=client_id).delete()
 
     # ------------------------------------------------------------------
     # Unificación de clientes
@@ -105,24 +158,16 @@ class ClientManager:
             if len(clients) < 2:
                 continue
                 
-            # Ordenar por ID (el más alto será el principal)
-            clients.sort(key=lambda c: c.id, reverse=True)
+            # Ya vienen ordenados por ID descendente (el más alto será el principal)
             main_client = clients[0]  # Cliente principal (ID más alto)
             duplicate_clients = clients[1:]  # Clientes a eliminar
             
             # IDs de los clientes duplicados
             duplicate_ids = [c.id for c in duplicate_clients]
-            
-            # Actualizar referencias en Book
-            books_updated = Book.objects.filter(client_id__in=duplicate_ids).update(client=main_client)
+
+            books_updated, gift_vouchers_updated = ClientManager._merge_clients(main_client.id, duplicate_ids)
             total_books_updated += books_updated
-            
-            # Actualizar referencias en GiftVoucher
-            gift_vouchers_updated = GiftVoucher.objects.filter(buyer_client_id__in=duplicate_ids).update(buyer_client=main_client)
             total_gift_vouchers_updated += gift_vouchers_updated
-            
-            # Eliminar clientes duplicados
-            Client.objects.filter(id__in=duplicate_ids).delete()
             total_clients_removed += len(duplicate_ids)
         
         return {
@@ -135,62 +180,364 @@ class ClientManager:
         }
 
     @staticmethod
-    def _find_duplicate_clients() -> Dict[str, List[Client]]:
+    def unify_client_groups(groups: List[List[int]]) -> Dict[str, Any]:
+        """
+        Unifica grupos de clientes indicados explícitamente.
+
+        Pensado para los candidatos de la detección aproximada
+        (``get_fuzzy_duplicate_clients_preview``) una vez revisados por el staff.
+        En cada grupo se conserva el cliente de ID más alto, igual que en
+        ``unify_duplicate_clients``. Cada grupo se confirma en su propia
+        transacción, como los bloques de ``run_unification_job``, y se admiten
+        como mucho ``MAX_EXPLICIT_GROUPS`` grupos por llamada.
+
+        Args:
+            groups: Lista de grupos, cada uno una lista de IDs de cliente
+
+        Returns:
+            Diccionario con estadísticas del proceso de unificación
+
+        Raises:
+            ValueError: Si hay más de ``MAX_EXPLICIT_GROUPS`` grupos
+        """
+        if len(groups) > ClientManager.MAX_EXPLICIT_GROUPS:
+            raise ValueError(
+                f"Se pueden unificar como máximo {ClientManager.MAX_EXPLICIT_GROUPS} grupos por petición"
+            )
+
+        total_books_updated = 0
+        total_gift_vouchers_updated = 0
+        total_clients_removed = 0
+        unified_groups = 0
+
+        for group in groups:
+            client_ids = sorted({int(client_id) for client_id in group}, reverse=True)
+            with transaction.atomic():
+                existing_ids = list(
+                    Client.objects.filter(id__in=client_ids).order_by('-id').values_list('id', flat=True)
+                )
+                if len(existing_ids) < 2:
+                    continue
+
+                main_client_id, duplicate_ids = existing_ids[0], existing_ids[1:]
+                books_updated, gift_vouchers_updated = ClientManager._merge_clients(main_client_id, duplicate_ids)
+            total_books_updated += books_updated
+            total_gift_vouchers_updated += gift_vouchers_updated
+            total_clients_removed += len(duplicate_ids)
+            unified_groups += 1
+
+        return {
+            "success": True,
+            "message": f"Unificación completada. {unified_groups} grupos procesados.",
+            "unified_groups": unified_groups,
+            "clients_removed": total_clients_removed,
+            "books_updated": total_books_updated,
+            "gift_vouchers_updated": total_gift_vouchers_updated
+        }
+
+    # ------------------------------------------------------------------
+    # Unificación en segundo plano (Celery)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def start_unification_job() -> ClientUnificationJobDTO:
+        """
+        Crea un proceso de unificación y lo encola en Celery.
+
+        La tarea se encola cuando la transacción actual se confirma para que el
+        worker encuentre ya el registro del proceso.
+        """
+        from reservations.tasks import unify_duplicate_clients_task
+
+        job = ClientUnificationJob.objects.create(
+            total_groups=ClientManager._duplicate_group_keys().count(),
+        )
+        transaction.on_commit(lambda: unify_duplicate_clients_task.delay(job.id))
+        return ClientManager._job_to_dto(job)
+
+    @staticmethod
+    def resume_unification_job(job_id: int) -> ClientUnificationJobDTO:
+        """Vuelve a encolar un proceso interrumpido o fallido desde su checkpoint."""
+        from reservations.tasks import unify_duplicate_clients_task
+
+        job = ClientUnificationJob.objects.get(id=job_id)
+        if job.status == 'completed':
+            raise ValueError(f"La unificación #{job_id} ya está completada")
+
+        job.status = 'pending'
+        job.error = None
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        transaction.on_commit(lambda: unify_duplicate_clients_task.delay(job.id))
+        return ClientManager._job_to_dto(job)
+
+    @staticmethod
+    def get_unification_job(job_id: int) -> Optional[ClientUnificationJobDTO]:
+        """Devuelve el progreso de un proceso de unificación o ``None`` si no existe."""
+        job = ClientUnificationJob.objects.filter(id=job_id).first()
+        if job is None:
+            return None
+        return ClientManager._job_to_dto(job)
+
+    @staticmethod
+    def run_unification_job(job_id: int, chunk_size: int = None) -> ClientUnificationJobDTO:
+        """
+        Procesa los grupos duplicados en bloques pequeños, cada uno en su propia
+        transacción.
+
+        Cada bloque reasigna reservas y cheques, elimina los duplicados y
+        avanza el checkpoint (último ``norm_email``/``norm_phone`` procesado)
+        dentro de la misma transacción, así que tras una caída el proceso
+        continúa exactamente después del último bloque confirmado. Los bloqueos
+        sobre ``Book`` y ``GiftVoucher`` sólo duran lo que tarda un bloque.
+        """
+        chunk_size = chunk_size or getattr(settings, 'CLIENT_UNIFICATION_CHUNK_SIZE', 50)
+
+        job = ClientUnificationJob.objects.get(id=job_id)
+        if job.status == 'completed':
+            return ClientManager._job_to_dto(job)
+        job.status = 'running'
+        job.save(update_fields=['status', 'updated_at'])
+
+        try:
+            while ClientManager._process_unification_chunk(job_id, chunk_size):
+                pass
+        except Exception as e:
+            ClientUnificationJob.objects.filter(id=job_id).update(
+                status='failed', error=str(e), updated_at=timezone.now()
+            )
+            raise
+
+        job.refresh_from_db()
+        return ClientManager._job_to_dto(job)
+
+    @staticmethod
+    @transaction.atomic
+    def _process_unification_chunk(job_id: int, chunk_size: int) -> bool:
+        """
+        Procesa el siguiente bloque de grupos de un proceso.
+
+        Returns:
+            ``True`` si quedan grupos pendientes
+        """
+        # Bloquear el proceso evita que dos workers procesen el mismo bloque
+        job = ClientUnificationJob.objects.select_for_update().get(id=job_id)
+        if job.status != 'running':
+            return False
+
+        group_keys = ClientManager._duplicate_group_keys()
+        if job.last_email is not None:
+            group_keys = group_keys.filter(
+                Q(norm_email__gt=job.last_email) |
+                Q(norm_email=job.last_email, norm_phone__gt=job.last_phone)
+            )
+        chunk_keys = list(group_keys[:chunk_size])
+
+        if not chunk_keys:
+            job.status = 'completed'
+            job.finished_at = timezone.now()
+            job.save()
+            return False
+
+        for clients in ClientManager._find_duplicate_clients(keys=chunk_keys).values():
+            duplicate_ids = [c.id for c in clients[1:]]
+            books_updated, gift_vouchers_updated = ClientManager._merge_clients(clients[0].id, duplicate_ids)
+            job.books_updated += books_updated
+            job.gift_vouchers_updated += gift_vouchers_updated
+            job.clients_removed += len(duplicate_ids)
+
+        job.processed_groups += len(chunk_keys)
+        job.last_email = chunk_keys[-1]['norm_email']
+        job.last_phone = chunk_keys[-1]['norm_phone']
+        if len(chunk_keys) < chunk_size:
+            job.status = 'completed'
+            job.finished_at = timezone.now()
+        job.save()
+        return job.status == 'running'
+
+    @staticmethod
+    def _job_to_dto(job: ClientUnificationJob) -> ClientUnificationJobDTO:
+        return ClientUnificationJobDTO(
+            id=job.id,
+            status=job.status,
+            total_groups=job.total_groups,
+            processed_groups=job.processed_groups,
+            clients_removed=job.clients_removed,
+            books_updated=job.books_updated,
+            gift_vouchers_updated=job.gift_vouchers_updated,
+            error=job.error,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
+            finished_at=job.finished_at,
+        )
+
+    @staticmethod
+    def _merge_clients(main_client_id: int, duplicate_ids: List[int]) -> Tuple[int, int]:
+        """
+        Reasigna reservas y cheques de los duplicados al cliente principal y
+        elimina los duplicados.
+
+        Returns:
+            Tupla ``(reservas actualizadas, cheques actualizados)``
+        """
+        # ``update`` no toca ``updated_at`` (auto_now): se fija para el feed de cambios
+        now = timezone.now()
+
+        # Actualizar referencias en Book
+        books_updated = Book.objects.filter(client_id__in=duplicate_ids).update(client_id=main_client_id, updated_at=now)
+
+        # Actualizar referencias en GiftVoucher
+        gift_vouchers_updated = GiftVoucher.objects.filter(buyer_client_id__in=duplicate_ids).update(
+            buyer_client_id=main_client_id, updated_at=now,
+        )
+
+        # Eliminar clientes duplicados
+        with ChangeFeedService.batch():
+            Client.objects.filter(id__in=duplicate_ids).delete()
+
+        return books_updated, gift_vouchers_updated
+
+    @staticmethod
+    def _contact_queryset():
+        """
+        Clientes con email y teléfono, anotados con su contacto normalizado.
+
+        La normalización (email en minúsculas sin espacios y teléfono sin
+        espacios) se hace en la base de datos para poder agrupar con
+        ``GROUP BY`` y aprovechar el índice funcional ``client_contact_norm_idx``.
+        """
+        return (
+            Client.objects
+            .exclude(email__isnull=True).exclude(email='')
+            .exclude(phone_number__isnull=True).exclude(phone_number='')
+            .annotate(
+                norm_email=Lower(Trim('email')),
+                norm_phone=Trim('phone_number'),
+            )
+            .exclude(norm_email='')
+            .exclude(norm_phone='')
+        )
+
+    @staticmethod
+    def _duplicate_group_keys():
+        """
+        Consulta agregada con los grupos duplicados.
+
+        Equivale a ``GROUP BY norm_email, norm_phone HAVING COUNT(*) > 1`` y
+        devuelve un diccionario por grupo con ``norm_email``, ``norm_phone`` y
+        ``group_size``, ordenado de forma estable para poder paginar.
+        """
+        return (
+            ClientManager._contact_queryset()
+            .values('norm_email', 'norm_phone')
+            .annotate(group_size=Count('id'))
+            .filter(group_size__gt=1)
+            .order_by('norm_email', 'norm_phone')
+        )
+
+    @staticmethod
+    def _find_duplicate_clients(keys: Optional[List[Dict[str, Any]]] = None) -> Dict[str, List[Client]]:
         """
         Encuentra grupos de clientes duplicados basándose en email y teléfono.
-        
+
+        Una única consulta con una función ventana (``COUNT(*) OVER (PARTITION BY
+        norm_email, norm_phone)``) devuelve sólo los clientes que pertenecen a un
+        grupo duplicado, ya ordenados por grupo y por ID descendente.
+
+        Args:
+            keys: Restringe la búsqueda a estos grupos (``norm_email``/``norm_phone``)
+
         Returns:
             Diccionario donde la clave es "email|phone" y el valor es lista de clientes duplicados
+            (el primero es el de ID más alto)
         """
-        # Filtrar clientes que tengan email Y teléfono (para evitar falsos positivos)
-        clients_with_contact = Client.objects.filter(
-            Q(email__isnull=False) & ~Q(email='') &
-            Q(phone_number__isnull=False) & ~Q(phone_number='')
-        ).order_by('email', 'phone_number')
-        
-        # Agrupar por email y teléfono
-        groups = defaultdict(list)
-        for client in clients_with_contact:
-            # Normalizar email y teléfono para comparación
-            email_key = client.email.lower().strip() if client.email else ""
-            phone_key = client.phone_number.strip() if client.phone_number else ""
-            
-            # Solo agrupar si tanto email como teléfono tienen valor
-            if email_key and phone_key:
-                group_key = f"{email_key}|{phone_key}"
-                groups[group_key].append(client)
-        
-        # Filtrar solo grupos con más de un cliente (duplicados)
-        duplicate_groups = {k: v for k, v in groups.items() if len(v) > 1}
-        
+        queryset = ClientManager._contact_queryset()
+
+        if keys is not None:
+            if not keys:
+                return {}
+            keys_filter = Q()
+            for key in keys:
+                keys_filter |= Q(norm_email=key['norm_email'], norm_phone=key['norm_phone'])
+            queryset = queryset.filter(keys_filter)
+
+        clients = (
+            queryset
+            .annotate(
+                group_size=Window(
+                    expression=Count('id'),
+                    partition_by=[F('norm_email'), F('norm_phone')],
+                )
+            )
+            .filter(group_size__gt=1)
+            .order_by('norm_email', 'norm_phone', '-id')
+        )
+
+        duplicate_groups = {}
+        for (email_key, phone_key), group in groupby(clients, key=lambda c: (c.norm_email, c.norm_phone)):
+            duplicate_groups[f"{email_key}|{phone_key}"] = list(group)
+
         return duplicate_groups
 
     @staticmethod
-    def get_duplicate_clients_preview() -> Dict[str, Any]:
+    def get_duplicate_clients_preview(page: int = 1, page_size: int = 50) -> Dict[str, Any]:
         """
-        Obtiene una vista previa de los clientes duplicados sin realizar cambios.
-        
+        Obtiene una vista previa paginada de los clientes duplicados sin realizar cambios.
+
+        Los totales salen de la consulta agregada de grupos, los clientes de la
+        página de una consulta con función ventana y los contadores de reservas
+        y cheques de una única consulta agregada sobre los duplicados.
+
+        Args:
+            page: Número de página (empieza en 1)
+            page_size: Número de grupos por página
+
         Returns:
             Diccionario con información de los duplicados encontrados
         """
-        duplicate_groups = ClientManager._find_duplicate_clients()
-        
+        page = max(1, page)
+        page_size = max(1, min(page_size, ClientManager.MAX_PREVIEW_PAGE_SIZE))
+
+        group_keys = ClientManager._duplicate_group_keys()
+        totals = group_keys.aggregate(
+            total_groups=Count('*'),
+            total_clients=Sum('group_size'),
+        )
+        total_groups = totals['total_groups'] or 0
+        total_clients = totals['total_clients'] or 0
+
+        offset = (page - 1) * page_size
+        page_keys = list(group_keys[offset:offset + page_size])
+        duplicate_groups = ClientManager._find_duplicate_clients(keys=page_keys)
+
+        # Contadores de referencias de todos los duplicados de la página en una consulta
+        duplicate_ids = [c.id for clients in duplicate_groups.values() for c in clients[1:]]
+        reference_counts = {
+            row['id']: row
+            for row in (
+                Client.objects
+                .filter(id__in=duplicate_ids)
+                .annotate(
+                    books_count=Count('book', distinct=True),
+                    vouchers_count=Count('giftvoucher', distinct=True),
+                )
+                .values('id', 'books_count', 'vouchers_count')
+            )
+        }
+
         preview_data = {
-            "total_groups": len(duplicate_groups),
-            "total_duplicates": sum(len(clients) - 1 for clients in duplicate_groups.values()),
+            "total_groups": total_groups,
+            "total_duplicates": total_clients - total_groups,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total_groups + page_size - 1) // page_size,
             "groups": []
         }
-        
+
         for group_key, clients in duplicate_groups.items():
-            email, phone = group_key.split('|')
-            clients.sort(key=lambda c: c.id, reverse=True)
+            email, phone = group_key.split('|', 1)
             main_client = clients[0]
             duplicates = clients[1:]
-            
-            # Contar referencias para cada cliente duplicado
-            books_count = Book.objects.filter(client_id__in=[c.id for c in duplicates]).count()
-            vouchers_count = GiftVoucher.objects.filter(buyer_client_id__in=[c.id for c in duplicates]).count()
-            
+
             group_info = {
                 "email": email,
                 "phone": phone,
@@ -208,13 +555,37 @@ class ClientManager:
                         "created_at": client.created_at.isoformat() if client.created_at else None
                     } for client in duplicates
                 ],
-                "books_to_update": books_count,
-                "vouchers_to_update": vouchers_count
+                "books_to_update": sum(reference_counts.get(c.id, {}).get('books_count', 0) for c in duplicates),
+                "vouchers_to_update": sum(reference_counts.get(c.id, {}).get('vouchers_count', 0) for c in duplicates)
             }
             preview_data["groups"].append(group_info)
-        
+
         return preview_data
 
+    @staticmethod
+    def get_fuzzy_duplicate_clients_preview(threshold: float = None, limit: int = 100) -> Dict[str, Any]:
+        """
+        Vista previa de posibles duplicados no exactos (acentos, erratas en
+        apellidos, prefijo +34...).
+
+        Los grupos devueltos pueden enviarse tal cual a ``unify_client_groups``
+        (``POST /api/v1/clientes/unificar/`` con ``groups``).
+
+        Args:
+            threshold: Puntuación mínima de similitud (0-1)
+            limit: Máximo de grupos devueltos
+
+        Returns:
+            Diccionario con los grupos candidatos ordenados por puntuación
+        """
+        groups = ClientMatchingService.find_duplicate_groups(threshold=threshold)
+        return {
+            "threshold": threshold if threshold is not None else ClientMatchingService.DEFAULT_THRESHOLD,
+            "total_groups": len(groups),
+            "total_duplicates": sum(len(g['client_ids']) - 1 for g in groups),
+            "groups": groups[:limit],
+        }
+
     # ------------------------------------------------------------------
     # Búsqueda de clientes similares
     # ------------------------------------------------------------------
@@ -313,6 +684,111 @@ class ClientManager:
         
         return matches
 
+    # ------------------------------------------------------------------
+    # Resolver o crear (reservas y cheques desde staff)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def resolve_or_create_client(
+        *,
+        name: str,
+        surname: str = None,
+        phone_number: str = None,
+        email: str = None,
+        policy: str = None,
+    ) -> Tuple[Client, bool]:
+        """
+        Devuelve un cliente existente con el mismo email o teléfono o crea uno nuevo.
+
+        La búsqueda compara los valores normalizados (``LOWER(TRIM(email))`` y
+        ``TRIM(phone_number)``), que son los que cubren los índices de contacto,
+        así que es una única consulta indexada.
+
+        Políticas (por defecto ``settings.CLIENT_MATCH_POLICY``):
+            - ``auto_attach``: reutiliza el mejor candidato si coincide el email,
+              o el teléfono y el nombre; si no, crea un cliente nuevo.
+            - ``suggest``: si hay candidatos lanza ``ClientMatchSuggestion``.
+            - ``never``: siempre crea un cliente nuevo.
+
+        Returns:
+            Tupla ``(cliente, creado)``
+        """
+        if policy is None:
+            policy = getattr(settings, 'CLIENT_MATCH_POLICY', ClientManager.MATCH_POLICY_AUTO_ATTACH)
+        if policy not in ClientManager.MATCH_POLICIES:
+            raise ValueError(f"Política de coincidencia de clientes inválida: {policy}")
+        if not name:
+            raise ValueError("Se requiere 'name' para crear un nuevo cliente")
+
+        norm_email = (email or "").strip().lower()
+        norm_phone = (phone_number or "").strip()
+
+        if policy != ClientManager.MATCH_POLICY_NEVER and (norm_email or norm_phone):
+            candidates = ClientManager._find_contact_matches(norm_email, norm_phone)
+            if candidates:
+                if policy == ClientManager.MATCH_POLICY_SUGGEST:
+                    raise ClientMatchSuggestion([ClientManager._to_dto(c) for c in candidates])
+
+                # Un teléfono compartido (familia, empresa...) sólo basta si también coincide el nombre
+                norm_name = ClientMatchingService.normalize_text(name)
+                for candidate in candidates:
+                    same_name = ClientMatchingService.normalize_text(candidate.name) == norm_name
+                    if candidate.email_match or (candidate.phone_match and same_name):
+                        ClientManager._fill_missing_contact(candidate, surname, norm_phone, norm_email)
+                        return candidate, False
+
+        client = Client.objects.create(
+            name=name,
+            surname=surname or "",
+            phone_number=phone_number or "",
+            email=email or "",
+        )
+        return client, True
+
+    @staticmethod
+    def _find_contact_matches(norm_email: str, norm_phone: str, limit: int = 5) -> List[Client]:
+        """
+        Clientes cuyo email o teléfono normalizado coincide, ordenados por fuerza
+        de la coincidencia (ambos > email > teléfono) y después por el más reciente.
+        """
+        email_match = Q(norm_email=norm_email) if norm_email else Q(pk__in=[])
+        phone_match = Q(norm_phone=norm_phone) if norm_phone else Q(pk__in=[])
+
+        # Se ordena por fuerza en SQL antes de limitar: un email exacto antiguo
+        # no puede quedar fuera por teléfonos compartidos más recientes
+        return list(
+            Client.objects
+            .annotate(norm_email=Lower(Trim('email')), norm_phone=Trim('phone_number'))
+            .filter(email_match | phone_match)
+            .annotate(
+                email_match=Case(When(email_match, then=Value(True)), default=Value(False), output_field=BooleanField()),
+                phone_match=Case(When(phone_match, then=Value(True)), default=Value(False), output_field=BooleanField()),
+            )
+            .annotate(match_score=Case(
+                When(email_match & phone_match, then=Value(2)),
+                When(email_match, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+            .order_by('-match_score', '-id')[:limit]
+        )
+
+    @staticmethod
+    def _fill_missing_contact(client: Client, surname: str, phone_number: str, email: str) -> None:
+        """Completa los datos vacíos del cliente reutilizado sin sobrescribir los existentes."""
+        update_fields = []
+        if surname and not client.surname:
+            client.surname = surname
+            update_fields.append('surname')
+        if phone_number and not client.phone_number:
+            client.phone_number = phone_number
+            update_fields.append('phone_number')
+        if email and not client.email:
+            client.email = email
+            update_fields.append('email')
+        if update_fields:
+            client.save(update_fields=update_fields)
+
     # ------------------------------------------------------------------
     # Helper
     # ------------------------------------------------------------------
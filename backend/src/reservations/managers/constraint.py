@@ -1,5 +1,6 @@
 from datetime import date, time
 from typing import List, Optional
+from django.db import transaction
 from django.utils import timezone
 
 from reservations.models import Constraint, ConstraintRange
@@ -41,6 +42,7 @@ class ConstraintManager:
             return None
 
     @staticmethod
+    @transaction.atomic
     def save_constraint(target_day: date, ranges: List[ConstraintRangeDTO]) -> ConstraintDTO:
         """
         Guarda o actualiza una restricción para un día específico.
@@ -61,16 +63,25 @@ class ConstraintManager:
         # Eliminar rangos existentes
         constraint.constraintrange_set.all().delete()
         
-        # Crear nuevos rangos
-        for range_dto in ranges:
-            ConstraintRange.objects.create(
+        # Crear nuevos rangos (un único INSERT)
+        ConstraintRange.objects.bulk_create([
+            ConstraintRange(
                 constraint=constraint,
                 initial_time=range_dto.initial_time,
                 end_time=range_dto.end_time
             )
+            for range_dto in ranges
+        ])
         
-        # Devolver DTO actualizado
-        return ConstraintManager.get_constraint_for_day(target_day)
+        # Devolver DTO actualizado (sin volver a leer lo que acabamos de escribir)
+        return ConstraintDTO(
+            id=constraint.id,
+            day=constraint.day,
+            ranges=[
+                ConstraintRangeDTO(initial_time=r.initial_time, end_time=r.end_time)
+                for r in sorted(ranges, key=lambda r: r.initial_time)
+            ]
+        )
 
     @staticmethod
     def delete_constraint(target_day: date) -> bool:
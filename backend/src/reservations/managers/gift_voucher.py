@@ -7,21 +7,59 @@ datos y en el modelo ``GiftVoucher`` para la persistencia.
 
 from __future__ import annotations
 
+import base64
 import random
-from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from decimal import Decimal
 
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
-from reservations.dtos.gift_voucher import GiftVoucherDTO, GiftVoucherWithDetailsDTO, StaffGiftVoucherPayloadDTO
+from reservations.dtos.gift_voucher import (
+    GiftVoucherDTO, GiftVoucherWithDetailsDTO, StaffGiftVoucherPayloadDTO,
+    GiftVoucherSummaryDTO, GiftVoucherPageDTO, StaffBulkGiftVoucherPayloadDTO,
+)
 from reservations.dtos.book import StaffBathRequestDTO
-from reservations.models import GiftVoucher, Client, Product, BathType, ProductBaths
+from reservations.models import GiftVoucher, Product, BathType, ProductBaths
+from reservations.managers.client import ClientManager
+from reservations.services.daily_stats import DailyStatsService
+from reservations.services.metrics import MetricsService
 
 
 class GiftVoucherManager:
     """Gestor CRUD para *cheques regalo* (GiftVoucher)."""
 
+    # Tamaño de página del listado paginado por cursor
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    # Máximo de cheques por emisión masiva
+    MAX_BULK_QUANTITY = 1000
+
+    # Columnas de ``GiftVoucherWithDetailsDTO`` leídas por ``list_voucher_detail_rows``
+    DETAIL_ROW_FIELDS = (
+        'id', 'code', 'price', 'status', 'payment_date', 'people', 'buyer_client_id', 'product_id',
+        'recipients_email', 'recipients_name', 'recipients_surname', 'gift_name', 'gift_description',
+        'created_at', 'bought_date',
+    )
+    DETAIL_ROW_RELATED = {
+        'buyer_name': 'buyer_client__name',
+        'buyer_surname': 'buyer_client__surname',
+        'buyer_phone': 'buyer_client__phone_number',
+        'buyer_email': 'buyer_client__email',
+        'buyer_client_created_at': 'buyer_client__created_at',
+        'product_name': 'product__name',
+    }
+
+    # Columnas leídas por la proyección compacta del listado
+    SUMMARY_FIELDS = (
+        'id', 'code', 'status', 'price', 'people', 'bought_date', 'created_at',
+        'buyer_client_id', 'buyer_client__name', 'buyer_client__surname', 'product__name',
+    )
+
     # ------------------------------------------------------------------
     # Conversión -> DTO
     # ------------------------------------------------------------------
@@ -96,6 +134,30 @@ class GiftVoucherManager:
             if not GiftVoucher.objects.filter(code=code).exists():
                 return code
 
+    @staticmethod
+    def _allocate_codes(count: int) -> List[str]:
+        """
+        Reserva ``count`` códigos libres del día (ddmmyyyy + 4 dígitos).
+
+        Los candidatos se comprueban en bloque con una consulta ``code__in`` por
+        ronda en lugar de una consulta por código.
+        """
+        today = timezone.now().strftime("%d%m%Y")
+        codes = set()
+        for _ in range(10):
+            missing = count - len(codes)
+            if missing <= 0:
+                break
+            # Generar algo más de lo necesario para absorber las colisiones
+            candidates = {
+                f"{today}{random.randint(0, 9999):04d}" for _ in range(missing * 2)
+            } - codes
+            taken = set(GiftVoucher.objects.filter(code__in=candidates).values_list('code', flat=True))
+            codes.update(list(candidates - taken)[:missing])
+        if len(codes) < count:
+            raise ValueError("No quedan suficientes códigos libres para hoy")
+        return sorted(codes)
+
     # ------------------------------------------------------------------
     # CRUD público
     # ------------------------------------------------------------------
@@ -140,11 +202,158 @@ class GiftVoucherManager:
         return [GiftVoucherManager._to_dto(v) for v in vouchers]
 
     @staticmethod
-    def list_vouchers_with_details() -> List[GiftVoucherWithDetailsDTO]:
+    def list_vouchers_with_details(limit: Optional[int] = None) -> List[GiftVoucherWithDetailsDTO]:
         """Devuelve todos los cheques regalo con detalles completos ordenados por fecha de creación."""
 
         vouchers = GiftVoucher.objects.select_related('buyer_client', 'product').all().order_by("-created_at")
-        return [GiftVoucherManager._to_details_dto(v) for v in vouchers]
+        return [GiftVoucherManager._to_details_dto(v) for v in vouchers[:limit]]
+
+    @staticmethod
+    def list_voucher_detail_rows(
+        limit: Optional[int] = None, fields: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        ``list_vouchers_with_details`` en diccionarios con las claves de
+        ``GiftVoucherWithDetailsDTO``: una sola consulta con los JOIN de
+        comprador y producto, sin instanciar modelos ni DTOs. Con ``fields``
+        sólo se leen esas columnas (y sólo los JOIN que hagan falta).
+        """
+        columns, related = GiftVoucherManager._detail_row_values(fields)
+        vouchers = GiftVoucher.objects.order_by("-created_at")
+        return list(vouchers.values(*columns, **related)[:limit])
+
+    @staticmethod
+    def _detail_row_values(fields: Optional[Iterable[str]] = None, required: Tuple[str, ...] = ()):
+        """Argumentos de ``values()`` para las filas de detalle con las claves ``fields`` (y ``required``)."""
+        wanted = None if fields is None else set(fields).union(required)
+        columns = [name for name in GiftVoucherManager.DETAIL_ROW_FIELDS if wanted is None or name in wanted]
+        related = {
+            key: F(path) for key, path in GiftVoucherManager.DETAIL_ROW_RELATED.items()
+            if wanted is None or key in wanted
+        }
+        if not columns and not related:
+            columns = ['id']  # ``values()`` sin columnas leería todas
+        return columns, related
+
+    @staticmethod
+    def list_vouchers_page(
+        *,
+        status: Optional[List[str]] = None,
+        bought_from: Optional[date] = None,
+        bought_to: Optional[date] = None,
+        buyer_id: Optional[int] = None,
+        buyer: Optional[str] = None,
+        cursor: Optional[str] = None,
+        page_size: Optional[int] = None,
+        compact: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> GiftVoucherPageDTO:
+        """
+        Devuelve una página de cheques regalo ordenados del más reciente al más antiguo.
+
+        La paginación es por cursor sobre ``(created_at, id)``: cada página se
+        lee con un rango sobre el índice en lugar de un OFFSET, así que su coste
+        no depende de cuántos cheques se hayan vendido.
+
+        Args:
+            status: Estados a incluir
+            bought_from / bought_to: Rango de fechas de compra (ambos incluidos)
+            buyer_id: ID del cliente comprador
+            buyer: Texto a buscar en nombre, apellidos, email o teléfono del comprador
+            cursor: ``next_cursor`` de la página anterior
+            page_size: Elementos por página (máximo ``MAX_PAGE_SIZE``)
+            compact: Devolver ``GiftVoucherSummaryDTO`` leyendo sólo las columnas de la tabla
+            fields: Sin ``compact``, claves de ``GiftVoucherWithDetailsDTO`` a leer;
+                los resultados son entonces filas ``values()`` con esas claves
+                (más ``id`` y ``created_at``, que sostienen el cursor)
+
+        Raises:
+            ValueError: Si el cursor no es válido o algún estado no existe
+        """
+        page_size = min(max(int(page_size or GiftVoucherManager.DEFAULT_PAGE_SIZE), 1), GiftVoucherManager.MAX_PAGE_SIZE)
+
+        vouchers = GiftVoucher.objects.all()
+        if status:
+            unknown = sorted(set(status).difference(value for value, _ in GiftVoucher.STATUS_CHOICES))
+            if unknown:
+                raise ValueError(f"Estados de cheque desconocidos: {', '.join(unknown)}")
+            vouchers = vouchers.filter(status__in=status)
+        tz = timezone.get_current_timezone()
+        if bought_from:
+            vouchers = vouchers.filter(bought_date__gte=datetime.combine(bought_from, time.min, tzinfo=tz))
+        if bought_to:
+            vouchers = vouchers.filter(bought_date__lt=datetime.combine(bought_to + timedelta(days=1), time.min, tzinfo=tz))
+        if buyer_id:
+            vouchers = vouchers.filter(buyer_client_id=buyer_id)
+        if buyer:
+            buyer = buyer.strip()
+            vouchers = vouchers.filter(
+                Q(buyer_client__name__icontains=buyer)
+                | Q(buyer_client__surname__icontains=buyer)
+                | Q(buyer_client__email__icontains=buyer)
+                | Q(buyer_client__phone_number__icontains=buyer)
+            )
+        if cursor:
+            cursor_created_at, cursor_id = GiftVoucherManager._decode_cursor(cursor)
+            vouchers = vouchers.filter(
+                Q(created_at__lt=cursor_created_at)
+                | Q(created_at=cursor_created_at, id__lt=cursor_id)
+            )
+
+        vouchers = vouchers.order_by('-created_at', '-id')
+
+        # Se lee un elemento de más para saber si hay página siguiente
+        if compact:
+            rows = list(vouchers.values(*GiftVoucherManager.SUMMARY_FIELDS)[:page_size + 1])
+            has_next = len(rows) > page_size
+            rows = rows[:page_size]
+            results = [GiftVoucherManager._row_to_summary_dto(row) for row in rows]
+            last = (rows[-1]['created_at'], rows[-1]['id']) if rows else None
+        elif fields is not None:
+            columns, related = GiftVoucherManager._detail_row_values(fields, required=('id', 'created_at'))
+            results = list(vouchers.values(*columns, **related)[:page_size + 1])
+            has_next = len(results) > page_size
+            results = results[:page_size]
+            last = (results[-1]['created_at'], results[-1]['id']) if results else None
+        else:
+            items = list(vouchers.select_related('buyer_client', 'product')[:page_size + 1])
+            has_next = len(items) > page_size
+            items = items[:page_size]
+            results = [GiftVoucherManager._to_details_dto(v) for v in items]
+            last = (items[-1].created_at, items[-1].id) if items else None
+
+        next_cursor = GiftVoucherManager._encode_cursor(*last) if has_next else None
+        return GiftVoucherPageDTO(results=results, next_cursor=next_cursor, page_size=page_size)
+
+    @staticmethod
+    def _row_to_summary_dto(row: dict) -> GiftVoucherSummaryDTO:
+        return GiftVoucherSummaryDTO(
+            id=row['id'],
+            code=row['code'],
+            status=row['status'],
+            price=row['price'],
+            people=row['people'],
+            bought_date=row['bought_date'],
+            created_at=row['created_at'],
+            buyer_client_id=row['buyer_client_id'],
+            buyer_name=row['buyer_client__name'],
+            buyer_surname=row['buyer_client__surname'],
+            product_name=row['product__name'],
+        )
+
+    @staticmethod
+    def _encode_cursor(created_at: datetime, voucher_id: int) -> str:
+        raw = f"{created_at.isoformat()}|{voucher_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str):
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            created_at, voucher_id = raw.rsplit('|', 1)
+            return datetime.fromisoformat(created_at), int(voucher_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("Cursor de paginación inválido")
 
     # ------------------------------------------------------------------
     @staticmethod
@@ -266,7 +475,11 @@ class GiftVoucherManager:
             },
         ]
         
+        # Una consulta para los existentes; sólo se crean los que falten
+        existing = set(BathType.objects.values_list('massage_type', 'massage_duration'))
         for bath_data in required_bath_types:
+            if (bath_data['massage_type'], bath_data['massage_duration']) in existing:
+                continue
             BathType.objects.get_or_create(
                 massage_type=bath_data['massage_type'],
                 massage_duration=bath_data['massage_duration'],
@@ -295,131 +508,16 @@ class GiftVoucherManager:
         GiftVoucherManager.ensure_bath_types_exist()
         
         # 1. Crear o encontrar cliente comprador
-        buyer_client = Client.objects.create(
+        buyer_client, _ = ClientManager.resolve_or_create_client(
             name=payload.buyer_name,
-            surname=payload.buyer_surname or "",
-            phone_number=payload.buyer_phone or "",
+            surname=payload.buyer_surname,
+            phone_number=payload.buyer_phone,
             email=payload.buyer_email,
+            policy=payload.client_match,
         )
         
-        # 2. Procesar masajes y calcular precio
-        baths = payload.baths or []
-        if not baths:
-            raise ValueError("Debe indicar al menos un tipo de baño/masaje")
-        
-        # Buscar los tipos de baños en la base de datos y calcular precio total
-        final_price = Decimal("0")
-        bath_type_details = []
-        
-        for br in baths:
-            if isinstance(br, dict):
-                # Convertir dict a StaffBathRequestDTO
-                br = StaffBathRequestDTO(**br)
-            
-            br.validate()
-            
-            try:
-                # Buscar el BathType existente en la base de datos
-                bath_type = BathType.objects.get(
-                    massage_type=br.massage_type,
-                    massage_duration=br.minutes
-                )
-                
-                # Calcular precio: bathtype.price x quantity
-                bath_total_price = bath_type.price * br.quantity
-                final_price += bath_total_price
-                
-                bath_type_details.append({
-                    'bath_type': bath_type,
-                    'quantity': br.quantity,
-                    'massage_type': br.massage_type,
-                    'duration': br.minutes
-                })
-                
-            except BathType.DoesNotExist:
-                raise ValueError(f"No existe el tipo de baño: {br.massage_type} de {br.minutes} minutos")
-        
-        # 3. Buscar producto existente con mismo precio y mismos BathTypes
-        bath_types_signature = sorted([
-            (detail['massage_type'], detail['duration'], detail['quantity']) 
-            for detail in bath_type_details
-        ])
-        
-        # Buscar productos con el mismo precio calculado
-        candidates = Product.objects.filter(price=final_price)
-        
-        product = None
-        for prod in candidates:
-            # Obtener los bath_types del producto candidato
-            prod_baths = list(prod.baths.values_list(
-                'bath_type__massage_type', 
-                'bath_type__massage_duration', 
-                'quantity'
-            ))
-            prod_baths_signature = sorted(prod_baths)
-            
-            # Si coinciden exactamente los tipos de baño y cantidades
-            if bath_types_signature == prod_baths_signature:
-                product = prod
-                break
-        
-        # 4. Si no existe producto, crear uno nuevo
-        if not product:
-            # Generar nombre descriptivo basado en los masajes
-            massage_descriptions = []
-            bath_descriptions = []
-            
-            # Mapeo de tipos de masaje a español
-            massage_type_spanish = {
-                'relax': 'Relajante',
-                'rock': 'Piedras', 
-                'exfoliation': 'Exfoliante',
-                'none': 'Solo Baños'
-            }
-            
-            for detail in bath_type_details:
-                massage_type = detail['massage_type']
-                duration = detail['duration']
-                quantity = detail['quantity']
-                
-                # Traducir tipo de masaje al español
-                spanish_type = massage_type_spanish.get(massage_type, massage_type.title())
-                
-                if massage_type == 'none':
-                    # Para baños sin masaje
-                    bath_descriptions.append(f"{quantity}x {spanish_type}")
-                else:
-                    # Para masajes con duración
-                    massage_descriptions.append(f"{quantity}x {spanish_type} {duration}'")
-            
-            # Combinar descripciones de masajes y baños
-            all_descriptions = massage_descriptions + bath_descriptions
-            
-            if all_descriptions:
-                product_name = f"Cheque Regalo: {', '.join(all_descriptions)}"
-            else:
-                # Fallback si no hay descripciones
-                product_name = f"Cheque Regalo - {payload.gift_name}"
-            
-            # Determinar si es solo baños sin masaje o incluye masajes
-            has_massages = any(detail['massage_type'] != 'none' for detail in bath_type_details)
-            
-            product = Product.objects.create(
-                name=product_name,
-                description=f"Producto para cheque regalo: {payload.gift_name}",
-                price=final_price,
-                uses_capacity=True,
-                uses_massagist=has_massages,
-                visible=False,
-            )
-            
-            # Crear los ProductBaths asociados
-            for detail in bath_type_details:
-                ProductBaths.objects.create(
-                    product=product,
-                    bath_type=detail['bath_type'],
-                    quantity=detail['quantity']
-                )
+        # 2-4. Resolver precio y producto a partir de los masajes
+        product, final_price = GiftVoucherManager._resolve_gift_product(payload.baths, payload.gift_name)
         
         # 5. Crear el gift voucher
         voucher_dto = GiftVoucherDTO(
@@ -437,6 +535,267 @@ class GiftVoucherManager:
         
         return GiftVoucherManager.create_voucher(voucher_dto)
 
+    # ------------------------------------------------------------------
+    # Caducidad (barrido periódico)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def expire_stale_vouchers(
+        pending_ttl_days: Optional[int] = None,
+        validity_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> dict:
+        """
+        Marca como ``expired`` los cheques sin pagar y los pagados ya caducados.
+
+        - Pendientes de pago creados hace más de ``pending_ttl_days``.
+        - Pagados creados hace más de ``validity_days`` (si se indica).
+
+        Cada estado se recorre por cursor sobre ``(created_at, id)`` usando su
+        índice parcial, en lotes de ``batch_size`` que se confirman por separado,
+        así que nunca se bloquea toda la tabla. El ``UPDATE`` vuelve a comprobar
+        el estado, de modo que un cheque pagado o canjeado mientras tanto no se
+        caduca.
+
+        Returns:
+            ``{"pending_expired": n, "paid_expired": m}``
+        """
+        if pending_ttl_days is None:
+            pending_ttl_days = settings.GIFT_VOUCHER_PENDING_TTL_DAYS
+        if validity_days is None:
+            validity_days = settings.GIFT_VOUCHER_VALIDITY_DAYS
+        batch_size = batch_size or settings.GIFT_VOUCHER_SWEEP_BATCH_SIZE
+        now = timezone.now()
+
+        result = {"pending_expired": 0, "paid_expired": 0}
+        if pending_ttl_days:
+            result["pending_expired"] = GiftVoucherManager._expire_status(
+                'pending_payment', now - timedelta(days=pending_ttl_days), batch_size
+            )
+        if validity_days:
+            result["paid_expired"] = GiftVoucherManager._expire_status(
+                'paid', now - timedelta(days=validity_days), batch_size
+            )
+        return result
+
+    @staticmethod
+    def _expire_status(status: str, cutoff: datetime, batch_size: int) -> int:
+        """Caduca por lotes los cheques en ``status`` creados antes de ``cutoff``."""
+        expired = 0
+        last = None
+        while True:
+            batch = GiftVoucher.objects.filter(status=status, created_at__lt=cutoff)
+            if last is not None:
+                batch = batch.filter(
+                    Q(created_at__gt=last[0]) | Q(created_at=last[0], id__gt=last[1])
+                )
+            rows = list(batch.order_by('created_at', 'id').values_list('created_at', 'id')[:batch_size])
+            if not rows:
+                break
+            with transaction.atomic():
+                expired += GiftVoucher.objects.filter(
+                    id__in=[voucher_id for _, voucher_id in rows], status=status
+                ).update(status='expired', updated_at=timezone.now())
+            if len(rows) < batch_size:
+                break
+            last = rows[-1]
+        return expired
+
+    # ------------------------------------------------------------------
+    # Emisión masiva (pedidos de empresa)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    @transaction.atomic
+    def create_gift_vouchers_bulk(payload: StaffBulkGiftVoucherPayloadDTO) -> List[GiftVoucherDTO]:
+        """
+        Emite ``payload.quantity`` cheques iguales para un mismo comprador.
+
+        El comprador, el producto y el precio se resuelven una sola vez, los
+        códigos se reservan en bloque y todos los cheques se insertan con un
+        único ``bulk_create`` dentro de la misma transacción.
+        """
+        payload.validate()
+        if payload.quantity > GiftVoucherManager.MAX_BULK_QUANTITY:
+            raise ValueError(f"No se pueden emitir más de {GiftVoucherManager.MAX_BULK_QUANTITY} cheques a la vez")
+
+        total_baths = sum(bath.quantity for bath in payload.baths if bath.massage_type != 'none')
+        if total_baths > payload.people:
+            raise ValueError(f"Hay más masajes ({total_baths}) que personas ({payload.people}). Reduce la cantidad de masajes o aumenta el número de personas.")
+
+        GiftVoucherManager.ensure_bath_types_exist()
+
+        buyer_client, _ = ClientManager.resolve_or_create_client(
+            name=payload.buyer_name,
+            surname=payload.buyer_surname,
+            phone_number=payload.buyer_phone,
+            email=payload.buyer_email,
+            policy=payload.client_match,
+        )
+        product, final_price = GiftVoucherManager._resolve_gift_product(payload.baths, payload.gift_name)
+
+        recipients = list(payload.recipients or [])
+        recipients += [{}] * (payload.quantity - len(recipients))
+        now = timezone.now()
+
+        # Un código puede quedar ocupado por otra emisión entre la reserva y la
+        # inserción; en ese caso se repite la inserción con códigos nuevos
+        for attempt in range(3):
+            codes = GiftVoucherManager._allocate_codes(payload.quantity)
+            vouchers = [
+                GiftVoucher(
+                    code=code,
+                    price=final_price,
+                    status=payload.status,
+                    payment_date=now if payload.status == 'paid' else None,
+                    people=payload.people,
+                    buyer_client=buyer_client,
+                    product=product,
+                    recipients_email=recipient.get('email') or payload.recipient_email or "",
+                    recipients_name=recipient.get('name') or payload.recipient_name or "",
+                    recipients_surname=recipient.get('surname') or payload.recipient_surname or "",
+                    gift_name=payload.gift_name,
+                    gift_description=payload.gift_description or "",
+                    bought_date=now,
+                    created_at=now,
+                )
+                for code, recipient in zip(codes, recipients)
+            ]
+            try:
+                with transaction.atomic():
+                    created = GiftVoucher.objects.bulk_create(vouchers)
+                break
+            except IntegrityError:
+                if attempt == 2:
+                    raise ValueError("No se pudieron reservar códigos únicos para los cheques")
+
+        # bulk_create no emite post_save: marcar el día para el resumen diario
+        DailyStatsService.mark_dirty(DailyStatsService.voucher_day(vouchers[0]))
+
+        # Algunos backends no devuelven los IDs tras bulk_create
+        if created and created[0].id is None:
+            created = list(GiftVoucher.objects.filter(code__in=codes).order_by('code'))
+        return [GiftVoucherManager._to_dto(v) for v in created]
+
+    # ------------------------------------------------------------------
+    # Resolución de producto y precio a partir de los masajes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _resolve_gift_product(baths: List, gift_name: str) -> Tuple[Product, Decimal]:
+        """
+        Calcula el precio de los masajes y devuelve el producto que los representa.
+
+        Se reutiliza un producto existente con el mismo precio y exactamente los
+        mismos tipos de baño y cantidades; si no hay ninguno se crea uno oculto.
+        Los tipos de baño se leen en una sola consulta y los productos candidatos
+        en otra, independientemente del número de líneas.
+
+        Returns:
+            Tupla ``(producto, precio_total)``
+        """
+        baths = baths or []
+        if not baths:
+            raise ValueError("Debe indicar al menos un tipo de baño/masaje")
+
+        requests = []
+        for br in baths:
+            if isinstance(br, dict):
+                # Convertir dict a StaffBathRequestDTO
+                br = StaffBathRequestDTO(**br)
+            br.validate()
+            requests.append(br)
+
+        # Buscar todos los tipos de baño de una vez
+        type_filter = Q()
+        for br in requests:
+            type_filter |= Q(massage_type=br.massage_type, massage_duration=br.minutes)
+        bath_types = {
+            (bt.massage_type, bt.massage_duration): bt
+            for bt in BathType.objects.filter(type_filter)
+        }
+
+        # Calcular precio: bathtype.price x quantity
+        final_price = Decimal("0")
+        bath_type_details = []
+        for br in requests:
+            bath_type = bath_types.get((br.massage_type, br.minutes))
+            if bath_type is None:
+                raise ValueError(f"No existe el tipo de baño: {br.massage_type} de {br.minutes} minutos")
+            final_price += bath_type.price * br.quantity
+            bath_type_details.append({
+                'bath_type': bath_type,
+                'quantity': br.quantity,
+                'massage_type': br.massage_type,
+                'duration': br.minutes
+            })
+
+        # Buscar producto existente con mismo precio y mismos BathTypes
+        bath_types_signature = sorted(
+            (detail['massage_type'], detail['duration'], detail['quantity'])
+            for detail in bath_type_details
+        )
+        candidate_signatures = {}
+        candidate_rows = ProductBaths.objects.filter(product__price=final_price).values_list(
+            'product_id', 'bath_type__massage_type', 'bath_type__massage_duration', 'quantity'
+        ).order_by('product_id')
+        for product_id, massage_type, duration, quantity in candidate_rows:
+            candidate_signatures.setdefault(product_id, []).append((massage_type, duration, quantity))
+
+        for product_id, signature in candidate_signatures.items():
+            # Si coinciden exactamente los tipos de baño y cantidades
+            if sorted(signature) == bath_types_signature:
+                MetricsService.inc('product_signature_lookups_total', source='gift_voucher', result='hit')
+                return Product.objects.get(id=product_id), final_price
+
+        MetricsService.inc('product_signature_lookups_total', source='gift_voucher', result='miss')
+
+        # Si no existe producto, crear uno nuevo
+        # Mapeo de tipos de masaje a español
+        massage_type_spanish = {
+            'relax': 'Relajante',
+            'rock': 'Piedras', 
+            'exfoliation': 'Exfoliante',
+            'none': 'Solo Baños'
+        }
+
+        massage_descriptions = []
+        bath_descriptions = []
+        for detail in bath_type_details:
+            massage_type = detail['massage_type']
+            spanish_type = massage_type_spanish.get(massage_type, massage_type.title())
+            if massage_type == 'none':
+                # Para baños sin masaje
+                bath_descriptions.append(f"{detail['quantity']}x {spanish_type}")
+            else:
+                # Para masajes con duración
+                massage_descriptions.append(f"{detail['quantity']}x {spanish_type} {detail['duration']}'")
+
+        # Combinar descripciones de masajes y baños
+        all_descriptions = massage_descriptions + bath_descriptions
+        if all_descriptions:
+            product_name = f"Cheque Regalo: {', '.join(all_descriptions)}"
+        else:
+            # Fallback si no hay descripciones
+            product_name = f"Cheque Regalo - {gift_name}"
+
+        # Determinar si es solo baños sin masaje o incluye masajes
+        has_massages = any(detail['massage_type'] != 'none' for detail in bath_type_details)
+
+        product = Product.objects.create(
+            name=product_name,
+            description=f"Producto para cheque regalo: {gift_name}",
+            price=final_price,
+            uses_capacity=True,
+            uses_massagist=has_massages,
+            visible=False,
+        )
+        ProductBaths.objects.bulk_create([
+            ProductBaths(product=product, bath_type=detail['bath_type'], quantity=detail['quantity'])
+            for detail in bath_type_details
+        ])
+        return product, final_price
+
     # ------------------------------------------------------------------
     # Marcar cheque regalo como usado
     # ------------------------------------------------------------------
@@ -445,20 +804,34 @@ class GiftVoucherManager:
     @transaction.atomic
     def mark_as_used(voucher_id: int) -> GiftVoucherDTO:
         """Marca un cheque regalo como usado."""
-        try:
-            voucher = GiftVoucher.objects.get(id=voucher_id)
-            
+        return GiftVoucherManager._to_dto(GiftVoucherManager.redeem(voucher_id))
+
+    @staticmethod
+    def redeem(voucher_id: int) -> GiftVoucher:
+        """
+        Canjea un cheque regalo pagado y devuelve el cheque ya marcado como usado.
+
+        El cambio de estado es un único ``UPDATE ... WHERE id = %s AND status =
+        'paid'``: la base de datos bloquea la fila, así que de dos canjes
+        simultáneos del mismo cheque sólo uno actualiza la fila y el otro recibe
+        un ``ValueError``. Debe llamarse dentro de la transacción que crea la
+        reserva para que ésta se deshaga si el canje falla.
+        """
+        updated = GiftVoucher.objects.filter(id=voucher_id, status='paid').update(
+            status='used',
+            updated_at=timezone.now(),
+        )
+        voucher = GiftVoucher.objects.filter(id=voucher_id).first()
+        if voucher is None:
+            raise ValueError(f"No se encontró el cheque regalo con ID {voucher_id}")
+        if not updated:
+            MetricsService.inc('gift_voucher_redemptions_total', result='rejected')
             if voucher.status == 'used':
                 raise ValueError(f"El cheque regalo #{voucher.code} ya está marcado como usado")
-            
-            if voucher.status != 'paid':
-                raise ValueError(f"El cheque regalo #{voucher.code} debe estar pagado antes de poder ser usado")
-            
-            voucher.status = 'used'
-            voucher.save(update_fields=['status'])
-            
-            return GiftVoucherManager._to_dto(voucher)
-            
-        except GiftVoucher.DoesNotExist:
-            raise ValueError(f"No se encontró el cheque regalo con ID {voucher_id}")
+            if voucher.status == 'expired':
+                raise ValueError(f"El cheque regalo #{voucher.code} ha caducado")
+            raise ValueError(f"El cheque regalo #{voucher.code} debe estar pagado antes de poder ser usado")
+        # Sólo cuenta si la transacción que lo canjea se confirma
+        transaction.on_commit(lambda: MetricsService.inc('gift_voucher_redemptions_total', result='redeemed'))
+        return voucher
 
@@ -1,13 +1,22 @@
-from typing import Optional
+from collections import defaultdict
+from decimal import Decimal
+from typing import Optional, Dict, List
+
 from django.db import transaction
+from django.db.models import Case, When, Value
+from django.utils import timezone
 
-from reservations.models import BathType, HostingType, Product, ProductBaths, ProductHosting
+from reservations.models import BathType, HostingType, Product, ProductBaths, ProductHosting, Book, GiftVoucher
+from reservations.services.catalog_version import CatalogVersionService
 from reservations.dtos.product import BathTypeDTO, HostingTypeDTO, ProductCreateDTO, BathQuantityDTO, HostingQuantityDTO
 
 
 class ProductManager:
     """Gestor de operaciones relacionadas con productos y sus componentes."""
 
+    # IDs reasignados por cada UPDATE ... CASE de la compactación
+    COMPACTION_BATCH_SIZE = 500
+
     # ---------------------------------------------------------------------
     # Métodos de BathType
     # ---------------------------------------------------------------------
@@ -71,53 +80,17 @@ class ProductManager:
 
         dto.validate()
 
-        product = Product.objects.create(
-            name=dto.name,
-            observation=dto.observation or "",
-            description=dto.description or "",
-            price=dto.price,
-            uses_capacity=dto.uses_capacity,
-            uses_massagist=dto.uses_massagist,
-            visible=dto.visible,
-        )
-
-        # Procesar baños
-        for bath_q in dto.baths:
-            if bath_q.quantity <= 0:
-                continue  # ignorar entradas sin cantidad
-
-            bath_type_obj = None
-            if bath_q.bath_type.id:
-                bath_type_obj = BathType.objects.get(id=bath_q.bath_type.id)
-            else:
-                bath_type_obj = ProductManager.get_bath_type_if_exists(bath_q.bath_type)
-                if bath_type_obj is None:
-                    bath_type_obj = ProductManager.create_bath_type(bath_q.bath_type)
-
-            ProductBaths.objects.create(
-                product=product,
-                bath_type=bath_type_obj,
-                quantity=bath_q.quantity,
-            )
-
-        # Procesar alojamientos
-        for host_q in dto.hostings:
-            if host_q.quantity <= 0:
-                continue
-
-            hosting_type_obj = None
-            if host_q.hosting_type.id:
-                hosting_type_obj = HostingType.objects.get(id=host_q.hosting_type.id)
-            else:
-                hosting_type_obj = ProductManager.get_hosting_type_if_exists(host_q.hosting_type)
-                if hosting_type_obj is None:
-                    hosting_type_obj = ProductManager.create_hosting_type(host_q.hosting_type)
-
-            ProductHosting.objects.create(
-                product=product,
-                hosting_type=hosting_type_obj,
-                quantity=host_q.quantity,
+        with CatalogVersionService.batch():
+            product = Product.objects.create(
+                name=dto.name,
+                observation=dto.observation or "",
+                description=dto.description or "",
+                price=dto.price,
+                uses_capacity=dto.uses_capacity,
+                uses_massagist=dto.uses_massagist,
+                visible=dto.visible,
             )
+            ProductManager._create_related_records(product, dto)
 
         return product
 
@@ -145,16 +118,14 @@ class ProductManager:
         product.uses_capacity = dto.uses_capacity
         product.uses_massagist = dto.uses_massagist
         product.visible = dto.visible
-        product.save()
 
-        # Limpiar relaciones actuales
-        ProductBaths.objects.filter(product=product).delete()
-        ProductHosting.objects.filter(product=product).delete()
+        with CatalogVersionService.batch():
+            product.save()
+            # Sincronizar relaciones con las ya prefetcheadas (sin borrarlas todas)
+            ProductManager._create_related_records(product, dto, existing=True)
 
-        # Volver a crearlas usando la misma lógica que en create
-        ProductManager._create_related_records(product, dto)
-
-        return product
+        # Las relaciones prefetcheadas ya no reflejan el estado guardado
+        return ProductManager.get_product_by_id(product_id)
 
     @staticmethod
     @transaction.atomic
@@ -167,38 +138,91 @@ class ProductManager:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _create_related_records(product: Product, dto: ProductCreateDTO) -> None:
-        """Factoriza la creación de ProductBaths y ProductHosting (usado en create y update)."""
+    def _create_related_records(product: Product, dto: ProductCreateDTO, existing: bool = False) -> None:
+        """
+        Factoriza la creación de ProductBaths y ProductHosting (usado en create y update).
 
-        # Baños
-        for bath_q in dto.baths:
-            if bath_q.quantity <= 0:
-                continue
+        Los tipos referenciados por ID se leen con una consulta ``id__in`` por
+        modelo y las filas hijas se escriben con ``bulk_create``/``bulk_update``,
+        así que el número de consultas no depende del número de líneas. Con
+        ``existing=True`` se reutilizan las filas actuales del producto (las de
+        ``get_product_by_id``, ya prefetcheadas): sólo se actualiza la cantidad
+        de las que siguen, se crean las nuevas y se borran las que sobran.
 
-            bath_type_obj = None
-            if bath_q.bath_type.id:
-                bath_type_obj = BathType.objects.get(id=bath_q.bath_type.id)
-            else:
-                bath_type_obj = ProductManager.get_bath_type_if_exists(bath_q.bath_type)
-                if bath_type_obj is None:
-                    bath_type_obj = ProductManager.create_bath_type(bath_q.bath_type)
+        ``bulk_create`` no emite señales, por lo que la versión del catálogo de
+        productos se incrementa explícitamente.
+        """
+        bath_lines = ProductManager._resolve_type_lines(
+            BathType,
+            [(q.bath_type, q.quantity) for q in dto.baths],
+            ProductManager.get_bath_type_if_exists,
+            ProductManager.create_bath_type,
+        )
+        hosting_lines = ProductManager._resolve_type_lines(
+            HostingType,
+            [(q.hosting_type, q.quantity) for q in dto.hostings],
+            ProductManager.get_hosting_type_if_exists,
+            ProductManager.create_hosting_type,
+        )
 
-            ProductBaths.objects.create(product=product, bath_type=bath_type_obj, quantity=bath_q.quantity)
+        ProductManager._sync_children(
+            ProductBaths, product, 'bath_type', bath_lines,
+            product.baths.all() if existing else [],
+        )
+        ProductManager._sync_children(
+            ProductHosting, product, 'hosting_type', hosting_lines,
+            product.hostings.all() if existing else [],
+        )
+        CatalogVersionService.bump(CatalogVersionService.PRODUCTS)
 
-        # Alojamientos
-        for host_q in dto.hostings:
-            if host_q.quantity <= 0:
-                continue
+    @staticmethod
+    def _resolve_type_lines(model, lines, get_if_exists, create) -> List[tuple]:
+        """
+        Convierte ``[(TypeDTO, cantidad)]`` en ``[(instancia, cantidad)]``.
 
-            hosting_type_obj = None
-            if host_q.hosting_type.id:
-                hosting_type_obj = HostingType.objects.get(id=host_q.hosting_type.id)
+        Ignora las líneas sin cantidad. Los tipos con ID se cargan en una sola
+        consulta (``model.DoesNotExist`` si falta alguno); los que no lo traen se
+        buscan por sus atributos o se crean, como hasta ahora.
+        """
+        lines = [(type_dto, quantity) for type_dto, quantity in lines if quantity > 0]
+        ids = {type_dto.id for type_dto, _ in lines if type_dto.id}
+        by_id = model.objects.in_bulk(ids) if ids else {}
+        missing = ids - set(by_id)
+        if missing:
+            raise model.DoesNotExist(
+                f"No existe {model._meta.verbose_name} con ID {', '.join(str(i) for i in sorted(missing))}"
+            )
+
+        resolved = []
+        for type_dto, quantity in lines:
+            if type_dto.id:
+                type_obj = by_id[type_dto.id]
             else:
-                hosting_type_obj = ProductManager.get_hosting_type_if_exists(host_q.hosting_type)
-                if hosting_type_obj is None:
-                    hosting_type_obj = ProductManager.create_hosting_type(host_q.hosting_type)
+                type_obj = get_if_exists(type_dto)
+                if type_obj is None:
+                    type_obj = create(type_dto)
+            resolved.append((type_obj, quantity))
+        return resolved
 
-            ProductHosting.objects.create(product=product, hosting_type=hosting_type_obj, quantity=host_q.quantity)
+    @staticmethod
+    def _sync_children(model, product: Product, type_field: str, lines: List[tuple], current_rows) -> None:
+        """Deja en ``model`` exactamente las líneas indicadas para el producto."""
+        current = {getattr(row, f"{type_field}_id"): row for row in current_rows}
+        to_create, to_update = [], []
+        for type_obj, quantity in lines:
+            row = current.pop(type_obj.id, None)
+            if row is None:
+                to_create.append(model(product=product, quantity=quantity, **{type_field: type_obj}))
+            elif row.quantity != quantity:
+                row.quantity = quantity
+                to_update.append(row)
+
+        if current:
+            model.objects.filter(id__in=[row.id for row in current.values()]).delete()
+        if to_update:
+            model.objects.bulk_update(to_update, ['quantity'])
+        if to_create:
+            model.objects.bulk_create(to_create)
 
     # ---------------------------------------------------------------------
     # Nuevos métodos: gestión de BathType (listado y precio)
@@ -220,3 +244,135 @@ class ProductManager:
         bath_type.price = new_price
         bath_type.save(update_fields=["price"])
         return bath_type
+
+    # ---------------------------------------------------------------------
+    # Compactación de productos ocultos duplicados
+    # ---------------------------------------------------------------------
+
+    @staticmethod
+    def find_duplicate_hidden_products() -> List[Dict]:
+        """
+        Agrupa los productos ocultos (generados automáticamente) con la misma
+        composición de baños y alojamientos.
+
+        Se leen las composiciones con dos consultas y se agrupan en memoria. En
+        cada grupo se conserva el producto cuyo precio coincide con el precio
+        actual de sus baños (el que encontrará la búsqueda por precio al crear
+        reservas y cheques) o, si ninguno coincide, el más reciente.
+
+        Returns:
+            Lista de ``{"keep": id, "duplicates": [ids], "current_price": Decimal|None}``
+        """
+        compositions = defaultdict(list)
+        bath_rows = ProductBaths.objects.filter(product__visible=False).values_list(
+            'product_id', 'bath_type_id', 'quantity'
+        )
+        for product_id, bath_type_id, quantity in bath_rows:
+            compositions[product_id].append(('bath', bath_type_id, quantity))
+        hosting_rows = ProductHosting.objects.filter(product__visible=False).values_list(
+            'product_id', 'hosting_type_id', 'quantity'
+        )
+        for product_id, hosting_type_id, quantity in hosting_rows:
+            compositions[product_id].append(('hosting', hosting_type_id, quantity))
+
+        groups = defaultdict(list)
+        for product_id, items in compositions.items():
+            groups[tuple(sorted(items))].append(product_id)
+
+        prices = dict(Product.objects.filter(visible=False).values_list('id', 'price'))
+        bath_prices = dict(BathType.objects.values_list('id', 'price'))
+
+        result = []
+        for signature, product_ids in groups.items():
+            if len(product_ids) < 2:
+                continue
+            current_price = None
+            if all(kind == 'bath' for kind, _, _ in signature):
+                current_price = sum(
+                    (bath_prices.get(type_id, Decimal("0")) * quantity for _, type_id, quantity in signature),
+                    Decimal("0"),
+                )
+            product_ids.sort(reverse=True)
+            matching = [pid for pid in product_ids if prices.get(pid) == current_price]
+            keep = matching[0] if matching else product_ids[0]
+            result.append({
+                'keep': keep,
+                'duplicates': [pid for pid in product_ids if pid != keep],
+                'current_price': current_price,
+            })
+        return result
+
+    @staticmethod
+    def compact_hidden_products(dry_run: bool = False) -> Dict[str, int]:
+        """
+        Unifica los productos ocultos duplicados.
+
+        Reasigna en bloque ``Book.product`` y ``GiftVoucher.product`` al producto
+        conservado de cada grupo (``UPDATE ... CASE`` por lotes), actualiza su
+        precio al precio actual de sus baños y borra los duplicados junto con
+        los productos ocultos sin composición que ya no usa nadie.
+
+        Cada lote se confirma en su propia transacción, así que los bloqueos
+        sobre ``Book`` y ``GiftVoucher`` sólo duran un lote. Si el proceso se
+        interrumpe basta con volver a lanzarlo: los duplicados se borran al
+        final y el siguiente intento los vuelve a encontrar.
+
+        Las reservas y cheques guardan su propio importe, así que cambiar de
+        producto no altera lo cobrado ni lo pendiente.
+        """
+        groups = ProductManager.find_duplicate_hidden_products()
+        redirect = {dup: group['keep'] for group in groups for dup in group['duplicates']}
+
+        stats = {
+            'groups': len(groups),
+            'products_merged': len(redirect),
+            'books_updated': 0,
+            'gift_vouchers_updated': 0,
+            'products_deleted': 0,
+        }
+        if dry_run:
+            stats['books_updated'] = Book.objects.filter(product_id__in=redirect.keys()).count()
+            stats['gift_vouchers_updated'] = GiftVoucher.objects.filter(product_id__in=redirect.keys()).count()
+            return stats
+
+        duplicate_ids = list(redirect)
+        for start in range(0, len(duplicate_ids), ProductManager.COMPACTION_BATCH_SIZE):
+            batch = duplicate_ids[start:start + ProductManager.COMPACTION_BATCH_SIZE]
+            new_product = Case(*[When(product_id=dup, then=Value(redirect[dup])) for dup in batch])
+            # ``update`` no toca ``updated_at`` (auto_now): se fija para el feed de cambios
+            now = timezone.now()
+            with transaction.atomic():
+                stats['books_updated'] += Book.objects.filter(product_id__in=batch).update(
+                    product_id=new_product, updated_at=now,
+                )
+                stats['gift_vouchers_updated'] += GiftVoucher.objects.filter(product_id__in=batch).update(
+                    product_id=new_product, updated_at=now,
+                )
+
+        for group in groups:
+            if group['current_price'] is not None:
+                Product.objects.filter(id=group['keep']).exclude(price=group['current_price']).update(
+                    price=group['current_price']
+                )
+
+        # Duplicados ya sin referencias + productos ocultos vacíos sin usar
+        orphans = Product.objects.filter(visible=False, baths__isnull=True, hostings__isnull=True)
+        orphans = (
+            Product.objects.filter(id__in=duplicate_ids) | Product.objects.filter(id__in=orphans.values('id'))
+        )
+        orphan_ids = list(orphans.values_list('id', flat=True))
+        for start in range(0, len(orphan_ids), ProductManager.COMPACTION_BATCH_SIZE):
+            batch = orphan_ids[start:start + ProductManager.COMPACTION_BATCH_SIZE]
+            with transaction.atomic():
+                # Se vuelve a comprobar al borrar por si entre tanto se ha usado alguno
+                _, deleted = (
+                    Product.objects.filter(id__in=batch)
+                    .exclude(id__in=Book.objects.filter(product_id__in=batch).values('product_id'))
+                    .exclude(id__in=GiftVoucher.objects.filter(product_id__in=batch).values('product_id'))
+                    .delete()
+                )
+            stats['products_deleted'] += deleted.get(Product._meta.label, 0)
+
+        # QuerySet.update no emite señales: invalidar el ETag del catálogo
+        CatalogVersionService.bump(CatalogVersionService.PRODUCTS)
+        return stats
@@ -0,0 +1,117 @@
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from myproject.log import request_id_var
+from reservations.services.metrics import MetricsService
+from reservations.services.profiling import RequestProfilingService
+
+
+class QueryCounter:
+    """``execute_wrapper`` que sólo cuenta consultas y su tiempo."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """
+    Histogramas por petición para ``/metrics``: duración por ruta, método y
+    código, y número y tiempo de las consultas SQL.
+
+    La ruta es el nombre de la URL resuelta (``booking-detail``...), no el
+    path, para que el número de series no crezca con los identificadores.
+    Debe ser el primer middleware para medir también los demás.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        status = 500
+        try:
+            with connection.execute_wrapper(queries):
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            match = getattr(request, 'resolver_match', None)
+            route = match.view_name if match else '<unmatched>'
+            labels = {'route': route, 'method': request.method}
+            MetricsService.observe_many([
+                (
+                    'http_request_duration_seconds', time.perf_counter() - started,
+                    {**labels, 'status': str(status)},
+                ),
+                ('http_request_db_queries', queries.count, labels),
+                ('http_request_db_seconds', queries.seconds, labels),
+            ])
+
+
+class RequestIdMiddleware:
+    """
+    Identificador de la petición para correlacionar sus registros de log.
+
+    Se reutiliza la cabecera ``X-Request-ID`` si la trae (proxy o frontend) y
+    si no se genera uno; se devuelve en la respuesta y ``RequestIdFilter`` lo
+    añade a cada registro emitido durante la petición.
+    """
+
+    VALID_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        incoming = request.META.get('HTTP_X_REQUEST_ID', '')
+        request.request_id = incoming if self.VALID_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id_var.set(request.request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response['X-Request-ID'] = request.request_id
+        return response
+
+
+class RequestProfilingMiddleware:
+    """
+    Perfila la petición cuando un usuario staff lo pide con la cabecera
+    ``X-Profile`` o ``?_profile=`` (ver ``RequestProfilingService``).
+
+    El resto de peticiones sólo pagan una búsqueda en ``request.META``: la
+    cadena de consulta ni siquiera se parsea si no contiene el parámetro.
+    Debe ir después de ``AuthenticationMiddleware``.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.query_flag = f"{RequestProfilingService.QUERY_FLAG}="
+
+    def __call__(self, request):
+        meta = request.META
+        if RequestProfilingService.HEADER not in meta and self.query_flag not in meta.get('QUERY_STRING', ''):
+            return self.get_response(request)
+        mode = RequestProfilingService.requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+        return RequestProfilingService.profile(request, self.get_response, mode)
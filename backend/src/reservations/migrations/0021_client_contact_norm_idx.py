@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:26
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0020_remove_giftvoucher_used_giftvoucher_payment_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower(django.db.models.functions.text.Trim('email')), django.db.models.functions.text.Trim('phone_number'), name='client_contact_norm_idx'),
+        ),
+    ]
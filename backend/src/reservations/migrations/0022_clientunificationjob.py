@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0021_client_contact_norm_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientUnificationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En curso'), ('completed', 'Completado'), ('failed', 'Fallido')], default='pending', max_length=20, verbose_name='Estado')),
+                ('total_groups', models.PositiveIntegerField(default=0, verbose_name='Grupos totales')),
+                ('processed_groups', models.PositiveIntegerField(default=0, verbose_name='Grupos procesados')),
+                ('clients_removed', models.PositiveIntegerField(default=0, verbose_name='Clientes eliminados')),
+                ('books_updated', models.PositiveIntegerField(default=0, verbose_name='Reservas actualizadas')),
+                ('gift_vouchers_updated', models.PositiveIntegerField(default=0, verbose_name='Cheques actualizados')),
+                ('last_email', models.CharField(blank=True, max_length=255, null=True, verbose_name='Último email procesado')),
+                ('last_phone', models.CharField(blank=True, max_length=50, null=True, verbose_name='Último teléfono procesado')),
+                ('error', models.TextField(blank=True, null=True, verbose_name='Error')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de finalización')),
+            ],
+            options={
+                'verbose_name': 'Unificación de clientes',
+                'verbose_name_plural': 'Unificaciones de clientes',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
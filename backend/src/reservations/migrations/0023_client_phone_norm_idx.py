@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:34
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0022_clientunificationjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Trim('phone_number'), name='client_phone_norm_idx'),
+        ),
+    ]
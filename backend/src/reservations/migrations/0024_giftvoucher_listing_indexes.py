@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0023_client_phone_norm_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='giftvoucher',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='giftvoucher_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='giftvoucher',
+            index=models.Index(fields=['-created_at', '-id'], name='giftvoucher_created_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0024_giftvoucher_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='giftvoucher',
+            name='status',
+            field=models.CharField(choices=[('pending_payment', 'Pendiente pago'), ('paid', 'Pagado'), ('used', 'Usado'), ('expired', 'Caducado')], default='pending_payment', max_length=255, verbose_name='Estado'),
+        ),
+        migrations.AddIndex(
+            model_name='giftvoucher',
+            index=models.Index(condition=models.Q(('status', 'paid')), fields=['created_at', 'id'], name='giftvoucher_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='giftvoucher',
+            index=models.Index(condition=models.Q(('status', 'pending_payment')), fields=['created_at', 'id'], name='giftvoucher_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_catalog_versions(apps, schema_editor):
+    CatalogVersion = apps.get_model('reservations', 'CatalogVersion')
+    for name in ('products', 'bath_types', 'capacity', 'availability'):
+        CatalogVersion.objects.get_or_create(name=name, defaults={'version': 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0025_giftvoucher_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Catálogo')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Versión')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Última modificación')),
+            ],
+            options={
+                'verbose_name': 'Versión de catálogo',
+                'verbose_name_plural': 'Versiones de catálogo',
+            },
+        ),
+        migrations.RunPython(create_catalog_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('reservations', '0026_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['book_date'], name='book_date_idx'),
+        ),
+    ]
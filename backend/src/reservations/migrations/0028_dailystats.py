@@ -0,0 +1,56 @@
+# Generated by Django 5.0.1 on 2026-10-18 23:50
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def mark_existing_days(apps, schema_editor):
+    """Marca como pendientes los días con reservas o cheques (se rellenan en el próximo refresh)."""
+    Book = apps.get_model('reservations', 'Book')
+    GiftVoucher = apps.get_model('reservations', 'GiftVoucher')
+    DailyStats = apps.get_model('reservations', 'DailyStats')
+    days = set(Book.objects.order_by().values_list('book_date', flat=True).distinct())
+    days.update(
+        GiftVoucher.objects.order_by()
+        .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+        .values_list('day', flat=True).distinct()
+    )
+    DailyStats.objects.bulk_create(
+        [DailyStats(date=day, dirty=True) for day in days if day is not None],
+        batch_size=1000, ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0027_book_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Día')),
+                ('bookings', models.PositiveIntegerField(default=0, verbose_name='Reservas')),
+                ('people', models.PositiveIntegerField(default=0, verbose_name='Personas')),
+                ('revenue_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Cobrado')),
+                ('revenue_pending', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Pendiente')),
+                ('massages_by_type', models.JSONField(blank=True, default=dict, verbose_name='Masajes por tipo')),
+                ('vouchers_sold', models.PositiveIntegerField(default=0, verbose_name='Cheques vendidos')),
+                ('vouchers_sold_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Importe cheques vendidos')),
+                ('vouchers_used', models.PositiveIntegerField(default=0, verbose_name='Cheques canjeados')),
+                ('vouchers_used_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Importe cheques canjeados')),
+                ('dirty', models.BooleanField(default=True, verbose_name='Pendiente de recalcular')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+            ],
+            options={
+                'verbose_name': 'Estadística diaria',
+                'verbose_name_plural': 'Estadísticas diarias',
+                'indexes': [models.Index(condition=models.Q(('dirty', True)), fields=['date'], name='dailystats_dirty_idx')],
+            },
+        ),
+        migrations.RunPython(mark_existing_days, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0028_dailystats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10, verbose_name='Método')),
+                ('path', models.CharField(max_length=2000, verbose_name='Ruta')),
+                ('query_string', models.TextField(blank=True, default='', verbose_name='Parámetros')),
+                ('user', models.CharField(blank=True, default='', max_length=150, verbose_name='Usuario')),
+                ('mode', models.CharField(choices=[('cprofile', 'cProfile'), ('sample', 'Muestreo')], max_length=20, verbose_name='Perfilador')),
+                ('status_code', models.PositiveIntegerField(blank=True, null=True, verbose_name='Código de respuesta')),
+                ('duration_ms', models.FloatField(verbose_name='Duración (ms)')),
+                ('sql_ms', models.FloatField(default=0, verbose_name='Tiempo SQL (ms)')),
+                ('query_count', models.PositiveIntegerField(default=0, verbose_name='Consultas')),
+                ('duplicate_query_count', models.PositiveIntegerField(default=0, verbose_name='Consultas duplicadas')),
+                ('similar_query_count', models.PositiveIntegerField(default=0, verbose_name='Consultas repetidas (N+1)')),
+                ('summary', models.TextField(blank=True, default='', verbose_name='Resumen')),
+                ('profile_data', models.BinaryField(verbose_name='Volcado del perfilador')),
+                ('queries', models.JSONField(blank=True, default=list, verbose_name='Consultas SQL')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha')),
+            ],
+            options={
+                'verbose_name': 'Perfil de petición',
+                'verbose_name_plural': 'Perfiles de peticiones',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.1 on 2026-10-19 09:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0029_requestprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Fecha de actualización'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Fecha de actualización'),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='ChangeTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('bookings', 'Reserva'), ('clients', 'Cliente'), ('gift_vouchers', 'Cheque regalo')], max_length=20, verbose_name='Tipo')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID borrado')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de borrado')),
+            ],
+            options={
+                'verbose_name': 'Borrado registrado',
+                'verbose_name_plural': 'Borrados registrados',
+                'indexes': [models.Index(fields=['deleted_at', 'id'], name='changetombstone_deleted_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['updated_at', 'id'], name='book_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['updated_at', 'id'], name='client_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='giftvoucher',
+            index=models.Index(fields=['updated_at', 'id'], name='giftvoucher_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-19 10:20
+
+from django.db import migrations
+
+
+def mark_all_days(apps, schema_editor):
+    """``revenue_paid`` ya no incluye los canjes: hay que recalcular todos los días."""
+    DailyStats = apps.get_model('reservations', 'DailyStats')
+    DailyStats.objects.filter(dirty=False).update(dirty=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0030_change_feed'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_all_days, migrations.RunPython.noop),
+    ]
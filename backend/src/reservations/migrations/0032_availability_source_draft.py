@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0031_dailystats_revenue_without_redemptions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='availability',
+            name='source',
+            field=models.CharField(choices=[('manual', 'Manual'), ('forecast', 'Previsión de masajistas')], default='manual', max_length=20, verbose_name='Origen'),
+        ),
+        migrations.AddField(
+            model_name='availability',
+            name='is_draft',
+            field=models.BooleanField(default=False, verbose_name='Borrador'),
+        ),
+    ]
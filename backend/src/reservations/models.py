@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower, Trim
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -33,10 +34,19 @@ class Client(models.Model):
     phone_number = models.CharField(max_length=50, null=True, blank=True, verbose_name="Teléfono")
     email = models.EmailField(null=True, blank=True, verbose_name="Email")
     created_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha de registro")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de actualización")
 
     class Meta:
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
+        indexes = [
+            # Feed de cambios (/api/v1/changes) por cursor (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='client_updated_idx'),
+            # Contacto normalizado usado para detectar duplicados
+            models.Index(Lower(Trim('email')), Trim('phone_number'), name='client_contact_norm_idx'),
+            # Búsqueda sólo por teléfono al resolver clientes (el índice anterior empieza por email)
+            models.Index(Trim('phone_number'), name='client_phone_norm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} {self.surname}"
@@ -46,6 +56,7 @@ class GiftVoucher(models.Model):
         ('pending_payment', 'Pendiente pago'),
         ('paid', 'Pagado'),
         ('used', 'Usado'),
+        ('expired', 'Caducado'),
     ]
     code = models.CharField(max_length=255, unique=True, verbose_name="Código")
     bought_date = models.DateTimeField(default=timezone.now, verbose_name="Fecha de compra")
@@ -66,6 +77,23 @@ class GiftVoucher(models.Model):
     class Meta:
         verbose_name = "Cheque regalo"
         verbose_name_plural = "Cheques regalo"
+        indexes = [
+            # Listado paginado por cursor (created_at, id), con y sin filtro de estado
+            models.Index(fields=['status', '-created_at', '-id'], name='giftvoucher_status_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='giftvoucher_created_idx'),
+            # Índices parciales: la búsqueda general sólo mira cheques pagados y el
+            # barrido de caducidad sólo recorre pagados y pendientes de pago
+            models.Index(
+                fields=['created_at', 'id'], condition=models.Q(status='paid'),
+                name='giftvoucher_paid_idx',
+            ),
+            models.Index(
+                fields=['created_at', 'id'], condition=models.Q(status='pending_payment'),
+                name='giftvoucher_pending_idx',
+            ),
+            # Feed de cambios (/api/v1/changes) por cursor (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='giftvoucher_updated_idx'),
+        ]
 
 class Product(models.Model):
     name = models.CharField(max_length=255, verbose_name="Nombre")
@@ -164,10 +192,17 @@ class Availability(models.Model):
         (6, 'Sábado'),
         (7, 'Domingo'),
     ]
+    SOURCE_CHOICES = [
+        ('manual', 'Manual'),
+        ('forecast', 'Previsión de masajistas'),
+    ]
     type = models.CharField(max_length=20, choices=TYPE_CHOICES, verbose_name="Tipo")
     punctual_day = models.DateField(null=True, blank=True, verbose_name="Día específico")
     weekday = models.IntegerField(null=True, blank=True, choices=WEEKDAY_CHOICES, verbose_name="Día de la semana")
     created_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha de creación")
+    # Las versiones generadas por la previsión son borradores hasta que el staff las publica
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='manual', verbose_name="Origen")
+    is_draft = models.BooleanField(default=False, verbose_name="Borrador")
 
     class Meta:
         verbose_name = "Disponibilidad"
@@ -201,6 +236,7 @@ class Book(models.Model):
     checked_in = models.BooleanField(default=False, verbose_name="Registrado")
     checked_out = models.BooleanField(default=False, verbose_name="Finalizado")
     created_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha de creación")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de actualización")
     client = models.ForeignKey(Client, on_delete=models.CASCADE, verbose_name="Cliente")
     product = models.ForeignKey('Product', on_delete=models.PROTECT, verbose_name="Producto", default=1)
     
@@ -212,6 +248,12 @@ class Book(models.Model):
     class Meta:
         verbose_name = "Reserva"
         verbose_name_plural = "Reservas"
+        indexes = [
+            # Informes de facturación por rango de fechas de reserva
+            models.Index(fields=['book_date'], name='book_date_idx'),
+            # Feed de cambios (/api/v1/changes) por cursor (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='book_updated_idx'),
+        ]
 
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -327,3 +369,152 @@ class ConstraintRange(models.Model):
     def __str__(self):
         return f"{self.initial_time} - {self.end_time}"
 
+class ClientUnificationJob(models.Model):
+    """Proceso de unificación de clientes duplicados ejecutado en segundo plano.
+
+    Guarda el progreso y el último grupo procesado (checkpoint) para poder
+    reanudar el proceso tras una caída del worker.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('running', 'En curso'),
+        ('completed', 'Completado'),
+        ('failed', 'Fallido'),
+    ]
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Estado")
+    total_groups = models.PositiveIntegerField(default=0, verbose_name="Grupos totales")
+    processed_groups = models.PositiveIntegerField(default=0, verbose_name="Grupos procesados")
+    clients_removed = models.PositiveIntegerField(default=0, verbose_name="Clientes eliminados")
+    books_updated = models.PositiveIntegerField(default=0, verbose_name="Reservas actualizadas")
+    gift_vouchers_updated = models.PositiveIntegerField(default=0, verbose_name="Cheques actualizados")
+    last_email = models.CharField(max_length=255, null=True, blank=True, verbose_name="Último email procesado")
+    last_phone = models.CharField(max_length=50, null=True, blank=True, verbose_name="Último teléfono procesado")
+    error = models.TextField(null=True, blank=True, verbose_name="Error")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha de creación")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de actualización")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de finalización")
+
+    class Meta:
+        verbose_name = "Unificación de clientes"
+        verbose_name_plural = "Unificaciones de clientes"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Unificación #{self.id} ({self.get_status_display()})"
+
+
+class CatalogVersion(models.Model):
+    """
+    Contador de cambios de un catálogo (productos, tipos de baño, aforo,
+    disponibilidades). Se incrementa en cada escritura y sirve como ETag /
+    Last-Modified de los endpoints de catálogo sin tener que leer sus datos.
+    """
+
+    name = models.CharField(max_length=50, unique=True, verbose_name="Catálogo")
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Versión")
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name="Última modificación")
+
+    class Meta:
+        verbose_name = "Versión de catálogo"
+        verbose_name_plural = "Versiones de catálogo"
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+class ChangeTombstone(models.Model):
+    """
+    Registro de un borrado de reserva, cliente o cheque regalo para el feed de
+    cambios (``/api/v1/changes``): los clientes que ya tenían la fila en su
+    caché local la eliminan. Se purgan pasados ``CHANGE_FEED_TOMBSTONE_DAYS``.
+    """
+
+    KIND_CHOICES = [
+        ('bookings', 'Reserva'),
+        ('clients', 'Cliente'),
+        ('gift_vouchers', 'Cheque regalo'),
+    ]
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Tipo")
+    object_id = models.PositiveBigIntegerField(verbose_name="ID borrado")
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha de borrado")
+
+    class Meta:
+        verbose_name = "Borrado registrado"
+        verbose_name_plural = "Borrados registrados"
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='changetombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id}"
+
+class DailyStats(models.Model):
+    """
+    Resumen diario precalculado de reservas y cheques regalo para informes.
+
+    Las reservas cuentan en su fecha de reserva y los cheques vendidos en su
+    fecha de creación. ``revenue_paid`` excluye los canjes de cheques, cuyo
+    importe ya está en ``vouchers_sold_amount``. ``dirty`` marca los días con
+    cambios pendientes de recalcular; sólo esos días se vuelven a agregar.
+    """
+
+    date = models.DateField(unique=True, verbose_name="Día")
+    bookings = models.PositiveIntegerField(default=0, verbose_name="Reservas")
+    people = models.PositiveIntegerField(default=0, verbose_name="Personas")
+    revenue_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Cobrado")
+    revenue_pending = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Pendiente")
+    massages_by_type = models.JSONField(default=dict, blank=True, verbose_name="Masajes por tipo")
+    vouchers_sold = models.PositiveIntegerField(default=0, verbose_name="Cheques vendidos")
+    vouchers_sold_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Importe cheques vendidos")
+    vouchers_used = models.PositiveIntegerField(default=0, verbose_name="Cheques canjeados")
+    vouchers_used_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Importe cheques canjeados")
+    dirty = models.BooleanField(default=True, verbose_name="Pendiente de recalcular")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de actualización")
+
+    class Meta:
+        verbose_name = "Estadística diaria"
+        verbose_name_plural = "Estadísticas diarias"
+        indexes = [
+            models.Index(fields=['date'], name='dailystats_dirty_idx', condition=models.Q(dirty=True)),
+        ]
+
+    def __str__(self):
+        return f"Estadísticas del {self.date.strftime('%d/%m/%Y')}"
+
+class RequestProfile(models.Model):
+    """
+    Perfil de una petición concreta, solicitado por un administrador con la
+    cabecera ``X-Profile`` o el parámetro ``?_profile=``.
+
+    Guarda el volcado del perfilador (``pstats`` de cProfile o pilas plegadas
+    del muestreador) y la lista de consultas SQL con sus tiempos para
+    descargarlos desde el admin.
+    """
+
+    MODE_CHOICES = [
+        ('cprofile', 'cProfile'),
+        ('sample', 'Muestreo'),
+    ]
+    method = models.CharField(max_length=10, verbose_name="Método")
+    path = models.CharField(max_length=2000, verbose_name="Ruta")
+    query_string = models.TextField(blank=True, default='', verbose_name="Parámetros")
+    user = models.CharField(max_length=150, blank=True, default='', verbose_name="Usuario")
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, verbose_name="Perfilador")
+    status_code = models.PositiveIntegerField(null=True, blank=True, verbose_name="Código de respuesta")
+    duration_ms = models.FloatField(verbose_name="Duración (ms)")
+    sql_ms = models.FloatField(default=0, verbose_name="Tiempo SQL (ms)")
+    query_count = models.PositiveIntegerField(default=0, verbose_name="Consultas")
+    duplicate_query_count = models.PositiveIntegerField(default=0, verbose_name="Consultas duplicadas")
+    similar_query_count = models.PositiveIntegerField(default=0, verbose_name="Consultas repetidas (N+1)")
+    summary = models.TextField(blank=True, default='', verbose_name="Resumen")
+    profile_data = models.BinaryField(verbose_name="Volcado del perfilador")
+    queries = models.JSONField(default=list, blank=True, verbose_name="Consultas SQL")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Fecha")
+
+    class Meta:
+        verbose_name = "Perfil de petición"
+        verbose_name_plural = "Perfiles de peticiones"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,423 @@
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.db.models import Count
+from django.test import Client as HttpClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from reservations.managers.availability import AvailabilityManager
+from reservations.managers.book import BookManager
+from reservations.managers.client import ClientManager
+from reservations.managers.gift_voucher import GiftVoucherManager
+from reservations.models import Availability, Book, Client, Constraint, GiftVoucher, Product
+from reservations.services.billing import BillingService
+from reservations.services.forecast import MassagistForecastService
+from reservations.services.general_search import GeneralSearchService
+from reservations.services.occupancy import OccupancyService
+
+
+class BenchmarkService:
+    """
+    Banco de pruebas repetible de managers y endpoints HTTP.
+
+    Sólo se miden operaciones de lectura, para que repetirlas no altere los
+    datos y dos ejecuciones sobre el mismo conjunto (ver
+    ``SyntheticDataService``) sean comparables. Cada caso se ejecuta
+    ``warmup`` veces sin medir y ``repeat`` veces midiendo tiempo de reloj y
+    número de consultas; el resultado se guarda en JSON junto al commit, el
+    motor de base de datos y el tamaño de las tablas.
+
+    Los endpoints se llaman con el cliente de pruebas de Django
+    (``transport='client'``) o directamente sobre el ``WSGIHandler``
+    (``transport='wsgi'``). El cliente de pruebas no cierra la conexión a la
+    base de datos al terminar la petición; el ``WSGIHandler`` sí, como
+    gunicorn, así que es el que refleja ``CONN_MAX_AGE`` (ver el comando
+    ``benchmark_settings``).
+    """
+
+    REPEAT = 5
+    WARMUP = 1
+    # Variación de la mediana a partir de la cual ``compare`` marca un caso
+    REGRESSION_THRESHOLD = 0.2
+    TRANSPORTS = ('client', 'wsgi')
+
+    # ------------------------------------------------------------------
+    # Casos
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def reference_day() -> date:
+        """Día con más reservas hasta hoy (o hoy si no hay reservas)."""
+        row = (
+            Book.objects.filter(book_date__lte=date.today())
+            .values('book_date').annotate(n=Count('id')).order_by('-n', '-book_date').first()
+        )
+        return row['book_date'] if row else date.today()
+
+    @staticmethod
+    def manager_cases(day: date) -> Dict[str, Callable[[], Any]]:
+        book = Book.objects.filter(book_date=day).order_by('id').first()
+        surname = Client.objects.exclude(surname=None).values_list('surname', flat=True).first() or "García"
+        year_start = day.replace(month=1, day=1)
+        cases = {
+            'book.list_bookings_by_date': lambda: BookManager.list_bookings_by_date(day.isoformat()),
+            'client.list_clients': ClientManager.list_clients,
+            'client.duplicates_preview': lambda: ClientManager.get_duplicate_clients_preview(page=1, page_size=50),
+            'client.fuzzy_duplicates_preview': lambda: ClientManager.get_fuzzy_duplicate_clients_preview(limit=50),
+            'gift_voucher.list_page': lambda: GiftVoucherManager.list_vouchers_page(page_size=50),
+            'gift_voucher.list_page_paid': lambda: GiftVoucherManager.list_vouchers_page(status=['paid'], page_size=50),
+            'availability.ranges_for_period': lambda: AvailabilityManager.get_ranges_for_period(
+                day - timedelta(days=90), day
+            ),
+            'billing.report_year_by_week': lambda: BillingService.get_report(year_start, day, 'week'),
+            'occupancy.build_heatmap': lambda: OccupancyService.build_heatmap(day - timedelta(days=90), day),
+            'forecast.forecast': lambda: MassagistForecastService.forecast(today=day),
+            'search.general': lambda: GeneralSearchService.search(surname.split()[0]),
+        }
+        if book:
+            cases['book.get_book_detail'] = lambda: BookManager.get_book_detail(book.id)
+        return cases
+
+    @staticmethod
+    def http_cases(day: date) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """Nombre del caso → (ruta, parámetros GET)."""
+        book = Book.objects.filter(book_date=day).order_by('id').first()
+        voucher = GiftVoucher.objects.order_by('-id').first()
+        # El endpoint responde 404 en días sin restricción
+        constraint = Constraint.objects.filter(day__lte=day).order_by('-day').first()
+        cases = {
+            'GET booking-by-date': (reverse('booking-by-date'), {'date': day.isoformat()}),
+            'GET client-list': (reverse('client-list'), {}),
+            'GET gift-voucher-list': (reverse('gift-voucher-list'), {}),
+            'GET product-list': (reverse('product-list'), {}),
+            'GET availability-history': (
+                reverse('availability-history', kwargs={'target_date': day.isoformat()}), {}
+            ),
+            'GET billing-list': (
+                reverse('billing-list'),
+                {'start': day.replace(month=1, day=1).isoformat(), 'end': day.isoformat(), 'granularity': 'week'},
+            ),
+            'GET analytics-ocupacion': (
+                reverse('analytics-ocupacion'), {'months': 3, 'end': day.isoformat(), 'refresh': 1}
+            ),
+            'GET general-search': (reverse('general-search'), {'q': 'garcia'}),
+        }
+        if book:
+            cases['GET booking-manage-detail'] = (reverse('booking-manage-detail', kwargs={'pk': book.id}), {})
+        if constraint:
+            cases['GET constraint-by-date'] = (
+                reverse('constraint-by-date', kwargs={'target_date': constraint.day.isoformat()}), {}
+            )
+        if voucher:
+            cases['GET gift-voucher-detail'] = (reverse('gift-voucher-detail', kwargs={'pk': voucher.id}), {})
+        return cases
+
+    # ------------------------------------------------------------------
+    # Medición
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def measure(func: Callable[[], Any], repeat: int = REPEAT, warmup: int = WARMUP) -> Dict[str, Any]:
+        """
+        Tiempos (ms) y consultas de ``repeat`` ejecuciones de ``func``.
+
+        Las consultas se cuentan en una ejecución aparte: capturarlas fuerza
+        el cursor de depuración, que no debe entrar en los tiempos.
+        """
+        for _ in range(warmup):
+            func()
+        with CaptureQueriesContext(connection) as captured:
+            func()
+        # Antes de las demás ejecuciones: cada petición vacía ``connection.queries``
+        queries = len(captured.captured_queries)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        ordered = sorted(timings)
+        return {
+            'runs': repeat,
+            'min_ms': round(ordered[0], 3),
+            'median_ms': round(statistics.median(ordered), 3),
+            'p95_ms': round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 3),
+            'max_ms': round(ordered[-1], 3),
+            'mean_ms': round(statistics.fmean(ordered), 3),
+            'queries': queries,
+        }
+
+    @staticmethod
+    def host() -> str:
+        """Un nombre de host aceptado por ``ALLOWED_HOSTS`` (``DEBUG=False``)."""
+        for host in settings.ALLOWED_HOSTS:
+            if host != '*':
+                return host.lstrip('.')
+        return 'localhost'
+
+    @staticmethod
+    def _http_call(client: HttpClient, path: str, params: Dict[str, Any]) -> Callable[[], Any]:
+        def call():
+            response = client.get(path, params)
+            if response.status_code >= 400:
+                raise RuntimeError(f"GET {path} devolvió {response.status_code}")
+            return response
+        return call
+
+    @staticmethod
+    def _wsgi_call(
+        handler: WSGIHandler, path: str, params: Dict[str, Any], cookies: str = ''
+    ) -> Callable[[], Any]:
+        """Petición completa por el ``WSGIHandler``, con las señales de inicio y fin."""
+        host = BenchmarkService.host()
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': urlencode(params),
+            'SERVER_NAME': host,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': host,
+            'HTTP_COOKIE': cookies,
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+
+        def call():
+            status = []
+            body = handler(
+                dict(environ, **{'wsgi.input': io.BytesIO(b'')}),
+                lambda status_line, headers, exc_info=None: status.append(status_line),
+            )
+            try:
+                content = b''.join(body)
+            finally:
+                body.close()  # dispara ``request_finished`` (cierre de conexiones)
+            if int(status[0].split()[0]) >= 400:
+                raise RuntimeError(f"GET {path} devolvió {status[0]}")
+            return content
+        return call
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def run(
+        repeat: int = REPEAT,
+        warmup: int = WARMUP,
+        day: Optional[date] = None,
+        only: Optional[List[str]] = None,
+        include_http: bool = True,
+        transport: str = 'client',
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta todos los casos y devuelve el informe.
+
+        Args:
+            day: día de referencia; por defecto el de más reservas hasta hoy
+            only: subcadenas; sólo se ejecutan los casos cuyo nombre contiene alguna
+            transport: ``client`` (cliente de pruebas) o ``wsgi`` (``WSGIHandler``)
+        """
+        if transport not in BenchmarkService.TRANSPORTS:
+            raise ValueError(f"Transporte desconocido: {transport}")
+        day = day or BenchmarkService.reference_day()
+        cases: Dict[str, Callable[[], Any]] = dict(BenchmarkService.manager_cases(day))
+
+        if include_http:
+            client = HttpClient(HTTP_HOST=BenchmarkService.host())
+            user = get_user_model().objects.filter(is_superuser=True, is_active=True).first()
+            if user:
+                client.force_login(user)
+            handler = WSGIHandler() if transport == 'wsgi' else None
+            cookies = '; '.join(f"{key}={morsel.value}" for key, morsel in client.cookies.items())
+            for name, (path, params) in BenchmarkService.http_cases(day).items():
+                if handler:
+                    cases[name] = BenchmarkService._wsgi_call(handler, path, params, cookies)
+                else:
+                    cases[name] = BenchmarkService._http_call(client, path, params)
+
+        if only:
+            cases = {name: func for name, func in cases.items() if any(o in name for o in only)}
+
+        results = {}
+        for name, func in cases.items():
+            try:
+                results[name] = BenchmarkService.measure(func, repeat, warmup)
+            except Exception as exc:  # un caso roto no invalida el resto del informe
+                results[name] = {'error': f"{type(exc).__name__}: {exc}"}
+
+        return {
+            'meta': BenchmarkService.environment(),
+            'reference_day': day.isoformat(),
+            'transport': transport,
+            'repeat': repeat,
+            'warmup': warmup,
+            'dataset': BenchmarkService.dataset_size(),
+            'results': results,
+        }
+
+    @staticmethod
+    def environment() -> Dict[str, Any]:
+        """Commit, motor de base de datos y versiones, para comparar informes."""
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                cwd=settings.BASE_DIR, timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'commit': commit,
+            'database': connection.vendor,
+            'settings': settings.SETTINGS_MODULE,
+            'debug': settings.DEBUG,
+            'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE', 0),
+            'python': platform.python_version(),
+            'host': platform.node(),
+        }
+
+    @staticmethod
+    def dataset_size() -> Dict[str, int]:
+        return {
+            'clients': Client.objects.count(),
+            'bookings': Book.objects.count(),
+            'gift_vouchers': GiftVoucher.objects.count(),
+            'products': Product.objects.count(),
+            'availabilities': Availability.objects.count(),
+            'constraints': Constraint.objects.count(),
+        }
+
+    # ------------------------------------------------------------------
+    # Serialización de listados grandes
+    # ------------------------------------------------------------------
+
+    SERIALIZATION_ROWS = 10000
+
+    @staticmethod
+    def serialization_cases(rows: int) -> Dict[str, Tuple[Callable[[], Any], Callable[[], Any]]]:
+        """
+        Listado → (ruta con DTO + serializer de DRF + ``JSONRenderer``,
+        ruta rápida con ``values()`` + ``RowSerializer`` + ``ORJSONRenderer``).
+        Ambas devuelven los mismos bytes.
+        """
+        # La capa de API sólo se importa aquí: el resto del banco no la necesita
+        from rest_framework.renderers import JSONRenderer
+
+        from api.v1.renderers import ORJSONRenderer
+        from api.v1.serializers.book import BookingSerializer
+        from api.v1.serializers.client import ClientSerializer
+        from api.v1.serializers.gift_voucher import GiftVoucherWithDetailsSerializer
+        from api.v1.serializers.rows import RowSerializer
+
+        def pair(serializer_class, dtos, rows_func, exclude=()):
+            row_serializer = RowSerializer(serializer_class, exclude=exclude)
+            return (
+                lambda: JSONRenderer().render(serializer_class(dtos(), many=True).data),
+                lambda: ORJSONRenderer().render(row_serializer.to_representation(rows_func())),
+            )
+
+        return {
+            'bookings': pair(
+                BookingSerializer,
+                lambda: BookManager.list_bookings(limit=rows),
+                lambda: BookManager.list_booking_rows(limit=rows),
+            ),
+            'clients': pair(
+                ClientSerializer,
+                lambda: ClientManager.list_clients(limit=rows),
+                lambda: ClientManager.list_client_rows(limit=rows),
+            ),
+            'gift_vouchers': pair(
+                GiftVoucherWithDetailsSerializer,
+                lambda: GiftVoucherManager.list_vouchers_with_details(limit=rows),
+                lambda: GiftVoucherManager.list_voucher_detail_rows(limit=rows),
+                exclude=('used',),
+            ),
+        }
+
+    @staticmethod
+    def serialization(rows: int = SERIALIZATION_ROWS, repeat: int = REPEAT, warmup: int = WARMUP) -> Dict[str, Any]:
+        """Tiempo y filas por segundo de las dos rutas de cada listado (consulta incluida)."""
+        results = {}
+        for name, (legacy, fast) in BenchmarkService.serialization_cases(rows).items():
+            output = fast()
+            if output != legacy():
+                raise RuntimeError(f"{name}: las dos rutas no devuelven la misma respuesta")
+            entry = {'rows': len(json.loads(output)), 'bytes': len(output)}
+            for variant, func in (('legacy', legacy), ('fast', fast)):
+                measured = BenchmarkService.measure(func, repeat, warmup)
+                measured['rows_per_second'] = round(entry['rows'] * 1000 / measured['median_ms'])
+                entry[variant] = measured
+            entry['speedup'] = round(entry['legacy']['median_ms'] / entry['fast']['median_ms'], 2)
+            results[name] = entry
+        return {'meta': BenchmarkService.environment(), 'rows': rows, 'results': results}
+
+    # ------------------------------------------------------------------
+    # Persistencia y comparación
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def save(report: Dict[str, Any], path: str) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False, sort_keys=True))
+        return path
+
+    @staticmethod
+    def load(path: str) -> Dict[str, Any]:
+        return json.loads(Path(path).read_text())
+
+    @staticmethod
+    def compare(
+        current: Dict[str, Any],
+        baseline: Dict[str, Any],
+        threshold: float = REGRESSION_THRESHOLD,
+    ) -> List[Dict[str, Any]]:
+        """
+        Diferencias por caso entre dos informes (mediana y consultas).
+
+        ``status`` es ``regression`` o ``improvement`` cuando la mediana cambia
+        más de ``threshold`` (proporción) o cambia el número de consultas.
+        """
+        rows = []
+        for name, result in sorted(current['results'].items()):
+            before = baseline['results'].get(name)
+            if not before or 'error' in result or 'error' in before:
+                continue
+            ratio = result['median_ms'] / before['median_ms'] if before['median_ms'] else None
+            query_delta = result['queries'] - before['queries']
+            if query_delta > 0 or (ratio is not None and ratio > 1 + threshold):
+                status = 'regression'
+            elif query_delta < 0 or (ratio is not None and ratio < 1 - threshold):
+                status = 'improvement'
+            else:
+                status = 'same'
+            rows.append({
+                'case': name,
+                'baseline_ms': before['median_ms'],
+                'current_ms': result['median_ms'],
+                'ratio': round(ratio, 3) if ratio is not None else None,
+                'baseline_queries': before['queries'],
+                'current_queries': result['queries'],
+                'status': status,
+            })
+        return rows
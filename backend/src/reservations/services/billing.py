@@ -0,0 +1,181 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from reservations.models import Admin, Agent, Book, DailyStats, GiftVoucher, WebBooking
+from reservations.services.daily_stats import DailyStatsService
+
+
+class BillingService:
+    """
+    Agregados de facturación calculados en la base de datos.
+
+    Cada agrupación es una única consulta ``GROUP BY`` con ``SUM``/``COUNT``;
+    nunca se cargan reservas ni cheques individuales. Las reservas se agrupan
+    por fecha de reserva (``book_date``) y los cheques vendidos por fecha de
+    creación. Las redenciones son las reservas creadas desde un cheque regalo.
+
+    ``revenue_paid`` no incluye las redenciones: su ``amount_paid`` es el precio
+    del cheque, que ya se cobró al venderlo y cuenta en ``vouchers_sold_amount``.
+    Su importe se informa aparte en ``vouchers_redeemed_amount``.
+
+    La serie por periodo y los totales se leen de ``DailyStats``, que recalcula
+    la tarea periódica ``refresh_daily_stats_task`` (o ``refresh_daily_stats``);
+    el informe no recalcula nada y devuelve en ``stale_days`` cuántos días del
+    rango tienen cambios aún sin incorporar. Los desgloses por producto, origen
+    y agente no están en el resumen diario y se agregan sobre ``Book``.
+    """
+
+    GRANULARITY_DAY = 'day'
+    GRANULARITY_WEEK = 'week'
+    GRANULARITY_MONTH = 'month'
+    GRANULARITIES = {
+        GRANULARITY_DAY: TruncDay,
+        GRANULARITY_WEEK: TruncWeek,
+        GRANULARITY_MONTH: TruncMonth,
+    }
+
+    # Nombre del origen de creación por modelo (igual que Book.creator_type_name)
+    CREATOR_KINDS = {
+        Admin: 'Administrador',
+        Agent: 'Agente',
+        GiftVoucher: 'Cheque regalo',
+        WebBooking: 'Reserva web',
+    }
+
+    @staticmethod
+    def _booking_aggregates(voucher_type_id: int) -> Dict[str, Any]:
+        redeemed = Q(creator_type_id=voucher_type_id)
+        return {
+            'bookings': Count('id'),
+            'people': Sum('people'),
+            'revenue_paid': Sum('amount_paid', filter=~redeemed),
+            'revenue_pending': Sum('amount_pending'),
+            'vouchers_redeemed': Count('id', filter=redeemed),
+            'vouchers_redeemed_amount': Sum('amount_paid', filter=redeemed),
+        }
+
+    @staticmethod
+    def _clean(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Sustituye los ``SUM`` vacíos (``NULL``) por cero."""
+        for key in ('people',):
+            if key in row and row[key] is None:
+                row[key] = 0
+        for key in ('revenue_paid', 'revenue_pending', 'vouchers_redeemed_amount', 'vouchers_sold_amount'):
+            if key in row and row[key] is None:
+                row[key] = Decimal('0.00')
+        return row
+
+    @staticmethod
+    def get_report(start: date, end: date, granularity: str = GRANULARITY_MONTH) -> Dict[str, Any]:
+        """
+        Informe de facturación entre ``start`` y ``end`` (ambos incluidos).
+
+        Returns:
+            Diccionario con ``totals``, ``by_period`` (reservas y cheques por
+            día/semana/mes), ``by_product``, ``by_creator``, ``by_agent`` y
+            ``stale_days`` (días del resumen diario pendientes de recalcular)
+        """
+        if granularity not in BillingService.GRANULARITIES:
+            raise ValueError(f"Granularidad no válida: {granularity}")
+        if start > end:
+            raise ValueError("La fecha de inicio debe ser anterior a la de fin")
+
+        trunc = BillingService.GRANULARITIES[granularity]
+        voucher_type_id = ContentType.objects.get_for_model(GiftVoucher).id
+        aggregates = BillingService._booking_aggregates(voucher_type_id)
+        books = Book.objects.filter(book_date__range=(start, end)).order_by()
+
+        # Serie temporal desde el resumen diario, tal como lo dejó el último recálculo
+        by_period = [
+            {**row, 'period': BillingService._as_date(row['period'])}
+            for row in (
+                DailyStats.objects
+                .filter(date__range=(start, end))
+                .filter(Q(bookings__gt=0) | Q(vouchers_sold__gt=0))
+                .annotate(period=trunc('date'))
+                .values('period')
+                .annotate(
+                    bookings=Sum('bookings'),
+                    people=Sum('people'),
+                    revenue_paid=Sum('revenue_paid'),
+                    revenue_pending=Sum('revenue_pending'),
+                    vouchers_redeemed=Sum('vouchers_used'),
+                    vouchers_redeemed_amount=Sum('vouchers_used_amount'),
+                    vouchers_sold=Sum('vouchers_sold'),
+                    vouchers_sold_amount=Sum('vouchers_sold_amount'),
+                )
+                .order_by('period')
+            )
+        ]
+
+        return {
+            'start': start,
+            'end': end,
+            'granularity': granularity,
+            'totals': BillingService._totals(by_period),
+            'by_period': by_period,
+            'by_product': BillingService._by_product(books, aggregates),
+            'by_creator': BillingService._by_creator(books, aggregates),
+            'by_agent': BillingService._by_agent(books, aggregates),
+            'stale_days': DailyStatsService.stale_days(start, end),
+        }
+
+    @staticmethod
+    def _as_date(value) -> date:
+        return value.date() if isinstance(value, datetime) else value
+
+    @staticmethod
+    def _totals(by_period: List[Dict[str, Any]]) -> Dict[str, Any]:
+        keys = (
+            'bookings', 'people', 'revenue_paid', 'revenue_pending', 'vouchers_redeemed',
+            'vouchers_redeemed_amount', 'vouchers_sold', 'vouchers_sold_amount',
+        )
+        totals = BillingService._clean({key: None for key in keys})
+        for key in ('bookings', 'vouchers_redeemed', 'vouchers_sold'):
+            totals[key] = 0
+        for row in by_period:
+            for key in keys:
+                totals[key] += row[key]
+        return totals
+
+    @staticmethod
+    def _by_product(books, aggregates) -> List[Dict[str, Any]]:
+        rows = (
+            books.values('product_id', product_name=F('product__name'))
+            .annotate(**aggregates)
+            .order_by('-revenue_paid', 'product_id')
+        )
+        return [BillingService._clean(row) for row in rows]
+
+    @staticmethod
+    def _by_creator(books, aggregates) -> List[Dict[str, Any]]:
+        kinds_by_type_id = {
+            ContentType.objects.get_for_model(model).id: kind
+            for model, kind in BillingService.CREATOR_KINDS.items()
+        }
+        result = []
+        for row in books.values('creator_type_id').annotate(**aggregates).order_by('creator_type_id'):
+            type_id = row['creator_type_id']
+            row['creator_kind'] = kinds_by_type_id.get(type_id, 'Sin creador' if type_id is None else 'Desconocido')
+            result.append(BillingService._clean(row))
+        return result
+
+    @staticmethod
+    def _by_agent(books, aggregates) -> List[Dict[str, Any]]:
+        agent_type_id = ContentType.objects.get_for_model(Agent).id
+        rows = list(
+            books.filter(creator_type_id=agent_type_id)
+            .values(agent_id=F('creator_id'))
+            .annotate(**aggregates)
+            .order_by('-revenue_paid', 'agent_id')
+        )
+        names = dict(Agent.objects.filter(id__in=[row['agent_id'] for row in rows]).values_list('id', 'name'))
+        for row in rows:
+            row['agent_name'] = names.get(row['agent_id'])
+            BillingService._clean(row)
+        return rows
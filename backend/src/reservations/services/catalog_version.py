@@ -0,0 +1,112 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from reservations.models import (
+    CatalogVersion, Product, ProductBaths, ProductHosting, BathType, Capacity,
+    Availability, AvailabilityRange,
+)
+
+
+class CatalogVersionService:
+    """
+    Sello de versión por catálogo para las peticiones GET condicionales.
+
+    Cada catálogo tiene una fila en ``CatalogVersion`` cuyo contador se
+    incrementa (en la misma transacción que el cambio) al guardar o borrar
+    cualquiera de sus modelos. Leer la versión es una consulta por clave
+    única, mucho más barata que serializar el catálogo.
+
+    ``bulk_create`` y ``QuerySet.update`` no emiten señales: el código que los
+    use sobre estos modelos debe llamar a ``bump`` explícitamente. Dentro de
+    ``batch()`` los incrementos se agrupan y se aplican una vez al salir.
+    """
+
+    # Catálogos pendientes de incrementar dentro de ``batch()`` (por hilo)
+    _deferred = threading.local()
+
+    PRODUCTS = 'products'
+    BATH_TYPES = 'bath_types'
+    CAPACITY = 'capacity'
+    AVAILABILITY = 'availability'
+
+    # Modelos cuyo cambio invalida cada catálogo
+    CATALOG_MODELS = {
+        PRODUCTS: (Product, ProductBaths, ProductHosting, BathType),
+        BATH_TYPES: (BathType,),
+        CAPACITY: (Capacity,),
+        AVAILABILITY: (Availability, AvailabilityRange),
+    }
+
+    @staticmethod
+    def bump(*names: str) -> None:
+        """Incrementa la versión de los catálogos indicados."""
+        pending = getattr(CatalogVersionService._deferred, 'names', None)
+        if pending is not None:
+            pending.update(names)
+            return
+        now = timezone.now()
+        for name in names:
+            updated = CatalogVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=now)
+            if not updated:
+                CatalogVersion.objects.get_or_create(name=name, defaults={'version': 1, 'updated_at': now})
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """
+        Agrupa los incrementos del bloque en uno por catálogo.
+
+        Evita una actualización de ``CatalogVersion`` por cada fila guardada o
+        borrada al escribir muchos registros relacionados de una vez.
+        """
+        if getattr(CatalogVersionService._deferred, 'names', None) is not None:
+            yield
+            return
+        CatalogVersionService._deferred.names = set()
+        try:
+            yield
+        finally:
+            names = CatalogVersionService._deferred.names
+            CatalogVersionService._deferred.names = None
+        if names:
+            CatalogVersionService.bump(*sorted(names))
+
+    @staticmethod
+    def get(names: Iterable[str]) -> Tuple[str, Optional[datetime]]:
+        """
+        Devuelve ``(etag, last_modified)`` combinando las versiones indicadas.
+
+        Los catálogos que aún no tienen fila cuentan como versión 0.
+        """
+        names = sorted(names)
+        rows = {
+            row.name: row
+            for row in CatalogVersion.objects.filter(name__in=names)
+        }
+        etag = "-".join(
+            f"{name}.{rows[name].version if name in rows else 0}" for name in names
+        )
+        last_modified = max((row.updated_at for row in rows.values()), default=None)
+        return etag, last_modified
+
+    @staticmethod
+    def connect_signals() -> None:
+        """Registra los receptores que incrementan las versiones (``AppConfig.ready``)."""
+        catalogs_by_model = {}
+        for name, models in CatalogVersionService.CATALOG_MODELS.items():
+            for model in models:
+                catalogs_by_model.setdefault(model, []).append(name)
+
+        for model, names in catalogs_by_model.items():
+            def receiver(sender, names=tuple(names), **kwargs):
+                CatalogVersionService.bump(*names)
+
+            uid = f"catalog_version_{model._meta.label_lower}"
+            post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f"{uid}_save")
+            post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f"{uid}_delete")
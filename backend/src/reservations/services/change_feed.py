@@ -0,0 +1,220 @@
+import base64
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from reservations.models import Book, ChangeTombstone, Client, GiftVoucher
+
+
+class CursorExpired(Exception):
+    """El cursor es anterior a los borrados conservados: hay que resincronizar."""
+
+
+class ChangeFeedService:
+    """
+    Feed de cambios de reservas, clientes y cheques regalo (``/api/v1/changes``).
+
+    Cada tipo se recorre por su índice ``(updated_at, id)`` desde la posición
+    guardada en el cursor, y los borrados se leen de ``ChangeTombstone`` (que
+    rellenan las señales ``post_delete``). El cursor es opaco para el cliente:
+    codifica la última posición leída de cada tipo.
+
+    Una transacción puede confirmarse después de que otra con ``updated_at``
+    posterior ya se haya leído. Para no perder esas filas, cuando un tipo se ha
+    leído entero su posición retrocede a ``now - SETTLE_SECONDS``; la siguiente
+    petición repite las filas de esa ventana, así que el cliente debe aplicar
+    los cambios como ``upsert`` por ``id``.
+
+    Las filas de cheques llevan datos del comprador y del producto; si sólo
+    cambia el cliente, el feed trae el cliente pero no sus cheques.
+
+    ``QuerySet.update`` no actualiza ``updated_at`` (``auto_now``): el código
+    que lo use sobre estos modelos debe incluir ``updated_at=timezone.now()``.
+    ``QuerySet.delete`` sí emite ``post_delete`` por cada fila. Dentro de
+    ``batch()`` los borrados se guardan con un solo ``bulk_create``.
+    """
+
+    # Modelo de cada tipo de fila del feed
+    KINDS = {
+        'bookings': Book,
+        'clients': Client,
+        'gift_vouchers': GiftVoucher,
+    }
+    DELETED = 'deleted'
+
+    # Filas por tipo y petición
+    PAGE_SIZE = 500
+    # Margen para las transacciones que se confirman tarde (ver docstring)
+    SETTLE_SECONDS = 5
+
+    # Borrados pendientes de guardar dentro de ``batch()`` (por hilo)
+    _deferred = threading.local()
+
+    # ------------------------------------------------------------------
+    # Borrados
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def record_deletion(kind: str, object_id: int) -> None:
+        """Registra el borrado de una fila para el feed de cambios."""
+        tombstone = ChangeTombstone(kind=kind, object_id=object_id, deleted_at=timezone.now())
+        pending = getattr(ChangeFeedService._deferred, 'tombstones', None)
+        if pending is not None:
+            pending.append(tombstone)
+            return
+        tombstone.save()
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """Agrupa los borrados del bloque (p. ej. en cascada) en un único ``INSERT``."""
+        if getattr(ChangeFeedService._deferred, 'tombstones', None) is not None:
+            yield
+            return
+        ChangeFeedService._deferred.tombstones = []
+        try:
+            yield
+        finally:
+            tombstones = ChangeFeedService._deferred.tombstones
+            ChangeFeedService._deferred.tombstones = None
+        ChangeTombstone.objects.bulk_create(tombstones)
+
+    @staticmethod
+    def connect_signals() -> None:
+        """Registra los receptores que guardan los borrados (``AppConfig.ready``)."""
+        for kind, model in ChangeFeedService.KINDS.items():
+            def receiver(sender, instance, kind=kind, **kwargs):
+                ChangeFeedService.record_deletion(kind, instance.pk)
+
+            post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f"change_feed_{kind}_delete")
+
+    @staticmethod
+    def prune(days: Optional[int] = None) -> int:
+        """
+        Elimina los borrados registrados hace más de ``days`` días (por defecto
+        ``CHANGE_FEED_TOMBSTONE_DAYS``). Los cursores anteriores caducan.
+
+        Returns:
+            Número de registros eliminados
+        """
+        days = settings.CHANGE_FEED_TOMBSTONE_DAYS if days is None else days
+        deleted, _ = ChangeTombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()
+        return deleted
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def changes(cursor: Optional[str] = None, page_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Cambios posteriores a ``cursor``.
+
+        Sin cursor devuelve todas las filas actuales (carga inicial) y ningún
+        borrado. Si algún tipo llena la página, ``has_more`` indica que hay
+        que volver a pedir con el nuevo cursor.
+
+        Returns:
+            ``{'bookings': [...], 'clients': [...], 'gift_vouchers': [...],
+            'deleted': {tipo: [ids]}, 'cursor': str, 'has_more': bool}``; las
+            filas traen las claves de ``ROW_FIELDS`` del manager más
+            ``updated_at``
+
+        Raises:
+            ValueError: Si el cursor no es válido
+            CursorExpired: Si los borrados posteriores al cursor ya se purgaron
+        """
+        page_size = min(max(int(page_size or ChangeFeedService.PAGE_SIZE), 1), ChangeFeedService.PAGE_SIZE)
+        now = timezone.now()
+        settled = (now - timedelta(seconds=ChangeFeedService.SETTLE_SECONDS), 0)
+
+        if cursor:
+            positions = ChangeFeedService._decode_cursor(cursor)
+            retention = timedelta(days=settings.CHANGE_FEED_TOMBSTONE_DAYS)
+            if positions[ChangeFeedService.DELETED][0] < now - retention:
+                raise CursorExpired("El cursor es demasiado antiguo; hay que volver a cargar los datos")
+        else:
+            # Un cliente sin caché no necesita los borrados anteriores
+            positions = {kind: None for kind in ChangeFeedService.KINDS}
+            positions[ChangeFeedService.DELETED] = settled
+
+        result: Dict[str, Any] = {}
+        next_positions = {}
+        has_more = False
+        for kind in ChangeFeedService.KINDS:
+            rows = ChangeFeedService._changed_rows(kind, positions[kind], page_size)
+            full = len(rows) == page_size
+            result[kind] = rows
+            next_positions[kind] = (rows[-1]['updated_at'], rows[-1]['id']) if full else settled
+            has_more = has_more or full
+
+        tombstones = ChangeFeedService._after(
+            ChangeTombstone.objects.all(), 'deleted_at', positions[ChangeFeedService.DELETED],
+        ).values_list('kind', 'object_id', 'deleted_at', 'id')[:page_size]
+        tombstones = list(tombstones)
+        full = len(tombstones) == page_size
+        result[ChangeFeedService.DELETED] = {kind: [] for kind in ChangeFeedService.KINDS}
+        for kind, object_id, _, _ in tombstones:
+            result[ChangeFeedService.DELETED][kind].append(object_id)
+        next_positions[ChangeFeedService.DELETED] = tombstones[-1][2:] if full else settled
+
+        result['cursor'] = ChangeFeedService._encode_cursor(next_positions)
+        result['has_more'] = has_more or full
+        return result
+
+    @staticmethod
+    def _after(queryset, column: str, position: Optional[Tuple[datetime, int]]):
+        """Filas posteriores a ``position`` en el orden ``(column, id)``."""
+        if position is not None:
+            at, last_id = position
+            queryset = queryset.filter(Q(**{f'{column}__gt': at}) | Q(**{column: at, 'id__gt': last_id}))
+        return queryset.order_by(column, 'id')
+
+    @staticmethod
+    def _changed_rows(kind: str, position: Optional[Tuple[datetime, int]], limit: int) -> List[Dict[str, Any]]:
+        """Filas con las mismas claves que los listados de cada tipo (``*_ROW_FIELDS``)."""
+        # Los managers usan ``batch()`` al borrar: importarlos aquí evita el ciclo
+        from reservations.managers.book import BookManager
+        from reservations.managers.client import ClientManager
+        from reservations.managers.gift_voucher import GiftVoucherManager
+
+        queryset = ChangeFeedService._after(ChangeFeedService.KINDS[kind].objects.all(), 'updated_at', position)
+        if kind == 'bookings':
+            rows = queryset.values(*BookManager.ROW_FIELDS, 'updated_at', booking_date=F('book_date'))
+        elif kind == 'clients':
+            rows = queryset.values(*ClientManager.ROW_FIELDS, 'updated_at')
+        else:
+            columns, related = GiftVoucherManager._detail_row_values()
+            rows = queryset.values(*columns, 'updated_at', **related)
+        return list(rows[:limit])
+
+    @staticmethod
+    def _encode_cursor(positions: Dict[str, Optional[Tuple[datetime, int]]]) -> str:
+        raw = json.dumps({
+            kind: [position[0].isoformat(), position[1]] if position else None
+            for kind, position in positions.items()
+        }, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Dict[str, Optional[Tuple[datetime, int]]]:
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            positions = {}
+            for kind in (*ChangeFeedService.KINDS, ChangeFeedService.DELETED):
+                position = raw[kind]
+                positions[kind] = None if position is None else (
+                    datetime.fromisoformat(position[0]), int(position[1])
+                )
+        except (ValueError, UnicodeDecodeError, KeyError, IndexError, TypeError, AttributeError):
+            raise ValueError("Cursor de cambios inválido")
+        if positions[ChangeFeedService.DELETED] is None or positions[ChangeFeedService.DELETED][0].tzinfo is None:
+            raise ValueError("Cursor de cambios inválido")
+        return positions
@@ -0,0 +1,307 @@
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+from reservations.models import Client
+
+
+class ClientMatchingService:
+    """
+    Detección aproximada de clientes duplicados.
+
+    En lugar de comparar todos los clientes entre sí, cada cliente se reparte en
+    "bloques" según unas claves baratas de calcular (sufijo del teléfono, dominio
+    + raíz del email y clave fonética del nombre). Sólo se comparan los clientes
+    que comparten algún bloque, por lo que el coste crece casi linealmente con
+    el número de clientes.
+    """
+
+    # Dígitos finales del teléfono usados como clave de bloque
+    PHONE_SUFFIX_LENGTH = 7
+
+    # Los bloques más grandes (nombres muy comunes, dominios genéricos...) se
+    # descartan para no volver a una comparación de todos contra todos
+    MAX_BLOCK_SIZE = 30
+
+    # Puntuación mínima para considerar que dos clientes son el mismo
+    DEFAULT_THRESHOLD = 0.85
+
+    # Peso de cada campo en la puntuación final
+    WEIGHTS = {
+        'name': 0.4,
+        'email': 0.3,
+        'phone': 0.3,
+    }
+
+    # ------------------------------------------------------------------
+    # Normalización
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize_text(value: Optional[str]) -> str:
+        """Minúsculas, sin acentos ni signos y con los espacios colapsados."""
+        if not value:
+            return ""
+        value = unicodedata.normalize('NFKD', value)
+        value = "".join(ch for ch in value if not unicodedata.combining(ch))
+        value = re.sub(r'[^a-z0-9ñ ]+', ' ', value.lower())
+        return " ".join(value.split())
+
+    @staticmethod
+    def normalize_phone(value: Optional[str]) -> str:
+        """Deja sólo los dígitos y elimina el prefijo internacional español (+34 / 0034)."""
+        digits = re.sub(r'\D', '', value or "")
+        if digits.startswith('00'):
+            digits = digits[2:]
+        if digits.startswith('34') and len(digits) == 11:
+            digits = digits[2:]
+        return digits
+
+    @staticmethod
+    def normalize_email(value: Optional[str]) -> Tuple[str, str]:
+        """
+        Devuelve ``(raíz_local, dominio)`` de un email.
+
+        La raíz elimina la parte ``+etiqueta``, los separadores (``.``, ``_``,
+        ``-``) y los dígitos finales, de modo que ``ana.garcia85+spa@x.com`` y
+        ``anagarcia@x.com`` comparten raíz.
+        """
+        value = (value or "").strip().lower()
+        if '@' not in value:
+            return "", ""
+        local, domain = value.rsplit('@', 1)
+        local = local.split('+', 1)[0]
+        local = re.sub(r'[._\-]', '', local)
+        local = re.sub(r'\d+$', '', local)
+        return local, domain
+
+    @staticmethod
+    def phonetic_key(value: Optional[str]) -> str:
+        """
+        Clave fonética simplificada para nombres en español.
+
+        Agrupa las grafías que suenan igual (b/v, c/z/s, g/j, ll/y, qu/k...),
+        elimina la ``h`` muda y las letras repetidas.
+        """
+        text = ClientMatchingService.normalize_text(value).replace(' ', '')
+        if not text:
+            return ""
+        replacements = [
+            ('ch', 'X'), ('ll', 'y'), ('qu', 'k'), ('gue', 'Ge'), ('gui', 'Gi'),
+            ('ce', 'se'), ('ci', 'si'), ('ge', 'je'), ('gi', 'ji'),
+            ('h', ''), ('v', 'b'), ('z', 's'), ('c', 'k'), ('w', 'b'), ('ñ', 'n'), ('x', 'ks'),
+        ]
+        for source, target in replacements:
+            text = text.replace(source, target)
+        text = text.lower()
+        # Colapsar letras repetidas y quitar vocales salvo la inicial
+        collapsed = [text[0]]
+        for ch in text[1:]:
+            if ch != collapsed[-1]:
+                collapsed.append(ch)
+        return collapsed[0] + "".join(ch for ch in collapsed[1:] if ch not in 'aeiou')
+
+    # ------------------------------------------------------------------
+    # Blocking
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _prepare(record: Tuple[int, str, str, str, str]) -> Dict[str, Any]:
+        """Precalcula los campos normalizados de un cliente."""
+        client_id, name, surname, email, phone = record
+        full_name = ClientMatchingService.normalize_text(f"{name or ''} {surname or ''}")
+        email_stem, email_domain = ClientMatchingService.normalize_email(email)
+        return {
+            'id': client_id,
+            'name': name or "",
+            'surname': surname or "",
+            'email': (email or "").strip().lower(),
+            'phone_number': phone or "",
+            'full_name': full_name,
+            'norm_phone': ClientMatchingService.normalize_phone(phone),
+            'email_stem': email_stem,
+            'email_domain': email_domain,
+        }
+
+    @staticmethod
+    def blocking_keys(client: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Claves de bloque de un cliente preparado con ``_prepare``."""
+        keys = []
+        phone = client['norm_phone']
+        if len(phone) >= ClientMatchingService.PHONE_SUFFIX_LENGTH:
+            keys.append(('phone', phone[-ClientMatchingService.PHONE_SUFFIX_LENGTH:]))
+        if client['email_stem'] and client['email_domain']:
+            keys.append(('email', f"{client['email_stem']}@{client['email_domain']}"))
+        words = client['full_name'].split()
+        if len(words) >= 2:
+            # Nombre + primer apellido fonéticos + inicial del segundo apellido
+            name_key = ClientMatchingService.phonetic_key(words[0]) + '|' + ClientMatchingService.phonetic_key(words[1])
+            if len(words) >= 3:
+                name_key += '|' + words[2][0]
+            keys.append(('name', name_key))
+        return keys
+
+    @staticmethod
+    def candidate_pairs(clients: Dict[int, Dict[str, Any]]) -> Iterable[Tuple[int, int]]:
+        """Genera los pares de IDs que comparten al menos un bloque (sin repetir)."""
+        blocks = defaultdict(list)
+        for client in clients.values():
+            for key in ClientMatchingService.blocking_keys(client):
+                blocks[key].append(client['id'])
+
+        seen = set()
+        for ids in blocks.values():
+            if len(ids) < 2 or len(ids) > ClientMatchingService.MAX_BLOCK_SIZE:
+                continue
+            for a, b in combinations(sorted(ids), 2):
+                if (a, b) not in seen:
+                    seen.add((a, b))
+                    yield a, b
+
+    # ------------------------------------------------------------------
+    # Puntuación
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _phone_similarity(a: str, b: str) -> float:
+        """1 si coinciden, 0.8 si sólo difieren en un dígito, 0 en otro caso."""
+        if a == b:
+            return 1.0
+        if len(a) == len(b) and sum(x != y for x, y in zip(a, b)) == 1:
+            return 0.8
+        return 0.0
+
+    @staticmethod
+    def _email_similarity(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+        """Compara emails exactos, por raíz o con erratas en la parte local (mismo dominio)."""
+        if a['email'] == b['email']:
+            return 1.0
+        if a['email_domain'] != b['email_domain']:
+            return 0.0
+        if a['email_stem'] == b['email_stem']:
+            return 0.9
+        if abs(len(a['email_stem']) - len(b['email_stem'])) > 2:
+            return 0.0
+        matcher = SequenceMatcher(None, a['email_stem'], b['email_stem'])
+        # quick_ratio() es una cota superior barata de ratio()
+        if matcher.quick_ratio() < 0.85:
+            return 0.0
+        return 0.8 if matcher.ratio() >= 0.85 else 0.0
+
+    @staticmethod
+    def score_pair(a: Dict[str, Any], b: Dict[str, Any]) -> Tuple[float, List[str]]:
+        """
+        Puntúa la similitud entre dos clientes preparados.
+
+        Returns:
+            Tupla ``(puntuación entre 0 y 1, motivos)``. Sin coincidencia de
+            email ni de teléfono la puntuación es 0: un nombre parecido no es
+            suficiente para unificar.
+        """
+        reasons = []
+        scores = {}
+
+        if a['norm_phone'] and b['norm_phone']:
+            scores['phone'] = ClientMatchingService._phone_similarity(a['norm_phone'], b['norm_phone'])
+            if scores['phone'] >= 0.8:
+                reasons.append('phone')
+
+        if a['email_domain'] and b['email_domain']:
+            scores['email'] = ClientMatchingService._email_similarity(a, b)
+            if scores['email'] >= 0.8:
+                reasons.append('email')
+
+        if not reasons:
+            return 0.0, []
+
+        if a['full_name'] and b['full_name']:
+            scores['name'] = SequenceMatcher(None, a['full_name'], b['full_name']).ratio()
+            if scores['name'] >= 0.8:
+                reasons.append('name')
+
+        total_weight = sum(ClientMatchingService.WEIGHTS[field] for field in scores)
+        score = sum(ClientMatchingService.WEIGHTS[field] * value for field, value in scores.items()) / total_weight
+        return round(score, 3), reasons
+
+    # ------------------------------------------------------------------
+    # Agrupación
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def find_duplicate_groups(threshold: float = None, queryset=None) -> List[Dict[str, Any]]:
+        """
+        Busca grupos de clientes probablemente duplicados.
+
+        Los pares que superan el umbral se agrupan por componentes conexas
+        (union-find), así que A~B y B~C forman un único grupo.
+
+        Args:
+            threshold: Puntuación mínima (por defecto ``DEFAULT_THRESHOLD``)
+            queryset: Clientes a analizar (por defecto todos)
+
+        Returns:
+            Lista de grupos con ``client_ids`` (ID más alto primero, que será el
+            cliente principal al unificar), ``score`` mínimo, motivos y clientes
+        """
+        if threshold is None:
+            threshold = ClientMatchingService.DEFAULT_THRESHOLD
+        if queryset is None:
+            queryset = Client.objects.all()
+
+        clients = {}
+        records = queryset.values_list('id', 'name', 'surname', 'email', 'phone_number')
+        for record in records.iterator(chunk_size=5000):
+            prepared = ClientMatchingService._prepare(record)
+            clients[prepared['id']] = prepared
+
+        parent = {}
+
+        def find(x):
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        pair_scores = {}
+        for a, b in ClientMatchingService.candidate_pairs(clients):
+            score, reasons = ClientMatchingService.score_pair(clients[a], clients[b])
+            if score >= threshold:
+                pair_scores[(a, b)] = (score, reasons)
+                parent[find(a)] = find(b)
+
+        members = defaultdict(list)
+        for client_id in parent:
+            members[find(client_id)].append(client_id)
+
+        groups_scores = defaultdict(list)
+        groups_reasons = defaultdict(set)
+        for (a, b), (score, reasons) in pair_scores.items():
+            root = find(a)
+            groups_scores[root].append(score)
+            groups_reasons[root].update(reasons)
+
+        groups = []
+        for root, ids in members.items():
+            ids.sort(reverse=True)
+            groups.append({
+                'client_ids': ids,
+                'score': min(groups_scores[root]),
+                'reasons': sorted(groups_reasons[root]),
+                'clients': [
+                    {
+                        'id': clients[i]['id'],
+                        'name': clients[i]['name'],
+                        'surname': clients[i]['surname'],
+                        'email': clients[i]['email'],
+                        'phone_number': clients[i]['phone_number'],
+                    }
+                    for i in ids
+                ],
+            })
+
+        groups.sort(key=lambda g: (-g['score'], -g['client_ids'][0]))
+        return groups
@@ -0,0 +1,251 @@
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from reservations.models import Book, DailyStats, GiftVoucher
+
+
+class DailyStatsService:
+    """
+    Mantenimiento incremental de la tabla ``DailyStats``.
+
+    Guardar o borrar una reserva o un cheque marca su día como ``dirty``
+    (señales, igual que ``CatalogVersionService``). ``refresh`` vuelve a
+    agregar sólo los días marcados, con tres consultas ``GROUP BY`` por lote,
+    de modo que los informes leen un registro por día en lugar de todas las
+    reservas y cheques.
+
+    ``bulk_create`` y ``QuerySet.update`` no emiten señales: el código que los
+    use sobre reservas o cheques debe llamar a ``mark_dirty`` explícitamente.
+    Dentro de ``batch()`` los días se acumulan y se marcan una vez al salir.
+    """
+
+    # Días pendientes de marcar dentro de ``batch()`` (por hilo)
+    _deferred = threading.local()
+
+    # Días recalculados por transacción
+    REFRESH_BATCH_SIZE = 366
+
+    # Cheques que se han cobrado (los caducados por validez también se pagaron)
+    SOLD_VOUCHERS = Q(status__in=['paid', 'used']) | Q(status='expired', payment_date__isnull=False)
+
+    # ------------------------------------------------------------------
+    # Marcado de días
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def mark_dirty(*days: date) -> None:
+        """Marca los días indicados para recalcularlos en el próximo ``refresh``."""
+        days = {day for day in days if day is not None}
+        if not days:
+            return
+        pending = getattr(DailyStatsService._deferred, 'days', None)
+        if pending is not None:
+            pending.update(days)
+            return
+        updated = DailyStats.objects.filter(date__in=days).update(dirty=True)
+        if updated < len(days):
+            DailyStats.objects.bulk_create(
+                [DailyStats(date=day, dirty=True) for day in days],
+                ignore_conflicts=True,
+            )
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """
+        Agrupa el marcado de días del bloque en una sola actualización.
+
+        Evita dos consultas por reserva al borrar en cascada (por ejemplo, un
+        cliente con muchas reservas en días distintos).
+        """
+        if getattr(DailyStatsService._deferred, 'days', None) is not None:
+            yield
+            return
+        DailyStatsService._deferred.days = set()
+        try:
+            yield
+        finally:
+            days = DailyStatsService._deferred.days
+            DailyStatsService._deferred.days = None
+        DailyStatsService.mark_dirty(*days)
+
+    @staticmethod
+    def voucher_day(voucher: GiftVoucher) -> Optional[date]:
+        """Día (hora local) en el que cuenta la venta de un cheque."""
+        if voucher.created_at is None:
+            return None
+        return timezone.localtime(voucher.created_at).date()
+
+    @staticmethod
+    def connect_signals() -> None:
+        """Registra los receptores que marcan los días modificados (``AppConfig.ready``)."""
+
+        def remember_book_day(sender, instance, update_fields=None, **kwargs):
+            # Si la reserva cambia de fecha hay que recalcular también el día anterior.
+            # Sólo se consulta al guardar reservas existentes que pueden cambiar de fecha.
+            instance._stats_original_day = None
+            if instance._state.adding or instance.pk is None:
+                return
+            if update_fields is not None and 'book_date' not in update_fields:
+                return
+            instance._stats_original_day = (
+                Book.objects.filter(pk=instance.pk).values_list('book_date', flat=True).first()
+            )
+
+        def book_saved(sender, instance, **kwargs):
+            DailyStatsService.mark_dirty(
+                getattr(instance, '_stats_original_day', None), instance.book_date
+            )
+
+        def book_deleted(sender, instance, **kwargs):
+            DailyStatsService.mark_dirty(instance.book_date)
+
+        def voucher_changed(sender, instance, **kwargs):
+            DailyStatsService.mark_dirty(DailyStatsService.voucher_day(instance))
+
+        pre_save.connect(remember_book_day, sender=Book, weak=False, dispatch_uid="daily_stats_book_pre_save")
+        post_save.connect(book_saved, sender=Book, weak=False, dispatch_uid="daily_stats_book_save")
+        post_delete.connect(book_deleted, sender=Book, weak=False, dispatch_uid="daily_stats_book_delete")
+        post_save.connect(voucher_changed, sender=GiftVoucher, weak=False, dispatch_uid="daily_stats_voucher_save")
+        post_delete.connect(voucher_changed, sender=GiftVoucher, weak=False, dispatch_uid="daily_stats_voucher_delete")
+
+    # ------------------------------------------------------------------
+    # Recálculo
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def stale_days(start: date, end: date) -> int:
+        """Días entre ``start`` y ``end`` marcados y aún sin recalcular."""
+        return DailyStats.objects.filter(dirty=True, date__range=(start, end)).count()
+
+    @staticmethod
+    def refresh(start: Optional[date] = None, end: Optional[date] = None, batch_size: int = None) -> int:
+        """
+        Recalcula los días marcados (opcionalmente sólo los de ``start``-``end``).
+
+        Returns:
+            Número de días recalculados
+        """
+        batch_size = batch_size or DailyStatsService.REFRESH_BATCH_SIZE
+        dirty = DailyStats.objects.filter(dirty=True)
+        if start is not None:
+            dirty = dirty.filter(date__gte=start)
+        if end is not None:
+            dirty = dirty.filter(date__lte=end)
+
+        total = 0
+        while True:
+            days = list(dirty.order_by('date').values_list('date', flat=True)[:batch_size])
+            if not days:
+                return total
+            DailyStatsService.rebuild_days(days)
+            total += len(days)
+
+    @staticmethod
+    def rebuild(start: date, end: date, batch_size: int = None) -> int:
+        """Recalcula todos los días entre ``start`` y ``end`` (ambos incluidos), marcados o no."""
+        batch_size = batch_size or DailyStatsService.REFRESH_BATCH_SIZE
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        for i in range(0, len(days), batch_size):
+            DailyStatsService.rebuild_days(days[i:i + batch_size])
+        return len(days)
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild_days(days: Iterable[date]) -> None:
+        """Agrega y guarda los días indicados, dejándolos como no ``dirty``."""
+        days = sorted(set(days))
+        if not days:
+            return
+
+        # Desmarcar antes de leer: un cambio concurrente volverá a marcar el día
+        DailyStats.objects.filter(date__in=days).update(dirty=False)
+
+        values = DailyStatsService._aggregate(days)
+        existing = DailyStats.objects.in_bulk(days, field_name='date')
+        fields = [
+            'bookings', 'people', 'revenue_paid', 'revenue_pending', 'massages_by_type',
+            'vouchers_sold', 'vouchers_sold_amount', 'vouchers_used', 'vouchers_used_amount',
+        ]
+        now = timezone.now()
+        to_update, to_create = [], []
+        for day in days:
+            row = existing.get(day) or DailyStats(date=day)
+            for field in fields:
+                setattr(row, field, values[day][field])
+            row.dirty = False
+            row.updated_at = now
+            (to_update if row.pk else to_create).append(row)
+
+        if to_update:
+            DailyStats.objects.bulk_update(to_update, fields + ['updated_at'])
+        if to_create:
+            DailyStats.objects.bulk_create(to_create)
+
+    @staticmethod
+    def _aggregate(days: List[date]) -> Dict[date, Dict]:
+        """Calcula las cifras de los días indicados (tres consultas)."""
+        values = {
+            day: {
+                'bookings': 0, 'people': 0,
+                'revenue_paid': Decimal('0.00'), 'revenue_pending': Decimal('0.00'),
+                'massages_by_type': {},
+                'vouchers_sold': 0, 'vouchers_sold_amount': Decimal('0.00'),
+                'vouchers_used': 0, 'vouchers_used_amount': Decimal('0.00'),
+            }
+            for day in days
+        }
+
+        voucher_type_id = ContentType.objects.get_for_model(GiftVoucher).id
+        redeemed = Q(creator_type_id=voucher_type_id)
+        books = Book.objects.filter(book_date__in=days).order_by()
+        rows = books.values('book_date').annotate(
+            bookings=Count('id'),
+            people=Sum('people'),
+            # Lo cobrado por un canje ya cuenta como venta del cheque
+            revenue_paid=Sum('amount_paid', filter=~redeemed),
+            revenue_pending=Sum('amount_pending'),
+            vouchers_used=Count('id', filter=redeemed),
+            vouchers_used_amount=Sum('amount_paid', filter=redeemed),
+        )
+        for row in rows:
+            day = values[row.pop('book_date')]
+            day.update({key: value for key, value in row.items() if value is not None})
+
+        massages = (
+            books.filter(product__baths__isnull=False)
+            .values('book_date', massage_type=F('product__baths__bath_type__massage_type'))
+            .annotate(total=Sum('product__baths__quantity'))
+        )
+        for row in massages:
+            values[row['book_date']]['massages_by_type'][row['massage_type']] = row['total']
+
+        tz = timezone.get_current_timezone()
+        vouchers = (
+            GiftVoucher.objects
+            .filter(DailyStatsService.SOLD_VOUCHERS)
+            .filter(
+                created_at__gte=timezone.make_aware(datetime.combine(days[0], time.min), tz),
+                created_at__lt=timezone.make_aware(datetime.combine(days[-1] + timedelta(days=1), time.min), tz),
+            )
+            .order_by()
+            .annotate(day=TruncDate('created_at', tzinfo=tz))
+            .values('day')
+            .annotate(sold=Count('id'), amount=Sum('price'))
+        )
+        for row in vouchers:
+            if row['day'] in values:
+                values[row['day']]['vouchers_sold'] = row['sold']
+                values[row['day']]['vouchers_sold_amount'] = row['amount'] or Decimal('0.00')
+
+        return values
@@ -0,0 +1,255 @@
+import math
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.db import transaction
+
+from reservations.dtos.availability import AvailabilityDTO, AvailabilityRangeDTO
+from reservations.managers.availability import AvailabilityManager
+from reservations.models import Availability
+from reservations.services.occupancy import OccupancyService
+
+
+class MassagistForecastService:
+    """
+    Previsión de demanda de masajes y masajistas recomendados por tramo.
+
+    El modelo es estacional por día de la semana y tramo de 30 minutos: la
+    demanda prevista de cada ``(weekday, tramo)`` es la media con decaimiento
+    exponencial (semivida en semanas) de los minutos de masaje de ese mismo
+    tramo en las semanas anteriores, y su dispersión la desviación típica con
+    los mismos pesos. Todo se calcula sobre un array ``semanas × 7 × tramos``.
+
+    Los masajistas recomendados cubren la demanda prevista más ``safety``
+    desviaciones con una ocupación objetivo por masajista; en cada
+    ``AvailabilityRange`` se recomienda el máximo de sus tramos.
+    """
+
+    HISTORY_WEEKS = 26
+    HALF_LIFE_WEEKS = 4.0
+    SAFETY = 1.0
+    TARGET_UTILIZATION = 0.85
+
+    # ------------------------------------------------------------------
+    # Datos
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _week_start(day: date) -> date:
+        return day - timedelta(days=day.weekday())
+
+    @staticmethod
+    def load_history(first_monday: date, weeks: int) -> np.ndarray:
+        """Minutos de masaje como array ``semanas × 7 × tramos`` desde ``first_monday``."""
+        n_days = weeks * 7
+        end = first_monday + timedelta(days=n_days - 1)
+        bookings = OccupancyService.load_bookings(first_monday, end)
+        grid = OccupancyService.massage_grid(bookings, n_days)
+        return grid.reshape(weeks, 7, OccupancyService.SLOTS_PER_DAY).astype(float)
+
+    # ------------------------------------------------------------------
+    # Modelo
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def fit(history: np.ndarray, half_life: float = HALF_LIFE_WEEKS) -> Dict[str, np.ndarray]:
+        """Media y desviación típica ponderadas por semana (``7 × tramos``)."""
+        n_weeks = history.shape[0]
+        ages = np.arange(n_weeks - 1, -1, -1, dtype=float)
+        weights = 0.5 ** (ages / half_life)
+        weights /= weights.sum()
+        mean = np.tensordot(weights, history, axes=1)
+        variance = np.tensordot(weights, (history - mean) ** 2, axes=1)
+        return {'mean': mean, 'std': np.sqrt(variance)}
+
+    @staticmethod
+    def recommend(
+        model: Dict[str, np.ndarray],
+        safety: float = SAFETY,
+        target_utilization: float = TARGET_UTILIZATION,
+    ) -> np.ndarray:
+        """Masajistas recomendados por ``weekday × tramo`` (enteros)."""
+        demand = model['mean'] + safety * model['std']
+        capacity_per_massagist = OccupancyService.SLOT_MINUTES * target_utilization
+        return np.ceil(np.round(demand / capacity_per_massagist, 6)).astype(int)
+
+    # ------------------------------------------------------------------
+    # Previsión
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def forecast(
+        weeks: int = 4,
+        history_weeks: int = HISTORY_WEEKS,
+        half_life: float = HALF_LIFE_WEEKS,
+        safety: float = SAFETY,
+        target_utilization: float = TARGET_UTILIZATION,
+        today: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """
+        Previsión para las próximas ``weeks`` semanas (desde el lunes siguiente).
+
+        Returns:
+            ``weeks`` (lunes de cada semana prevista), ``slots`` y, por día de la
+            semana, la demanda prevista por tramo y los rangos vigentes con los
+            masajistas actuales y los recomendados
+        """
+        today = today or date.today()
+        next_monday = MassagistForecastService._week_start(today) + timedelta(days=7)
+        first_monday = next_monday - timedelta(days=7 * history_weeks)
+        history = MassagistForecastService.load_history(first_monday, history_weeks)
+        model = MassagistForecastService.fit(history, half_life)
+        recommended = MassagistForecastService.recommend(model, safety, target_utilization)
+
+        # Rangos vigentes en la primera semana prevista
+        ranges_by_day = AvailabilityManager.get_ranges_for_period(next_monday, next_monday + timedelta(days=6))
+
+        weekdays = []
+        for w in range(7):
+            day = next_monday + timedelta(days=w)
+            ranges = []
+            for r in sorted(ranges_by_day[day], key=lambda r: r.initial_time):
+                first, last = OccupancyService.slot_bounds(r.initial_time, r.end_time)
+                ranges.append({
+                    'initial_time': r.initial_time,
+                    'end_time': r.end_time,
+                    'current_massagists': r.massagists_availability,
+                    'recommended_massagists': int(recommended[w, first:last].max(initial=0)),
+                    'expected_minutes': round(float(model['mean'][w, first:last].sum()), 1),
+                })
+            weekdays.append({
+                'weekday': w + 1,
+                'expected_minutes': [round(v, 1) for v in model['mean'][w].tolist()],
+                'recommended_massagists': recommended[w].tolist(),
+                'ranges': ranges,
+            })
+
+        return {
+            'history_start': first_monday,
+            'history_weeks': history_weeks,
+            'weeks': [next_monday + timedelta(days=7 * i) for i in range(weeks)],
+            'slots': [OccupancyService.slot_label(s) for s in range(OccupancyService.SLOTS_PER_DAY)],
+            'weekdays': weekdays,
+        }
+
+    @staticmethod
+    def export_draft_versions(
+        forecast: Dict[str, Any],
+        weekdays: Optional[List[int]] = None,
+        effective_date: Optional[date] = None,
+    ) -> List[Availability]:
+        """
+        Crea borradores de versiones por weekday con los masajistas recomendados.
+
+        Se usan los mismos rangos horarios de la versión vigente y sólo cambia
+        ``massagists_availability``. Por defecto la fecha efectiva es la primera
+        semana prevista. Los borradores no aplican hasta que el staff los
+        publica (``AvailabilityManager.publish_draft_versions``).
+
+        Exportar de nuevo con la misma fecha sustituye las versiones de la
+        previsión para esos weekdays en lugar de acumularlas; las versiones
+        creadas a mano no se tocan.
+        """
+        effective_date = effective_date or forecast['weeks'][0]
+        entries = [
+            entry for entry in forecast['weekdays']
+            if entry['ranges'] and (not weekdays or entry['weekday'] in weekdays)
+        ]
+        created = []
+        with transaction.atomic():
+            AvailabilityManager.delete_forecast_versions(
+                [entry['weekday'] for entry in entries], effective_date
+            )
+            for entry in entries:
+                ranges = [
+                    AvailabilityRangeDTO(
+                        initial_time=r['initial_time'],
+                        end_time=r['end_time'],
+                        massagists_availability=r['recommended_massagists'],
+                    )
+                    for r in entry['ranges']
+                ]
+                created.append(AvailabilityManager.create_new_weekday_availability_version(
+                    entry['weekday'], ranges, effective_date,
+                    source=AvailabilityDTO.SOURCE_FORECAST, is_draft=True,
+                ))
+        return created
+
+    # ------------------------------------------------------------------
+    # Backtest
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def backtest(
+        folds: int = 8,
+        history_weeks: int = HISTORY_WEEKS,
+        half_life: float = HALF_LIFE_WEEKS,
+        safety: float = SAFETY,
+        target_utilization: float = TARGET_UTILIZATION,
+        today: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """
+        Validación con origen móvil sobre las últimas ``folds`` semanas completas.
+
+        Para cada semana se ajusta el modelo con las ``history_weeks`` anteriores
+        y se compara con lo ocurrido, junto a la referencia ingenua "igual que
+        la semana pasada". Métricas:
+
+        - ``mae``: error absoluto medio en minutos por tramo;
+        - ``wape``: error absoluto total / minutos reales;
+        - ``coverage``: tramos con demanda en los que los masajistas recomendados
+          cubren los necesarios (``ceil(minutos reales / 30)``);
+        - ``overstaffing``: masajistas recomendados de más por tramo, de media.
+        """
+        today = today or date.today()
+        last_monday = MassagistForecastService._week_start(today)
+        first_monday = last_monday - timedelta(days=7 * (history_weeks + folds))
+        data = MassagistForecastService.load_history(first_monday, history_weeks + folds)
+
+        slot_minutes = OccupancyService.SLOT_MINUTES
+        results = []
+        for k in range(folds):
+            history = data[k:k + history_weeks]
+            actual = data[k + history_weeks]
+            model = MassagistForecastService.fit(history, half_life)
+            recommended = MassagistForecastService.recommend(model, safety, target_utilization)
+            needed = np.ceil(actual / slot_minutes)
+            busy = actual > 0
+
+            results.append({
+                'week': first_monday + timedelta(days=7 * (k + history_weeks)),
+                'actual_minutes': float(actual.sum()),
+                'model': MassagistForecastService._errors(model['mean'], actual),
+                'naive': MassagistForecastService._errors(history[-1], actual),
+                'coverage': float((recommended[busy] >= needed[busy]).mean()) if busy.any() else None,
+                'overstaffing': float(np.clip(recommended - needed, 0, None)[busy].mean()) if busy.any() else None,
+            })
+
+        def average(values):
+            values = [v for v in values if v is not None and not math.isnan(v)]
+            return round(sum(values) / len(values), 4) if values else None
+
+        return {
+            'folds': folds,
+            'history_weeks': history_weeks,
+            'half_life': half_life,
+            'weeks': results,
+            'summary': {
+                'model_mae': average(r['model']['mae'] for r in results),
+                'model_wape': average(r['model']['wape'] for r in results),
+                'naive_mae': average(r['naive']['mae'] for r in results),
+                'naive_wape': average(r['naive']['wape'] for r in results),
+                'coverage': average(r['coverage'] for r in results),
+                'overstaffing': average(r['overstaffing'] for r in results),
+            },
+        }
+
+    @staticmethod
+    def _errors(predicted: np.ndarray, actual: np.ndarray) -> Dict[str, Optional[float]]:
+        error = np.abs(predicted - actual)
+        total = actual.sum()
+        return {
+            'mae': round(float(error.mean()), 4),
+            'wape': round(float(error.sum() / total), 4) if total else None,
+        }
@@ -1,6 +1,8 @@
+import time
 from django.db.models import Q
 from typing import List, Dict, Any, Optional
 from reservations.models import Client, Book, GiftVoucher
+from reservations.services.metrics import MetricsService
 
 
 class GeneralSearchService:
@@ -25,6 +27,7 @@ class GeneralSearchService:
             }
         
         term = term.strip()
+        started = time.perf_counter()
         
         # Buscar en clientes
         clients = GeneralSearchService._search_clients(term)
@@ -35,6 +38,7 @@ class GeneralSearchService:
         # Buscar en cheques regalo
         gift_vouchers = GeneralSearchService._search_gift_vouchers(term)
         
+        MetricsService.observe('general_search_duration_seconds', time.perf_counter() - started)
         return {
             'clients': clients,
             'bookings': bookings,
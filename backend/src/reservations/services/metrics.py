@@ -0,0 +1,291 @@
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+# Clave de una serie: (métrica, ((etiqueta, valor), ...)) con las etiquetas ordenadas
+SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class MetricsService:
+    """
+    Métricas de la aplicación en formato de texto de Prometheus (``/metrics``).
+
+    Cada proceso acumula sus contadores e histogramas en memoria. Con
+    ``METRICS_DIR`` definido (varios workers de gunicorn), cada proceso vuelca
+    su estado a ``<dir>/<pid>-<arranque>.json`` como mucho cada
+    ``METRICS_FLUSH_SECONDS`` y al salir, y ``/metrics`` suma los ficheros de
+    todos los procesos, de modo que cualquier worker devuelve el total. Los
+    ficheros de procesos que ya no existen se fusionan en ``_dead.json`` para
+    que los contadores no retrocedan al reciclar workers.
+
+    Sin ``METRICS_DIR`` sólo se exponen las métricas del propio proceso.
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+    # nombre → (tipo, ayuda, buckets de los histogramas)
+    DEFINITIONS = {
+        'http_request_duration_seconds': (
+            'histogram', "Duración de las peticiones HTTP por ruta, método y código", LATENCY_BUCKETS,
+        ),
+        'http_request_db_queries': ('histogram', "Consultas SQL por petición", QUERY_BUCKETS),
+        'http_request_db_seconds': ('histogram', "Tiempo en base de datos por petición", LATENCY_BUCKETS),
+        'booking_capacity_rejections_total': (
+            'counter', "Reservas de staff rechazadas por falta de aforo", None,
+        ),
+        'product_signature_lookups_total': (
+            'counter', "Búsquedas de producto por composición de baños (hit: se reutiliza uno existente)", None,
+        ),
+        'general_search_duration_seconds': ('histogram', "Duración de la búsqueda general", LATENCY_BUCKETS),
+        'gift_voucher_redemptions_total': ('counter', "Canjes de cheques regalo por resultado", None),
+    }
+
+    DEAD_FILE = '_dead.json'
+    LOCK_FILE = '_lock'
+
+    _lock = threading.Lock()
+    _pid: Optional[int] = None
+    _file: Optional[Path] = None
+    _counters: Dict[SeriesKey, float] = {}
+    # Por serie: recuentos por bucket (no acumulados, el último es +Inf), suma y total
+    _histograms: Dict[SeriesKey, List[float]] = {}
+    _last_flush = 0.0
+    _dirty = False
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def inc(name: str, value: float = 1, **labels: str) -> None:
+        """Incrementa un contador."""
+        key = MetricsService._key(name, labels)
+        with MetricsService._lock:
+            MetricsService._check_process()
+            MetricsService._counters[key] = MetricsService._counters.get(key, 0) + value
+            MetricsService._dirty = True
+        MetricsService._maybe_flush()
+
+    @staticmethod
+    def observe(name: str, value: float, **labels: str) -> None:
+        """Añade una observación a un histograma."""
+        MetricsService.observe_many([(name, value, labels)])
+
+    @staticmethod
+    def observe_many(observations: Iterable[Tuple[str, float, Dict[str, str]]]) -> None:
+        """Varias observaciones con un único bloqueo (una petición registra tres)."""
+        with MetricsService._lock:
+            MetricsService._check_process()
+            for name, value, labels in observations:
+                buckets = MetricsService.DEFINITIONS[name][2]
+                key = MetricsService._key(name, labels)
+                series = MetricsService._histograms.get(key)
+                if series is None:
+                    series = MetricsService._histograms[key] = [0.0] * (len(buckets) + 3)
+                series[bisect_left(buckets, value)] += 1
+                series[-2] += value
+                series[-1] += 1
+            MetricsService._dirty = True
+        MetricsService._maybe_flush()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> SeriesKey:
+        if name not in MetricsService.DEFINITIONS:
+            raise KeyError(f"Métrica no definida: {name}")
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    @staticmethod
+    def _check_process() -> None:
+        """Tras un ``fork`` (gunicorn con ``--preload``) el hijo empieza de cero."""
+        pid = os.getpid()
+        if MetricsService._pid != pid:
+            MetricsService._pid = pid
+            MetricsService._file = None
+            MetricsService._counters = {}
+            MetricsService._histograms = {}
+            MetricsService._last_flush = time.monotonic()
+
+    @staticmethod
+    def reset() -> None:
+        """Vacía las métricas del proceso (pruebas)."""
+        with MetricsService._lock:
+            MetricsService._pid = None
+            MetricsService._check_process()
+
+    # ------------------------------------------------------------------
+    # Multiproceso
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _directory() -> Optional[Path]:
+        directory = getattr(settings, 'METRICS_DIR', None)
+        return Path(directory) if directory else None
+
+    @staticmethod
+    def _maybe_flush() -> None:
+        interval = getattr(settings, 'METRICS_FLUSH_SECONDS', 1.0)
+        if MetricsService._directory() and time.monotonic() - MetricsService._last_flush >= interval:
+            MetricsService.flush()
+
+    @staticmethod
+    def flush() -> None:
+        """Vuelca el estado del proceso a su fichero (escritura atómica)."""
+        directory = MetricsService._directory()
+        if directory is None:
+            return
+        with MetricsService._lock:
+            MetricsService._check_process()
+            MetricsService._last_flush = time.monotonic()
+            if not MetricsService._dirty and MetricsService._file is not None:
+                return
+            state = MetricsService._dump(MetricsService._counters, MetricsService._histograms)
+            MetricsService._dirty = False
+            if MetricsService._file is None:
+                directory.mkdir(parents=True, exist_ok=True)
+                MetricsService._file = directory / f"{MetricsService._pid}-{time.time_ns()}.json"
+            tmp = MetricsService._file.with_suffix('.tmp')
+            tmp.write_text(state)
+            os.replace(tmp, MetricsService._file)
+
+    @staticmethod
+    def _dump(counters: Dict[SeriesKey, float], histograms: Dict[SeriesKey, List[float]]) -> str:
+        return json.dumps({
+            'counters': [[name, list(map(list, labels)), value] for (name, labels), value in counters.items()],
+            'histograms': [[name, list(map(list, labels)), series] for (name, labels), series in histograms.items()],
+        })
+
+    @staticmethod
+    def _merge(state: dict, counters: Dict[SeriesKey, float], histograms: Dict[SeriesKey, List[float]]) -> None:
+        """Suma el estado volcado por ``_dump`` sobre ``counters`` e ``histograms``."""
+        MetricsService._combine(
+            counters, histograms,
+            {(name, tuple(map(tuple, labels))): value for name, labels, value in state.get('counters', [])},
+            {(name, tuple(map(tuple, labels))): series for name, labels, series in state.get('histograms', [])},
+        )
+
+    @staticmethod
+    def _combine(counters, histograms, other_counters, other_histograms) -> None:
+        for key, value in other_counters.items():
+            counters[key] = counters.get(key, 0) + value
+        for key, series in other_histograms.items():
+            current = histograms.get(key)
+            # Si cambian los buckets de una versión a otra se conserva la serie más reciente
+            if current is None or len(current) != len(series):
+                histograms[key] = list(series)
+            else:
+                histograms[key] = [a + b for a, b in zip(current, series)]
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @staticmethod
+    def _collect_files(directory: Path) -> Tuple[Dict[SeriesKey, float], Dict[SeriesKey, List[float]]]:
+        """Suma los ficheros de todos los procesos y fusiona los de procesos muertos."""
+        counters: Dict[SeriesKey, float] = {}
+        histograms: Dict[SeriesKey, List[float]] = {}
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / MetricsService.LOCK_FILE, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dead_path = directory / MetricsService.DEAD_FILE
+            dead_counters: Dict[SeriesKey, float] = {}
+            dead_histograms: Dict[SeriesKey, List[float]] = {}
+            if dead_path.exists():
+                MetricsService._merge(json.loads(dead_path.read_text()), dead_counters, dead_histograms)
+
+            dead_files = []
+            for path in directory.glob('*-*.json'):
+                try:
+                    state = json.loads(path.read_text())
+                except (OSError, ValueError):
+                    continue
+                pid = int(path.name.split('-', 1)[0])
+                if pid != os.getpid() and not MetricsService._pid_alive(pid):
+                    MetricsService._merge(state, dead_counters, dead_histograms)
+                    dead_files.append(path)
+                else:
+                    MetricsService._merge(state, counters, histograms)
+
+            if dead_files:
+                tmp = dead_path.with_suffix('.tmp')
+                tmp.write_text(MetricsService._dump(dead_counters, dead_histograms))
+                os.replace(tmp, dead_path)
+                for path in dead_files:
+                    path.unlink(missing_ok=True)
+
+        MetricsService._combine(counters, histograms, dead_counters, dead_histograms)
+        return counters, histograms
+
+    # ------------------------------------------------------------------
+    # Exposición
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def collect() -> Tuple[Dict[SeriesKey, float], Dict[SeriesKey, List[float]]]:
+        """Métricas de todos los procesos (o sólo del actual sin ``METRICS_DIR``)."""
+        directory = MetricsService._directory()
+        if directory is None:
+            with MetricsService._lock:
+                MetricsService._check_process()
+                return dict(MetricsService._counters), {k: list(v) for k, v in MetricsService._histograms.items()}
+        MetricsService.flush()
+        return MetricsService._collect_files(directory)
+
+    @staticmethod
+    def render() -> str:
+        """Texto en el formato de exposición de Prometheus 0.0.4."""
+        counters, histograms = MetricsService.collect()
+        lines = []
+        for name, (kind, help_text, buckets) in MetricsService.DEFINITIONS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'counter':
+                for (series_name, labels), value in sorted(counters.items()):
+                    if series_name == name:
+                        lines.append(f"{name}{MetricsService._labels(labels)} {MetricsService._number(value)}")
+                continue
+            for (series_name, labels), series in sorted(histograms.items()):
+                if series_name != name:
+                    continue
+                cumulative = 0.0
+                for bound, count in zip(list(buckets) + ['+Inf'], series[:-2]):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else MetricsService._number(bound)
+                    lines.append(
+                        f"{name}_bucket{MetricsService._labels(labels + (('le', le),))} {MetricsService._number(cumulative)}"
+                    )
+                lines.append(f"{name}_sum{MetricsService._labels(labels)} {MetricsService._number(series[-2])}")
+                lines.append(f"{name}_count{MetricsService._labels(labels)} {MetricsService._number(series[-1])}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{key}="{MetricsService._escape(value)}"' for key, value in labels) + '}'
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+    @staticmethod
+    def _number(value: float) -> str:
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+atexit.register(MetricsService.flush)
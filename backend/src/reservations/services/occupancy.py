@@ -0,0 +1,230 @@
+import math
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, IntegerField, Sum, Value
+from django.db.models.functions import Cast, Coalesce, ExtractHour, ExtractMinute
+
+from reservations.managers.availability import AvailabilityManager
+from reservations.models import Book, Capacity
+
+
+class OccupancyService:
+    """
+    Mapa de calor de ocupación (día de la semana × tramo de 30 minutos).
+
+    Las reservas del periodo se leen en una única consulta como columnas
+    numéricas ``(día, tramo, personas, minutos de masaje)`` y todo el cálculo se
+    hace con arrays de NumPy sobre una rejilla ``días × tramos``:
+
+    - personas que empiezan en cada tramo frente al ``Capacity`` (el aforo se
+      valida por hora de inicio, igual que al crear reservas);
+    - minutos de masaje frente a ``massagists_availability × 30`` del
+      ``AvailabilityRange`` vigente cada día. Los minutos de una reserva se
+      reparten en tramos consecutivos de 30 minutos desde su hora de inicio.
+
+    Los días sin reservas cuentan como ceros, así que medias y percentiles son
+    por día del calendario y no por día con actividad.
+    """
+
+    SLOT_MINUTES = 30
+    SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+    PERCENTILES = (50, 90)
+    CACHE_KEY = "occupancy_heatmap:{start}:{end}"
+
+    # ------------------------------------------------------------------
+    # Carga de datos
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def load_bookings(start: date, end: date) -> Dict[str, np.ndarray]:
+        """Columnas ``day`` (índice desde ``start``), ``slot``, ``people`` y ``minutes``."""
+        rows = (
+            Book.objects
+            .filter(book_date__range=(start, end))
+            .order_by()
+            .values('id')
+            .annotate(
+                massage_minutes=Coalesce(
+                    Sum(
+                        Cast('product__baths__bath_type__massage_duration', IntegerField())
+                        * F('product__baths__quantity')
+                    ),
+                    Value(0),
+                ),
+            )
+            .values_list('book_date', ExtractHour('hour'), ExtractMinute('hour'), 'people', 'massage_minutes')
+        )
+        rows = list(rows)
+        if not rows:
+            empty = np.zeros(0, dtype=np.int64)
+            return {'day': empty, 'slot': empty, 'people': empty, 'minutes': empty}
+
+        dates, hours, minutes, people, massage = zip(*rows)
+        day = (np.array(dates, dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+        slot = np.array(hours, dtype=np.int64) * (60 // OccupancyService.SLOT_MINUTES) \
+            + np.array(minutes, dtype=np.int64) // OccupancyService.SLOT_MINUTES
+        return {
+            'day': day,
+            'slot': slot,
+            'people': np.array(people, dtype=np.int64),
+            'minutes': np.array(massage, dtype=np.int64),
+        }
+
+    @staticmethod
+    def massagist_grid(start: date, n_days: int) -> np.ndarray:
+        """Masajistas disponibles por ``día × tramo`` según los rangos vigentes."""
+        grid = np.zeros((n_days, OccupancyService.SLOTS_PER_DAY), dtype=np.int64)
+        ranges_by_day = AvailabilityManager.get_ranges_for_period(start, start + timedelta(days=n_days - 1))
+        for day, ranges in ranges_by_day.items():
+            row = grid[(day - start).days]
+            for r in ranges:
+                first, last = OccupancyService.slot_bounds(r.initial_time, r.end_time)
+                row[first:last] = r.massagists_availability
+        return grid
+
+    @staticmethod
+    def slot_bounds(initial_time, end_time) -> Tuple[int, int]:
+        """Tramos ``[primero, último)`` cubiertos por un rango horario."""
+        first = (initial_time.hour * 60 + initial_time.minute) // OccupancyService.SLOT_MINUTES
+        end_minutes = end_time.hour * 60 + end_time.minute
+        last = -(-end_minutes // OccupancyService.SLOT_MINUTES)
+        if last <= first:  # rangos que acaban a medianoche
+            last = OccupancyService.SLOTS_PER_DAY
+        return first, last
+
+    # ------------------------------------------------------------------
+    # Rejillas
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def people_grid(bookings: Dict[str, np.ndarray], n_days: int) -> np.ndarray:
+        """Personas que empiezan en cada ``día × tramo``."""
+        grid = np.zeros((n_days, OccupancyService.SLOTS_PER_DAY), dtype=np.int64)
+        np.add.at(grid, (bookings['day'], bookings['slot']), bookings['people'])
+        return grid
+
+    @staticmethod
+    def massage_grid(bookings: Dict[str, np.ndarray], n_days: int) -> np.ndarray:
+        """Minutos de masaje por ``día × tramo`` (repartidos en tramos de 30 minutos)."""
+        step = OccupancyService.SLOT_MINUTES
+        grid = np.zeros((n_days, OccupancyService.SLOTS_PER_DAY), dtype=np.int64)
+        remaining = bookings['minutes'].copy()
+        offset = 0
+        while remaining.any():
+            chunk = np.minimum(remaining, step)
+            slot = bookings['slot'] + offset
+            inside = (chunk > 0) & (slot < OccupancyService.SLOTS_PER_DAY)
+            np.add.at(grid, (bookings['day'][inside], slot[inside]), chunk[inside])
+            remaining -= chunk
+            offset += 1
+        return grid
+
+    @staticmethod
+    def weekday_index(start: date, n_days: int) -> np.ndarray:
+        """Día de la semana (0=lunes ... 6=domingo) de cada fila de la rejilla."""
+        return (np.arange(n_days) + start.weekday()) % 7
+
+    # ------------------------------------------------------------------
+    # Mapa de calor
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def build_heatmap(start: date, end: date) -> Dict[str, Any]:
+        """Calcula el mapa de calor entre ``start`` y ``end`` (ambos incluidos)."""
+        n_days = (end - start).days + 1
+        bookings = OccupancyService.load_bookings(start, end)
+        people = OccupancyService.people_grid(bookings, n_days)
+        massage = OccupancyService.massage_grid(bookings, n_days)
+        massagists = OccupancyService.massagist_grid(start, n_days)
+        weekday = OccupancyService.weekday_index(start, n_days)
+
+        capacity_row = Capacity.objects.first()
+        capacity = capacity_row.value if capacity_row else None
+
+        # Sólo las columnas con reservas o con masajistas en algún día
+        active = np.flatnonzero(people.any(axis=0) | massage.any(axis=0) | massagists.any(axis=0))
+        if active.size:
+            active = np.arange(active[0], active[-1] + 1)
+        people, massage, massagists = people[:, active], massage[:, active], massagists[:, active]
+
+        shape = (7, active.size)
+        mean = np.full(shape, np.nan)
+        percentiles = {p: np.full(shape, np.nan) for p in OccupancyService.PERCENTILES}
+        maximum = np.full(shape, np.nan)
+        saturated = np.full(shape, np.nan)
+        massagist_utilization = np.full(shape, np.nan)
+        days_per_weekday = np.bincount(weekday, minlength=7)
+
+        for w in range(7):
+            rows = weekday == w
+            if not rows.any() or not active.size:
+                continue
+            people_w = people[rows]
+            mean[w] = people_w.mean(axis=0)
+            maximum[w] = people_w.max(axis=0)
+            for p, values in zip(
+                OccupancyService.PERCENTILES,
+                np.percentile(people_w, OccupancyService.PERCENTILES, axis=0),
+            ):
+                percentiles[p][w] = values
+            if capacity:
+                saturated[w] = (people_w >= capacity).mean(axis=0)
+
+            offered = massagists[rows].sum(axis=0) * OccupancyService.SLOT_MINUTES
+            used = massage[rows].sum(axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                massagist_utilization[w] = np.where(offered > 0, used / offered, np.nan)
+
+        capacity_utilization = mean / capacity if capacity else np.full(shape, np.nan)
+
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'capacity': capacity,
+            'weekdays': list(range(1, 8)),
+            'days_per_weekday': days_per_weekday.tolist(),
+            'slots': [OccupancyService.slot_label(slot) for slot in active.tolist()],
+            'bookings': int(bookings['day'].size),
+            'people_mean': OccupancyService._to_json(mean),
+            **{f'people_p{p}': OccupancyService._to_json(values) for p, values in percentiles.items()},
+            'people_max': OccupancyService._to_json(maximum),
+            'capacity_utilization': OccupancyService._to_json(capacity_utilization),
+            'saturated_share': OccupancyService._to_json(saturated),
+            'massagist_utilization': OccupancyService._to_json(massagist_utilization),
+        }
+
+    @staticmethod
+    def get_heatmap(months: int = 3, end: Optional[date] = None, refresh: bool = False) -> Dict[str, Any]:
+        """Mapa de calor de los últimos ``months`` meses, cacheado como JSON."""
+        end = end or date.today()
+        start = end - timedelta(days=round(months * 365.25 / 12)) + timedelta(days=1)
+        key = OccupancyService.CACHE_KEY.format(start=start.isoformat(), end=end.isoformat())
+        if not refresh:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        heatmap = OccupancyService.build_heatmap(start, end)
+        cache.set(key, heatmap, getattr(settings, 'OCCUPANCY_HEATMAP_CACHE_SECONDS', 3600))
+        return heatmap
+
+    # ------------------------------------------------------------------
+    # Utilidades
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def slot_label(slot: int) -> str:
+        minutes = slot * OccupancyService.SLOT_MINUTES
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    @staticmethod
+    def _to_json(matrix: np.ndarray) -> List[List[Optional[float]]]:
+        """Redondea a 3 decimales y convierte ``NaN`` en ``None``."""
+        rounded = np.round(matrix.astype(float), 3)
+        return [
+            [None if math.isnan(value) else value for value in row]
+            for row in rounded.tolist()
+        ]
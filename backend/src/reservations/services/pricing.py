@@ -0,0 +1,123 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from reservations.models import BathType, ProductBaths
+
+
+class PricingService:
+    """
+    Presupuestos de carritos de baños/masajes en bloque.
+
+    Los precios de ``BathType`` se leen una sola vez y se pasan a céntimos
+    enteros, de modo que todas las sumas son exactas sin crear un ``Decimal``
+    por operación; el total se vuelve a convertir a ``Decimal`` al final. Los
+    productos equivalentes se buscan con una única consulta para todos los
+    carritos.
+
+    A diferencia de ``OccupancyService`` no se usa NumPy: cada carrito tiene
+    sólo unas pocas líneas que hay que validar una a una, y las sumas con
+    enteros de Python ya son exactas y más baratas que montar arrays.
+    """
+
+    MAX_CARTS = 500
+
+    @staticmethod
+    def _to_cents(value: Decimal) -> int:
+        return int((Decimal(value) * 100).to_integral_value())
+
+    @staticmethod
+    def _from_cents(cents: int) -> Decimal:
+        return (Decimal(cents) / 100).quantize(Decimal("0.01"))
+
+    @staticmethod
+    def load_price_table() -> Dict[Tuple[str, str], Tuple[int, int]]:
+        """Instantánea ``(tipo, minutos) -> (bath_type_id, precio en céntimos)``."""
+        return {
+            (massage_type, duration): (bath_type_id, PricingService._to_cents(price))
+            for bath_type_id, massage_type, duration, price in BathType.objects.values_list(
+                'id', 'massage_type', 'massage_duration', 'price'
+            )
+        }
+
+    @staticmethod
+    def quote_carts(carts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Calcula el total de cada carrito y el producto existente equivalente.
+
+        Args:
+            carts: Lista de ``{"id": opcional, "baths": [{"massage_type", "minutes", "quantity"}]}``
+
+        Returns:
+            Un resultado por carrito, en el mismo orden, con ``total``, ``lines``,
+            ``product_id`` (``None`` si no hay producto con la misma composición y
+            precio) y ``error`` (``None`` si el carrito es válido)
+        """
+        if len(carts) > PricingService.MAX_CARTS:
+            raise ValueError(f"No se pueden presupuestar más de {PricingService.MAX_CARTS} carritos a la vez")
+
+        price_table = PricingService.load_price_table()
+
+        quotes = []
+        for cart in carts:
+            quote = {'id': cart.get('id'), 'total': None, 'lines': [], 'product_id': None, 'error': None}
+            total_cents = 0
+            signature = []
+            for line in cart.get('baths') or []:
+                key = (line['massage_type'], str(line['minutes']))
+                quantity = int(line.get('quantity', 1))
+                if key not in price_table:
+                    quote['error'] = f"No existe el tipo de baño: {key[0]} de {key[1]} minutos"
+                    break
+                if quantity <= 0:
+                    quote['error'] = "La cantidad debe ser mayor que 0"
+                    break
+                bath_type_id, unit_cents = price_table[key]
+                total_cents += unit_cents * quantity
+                signature.append((key[0], key[1], quantity))
+                quote['lines'].append({
+                    'bath_type_id': bath_type_id,
+                    'massage_type': key[0],
+                    'minutes': key[1],
+                    'quantity': quantity,
+                    'unit_price': PricingService._from_cents(unit_cents),
+                    'subtotal': PricingService._from_cents(unit_cents * quantity),
+                })
+            else:
+                if not signature:
+                    quote['error'] = "Debe indicar al menos un tipo de baño/masaje"
+            if quote['error'] is None:
+                quote['total'] = PricingService._from_cents(total_cents)
+                quote['_signature'] = tuple(sorted(signature))
+            quotes.append(quote)
+
+        PricingService._attach_matching_products(quotes)
+        for quote in quotes:
+            quote.pop('_signature', None)
+        return quotes
+
+    @staticmethod
+    def _attach_matching_products(quotes: List[Dict[str, Any]]) -> None:
+        """Rellena ``product_id`` con el producto de igual precio y composición (una consulta)."""
+        totals = {quote['total'] for quote in quotes if quote['error'] is None}
+        if not totals:
+            return
+
+        compositions = defaultdict(list)
+        prices = {}
+        rows = ProductBaths.objects.filter(product__price__in=totals).values_list(
+            'product_id', 'product__price', 'bath_type__massage_type', 'bath_type__massage_duration', 'quantity'
+        )
+        for product_id, price, massage_type, duration, quantity in rows:
+            compositions[product_id].append((massage_type, duration, quantity))
+            prices[product_id] = price
+
+        # Igual que la búsqueda al crear reservas: el producto más antiguo que coincida
+        products_by_key: Dict[Tuple[Decimal, tuple], Optional[int]] = {}
+        for product_id in sorted(compositions):
+            key = (prices[product_id], tuple(sorted(compositions[product_id])))
+            products_by_key.setdefault(key, product_id)
+
+        for quote in quotes:
+            if quote['error'] is None:
+                quote['product_id'] = products_by_key.get((quote['total'], quote['_signature']))
@@ -0,0 +1,267 @@
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+from reservations.models import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+
+class SqlRecorder:
+    """``execute_wrapper`` que guarda cada consulta con su duración y origen."""
+
+    def __init__(self, max_queries: int):
+        self.max_queries = max_queries
+        self.queries: List[Dict[str, Any]] = []
+        self.total = 0
+        self.total_ms = 0.0
+        self._app_root = str(settings.BASE_DIR)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.total += 1
+            self.total_ms += elapsed
+            if len(self.queries) < self.max_queries:
+                self.queries.append({
+                    'sql': sql,
+                    'params': repr(params)[:500],
+                    'many': many,
+                    'ms': round(elapsed, 3),
+                    'origin': self._origin(),
+                })
+
+    def _origin(self) -> List[str]:
+        """Últimas líneas del código de la aplicación que lanzaron la consulta."""
+        frames = [
+            f"{frame.filename[len(self._app_root) + 1:]}:{frame.lineno} {frame.name}"
+            for frame in traceback.extract_stack(limit=60)
+            if frame.filename.startswith(self._app_root) and 'services/profiling' not in frame.filename
+        ]
+        return frames[-3:]
+
+
+class StackSampler:
+    """
+    Perfilador por muestreo: un hilo lee la pila del hilo de la petición cada
+    ``interval`` segundos y cuenta las pilas plegadas (formato de flamegraph).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def folded(self) -> str:
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def summary(self, limit: int) -> str:
+        """Funciones con más muestras propias (hoja de la pila)."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        lines = [f"{self.samples} muestras cada {self.interval * 1000:.1f} ms"]
+        lines += [f"{count:6d}  {leaf}" for leaf, count in leaves.most_common(limit)]
+        return '\n'.join(lines)
+
+
+class RequestProfilingService:
+    """
+    Perfilado bajo demanda de peticiones concretas.
+
+    Lo activa un usuario staff con la cabecera ``X-Profile`` o el parámetro
+    ``?_profile=`` (valor ``cprofile``, por defecto, o ``sample``). La
+    petición se ejecuta bajo el perfilador, se registran todas sus consultas
+    SQL y se guarda un ``RequestProfile`` con el volcado, la lista de
+    consultas y las repetidas:
+
+    - duplicadas: mismo SQL y mismos parámetros;
+    - similares: mismo SQL con distintos parámetros (típico N+1).
+
+    Sin la cabecera ni el parámetro la petición no pasa por aquí (ver
+    ``RequestProfilingMiddleware``).
+    """
+
+    HEADER = 'HTTP_X_PROFILE'
+    QUERY_FLAG = '_profile'
+    MODES = ('cprofile', 'sample')
+    SUMMARY_LINES = 30
+
+    # ------------------------------------------------------------------
+    # Activación
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def requested_mode(request) -> Optional[str]:
+        """Modo pedido por un usuario staff, o ``None`` si no hay que perfilar."""
+        value = request.META.get(RequestProfilingService.HEADER)
+        if value is None:
+            value = request.GET.get(RequestProfilingService.QUERY_FLAG)
+        if value is None or value.lower() in ('', '0', 'false', 'no'):
+            return None
+        user = getattr(request, 'user', None)
+        if not (user and user.is_active and user.is_staff):
+            return None
+        value = value.lower()
+        return value if value in RequestProfilingService.MODES else 'cprofile'
+
+    # ------------------------------------------------------------------
+    # Perfilado
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def profile(request, get_response: Callable, mode: str):
+        """Ejecuta ``get_response`` bajo el perfilador y guarda el informe."""
+        recorder = SqlRecorder(getattr(settings, 'REQUEST_PROFILE_MAX_QUERIES', 2000))
+        profiler = cProfile.Profile() if mode == 'cprofile' else None
+        sampler = None if profiler else StackSampler(getattr(settings, 'REQUEST_PROFILE_SAMPLE_INTERVAL', 0.005))
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            if profiler:
+                profiler.enable()
+            else:
+                sampler.start()
+            try:
+                response = get_response(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+                else:
+                    sampler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            report = RequestProfilingService._save(
+                request, response, mode, duration_ms, recorder, profiler, sampler
+            )
+        except Exception:  # el perfil nunca debe romper la respuesta
+            logger.exception("No se pudo guardar el perfil de %s", request.path)
+            return response
+        response['X-Profile-Id'] = str(report.id)
+        return response
+
+    @staticmethod
+    def analyze_queries(queries: List[Dict[str, Any]]) -> Tuple[int, int, List[Dict[str, Any]]]:
+        """
+        Marca cada consulta con su número de repeticiones.
+
+        Returns:
+            (consultas duplicadas de más, consultas similares de más, grupos repetidos
+            ordenados por tiempo total)
+        """
+        exact = Counter((q['sql'], q['params']) for q in queries)
+        similar = Counter(q['sql'] for q in queries)
+        time_by_sql: Dict[str, float] = {}
+        for q in queries:
+            q['duplicates'] = exact[(q['sql'], q['params'])]
+            q['similar'] = similar[q['sql']]
+            time_by_sql[q['sql']] = time_by_sql.get(q['sql'], 0.0) + q['ms']
+
+        duplicate_count = sum(n - 1 for n in exact.values())
+        similar_count = sum(n - 1 for n in similar.values()) - duplicate_count
+        groups = sorted(
+            (
+                {'sql': sql, 'count': n, 'ms': round(time_by_sql[sql], 3)}
+                for sql, n in similar.items() if n > 1
+            ),
+            key=lambda g: -g['ms'],
+        )
+        return duplicate_count, similar_count, groups
+
+    @staticmethod
+    def _save(request, response, mode, duration_ms, recorder, profiler, sampler) -> RequestProfile:
+        duplicate_count, similar_count, groups = RequestProfilingService.analyze_queries(recorder.queries)
+        limit = RequestProfilingService.SUMMARY_LINES
+
+        if profiler:
+            stats = pstats.Stats(profiler, stream=io.StringIO())
+            stats.sort_stats('cumulative').print_stats(limit)
+            summary = stats.stream.getvalue()
+            data = marshal.dumps(stats.stats)
+        else:
+            summary = sampler.summary(limit)
+            data = sampler.folded().encode()
+
+        lines = [
+            f"{recorder.total} consultas en {recorder.total_ms:.1f} ms "
+            f"({duplicate_count} duplicadas, {similar_count} similares)",
+        ]
+        lines += [f"  {g['count']:4d}× {g['ms']:8.1f} ms  {g['sql'][:200]}" for g in groups[:10]]
+        summary = '\n'.join(lines) + '\n\n' + summary
+
+        user = request.user
+        report = RequestProfile.objects.create(
+            method=request.method,
+            path=request.path[:2000],
+            query_string=request.META.get('QUERY_STRING', ''),
+            user=user.get_username(),
+            mode=mode,
+            status_code=getattr(response, 'status_code', None),
+            duration_ms=round(duration_ms, 3),
+            sql_ms=round(recorder.total_ms, 3),
+            query_count=recorder.total,
+            duplicate_query_count=duplicate_count,
+            similar_query_count=similar_count,
+            summary=summary,
+            profile_data=data,
+            queries=recorder.queries,
+        )
+        RequestProfilingService.prune()
+        return report
+
+    @staticmethod
+    def prune(keep: Optional[int] = None) -> int:
+        """Borra los perfiles más antiguos y deja sólo los ``keep`` últimos."""
+        keep = keep if keep is not None else getattr(settings, 'REQUEST_PROFILE_KEEP', 200)
+        stale = RequestProfile.objects.order_by('-created_at', '-id').values_list('id', flat=True)[keep:]
+        deleted, _ = RequestProfile.objects.filter(id__in=list(stale)).delete()
+        return deleted
+
+    # ------------------------------------------------------------------
+    # Descarga
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def download(report: RequestProfile) -> Tuple[bytes, str, str]:
+        """Contenido, tipo y nombre de fichero del volcado del perfilador."""
+        if report.mode == 'cprofile':
+            # Mismo formato que ``pstats.Stats.dump_stats``: se abre con pstats o snakeviz
+            return bytes(report.profile_data), 'application/octet-stream', f"profile-{report.id}.prof"
+        return bytes(report.profile_data), 'text/plain; charset=utf-8', f"profile-{report.id}.folded"
@@ -0,0 +1,475 @@
+import random
+import unicodedata
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from reservations.managers.book import BookManager
+from reservations.models import (
+    Admin, Agent, Availability, AvailabilityRange, BathType, Book, BookLogs, Client,
+    Constraint, ConstraintRange, GiftVoucher, Product, ProductBaths, WebBooking,
+)
+from reservations.services.catalog_version import CatalogVersionService
+from reservations.services.daily_stats import DailyStatsService
+
+
+class SyntheticDataService:
+    """
+    Generador de datos sintéticos realistas para pruebas de carga.
+
+    Todo se inserta con ``bulk_create`` por lotes dentro de una transacción y
+    con una semilla fija, de modo que dos ejecuciones con los mismos
+    parámetros producen el mismo conjunto de datos. Las reservas se reparten
+    con pesos por mes, día de la semana y tramo horario; los clientes incluyen
+    duplicados exactos (mismo email/teléfono con otro formato) y aproximados
+    (erratas y acentos) para ejercitar la unificación.
+
+    Como ``bulk_create`` no emite señales, al terminar se incrementan las
+    versiones de catálogo y se recalcula ``DailyStats`` del periodo generado.
+    """
+
+    DEFAULT_PREFIX = "SYN"
+    BATCH_SIZE = 2000
+
+    FIRST_NAMES = (
+        "María", "Carlos", "Ana", "Luis", "Carmen", "Miguel", "Elena", "David", "Lucía", "Javier",
+        "Pilar", "Roberto", "Sandra", "Fernando", "Isabel", "Alberto", "Beatriz", "Sergio",
+        "Cristina", "Raúl", "Patricia", "Andrés", "Mónica", "Francisco", "Silvia", "Pablo",
+        "Gloria", "Jorge", "Alicia", "Iván", "Noelia", "Óscar", "Rocío", "Ángel", "Inés", "Rubén",
+    )
+    SURNAMES = (
+        "García", "López", "Rodríguez", "Pérez", "Martínez", "Silva", "Fernández", "Ruiz",
+        "Sánchez", "Torres", "Jiménez", "Moreno", "Morales", "Herrera", "Castro", "Ortega",
+        "Delgado", "Vega", "Romero", "Gil", "Medina", "Ramos", "Guerrero", "Cortés", "Vargas",
+        "Campos", "Rubio", "Pascual", "Marín", "Iglesias", "Peña", "Aguilar", "Santos", "León",
+    )
+    EMAIL_DOMAINS = ("gmail.com", "hotmail.com", "yahoo.es", "outlook.com", "email.com")
+    PLATFORMS = ("Booking", "Groupon", "Atrápalo", "Civitatis", "Hotel")
+    COMMENTS = (
+        "", "", "", "Cliente habitual", "Aniversario", "Regalo de cumpleaños", "Primera visita",
+        "Sesión de pareja", "Prefiere masajista femenina", "Alergia a aceites esenciales",
+    )
+
+    # Pesos de la demanda (lunes ... domingo, enero ... diciembre)
+    WEEKDAY_WEIGHTS = (0.7, 0.6, 0.7, 0.8, 1.2, 1.8, 1.5)
+    MONTH_WEIGHTS = (1.2, 1.3, 1.1, 1.0, 0.9, 0.7, 0.6, 0.6, 0.8, 1.0, 1.2, 1.5)
+    # Tramos de inicio cada 30 minutos con picos a mediodía y por la tarde
+    SLOT_WEIGHTS = {
+        time(10, 0): 3, time(10, 30): 3, time(11, 0): 4, time(11, 30): 4, time(12, 0): 6,
+        time(12, 30): 5, time(13, 0): 4, time(13, 30): 3, time(14, 0): 2, time(14, 30): 2,
+        time(15, 0): 3, time(15, 30): 3, time(16, 0): 6, time(16, 30): 6, time(17, 0): 8,
+        time(17, 30): 8, time(18, 0): 9, time(18, 30): 8, time(19, 0): 7, time(19, 30): 6,
+        time(20, 0): 5, time(20, 30): 4, time(21, 0): 3, time(21, 30): 2,
+    }
+    PEOPLE_WEIGHTS = {1: 2, 2: 10, 3: 3, 4: 3, 5: 1, 6: 1}
+    VOUCHER_STATUS_WEIGHTS = {'paid': 40, 'used': 35, 'pending_payment': 10, 'expired': 15}
+    # Origen de las reservas que no canjean un cheque
+    CREATOR_WEIGHTS = {'admin': 55, 'agent': 20, 'web': 25}
+
+    # Catálogo mínimo si la base de datos no tiene productos: (nombre, baños)
+    DEFAULT_PRODUCTS = (
+        ("Baño", (('none', '0', 1),)),
+        ("Baño + masaje 15", (('relax', '15', 1),)),
+        ("Baño + relajante 30", (('relax', '30', 1),)),
+        ("Baño + relajante 60", (('relax', '60', 1),)),
+        ("Baño + piedras 30", (('rock', '30', 1),)),
+        ("Baño + exfoliante 60", (('exfoliation', '60', 1),)),
+        ("Pareja relajante 30", (('relax', '30', 2),)),
+        ("Pareja mixto", (('relax', '60', 1), ('rock', '30', 1))),
+    )
+
+    # ------------------------------------------------------------------
+    # Generación
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def generate(
+        clients: int = 1000,
+        duplicate_ratio: float = 0.05,
+        bookings: int = 20000,
+        vouchers: int = 2000,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        admins: int = 3,
+        agents: int = 5,
+        availability_versions: int = 3,
+        constraints: int = 30,
+        seed: int = 42,
+        prefix: str = DEFAULT_PREFIX,
+        batch_size: int = BATCH_SIZE,
+        refresh_stats: bool = True,
+    ) -> Dict[str, int]:
+        """
+        Inserta un conjunto de datos sintético y devuelve cuántas filas creó por modelo.
+
+        Args:
+            clients: clientes únicos; se añaden ``clients * duplicate_ratio`` duplicados
+            bookings: reservas repartidas entre ``start`` y ``end`` (por defecto, dos años
+                hasta hoy más dos meses de reservas futuras)
+            vouchers: cheques regalo en todos los estados; los usados generan su reserva
+            prefix: prefijo de ``internal_order_id`` y de los códigos de cheque
+            seed: semilla del generador (mismos parámetros, mismos datos)
+        """
+        today = date.today()
+        end = end or today + timedelta(days=60)
+        start = start or end - timedelta(days=2 * 365 + 60)
+        if start > end:
+            raise ValueError("La fecha inicial no puede ser posterior a la final")
+
+        rng = random.Random(seed)
+        generator = SyntheticDataService
+        counts: Dict[str, int] = {}
+
+        with transaction.atomic(), CatalogVersionService.batch():
+            products = generator._ensure_products(counts)
+            staff = generator._create_staff(admins, agents, prefix, counts)
+            client_ids = generator._create_clients(rng, clients, duplicate_ratio, prefix, batch_size, counts)
+            voucher_bookings = generator._create_vouchers(
+                rng, vouchers, client_ids, products, start, end, prefix, batch_size, counts
+            )
+            generator._create_bookings(
+                rng, bookings, voucher_bookings, client_ids, products, staff,
+                start, end, prefix, batch_size, counts,
+            )
+            generator._create_availability(rng, availability_versions, start, end, counts)
+            generator._create_constraints(rng, constraints, start, end, counts)
+            CatalogVersionService.bump(CatalogVersionService.AVAILABILITY)
+
+        if refresh_stats:
+            DailyStatsService.rebuild(start, end)
+        return counts
+
+    # ------------------------------------------------------------------
+    # Catálogo y personal
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _ensure_products(counts: Dict[str, int]) -> List[Product]:
+        """Productos visibles con baños; si no hay ninguno se crea un catálogo mínimo."""
+        BookManager.ensure_bath_types_exist()
+        products = list(Product.objects.filter(visible=True, baths__isnull=False).distinct())
+        if products:
+            counts['products'] = 0
+            return products
+
+        bath_types = {(b.massage_type, b.massage_duration): b for b in BathType.objects.all()}
+        products = Product.objects.bulk_create([
+            Product(
+                name=name,
+                price=sum(bath_types[(kind, minutes)].price * quantity for kind, minutes, quantity in baths),
+                uses_massagist=any(kind != 'none' for kind, _, _ in baths),
+            )
+            for name, baths in SyntheticDataService.DEFAULT_PRODUCTS
+        ])
+        ProductBaths.objects.bulk_create([
+            ProductBaths(product=product, bath_type=bath_types[(kind, minutes)], quantity=quantity)
+            for product, (_, baths) in zip(products, SyntheticDataService.DEFAULT_PRODUCTS)
+            for kind, minutes, quantity in baths
+        ])
+        CatalogVersionService.bump(CatalogVersionService.PRODUCTS)
+        counts['products'] = len(products)
+        return products
+
+    @staticmethod
+    def _create_staff(admins: int, agents: int, prefix: str, counts: Dict[str, int]) -> Dict[str, List[int]]:
+        """Administradores y agentes que figuran como creadores de las reservas."""
+        offset = Admin.objects.filter(email__startswith=f"{prefix.lower()}-admin").count()
+        created_admins = Admin.objects.bulk_create([
+            Admin(
+                name=f"Admin {offset + i}", surname="Sintético",
+                email=f"{prefix.lower()}-admin{offset + i}@example.com", password="!",
+            )
+            for i in range(admins)
+        ])
+        created_agents = Agent.objects.bulk_create([
+            Agent(name=f"{prefix} Agente {i}", platform=SyntheticDataService.PLATFORMS[i % 5], description="")
+            for i in range(agents)
+        ])
+        counts['admins'] = len(created_admins)
+        counts['agents'] = len(created_agents)
+        return {
+            'admin': [a.id for a in created_admins] or list(Admin.objects.values_list('id', flat=True)[:10]),
+            'agent': [a.id for a in created_agents] or list(Agent.objects.values_list('id', flat=True)[:10]),
+        }
+
+    # ------------------------------------------------------------------
+    # Clientes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _strip_accents(value: str) -> str:
+        return ''.join(
+            c for c in unicodedata.normalize('NFKD', value) if not unicodedata.combining(c)
+        )
+
+    @staticmethod
+    def _duplicate(rng: random.Random, original: Client) -> Client:
+        """Copia de un cliente con el formato de contacto o el nombre alterados."""
+        variant = rng.random()
+        name, surname = original.name, original.surname
+        email, phone = original.email, original.phone_number
+        if variant < 0.5:
+            # Duplicado exacto tras normalizar (mayúsculas y espacios)
+            email = f" {email.upper()} "
+            phone = f"{phone} "
+        elif variant < 0.8:
+            # Sin acentos y con el teléfono en otro formato
+            name = SyntheticDataService._strip_accents(name)
+            surname = SyntheticDataService._strip_accents(surname)
+            phone = f"+34 {phone[2:5]} {phone[5:8]} {phone[8:]}"
+        else:
+            # Errata en el nombre y sin email
+            i = rng.randrange(1, len(name))
+            name = name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+            email = None
+        return Client(name=name, surname=surname, email=email, phone_number=phone)
+
+    @staticmethod
+    def _create_clients(
+        rng: random.Random, clients: int, duplicate_ratio: float, prefix: str,
+        batch_size: int, counts: Dict[str, int],
+    ) -> List[int]:
+        generator = SyntheticDataService
+        created = []
+        tag = prefix.lower()
+        for first in range(0, clients, batch_size):
+            batch = []
+            for i in range(first, min(first + batch_size, clients)):
+                name = rng.choice(generator.FIRST_NAMES)
+                surname = f"{rng.choice(generator.SURNAMES)} {rng.choice(generator.SURNAMES)}"
+                user = generator._strip_accents(f"{name}.{surname.split()[0]}").lower()
+                batch.append(Client(
+                    name=name,
+                    surname=surname,
+                    email=f"{user}.{tag}{i}@{rng.choice(generator.EMAIL_DOMAINS)}",
+                    phone_number=f"34{rng.choice('67')}{rng.randrange(10 ** 8):08d}",
+                ))
+            created.extend(Client.objects.bulk_create(batch))
+
+        duplicates = [
+            generator._duplicate(rng, rng.choice(created))
+            for _ in range(int(clients * duplicate_ratio))
+        ] if created else []
+        created.extend(Client.objects.bulk_create(duplicates, batch_size=batch_size))
+
+        counts['clients'] = clients
+        counts['duplicate_clients'] = len(duplicates)
+        return [c.id for c in created]
+
+    # ------------------------------------------------------------------
+    # Cheques regalo y reservas
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _weighted_days(start: date, end: date) -> Tuple[List[date], List[float]]:
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        weights = [
+            SyntheticDataService.WEEKDAY_WEIGHTS[day.weekday()] * SyntheticDataService.MONTH_WEIGHTS[day.month - 1]
+            for day in days
+        ]
+        return days, weights
+
+    @staticmethod
+    def _aware(day: date, hour: int = 12) -> datetime:
+        return timezone.make_aware(datetime.combine(day, time(hour)))
+
+    @staticmethod
+    def _create_vouchers(
+        rng: random.Random, vouchers: int, client_ids: Sequence[int], products: Sequence[Product],
+        start: date, end: date, prefix: str, batch_size: int, counts: Dict[str, int],
+    ) -> List[GiftVoucher]:
+        """Cheques en todos los estados; devuelve los usados para crear su reserva."""
+        if not vouchers or not client_ids:
+            counts['gift_vouchers'] = 0
+            return []
+        generator = SyntheticDataService
+        # Los cheques se venden hasta hoy salvo que todo el periodo sea futuro
+        days, weights = generator._weighted_days(start, max(start, min(end, date.today())))
+        statuses = rng.choices(
+            list(generator.VOUCHER_STATUS_WEIGHTS), list(generator.VOUCHER_STATUS_WEIGHTS.values()), k=vouchers
+        )
+        bought = rng.choices(days, weights, k=vouchers)
+        offset = GiftVoucher.objects.filter(code__startswith=prefix).count()
+
+        used = []
+        for first in range(0, vouchers, batch_size):
+            batch = []
+            for i in range(first, min(first + batch_size, vouchers)):
+                product = rng.choice(products)
+                status = statuses[i]
+                created_at = generator._aware(bought[i], rng.randrange(9, 22))
+                batch.append(GiftVoucher(
+                    code=f"{prefix}{offset + i:09d}",
+                    bought_date=created_at,
+                    created_at=created_at,
+                    payment_date=None if status == 'pending_payment' else created_at,
+                    people=2 if product.price > 60 else 1,
+                    price=product.price,
+                    status=status,
+                    recipients_name=rng.choice(generator.FIRST_NAMES),
+                    recipients_surname=rng.choice(generator.SURNAMES),
+                    gift_name=product.name,
+                    buyer_client_id=rng.choice(client_ids),
+                    product=product,
+                ))
+            created = GiftVoucher.objects.bulk_create(batch)
+            used.extend(v for v in created if v.status == 'used')
+
+        counts['gift_vouchers'] = vouchers
+        return used
+
+    @staticmethod
+    def _create_bookings(
+        rng: random.Random, bookings: int, used_vouchers: List[GiftVoucher], client_ids: Sequence[int],
+        products: Sequence[Product], staff: Dict[str, List[int]], start: date, end: date,
+        prefix: str, batch_size: int, counts: Dict[str, int],
+    ) -> None:
+        """Reservas con pesos por día y tramo; las de cheques usados se crean primero."""
+        generator = SyntheticDataService
+        content_types = ContentType.objects.get_for_models(Admin, Agent, GiftVoucher)
+        days, weights = generator._weighted_days(start, end)
+        # Se muestrea todo de una vez: ``choices`` con pesos es O(n) por llamada
+        book_dates = rng.choices(days, weights, k=bookings)
+        hours = rng.choices(list(generator.SLOT_WEIGHTS), list(generator.SLOT_WEIGHTS.values()), k=bookings)
+        people_counts = rng.choices(
+            list(generator.PEOPLE_WEIGHTS), list(generator.PEOPLE_WEIGHTS.values()), k=bookings
+        )
+        creator_kinds = rng.choices(
+            list(generator.CREATOR_WEIGHTS), list(generator.CREATOR_WEIGHTS.values()), k=bookings
+        )
+        offset = Book.objects.filter(internal_order_id__startswith=prefix).count()
+        now = timezone.now()
+
+        def rows() -> Iterator[Book]:
+            for i in range(bookings):
+                voucher = used_vouchers[i] if i < len(used_vouchers) else None
+                if voucher:
+                    book_date = min(voucher.created_at.date() + timedelta(days=rng.randrange(7, 120)), end)
+                    product, people, client_id = voucher.product, voucher.people, voucher.buyer_client_id
+                    creator_type, creator_id = content_types[GiftVoucher], voucher.id
+                    paid, pending = voucher.price, Decimal('0')
+                else:
+                    book_date = book_dates[i]
+                    product = rng.choice(products)
+                    people = people_counts[i]
+                    client_id = rng.choice(client_ids)
+                    kind = creator_kinds[i]
+                    if kind == 'agent' and staff['agent']:
+                        creator_type, creator_id = content_types[Agent], rng.choice(staff['agent'])
+                    elif kind == 'admin' and staff['admin']:
+                        creator_type, creator_id = content_types[Admin], rng.choice(staff['admin'])
+                    else:
+                        creator_type, creator_id = None, None
+                    total = product.price * people
+                    paid = total if rng.random() < 0.7 else (total / 2).quantize(Decimal('0.01'))
+                    pending = total - paid
+                created_at = generator._aware(book_date - timedelta(days=rng.randrange(0, 45)), 10)
+                past = book_date < now.date()
+                yield Book(
+                    internal_order_id=f"{prefix}{offset + i:09d}",
+                    book_date=book_date,
+                    hour=hours[i],
+                    people=people,
+                    comment=rng.choice(generator.COMMENTS) or None,
+                    amount_paid=paid,
+                    amount_pending=Decimal('0') if past else pending,
+                    payment_date=created_at if paid else None,
+                    checked_in=past,
+                    checked_out=past,
+                    created_at=min(created_at, now),
+                    client_id=client_id,
+                    product=product,
+                    creator_type=creator_type,
+                    creator_id=creator_id,
+                )
+
+        total = web = logs = 0
+        batch = []
+        for book in rows():
+            batch.append(book)
+            if len(batch) >= batch_size:
+                web, logs = generator._flush_bookings(rng, batch, web, logs)
+                total += len(batch)
+                batch = []
+        if batch:
+            web, logs = generator._flush_bookings(rng, batch, web, logs)
+            total += len(batch)
+
+        counts['bookings'] = total
+        counts['voucher_bookings'] = min(len(used_vouchers), bookings)
+        counts['web_bookings'] = web
+        counts['book_logs'] = logs
+
+    @staticmethod
+    def _flush_bookings(rng: random.Random, batch: List[Book], web: int, logs: int) -> Tuple[int, int]:
+        created = Book.objects.bulk_create(batch)
+        web_rows = [WebBooking(book=b, created_at=b.created_at) for b in created if b.creator_type_id is None]
+        log_rows = [
+            BookLogs(book=b, datetime=b.created_at, comment="Reserva modificada (datos sintéticos)")
+            for b in created if rng.random() < 0.1
+        ]
+        WebBooking.objects.bulk_create(web_rows)
+        BookLogs.objects.bulk_create(log_rows)
+        return web + len(web_rows), logs + len(log_rows)
+
+    # ------------------------------------------------------------------
+    # Disponibilidad y restricciones
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _create_availability(
+        rng: random.Random, versions: int, start: date, end: date, counts: Dict[str, int],
+    ) -> None:
+        """``versions`` versiones por día de la semana y algunos días puntuales."""
+        availabilities = []
+        span = max((end - start).days, 1)
+        for weekday in range(1, 8):
+            for v in range(versions):
+                created_at = SyntheticDataService._aware(start + timedelta(days=span * v // max(versions, 1)), 8)
+                availabilities.append(Availability(type='weekday', weekday=weekday, created_at=created_at))
+        punctual_days = rng.sample(range(span + 1), min(versions * 4, span + 1))
+        availabilities.extend(
+            Availability(
+                type='punctual', punctual_day=start + timedelta(days=d),
+                created_at=SyntheticDataService._aware(start, 8),
+            )
+            for d in punctual_days
+        )
+        availabilities = Availability.objects.bulk_create(availabilities)
+
+        ranges = []
+        for availability in availabilities:
+            busy = availability.weekday in (5, 6, 7) or availability.type == 'punctual'
+            for initial, final in ((10, 14), (14, 18), (18, 22)):
+                ranges.append(AvailabilityRange(
+                    availability=availability, initial_time=time(initial), end_time=time(final),
+                    massagists_availability=rng.randint(2, 4) + (1 if busy else 0),
+                ))
+        AvailabilityRange.objects.bulk_create(ranges)
+        counts['availabilities'] = len(availabilities)
+        counts['availability_ranges'] = len(ranges)
+
+    @staticmethod
+    def _create_constraints(
+        rng: random.Random, constraints: int, start: date, end: date, counts: Dict[str, int],
+    ) -> None:
+        """Restricciones en días distintos sin restricción previa."""
+        taken = set(Constraint.objects.filter(day__range=(start, end)).values_list('day', flat=True))
+        free = [
+            start + timedelta(days=i) for i in range((end - start).days + 1)
+            if start + timedelta(days=i) not in taken
+        ]
+        days = rng.sample(free, min(constraints, len(free)))
+        created = Constraint.objects.bulk_create([Constraint(day=day) for day in sorted(days)])
+        ranges = []
+        for constraint in created:
+            for _ in range(rng.randint(1, 2)):
+                hour = rng.randint(10, 20)
+                ranges.append(ConstraintRange(constraint=constraint, initial_time=time(hour), end_time=time(hour + 1)))
+        ConstraintRange.objects.bulk_create(ranges)
+        counts['constraints'] = len(created)
+        counts['constraint_ranges'] = len(ranges)
@@ -0,0 +1,38 @@
+from celery import shared_task
+
+from reservations.managers.client import ClientManager
+from reservations.managers.gift_voucher import GiftVoucherManager
+from reservations.managers.product import ProductManager
+from reservations.services.change_feed import ChangeFeedService
+from reservations.services.daily_stats import DailyStatsService
+
+
+@shared_task(acks_late=True)
+def unify_duplicate_clients_task(job_id: int) -> dict:
+    """Ejecuta (o reanuda desde su checkpoint) una unificación de clientes."""
+    dto = ClientManager.run_unification_job(job_id)
+    return {"job_id": dto.id, "status": dto.status, "processed_groups": dto.processed_groups}
+
+
+@shared_task
+def expire_gift_vouchers_task() -> dict:
+    """Barrido periódico (Celery beat) de cheques sin pagar o caducados."""
+    return GiftVoucherManager.expire_stale_vouchers()
+
+
+@shared_task
+def compact_hidden_products_task() -> dict:
+    """Compactación periódica (Celery beat) de productos ocultos duplicados."""
+    return ProductManager.compact_hidden_products()
+
+
+@shared_task
+def refresh_daily_stats_task() -> dict:
+    """Recálculo periódico (Celery beat) de los días marcados en el resumen diario."""
+    return {"days": DailyStatsService.refresh()}
+
+
+@shared_task
+def prune_change_tombstones_task() -> dict:
+    """Purga periódica (Celery beat) de los borrados antiguos del feed de cambios."""
+    return {"deleted": ChangeFeedService.prune()}
@@ -0,0 +1,166 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.utils import timezone
+
+from reservations.managers.book import BookManager
+from reservations.models import (
+    Admin, Agent, Availability, AvailabilityRange, BathType, Book, BookLogs, Capacity,
+    Client, ClientUnificationJob, Constraint, ConstraintRange, GiftVoucher, HostingType,
+    Product, ProductBaths, ProductHosting, WebBooking,
+)
+
+# Día con reservas que usan las pruebas de cuadrante, restricciones y disponibilidad
+TARGET_DAY = date(2030, 6, 12)
+
+# Tamaño del conjunto sembrado. Suficiente para que una consulta por fila
+# (N+1) dispare el presupuesto de consultas de cualquier endpoint.
+CLIENTS = 60
+DUPLICATE_CLIENTS = 12
+PRODUCTS = 8
+BOOKINGS_PER_DAY = 30
+DAYS = 20
+VOUCHERS = 40
+
+
+@pytest.fixture
+def seed(db):
+    """
+    Siembra un conjunto de datos realista y devuelve los identificadores que
+    necesitan los casos de prueba.
+
+    Se usan ``bulk_create`` para que la siembra sea rápida; las señales de
+    estadísticas diarias no se disparan, pero los endpoints que las necesitan
+    recalculan los días sucios por su cuenta.
+    """
+    cache.clear()
+
+    Capacity.objects.create(value=40)
+    BookManager.ensure_bath_types_exist()
+    bath_types = list(BathType.objects.order_by('id'))
+    hosting = HostingType.objects.create(name="Sala privada", capacity=4, description="")
+
+    products = Product.objects.bulk_create([
+        Product(name=f"Producto {i}", price=Decimal(40 + 10 * i), uses_massagist=i % 2 == 0)
+        for i in range(PRODUCTS)
+    ])
+    ProductBaths.objects.bulk_create([
+        ProductBaths(product=product, bath_type=bath_types[(i + j) % len(bath_types)], quantity=j + 1)
+        for i, product in enumerate(products)
+        for j in range(2)
+    ])
+    ProductHosting.objects.bulk_create([
+        ProductHosting(product=product, hosting_type=hosting, quantity=1)
+        for product in products[::2]
+    ])
+
+    clients = Client.objects.bulk_create([
+        Client(
+            name=f"Cliente{i}", surname=f"Apellido{i}",
+            email=f"cliente{i}@example.com", phone_number=f"600{i:06d}",
+        )
+        for i in range(CLIENTS)
+    ])
+    # Duplicados exactos (mismo email y teléfono) de los primeros clientes
+    Client.objects.bulk_create([
+        Client(
+            name=clients[i].name, surname=clients[i].surname,
+            email=clients[i].email.upper(), phone_number=clients[i].phone_number,
+        )
+        for i in range(DUPLICATE_CLIENTS)
+    ])
+
+    admins = Admin.objects.bulk_create([
+        Admin(name=f"Admin{i}", surname="Staff", email=f"admin{i}@example.com", password="x")
+        for i in range(3)
+    ])
+    agents = Agent.objects.bulk_create([
+        Agent(name=f"Agente{i}", platform="Booking", description="")
+        for i in range(3)
+    ])
+
+    vouchers = GiftVoucher.objects.bulk_create([
+        GiftVoucher(
+            code=f"SEED{i:08d}", price=products[i % PRODUCTS].price, people=2,
+            status=('paid', 'pending_payment', 'used')[i % 3],
+            payment_date=timezone.now() if i % 3 != 1 else None,
+            buyer_client=clients[i % CLIENTS], product=products[i % PRODUCTS],
+            gift_name=f"Regalo {i}", recipients_name=f"Destinatario{i}",
+        )
+        for i in range(VOUCHERS)
+    ])
+
+    creators = (
+        [(ContentType.objects.get_for_model(Admin), a.id) for a in admins]
+        + [(ContentType.objects.get_for_model(Agent), a.id) for a in agents]
+        + [(ContentType.objects.get_for_model(GiftVoucher), v.id) for v in vouchers[:5]]
+    )
+    first_day = TARGET_DAY - timedelta(days=DAYS // 2)
+    books = Book.objects.bulk_create([
+        Book(
+            internal_order_id=f"SEED{d:03d}{i:04d}",
+            book_date=first_day + timedelta(days=d),
+            hour=time(10 + i % 12, 30 * (i % 2)),
+            people=1 + i % 4,
+            amount_paid=Decimal(30 + i), amount_pending=Decimal(i % 3 * 10),
+            client=clients[(d * BOOKINGS_PER_DAY + i) % CLIENTS],
+            product=products[i % PRODUCTS],
+            creator_type=creators[i % len(creators)][0],
+            creator_id=creators[i % len(creators)][1],
+            comment="Sembrada",
+        )
+        for d in range(DAYS)
+        for i in range(BOOKINGS_PER_DAY)
+    ])
+    target_books = [b for b in books if b.book_date == TARGET_DAY]
+    BookLogs.objects.bulk_create([
+        BookLogs(book=book, comment=f"Cambio {j}")
+        for book in target_books[:10]
+        for j in range(3)
+    ])
+    WebBooking.objects.bulk_create([WebBooking(book=book) for book in target_books[:5]])
+
+    created_at = timezone.make_aware(datetime(2020, 1, 1))
+    availabilities = Availability.objects.bulk_create([
+        Availability(type='weekday', weekday=weekday, created_at=created_at)
+        for weekday in range(1, 8)
+    ] + [
+        Availability(type='punctual', punctual_day=TARGET_DAY + timedelta(days=1), created_at=created_at)
+    ])
+    AvailabilityRange.objects.bulk_create([
+        AvailabilityRange(
+            availability=availability, initial_time=time(start), end_time=time(start + 4),
+            massagists_availability=2 + k,
+        )
+        for availability in availabilities
+        for k, start in enumerate((10, 14, 18))
+    ])
+
+    constraint = Constraint.objects.create(day=TARGET_DAY)
+    ConstraintRange.objects.bulk_create([
+        ConstraintRange(constraint=constraint, initial_time=time(12), end_time=time(13)),
+        ConstraintRange(constraint=constraint, initial_time=time(20), end_time=time(21)),
+    ])
+
+    job = ClientUnificationJob.objects.create(status='failed', total_groups=DUPLICATE_CLIENTS)
+    superuser = User.objects.create_superuser('budget', 'budget@example.com', 'budget')
+
+    return SimpleNamespace(
+        day=TARGET_DAY,
+        client=clients[-1],
+        admin=admins[0],
+        agent=agents[0],
+        product=products[0],
+        bath_type=bath_types[1],
+        book=target_books[0],
+        voucher=vouchers[0],
+        availability=availabilities[0],
+        constraint=constraint,
+        job=job,
+        superuser=superuser,
+    )
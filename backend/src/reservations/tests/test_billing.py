@@ -0,0 +1,168 @@
+"""
+Informe de facturación sobre un conjunto pequeño y conocido: totales,
+agrupación por día/semana/mes y desgloses por producto, origen y agente.
+
+    pytest reservations/tests/test_billing.py
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+from django.utils import timezone
+
+from reservations.models import Agent, Book, Client, GiftVoucher, Product
+from reservations.services.billing import BillingService
+from reservations.services.daily_stats import DailyStatsService
+
+START, END = date(2030, 1, 1), date(2030, 2, 28)
+
+
+def _at(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()).replace(hour=12))
+
+
+@pytest.fixture
+def dataset(db):
+    """
+    Cinco reservas y tres cheques en enero y febrero de 2030:
+
+    ======  =========  =======  ===========  ====  =======  =========
+    día     producto   origen   creador      pers  cobrado  pendiente
+    ======  =========  =======  ===========  ====  =======  =========
+    07/01   Baño       agente   Booking      2     40       0
+    09/01   Masaje     agente   Viator       1     20       40
+    09/01   Baño       cheque   V1 (canje)   2     40       0
+    14/01   Masaje     -        -            3     60       0
+    04/02   Baño       agente   Booking      1     0        40
+    ======  =========  =======  ===========  ====  =======  =========
+
+    Cheques: V1 usado (40, 02/01), V2 pagado (60, 09/01) y V3 sin pagar
+    (99, 09/01, no cuenta como venta).
+    """
+    bath = Product.objects.create(name="Baño", price=40)
+    massage = Product.objects.create(name="Masaje", price=60)
+    booking, viator = Agent.objects.create(name="Booking"), Agent.objects.create(name="Viator")
+    client = Client.objects.create(name="Ana")
+
+    def voucher(code, status, price, day):
+        return GiftVoucher.objects.create(
+            code=code, status=status, price=price, buyer_client=client, product=bath, created_at=_at(day),
+        )
+
+    v1 = voucher("V1", 'used', 40, date(2030, 1, 2))
+    voucher("V2", 'paid', 60, date(2030, 1, 9))
+    voucher("V3", 'pending_payment', 99, date(2030, 1, 9))
+
+    agent_type = ContentType.objects.get_for_model(Agent)
+    voucher_type = ContentType.objects.get_for_model(GiftVoucher)
+    rows = [
+        (date(2030, 1, 7), bath, agent_type, booking.id, 2, 40, 0),
+        (date(2030, 1, 9), massage, agent_type, viator.id, 1, 20, 40),
+        (date(2030, 1, 9), bath, voucher_type, v1.id, 2, 40, 0),
+        (date(2030, 1, 14), massage, None, None, 3, 60, 0),
+        (date(2030, 2, 4), bath, agent_type, booking.id, 1, 0, 40),
+    ]
+    for day, product, creator_type, creator_id, people, paid, pending in rows:
+        Book.objects.create(
+            book_date=day, hour='10:00', people=people, amount_paid=paid, amount_pending=pending,
+            client=client, product=product, creator_type=creator_type, creator_id=creator_id,
+        )
+    DailyStatsService.refresh()
+    return {'bath': bath, 'massage': massage, 'booking': booking, 'viator': viator}
+
+
+def _figures(bookings, people, paid, pending, redeemed=0, redeemed_amount=0, **extra):
+    return {
+        'bookings': bookings, 'people': people,
+        'revenue_paid': Decimal(paid), 'revenue_pending': Decimal(pending),
+        'vouchers_redeemed': redeemed, 'vouchers_redeemed_amount': Decimal(redeemed_amount),
+        **{key: Decimal(value) if key.endswith('amount') else value for key, value in extra.items()},
+    }
+
+
+def _period(report, day):
+    return next(row for row in report['by_period'] if row['period'] == day)
+
+
+def test_totals_exclude_redemptions_from_revenue(dataset):
+    report = BillingService.get_report(START, END)
+
+    # El canje de V1 no vuelve a contar como cobrado: ya está en la venta del cheque
+    assert report['totals'] == _figures(
+        5, 9, 120, 80, redeemed=1, redeemed_amount=40, vouchers_sold=2, vouchers_sold_amount=100,
+    )
+
+
+def test_groups_by_day(dataset):
+    report = BillingService.get_report(START, END, BillingService.GRANULARITY_DAY)
+
+    assert [row['period'] for row in report['by_period']] == [
+        date(2030, 1, 2), date(2030, 1, 7), date(2030, 1, 9), date(2030, 1, 14), date(2030, 2, 4),
+    ]
+    assert _period(report, date(2030, 1, 2))['vouchers_sold_amount'] == Decimal(40)
+    nine = _period(report, date(2030, 1, 9))
+    assert {key: nine[key] for key in _figures(0, 0, 0, 0)} == _figures(2, 3, 20, 40, redeemed=1, redeemed_amount=40)
+    assert (nine['vouchers_sold'], nine['vouchers_sold_amount']) == (1, Decimal(60))
+
+
+def test_groups_by_week_starting_on_monday(dataset):
+    report = BillingService.get_report(START, END, BillingService.GRANULARITY_WEEK)
+
+    assert [(row['period'], row['bookings'], row['vouchers_sold']) for row in report['by_period']] == [
+        (date(2029, 12, 31), 0, 1),
+        (date(2030, 1, 7), 3, 1),
+        (date(2030, 1, 14), 1, 0),
+        (date(2030, 2, 4), 1, 0),
+    ]
+    assert _period(report, date(2030, 1, 7))['revenue_paid'] == Decimal(60)
+
+
+def test_groups_by_month(dataset):
+    report = BillingService.get_report(START, END, BillingService.GRANULARITY_MONTH)
+
+    assert [row['period'] for row in report['by_period']] == [date(2030, 1, 1), date(2030, 2, 1)]
+    january, february = report['by_period']
+    assert (january['bookings'], january['revenue_paid'], january['vouchers_sold_amount']) == (4, Decimal(120), Decimal(100))
+    assert (february['bookings'], february['revenue_paid'], february['revenue_pending']) == (1, Decimal(0), Decimal(40))
+
+
+def test_breakdowns_by_product_creator_and_agent(dataset):
+    report = BillingService.get_report(START, END)
+
+    assert report['by_product'] == [
+        {'product_id': dataset['massage'].id, 'product_name': "Masaje", **_figures(2, 4, 80, 40)},
+        {'product_id': dataset['bath'].id, 'product_name': "Baño", **_figures(3, 5, 40, 40, redeemed=1, redeemed_amount=40)},
+    ]
+    by_creator = {row.pop('creator_kind'): row for row in report['by_creator']}
+    assert {kind: {k: v for k, v in row.items() if k != 'creator_type_id'} for kind, row in by_creator.items()} == {
+        'Agente': _figures(3, 4, 60, 80),
+        'Cheque regalo': _figures(1, 2, 0, 0, redeemed=1, redeemed_amount=40),
+        'Sin creador': _figures(1, 3, 60, 0),
+    }
+    assert report['by_agent'] == [
+        {'agent_id': dataset['booking'].id, 'agent_name': "Booking", **_figures(2, 3, 40, 40)},
+        {'agent_id': dataset['viator'].id, 'agent_name': "Viator", **_figures(1, 1, 20, 40)},
+    ]
+
+
+def test_range_limits_bookings_and_vouchers(dataset):
+    report = BillingService.get_report(date(2030, 1, 8), date(2030, 1, 31))
+
+    assert report['totals'] == _figures(
+        3, 6, 80, 40, redeemed=1, redeemed_amount=40, vouchers_sold=1, vouchers_sold_amount=60,
+    )
+    assert [row['product_id'] for row in report['by_product']] == [dataset['massage'].id, dataset['bath'].id]
+
+
+def test_endpoint_serializes_report(dataset, client):
+    response = client.get(reverse('billing-list'), {'start': START, 'end': END, 'granularity': 'month'})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert (payload['totals']['revenue_paid'], payload['totals']['vouchers_sold_amount']) == ("120.00", "100.00")
+    assert [row['period'] for row in payload['by_period']] == ["2030-01-01", "2030-02-01"]
+
+    response = client.get(reverse('billing-list'), {'start': END, 'end': START})
+    assert response.status_code == 400
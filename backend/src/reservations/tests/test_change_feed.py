@@ -0,0 +1,148 @@
+"""
+Feed de cambios (``/api/v1/changes``): filas modificadas desde un cursor,
+borrados registrados y paginación.
+
+    pytest reservations/tests/test_change_feed.py
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from api.v1.serializers.book import BookingSerializer
+from reservations.managers.client import ClientManager
+from reservations.models import Book, ChangeTombstone, Client, GiftVoucher
+from reservations.services.change_feed import ChangeFeedService
+from reservations.services.synthetic_data import SyntheticDataService
+
+
+@pytest.fixture
+def dataset(db):
+    SyntheticDataService.generate(
+        clients=30, duplicate_ratio=0.1, bookings=60, vouchers=20,
+        start=date(2029, 1, 1), end=date(2029, 1, 31), constraints=0, batch_size=100,
+    )
+
+
+@pytest.fixture
+def settled(monkeypatch):
+    """Sin ventana de repetición: cada respuesta trae sólo lo nuevo."""
+    monkeypatch.setattr(ChangeFeedService, 'SETTLE_SECONDS', 0)
+
+
+def _changes(client, **params):
+    response = client.get(reverse('changes'), params)
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+def _ids(payload, kind):
+    return {row['id'] for row in payload[kind]}
+
+
+def test_initial_load_returns_every_row_with_list_keys(dataset, client, settled):
+    payload = _changes(client)
+
+    assert _ids(payload, 'bookings') == set(Book.objects.values_list('id', flat=True))
+    assert _ids(payload, 'clients') == set(Client.objects.values_list('id', flat=True))
+    assert _ids(payload, 'gift_vouchers') == set(GiftVoucher.objects.values_list('id', flat=True))
+    assert set(payload['bookings'][0]) == set(BookingSerializer().fields) | {'updated_at'}
+    assert all('updated_at' in row for kind in ('bookings', 'clients', 'gift_vouchers') for row in payload[kind])
+    assert payload['deleted'] == {'bookings': [], 'clients': [], 'gift_vouchers': []}
+    assert payload['has_more'] is False
+
+    assert _changes(client, since=payload['cursor'])['bookings'] == []
+
+
+def test_delta_contains_only_modified_rows(dataset, client, settled):
+    cursor = _changes(client)['cursor']
+    book = Book.objects.order_by('id').first()
+    book.people += 1
+    book.save()
+
+    payload = _changes(client, since=cursor)
+
+    assert _ids(payload, 'bookings') == {book.id}
+    assert payload['bookings'][0]['people'] == book.people
+    assert datetime.fromisoformat(payload['bookings'][0]['updated_at'].replace('Z', '+00:00')) == book.updated_at
+    assert payload['clients'] == [] and payload['gift_vouchers'] == []
+
+
+def test_deletes_are_reported_including_cascades(dataset, client, settled):
+    cursor = _changes(client)['cursor']
+    buyer = GiftVoucher.objects.order_by('id').first().buyer_client
+    booking_ids = set(Book.objects.filter(client=buyer).values_list('id', flat=True))
+    voucher_ids = set(GiftVoucher.objects.filter(buyer_client=buyer).values_list('id', flat=True))
+
+    ClientManager.delete_client(buyer.id)
+    payload = _changes(client, since=cursor)
+
+    assert payload['deleted']['clients'] == [buyer.id]
+    assert set(payload['deleted']['bookings']) == booking_ids
+    assert set(payload['deleted']['gift_vouchers']) == voucher_ids
+
+
+def test_client_merge_marks_reassigned_rows_as_changed(dataset, client, settled):
+    main, duplicate = Client.objects.order_by('-id')[:2]
+    Book.objects.create(
+        book_date=date(2029, 2, 1), hour='10:00', amount_paid=0, amount_pending=0,
+        client=duplicate, product_id=Book.objects.first().product_id,
+    )
+    cursor = _changes(client)['cursor']
+
+    ClientManager._merge_clients(main.id, [duplicate.id])
+    payload = _changes(client, since=cursor)
+
+    assert {row['client_id'] for row in payload['bookings']} == {main.id}
+    assert payload['deleted']['clients'] == [duplicate.id]
+
+
+def test_pages_cover_every_row_once(dataset, client, settled):
+    seen, cursor, pages = [], None, 0
+    while True:
+        payload = _changes(client, page_size=7, **({'since': cursor} if cursor else {}))
+        seen.extend(row['id'] for row in payload['bookings'])
+        cursor, pages = payload['cursor'], pages + 1
+        if not payload['has_more']:
+            break
+
+    assert pages > 1
+    assert sorted(seen) == sorted(Book.objects.values_list('id', flat=True))
+
+
+def test_recent_changes_are_repeated_within_settle_window(dataset, client):
+    cursor = _changes(client)['cursor']
+    book = Book.objects.order_by('id').first()
+    book.save()
+
+    first = _changes(client, since=cursor)
+    second = _changes(client, since=first['cursor'])
+
+    assert book.id in _ids(first, 'bookings')
+    assert book.id in _ids(second, 'bookings')
+
+
+def test_invalid_cursor_is_rejected(dataset, client):
+    response = client.get(reverse('changes'), {'since': 'no-es-un-cursor'})
+
+    assert response.status_code == 400
+
+
+def test_cursor_older_than_tombstones_requires_reload(dataset, client, settings):
+    old = timezone.now() - timedelta(days=settings.CHANGE_FEED_TOMBSTONE_DAYS + 1)
+    cursor = ChangeFeedService._encode_cursor({
+        'bookings': (old, 0), 'clients': (old, 0), 'gift_vouchers': (old, 0), 'deleted': (old, 0),
+    })
+
+    response = client.get(reverse('changes'), {'since': cursor})
+
+    assert response.status_code == 410
+
+
+def test_prune_removes_old_tombstones(db):
+    ChangeTombstone.objects.create(kind='bookings', object_id=1, deleted_at=timezone.now() - timedelta(days=40))
+    ChangeTombstone.objects.create(kind='bookings', object_id=2)
+
+    assert ChangeFeedService.prune(days=30) == 1
+    assert list(ChangeTombstone.objects.values_list('object_id', flat=True)) == [2]
@@ -0,0 +1,155 @@
+"""
+Coincidencias de clientes: detección aproximada de duplicados (acentos,
+erratas, prefijo +34), unificación de grupos explícitos y resolución por
+email o teléfono al crear reservas y cheques.
+
+    pytest reservations/tests/test_client_matching.py
+"""
+import pytest
+from django.urls import reverse
+
+from reservations.managers.client import ClientManager
+from reservations.models import Client
+from reservations.services.client_matching import ClientMatchingService
+
+
+def _groups(**kwargs):
+    return [
+        (group['client_ids'], group['reasons'])
+        for group in ClientMatchingService.find_duplicate_groups(**kwargs)
+    ]
+
+
+# ----------------------------------------------------------------------
+# Normalización
+# ----------------------------------------------------------------------
+
+def test_normalization_strips_accents_prefixes_and_email_tags():
+    assert ClientMatchingService.normalize_text("  José  ÁLVAREZ-Núñez ") == "jose alvarez nunez"
+    assert ClientMatchingService.normalize_phone("+34 600 11 22 33") == "600112233"
+    assert ClientMatchingService.normalize_phone("0034600112233") == "600112233"
+    assert ClientMatchingService.normalize_phone("612 34 56") == "6123456"
+    assert ClientMatchingService.normalize_email(" Ana.Garcia85+spa@X.com") == ("anagarcia", "x.com")
+    assert ClientMatchingService.phonetic_key("Vázquez") == ClientMatchingService.phonetic_key("Basquez")
+
+
+# ----------------------------------------------------------------------
+# Detección aproximada
+# ----------------------------------------------------------------------
+
+@pytest.mark.django_db
+def test_accents_and_international_prefix_match():
+    a = Client.objects.create(name="José", surname="Álvarez", email="jose@example.com", phone_number="600000010")
+    b = Client.objects.create(name="Jose", surname="Alvarez", email="JOSE@example.com ", phone_number="+34 600 000 010")
+
+    [(ids, reasons)] = _groups()
+
+    assert ids == [b.id, a.id]
+    assert reasons == ['email', 'name', 'phone']
+
+
+@pytest.mark.django_db
+def test_email_typo_matches_with_same_name():
+    a = Client.objects.create(name="María", surname="López", email="maria.lopez@example.com", phone_number="611000001")
+    b = Client.objects.create(name="Maria", surname="Lopez", email="marialopes@example.com")
+    Client.objects.create(name="Pedro", surname="Gil", email="marialopes@otro.com")
+
+    assert _groups() == [([b.id, a.id], ['email', 'name'])]
+
+
+@pytest.mark.django_db
+def test_similar_name_alone_is_not_a_match():
+    Client.objects.create(name="Luis", surname="Pérez", email="luis@a.com", phone_number="600000020")
+    Client.objects.create(name="Luis", surname="Perez", email="otro@b.com", phone_number="699999999")
+
+    assert _groups() == []
+
+
+@pytest.mark.django_db
+def test_pairs_are_grouped_transitively():
+    # A~B por teléfono y B~C por email; A y C no comparten contacto
+    a = Client.objects.create(name="Luis", surname="Pérez", phone_number="600000030")
+    b = Client.objects.create(name="Luis", surname="Perez", email="lperez@b.com", phone_number="+34600000030")
+    c = Client.objects.create(name="Luis", surname="Perez", email="lperez@b.com")
+
+    [group] = ClientMatchingService.find_duplicate_groups()
+
+    assert group['client_ids'] == [c.id, b.id, a.id]
+    assert group['reasons'] == ['email', 'name', 'phone']
+    assert ClientMatchingService.score_pair(
+        ClientMatchingService._prepare((a.id, a.name, a.surname, a.email, a.phone_number)),
+        ClientMatchingService._prepare((c.id, c.name, c.surname, c.email, c.phone_number)),
+    ) == (0.0, [])
+
+
+def test_oversized_blocks_are_skipped(monkeypatch):
+    clients = {
+        i: ClientMatchingService._prepare((i, f"Nombre{i}", "", "", "600000040"))
+        for i in (1, 2, 3)
+    }
+
+    assert sorted(ClientMatchingService.candidate_pairs(clients)) == [(1, 2), (1, 3), (2, 3)]
+    monkeypatch.setattr(ClientMatchingService, 'MAX_BLOCK_SIZE', 2)
+    assert list(ClientMatchingService.candidate_pairs(clients)) == []
+
+
+# ----------------------------------------------------------------------
+# Unificación de grupos explícitos
+# ----------------------------------------------------------------------
+
+@pytest.mark.django_db
+def test_unify_client_groups_keeps_highest_id():
+    a, b, c = (Client.objects.create(name=f"Cliente{i}") for i in range(3))
+
+    result = ClientManager.unify_client_groups([[a.id, c.id], [b.id]])
+
+    assert (result['unified_groups'], result['clients_removed']) == (1, 1)
+    assert sorted(Client.objects.values_list('id', flat=True)) == [b.id, c.id]
+
+
+@pytest.mark.django_db
+def test_unify_client_groups_rejects_too_many_groups(client):
+    groups = [[1, 2]] * (ClientManager.MAX_EXPLICIT_GROUPS + 1)
+
+    with pytest.raises(ValueError):
+        ClientManager.unify_client_groups(groups)
+    response = client.post(reverse('client-unify-clients'), {'groups': groups}, content_type='application/json')
+    assert response.status_code == 400
+
+
+# ----------------------------------------------------------------------
+# Resolución al crear reservas y cheques
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def shared_phone(db):
+    """Un cliente antiguo con el email buscado y muchos posteriores con su teléfono."""
+    owner = Client.objects.create(name="Ana", surname="Ruiz", email=" Ana@Example.com ", phone_number="600000001")
+    Client.objects.bulk_create([
+        Client(name=f"Familiar{i}", surname="Ruiz", email=f"familiar{i}@example.com", phone_number="600000001")
+        for i in range(8)
+    ])
+    return owner
+
+
+def test_email_match_survives_limit_behind_newer_phone_matches(shared_phone):
+    candidates = ClientManager._find_contact_matches('ana@example.com', '600000001', limit=3)
+
+    assert candidates[0].id == shared_phone.id
+    assert candidates[0].email_match and candidates[0].phone_match
+    assert all(c.phone_match and not c.email_match for c in candidates[1:])
+    assert [c.id for c in candidates[1:]] == sorted((c.id for c in candidates[1:]), reverse=True)
+
+
+def test_email_only_match_ranks_above_phone_only(shared_phone):
+    candidates = ClientManager._find_contact_matches('ana@example.com', '611111111')
+
+    assert [(c.id, c.email_match, c.phone_match) for c in candidates] == [(shared_phone.id, True, False)]
+
+
+def test_resolve_reuses_email_match_despite_shared_phone(shared_phone):
+    client, created = ClientManager.resolve_or_create_client(
+        name="Otra", email="ANA@example.com", phone_number="600000001", policy=ClientManager.MATCH_POLICY_AUTO_ATTACH,
+    )
+
+    assert (client.id, created) == (shared_phone.id, False)
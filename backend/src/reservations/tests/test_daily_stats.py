@@ -0,0 +1,166 @@
+"""
+Resumen diario incremental: marcado de días por señales y en bloque,
+recálculo limitado a un rango y marcado tras la emisión masiva de cheques.
+
+    pytest reservations/tests/test_daily_stats.py
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from reservations.models import Book, Client, DailyStats, Product
+from reservations.services.daily_stats import DailyStatsService
+
+DAY = date(2030, 3, 4)
+OTHER_DAY = date(2030, 3, 9)
+
+
+@pytest.fixture
+def make_book(db):
+    client = Client.objects.create(name="Ana")
+    product = Product.objects.create(name="Baño", price=40)
+
+    def make(day=DAY, paid=40):
+        return Book.objects.create(
+            book_date=day, hour='10:00', amount_paid=paid, amount_pending=0, client=client, product=product,
+        )
+    return make
+
+
+def _dirty():
+    return set(DailyStats.objects.filter(dirty=True).values_list('date', flat=True))
+
+
+# ----------------------------------------------------------------------
+# Marcado
+# ----------------------------------------------------------------------
+
+def test_creating_a_booking_marks_its_day(make_book):
+    make_book()
+
+    assert _dirty() == {DAY}
+
+
+def test_moving_a_booking_marks_old_and_new_day(make_book):
+    book = make_book()
+    DailyStatsService.refresh()
+    assert _dirty() == set()
+
+    # Instancia recién leída: el día anterior se consulta al guardar
+    book = Book.objects.get(pk=book.pk)
+    book.book_date = OTHER_DAY
+    book.save()
+
+    assert _dirty() == {DAY, OTHER_DAY}
+    DailyStatsService.refresh()
+    assert DailyStats.objects.get(date=DAY).bookings == 0
+    assert DailyStats.objects.get(date=OTHER_DAY).bookings == 1
+
+
+def test_save_without_book_date_skips_the_lookup(make_book):
+    book = make_book()
+    DailyStatsService.refresh()
+
+    with CaptureQueriesContext(connection) as captured:
+        book.amount_pending = 10
+        book.save(update_fields=['amount_pending'])
+
+    selects = [q['sql'] for q in captured.captured_queries if q['sql'].startswith('SELECT')]
+    assert not any('"book_date"' in sql and 'reservations_book' in sql for sql in selects)
+    assert _dirty() == {DAY}
+
+
+def test_deleting_a_booking_marks_its_day(make_book):
+    book = make_book()
+    DailyStatsService.refresh()
+
+    book.delete()
+
+    assert _dirty() == {DAY}
+
+
+def test_batch_marks_all_days_once_on_exit(make_book):
+    with CaptureQueriesContext(connection) as captured:
+        with DailyStatsService.batch():
+            make_book(DAY)
+            with DailyStatsService.batch():
+                make_book(OTHER_DAY)
+            make_book(DAY)
+            assert _dirty() == set()
+
+    assert _dirty() == {DAY, OTHER_DAY}
+    stats_writes = [
+        q['sql'] for q in captured.captured_queries
+        if 'reservations_dailystats' in q['sql'] and not q['sql'].startswith('SELECT')
+    ]
+    # Un UPDATE y un INSERT para los dos días juntos
+    assert len(stats_writes) == 2
+
+
+# ----------------------------------------------------------------------
+# Recálculo
+# ----------------------------------------------------------------------
+
+def test_refresh_limited_to_a_range(make_book):
+    make_book(DAY, paid=40)
+    make_book(DAY, paid=20)
+    make_book(OTHER_DAY)
+
+    assert DailyStatsService.refresh(start=DAY, end=DAY) == 1
+
+    assert _dirty() == {OTHER_DAY}
+    stats = DailyStats.objects.get(date=DAY)
+    assert (stats.bookings, stats.revenue_paid) == (2, Decimal("60.00"))
+    assert DailyStatsService.stale_days(DAY, OTHER_DAY) == 1
+    assert DailyStatsService.refresh() == 1
+    assert DailyStatsService.stale_days(DAY, OTHER_DAY) == 0
+
+
+def test_refresh_in_batches(make_book):
+    for day in range(1, 8):
+        make_book(date(2030, 3, day))
+
+    with CaptureQueriesContext(connection) as captured:
+        assert DailyStatsService.refresh(batch_size=3) == 7
+
+    assert _dirty() == set()
+    # Tres lotes (3, 3 y 1 días): una lectura de días marcados por lote más la final
+    reads = [
+        q['sql'] for q in captured.captured_queries
+        if q['sql'].startswith('SELECT') and 'WHERE "reservations_dailystats"."dirty"' in q['sql']
+    ]
+    assert len(reads) == 4
+
+
+def test_billing_report_does_not_refresh(make_book, client):
+    make_book()
+
+    response = client.get(reverse('billing-list'), {'start': DAY, 'end': OTHER_DAY})
+
+    assert response.json()['stale_days'] == 1
+    assert _dirty() == {DAY}
+
+
+# ----------------------------------------------------------------------
+# Emisión masiva de cheques
+# ----------------------------------------------------------------------
+
+@pytest.mark.django_db
+def test_bulk_voucher_issue_marks_the_sale_day(client):
+    payload = {
+        'buyer_name': 'Empresa', 'buyer_email': 'empresa@example.com', 'gift_name': 'Regalo', 'people': 2,
+        'baths': [{'massage_type': 'relax', 'minutes': '60', 'quantity': 2}], 'quantity': 3, 'status': 'paid',
+    }
+
+    response = client.post(reverse('gift-voucher-bulk-create-from-staff'), payload, content_type='application/json')
+
+    assert response.status_code == 201, response.content
+    today = timezone.localdate()
+    assert _dirty() == {today}
+    DailyStatsService.refresh()
+    assert DailyStats.objects.get(date=today).vouchers_sold == 3
@@ -0,0 +1,185 @@
+"""
+Detección de clientes duplicados por email y teléfono normalizados, vista
+previa paginada y unificación en segundo plano con checkpoint.
+
+    pytest reservations/tests/test_duplicate_clients.py
+"""
+from datetime import date
+
+import pytest
+
+from reservations.managers.client import ClientManager
+from reservations.models import Book, Client, ClientUnificationJob, GiftVoucher, Product
+
+
+def _client(name, email, phone):
+    return Client.objects.create(name=name, surname="Ruiz", email=email, phone_number=phone)
+
+
+@pytest.fixture
+def duplicates(db):
+    """
+    Dos grupos duplicados y varios clientes que no lo son:
+
+    - ``ana@example.com``/``600000001``: tres clientes que sólo difieren en
+      mayúsculas y espacios; los dos antiguos tienen 2 reservas y 1 cheque;
+    - ``bea@example.com``/``611000002``: dos clientes;
+    - mismo email con otro teléfono, cliente sin teléfono y cliente único.
+    """
+    product = Product.objects.create(name="Baño", price=40)
+    ana_old = _client("Ana", "ana@example.com", "600000001")
+    ana_mid = _client("Ana", " ANA@Example.com", "600000001 ")
+    ana_new = _client("Ana", "ana@example.com ", " 600000001")
+    bea_old = _client("Bea", "bea@example.com", "611000002")
+    bea_new = _client("Bea", "Bea@example.com", "611000002")
+    _client("Ana", "ana@example.com", "699999999")
+    _client("Ana", "ana@example.com", "")
+    _client("Carla", "carla@example.com", "622000003")
+
+    for owner in (ana_old, ana_old, ana_new):
+        Book.objects.create(
+            book_date=date(2030, 6, 12), hour='10:00', amount_paid=0, amount_pending=0,
+            client=owner, product=product,
+        )
+    GiftVoucher.objects.create(code="DUP1", buyer_client=ana_mid, product=product)
+
+    return {
+        'ana': (ana_new, ana_mid, ana_old),
+        'bea': (bea_new, bea_old),
+    }
+
+
+def test_group_keys_normalize_case_and_spaces(duplicates):
+    keys = list(ClientManager._duplicate_group_keys())
+
+    assert keys == [
+        {'norm_email': 'ana@example.com', 'norm_phone': '600000001', 'group_size': 3},
+        {'norm_email': 'bea@example.com', 'norm_phone': '611000002', 'group_size': 2},
+    ]
+
+
+def test_find_duplicates_returns_only_groups_with_highest_id_first(duplicates):
+    groups = ClientManager._find_duplicate_clients()
+
+    assert {key: [c.id for c in clients] for key, clients in groups.items()} == {
+        'ana@example.com|600000001': [c.id for c in duplicates['ana']],
+        'bea@example.com|611000002': [c.id for c in duplicates['bea']],
+    }
+
+
+def test_find_duplicates_restricted_to_keys(duplicates):
+    keys = [{'norm_email': 'bea@example.com', 'norm_phone': '611000002'}]
+
+    assert list(ClientManager._find_duplicate_clients(keys=keys)) == ['bea@example.com|611000002']
+    assert ClientManager._find_duplicate_clients(keys=[]) == {}
+
+
+def test_preview_pages_groups_with_totals_and_reference_counts(duplicates):
+    first = ClientManager.get_duplicate_clients_preview(page=1, page_size=1)
+    second = ClientManager.get_duplicate_clients_preview(page=2, page_size=1)
+
+    for preview in (first, second):
+        assert (preview['total_groups'], preview['total_duplicates'], preview['total_pages']) == (2, 3, 2)
+
+    ana_new, ana_mid, ana_old = duplicates['ana']
+    [group] = first['groups']
+    assert (group['email'], group['phone']) == ('ana@example.com', '600000001')
+    assert group['main_client']['id'] == ana_new.id
+    assert [d['id'] for d in group['duplicates']] == [ana_mid.id, ana_old.id]
+    # La reserva del principal no se reasigna
+    assert (group['books_to_update'], group['vouchers_to_update']) == (2, 1)
+
+    [group] = second['groups']
+    assert group['main_client']['id'] == duplicates['bea'][0].id
+    assert (group['books_to_update'], group['vouchers_to_update']) == (0, 0)
+
+
+def test_preview_clamps_page_and_page_size(duplicates):
+    preview = ClientManager.get_duplicate_clients_preview(page=0, page_size=10_000)
+
+    assert (preview['page'], preview['page_size']) == (1, ClientManager.MAX_PREVIEW_PAGE_SIZE)
+    assert len(preview['groups']) == 2
+    assert ClientManager.get_duplicate_clients_preview(page=3, page_size=1)['groups'] == []
+
+
+# ----------------------------------------------------------------------
+# Unificación en segundo plano por bloques
+# ----------------------------------------------------------------------
+
+GROUPS = 5
+
+
+@pytest.fixture
+def groups(db):
+    """Cinco grupos de dos clientes; el antiguo de cada grupo tiene una reserva."""
+    product = Product.objects.create(name="Baño", price=40)
+    for i in range(GROUPS):
+        old = _client(f"Cliente{i}", f"g{i}@example.com", f"60000000{i}")
+        _client(f"Cliente{i}", f"G{i}@example.com", f"60000000{i}")
+        Book.objects.create(
+            book_date=date(2030, 6, 12), hour='10:00', amount_paid=0, amount_pending=0,
+            client=old, product=product,
+        )
+
+
+def _job(**kwargs):
+    return ClientUnificationJob.objects.create(
+        total_groups=ClientManager._duplicate_group_keys().count(), **kwargs,
+    )
+
+
+def test_chunk_merges_groups_and_advances_checkpoint(groups):
+    job = _job(status='running')
+
+    assert ClientManager._process_unification_chunk(job.id, 2) is True
+
+    job.refresh_from_db()
+    assert (job.processed_groups, job.clients_removed, job.books_updated) == (2, 2, 2)
+    assert (job.last_email, job.last_phone) == ('g1@example.com', '600000001')
+    assert Client.objects.count() == 2 * GROUPS - 2
+
+
+def test_crash_rolls_back_chunk_and_resume_continues_from_checkpoint(groups, monkeypatch):
+    job = _job()
+    merge = ClientManager._merge_clients
+    merged = []
+
+    def crash_on_fourth_group(main_id, duplicate_ids):
+        if len(merged) == 3:
+            raise RuntimeError("worker caído")
+        merged.append(main_id)
+        return merge(main_id, duplicate_ids)
+
+    monkeypatch.setattr(ClientManager, '_merge_clients', staticmethod(crash_on_fourth_group))
+    with pytest.raises(RuntimeError):
+        ClientManager.run_unification_job(job.id, chunk_size=2)
+
+    # El segundo bloque se deshace entero: el checkpoint sigue tras el primero
+    job.refresh_from_db()
+    assert (job.status, job.error) == ('failed', "worker caído")
+    assert (job.processed_groups, job.last_email) == (2, 'g1@example.com')
+    assert Client.objects.count() == 2 * GROUPS - 2
+
+    monkeypatch.setattr(ClientManager, '_merge_clients', staticmethod(merge))
+    ClientManager.resume_unification_job(job.id)
+    dto = ClientManager.run_unification_job(job.id, chunk_size=2)
+
+    assert dto.status == 'completed' and dto.finished_at is not None
+    assert (dto.processed_groups, dto.clients_removed, dto.books_updated) == (GROUPS, GROUPS, GROUPS)
+    # Cada grupo conserva exactamente un cliente, el de ID más alto, con su reserva
+    survivors = list(Client.objects.order_by('phone_number'))
+    assert [c.phone_number for c in survivors] == [f"60000000{i}" for i in range(GROUPS)]
+    assert all(c.email.startswith('G') and c.book_set.count() == 1 for c in survivors)
+
+
+def test_job_completes_and_is_not_run_again(groups):
+    job = _job()
+
+    dto = ClientManager.run_unification_job(job.id, chunk_size=GROUPS)
+
+    # Un bloque lleno no sabe si quedan grupos: el siguiente vacío lo completa
+    assert (dto.status, dto.processed_groups, dto.clients_removed) == ('completed', GROUPS, GROUPS)
+    assert ClientManager._duplicate_group_keys().count() == 0
+    assert ClientManager.run_unification_job(job.id).updated_at == dto.updated_at
+    with pytest.raises(ValueError):
+        ClientManager.resume_unification_job(job.id)
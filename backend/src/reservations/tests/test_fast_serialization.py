@@ -0,0 +1,88 @@
+"""
+Ruta rápida de los listados (``values()`` + ``RowSerializer``) y ``ORJSONRenderer``.
+
+    pytest reservations/tests/test_fast_serialization.py
+"""
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.v1.renderers import ORJSONRenderer
+from api.v1.serializers.book import BookingSerializer
+from api.v1.serializers.rows import RowSerializer
+from reservations.managers.book import BookManager
+from reservations.services.benchmark import BenchmarkService
+from reservations.services.synthetic_data import SyntheticDataService
+
+
+@pytest.fixture
+def dataset(db):
+    SyntheticDataService.generate(
+        clients=60, duplicate_ratio=0.1, bookings=150, vouchers=40,
+        start=date(2029, 1, 1), end=date(2029, 3, 31), constraints=0, batch_size=100,
+    )
+
+
+def test_renderer_matches_drf_json_renderer():
+    data = {
+        'price': Decimal('12.50'),
+        'created_at': datetime(2029, 1, 2, 10, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'day': date(2029, 1, 2),
+        'hour': time(9, 30, 0, 250000),
+        'duration': timedelta(minutes=90),
+        'uuid': uuid.UUID(int=1),
+        'items': ({'a': 1}, [None, True, 1.5]),
+        1: 'clave numérica',
+        'text': 'ñ y separador\u2028de línea',
+    }
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert ORJSONRenderer().render(None) == b''
+    assert ORJSONRenderer().render([1], 'application/json; indent=4') == b'[\n  1\n]'
+
+
+@pytest.mark.parametrize('name', ['bookings', 'clients', 'gift_vouchers'])
+def test_fast_path_returns_same_bytes_as_serializer(dataset, name):
+    legacy, fast = BenchmarkService.serialization_cases(rows=1000)[name]
+
+    assert fast() == legacy()
+
+
+def test_row_serializer_uses_current_timezone(dataset):
+    rows = BookManager.list_booking_rows(limit=5)
+    with timezone.override('America/Mexico_City'):
+        fast = RowSerializer(BookingSerializer).to_representation(rows)
+        slow = BookingSerializer(BookManager.list_bookings(limit=5), many=True).data
+
+    assert fast == [dict(item) for item in slow]
+    assert fast[0]['created_at'].endswith(('-06:00', '-05:00'))
+
+
+@pytest.mark.parametrize('route, params', [
+    ('booking-list', {}),
+    ('booking-by-date', {'date': '2029-02-01'}),
+    ('client-list', {}),
+    ('gift-voucher-list', {}),
+])
+def test_list_endpoints_keep_their_payload(dataset, client, route, params):
+    response = client.get(reverse(route), params)
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/json'
+    payload = response.json()
+    assert isinstance(payload, list)
+    if payload and route.startswith('booking'):
+        assert set(payload[0]) == set(BookingSerializer().fields)
+
+
+def test_serialization_benchmark_report(dataset):
+    report = BenchmarkService.serialization(rows=100, repeat=1, warmup=0)
+
+    assert report['results']['bookings']['rows'] == 100
+    assert report['results']['clients']['fast']['rows_per_second'] > 0
+    assert set(report['results']['gift_vouchers']) >= {'legacy', 'fast', 'speedup', 'bytes'}
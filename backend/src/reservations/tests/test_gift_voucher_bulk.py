@@ -0,0 +1,132 @@
+"""
+Emisión masiva de cheques regalo: reserva de códigos del día, reintento
+ante colisiones, agotamiento y CSV en streaming.
+
+    pytest reservations/tests/test_gift_voucher_bulk.py
+"""
+import csv
+import io
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from reservations.managers import gift_voucher as gift_voucher_module
+from reservations.managers.gift_voucher import GiftVoucherManager
+from reservations.models import Client, GiftVoucher, Product
+
+
+def _payload(**extra):
+    return {
+        'buyer_name': 'Empresa', 'buyer_email': 'empresa@example.com', 'buyer_phone': '699000000',
+        'gift_name': 'Regalo', 'people': 2,
+        'baths': [{'massage_type': 'relax', 'minutes': '60', 'quantity': 2}],
+        **extra,
+    }
+
+
+def _today():
+    return timezone.now().strftime("%d%m%Y")
+
+
+def _take(codes):
+    """Ocupa ``codes`` con cheques existentes."""
+    buyer = Client.objects.create(name="Otro")
+    product = Product.objects.create(name="Otro", price=10)
+    GiftVoucher.objects.bulk_create([
+        GiftVoucher(code=code, buyer_client=buyer, product=product) for code in codes
+    ])
+
+
+# ----------------------------------------------------------------------
+# Códigos
+# ----------------------------------------------------------------------
+
+@pytest.mark.django_db
+def test_allocated_codes_are_unique_and_skip_taken_ones():
+    today = _today()
+    taken = {f"{today}{n:04d}" for n in range(0, 10_000, 2)}  # la mitad del día
+    _take(taken)
+
+    codes = GiftVoucherManager._allocate_codes(500)
+
+    assert len(codes) == len(set(codes)) == 500
+    assert all(len(code) == 12 and code.startswith(today) for code in codes)
+    assert not taken.intersection(codes)
+
+
+@pytest.mark.django_db
+def test_allocation_fails_when_the_day_has_no_free_codes(monkeypatch):
+    _take([f"{_today()}0007"])
+    monkeypatch.setattr(gift_voucher_module.random, 'randint', lambda a, b: 7)
+
+    with pytest.raises(ValueError, match="No quedan suficientes códigos"):
+        GiftVoucherManager._allocate_codes(1)
+
+
+# ----------------------------------------------------------------------
+# Emisión
+# ----------------------------------------------------------------------
+
+@pytest.mark.django_db
+def test_collision_on_insert_retries_with_new_codes(client, monkeypatch):
+    collided = f"{_today()}0001"
+    _take([collided])
+    allocate = GiftVoucherManager._allocate_codes
+    calls = []
+
+    def allocate_stale_first(count):
+        # La primera reserva devuelve un código que otra emisión ya insertó
+        calls.append(count)
+        return [collided] + allocate(count - 1) if len(calls) == 1 else allocate(count)
+
+    monkeypatch.setattr(GiftVoucherManager, '_allocate_codes', staticmethod(allocate_stale_first))
+    response = client.post(reverse('gift-voucher-bulk-create-from-staff'), _payload(quantity=3), content_type='application/json')
+
+    assert response.status_code == 201, response.content
+    assert len(calls) == 2
+    codes = [item['code'] for item in response.json()]
+    assert len(set(codes)) == 3 and collided not in codes
+    assert GiftVoucher.objects.filter(buyer_client__name='Empresa').count() == 3
+
+
+@pytest.mark.django_db
+def test_repeated_collisions_give_up_without_creating_vouchers(client, monkeypatch):
+    collided = f"{_today()}0001"
+    _take([collided])
+    monkeypatch.setattr(GiftVoucherManager, '_allocate_codes', staticmethod(lambda count: [collided] * count))
+
+    response = client.post(reverse('gift-voucher-bulk-create-from-staff'), _payload(quantity=2), content_type='application/json')
+
+    assert response.status_code == 400
+    assert 'códigos únicos' in response.json()['error']
+    assert GiftVoucher.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_csv_output_streams_one_row_per_voucher(client):
+    recipients = [{'name': 'Ana', 'surname': 'Ruiz', 'email': 'ana@example.com'}, {'name': 'Luis'}]
+
+    response = client.post(
+        reverse('gift-voucher-bulk-create-from-staff') + '?output=csv',
+        _payload(quantity=3, status='paid', recipient_name='Equipo', recipients=recipients),
+        content_type='application/json',
+    )
+
+    assert response.status_code == 201
+    assert response.streaming
+    assert response['Content-Disposition'] == 'attachment; filename="cheques.csv"'
+    rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+    assert rows[0] == [
+        'codigo', 'precio', 'estado', 'personas', 'regalo',
+        'destinatario_nombre', 'destinatario_apellidos', 'destinatario_email', 'fecha',
+    ]
+    vouchers = {v.code: v for v in GiftVoucher.objects.all()}
+    assert sorted(row[0] for row in rows[1:]) == sorted(vouchers)
+    assert [row[5:8] for row in rows[1:]] == [
+        ['Ana', 'Ruiz', 'ana@example.com'], ['Luis', '', ''], ['Equipo', '', ''],
+    ]
+    for code, price, state, people, gift, *_, day in rows[1:]:
+        voucher = vouchers[code]
+        assert (price, state, people, gift) == (str(voucher.price), 'paid', '2', 'Regalo')
+        assert day == voucher.created_at.strftime('%d/%m/%Y')
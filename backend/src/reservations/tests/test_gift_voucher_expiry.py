@@ -0,0 +1,110 @@
+"""
+Caducidad de cheques regalo: plazos de pago y de validez, recorrido por
+lotes con cursor y comando ``expire_gift_vouchers``.
+
+    pytest reservations/tests/test_gift_voucher_expiry.py
+"""
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reservations.managers.gift_voucher import GiftVoucherManager
+from reservations.models import Client, GiftVoucher, Product
+
+
+@pytest.fixture
+def make_voucher(db):
+    buyer = Client.objects.create(name="Comprador")
+    product = Product.objects.create(name="Baño", price=40)
+    now = timezone.now()
+    counter = iter(range(10_000))
+
+    def make(status, age_days, created_at=None):
+        return GiftVoucher.objects.create(
+            code=f"EXP{next(counter):05d}", status=status, buyer_client=buyer, product=product,
+            created_at=created_at or now - timedelta(days=age_days),
+        )
+    return make
+
+
+def _statuses():
+    return dict(GiftVoucher.objects.values_list('code', 'status'))
+
+
+def test_pending_vouchers_expire_after_ttl_and_paid_ones_are_kept(make_voucher, settings):
+    settings.GIFT_VOUCHER_PENDING_TTL_DAYS = 30
+    settings.GIFT_VOUCHER_VALIDITY_DAYS = None
+    stale = make_voucher('pending_payment', 31)
+    recent = make_voucher('pending_payment', 29)
+    old_paid = make_voucher('paid', 2000)
+    old_used = make_voucher('used', 2000)
+
+    result = GiftVoucherManager.expire_stale_vouchers()
+
+    assert result == {'pending_expired': 1, 'paid_expired': 0}
+    assert _statuses() == {
+        stale.code: 'expired', recent.code: 'pending_payment', old_paid.code: 'paid', old_used.code: 'used',
+    }
+
+
+def test_paid_vouchers_expire_after_validity(make_voucher, settings):
+    settings.GIFT_VOUCHER_VALIDITY_DAYS = 365
+    expired = make_voucher('paid', 366)
+    valid = make_voucher('paid', 364)
+    used = make_voucher('used', 400)
+
+    result = GiftVoucherManager.expire_stale_vouchers(pending_ttl_days=0)
+
+    assert result == {'pending_expired': 0, 'paid_expired': 1}
+    assert _statuses() == {expired.code: 'expired', valid.code: 'paid', used.code: 'used'}
+
+
+def test_batches_walk_the_keyset_including_ties(make_voucher):
+    tie = timezone.now() - timedelta(days=60)
+    stale = [make_voucher('pending_payment', 0, created_at=tie) for _ in range(4)]
+    stale += [make_voucher('pending_payment', 40 + i) for i in range(3)]
+    kept = make_voucher('pending_payment', 1)
+
+    with CaptureQueriesContext(connection) as captured:
+        result = GiftVoucherManager.expire_stale_vouchers(pending_ttl_days=30, validity_days=0, batch_size=3)
+
+    assert result['pending_expired'] == 7
+    assert {code for code, status in _statuses().items() if status == 'expired'} == {v.code for v in stale}
+    assert _statuses()[kept.code] == 'pending_payment'
+    # 7 cheques en lotes de 3: tres lecturas y tres actualizaciones
+    updates = [q['sql'] for q in captured.captured_queries if q['sql'].startswith('UPDATE')]
+    assert len(updates) == 3
+
+
+def test_update_skips_vouchers_paid_after_the_batch_was_read(make_voucher, monkeypatch):
+    voucher = make_voucher('pending_payment', 40)
+    original = GiftVoucher.objects.filter
+
+    def pay_before_update(*args, **kwargs):
+        if 'id__in' in kwargs:
+            GiftVoucher.objects.filter(id=voucher.id).update(status='paid')
+            monkeypatch.setattr(GiftVoucher.objects, 'filter', original)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(GiftVoucher.objects, 'filter', pay_before_update)
+    result = GiftVoucherManager.expire_stale_vouchers(pending_ttl_days=30, validity_days=0)
+
+    assert result['pending_expired'] == 0
+    assert _statuses() == {voucher.code: 'paid'}
+
+
+def test_command_uses_arguments_and_reports_counts(make_voucher, settings):
+    settings.GIFT_VOUCHER_VALIDITY_DAYS = None
+    pending = make_voucher('pending_payment', 10)
+    paid = make_voucher('paid', 10)
+    out = io.StringIO()
+
+    call_command('expire_gift_vouchers', '--pending-ttl-days=7', '--batch-size=1', stdout=out)
+
+    assert _statuses() == {pending.code: 'expired', paid.code: 'paid'}
+    assert "1 sin pagar, 0 pagados" in out.getvalue()
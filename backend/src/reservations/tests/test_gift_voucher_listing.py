@@ -0,0 +1,57 @@
+"""
+Listado de cheques regalo paginado por cursor y con filtros.
+
+    pytest reservations/tests/test_gift_voucher_listing.py
+"""
+from datetime import date
+
+import pytest
+from django.urls import reverse
+
+from reservations.models import GiftVoucher
+from reservations.services.synthetic_data import SyntheticDataService
+
+
+@pytest.fixture
+def dataset(db):
+    SyntheticDataService.generate(
+        clients=20, duplicate_ratio=0, bookings=10, vouchers=45,
+        start=date(2029, 1, 1), end=date(2029, 1, 31), constraints=0, batch_size=100,
+    )
+
+
+def _pages(client, **params):
+    pages, cursor = [], None
+    while True:
+        response = client.get(reverse('gift-voucher-list'), {**params, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200, response.content
+        payload = response.json()
+        pages.append(payload['results'])
+        cursor = payload['next_cursor']
+        if not cursor:
+            return pages
+
+
+def test_pages_cover_every_voucher_once_newest_first(dataset, client):
+    pages = _pages(client, page_size=10, fields='id,code,status,buyer_email')
+
+    assert [len(page) for page in pages] == [10, 10, 10, 10, 5]
+    ids = [item['id'] for page in pages for item in page]
+    expected = GiftVoucher.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+    assert ids == list(expected)
+    assert set(pages[0][0]) == {'id', 'code', 'status', 'buyer_email'}
+
+
+def test_status_filter_accepts_several_states(dataset, client):
+    pages = _pages(client, page_size=50, status='paid,used')
+
+    statuses = {item['status'] for page in pages for item in page}
+    assert statuses <= {'paid', 'used'}
+    assert sum(len(page) for page in pages) == GiftVoucher.objects.filter(status__in=('paid', 'used')).count()
+
+
+def test_unknown_status_is_rejected(dataset, client):
+    response = client.get(reverse('gift-voucher-list'), {'status': 'paid,pagado'})
+
+    assert response.status_code == 400
+    assert 'pagado' in response.json()['error']
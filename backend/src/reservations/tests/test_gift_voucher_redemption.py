@@ -0,0 +1,109 @@
+import threading
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+
+from reservations.managers.book import BookManager
+from reservations.managers.gift_voucher import GiftVoucherManager
+from reservations.models import Book, Client, GiftVoucher, Product
+
+
+def _create_voucher(status='paid'):
+    client = Client.objects.create(name="Comprador", email="comprador@example.com")
+    product = Product.objects.create(name="Cheque Regalo: 2x Relajante 30'", price=Decimal("40.00"), visible=False)
+    return GiftVoucher.objects.create(
+        code="010120300001",
+        price=Decimal("40.00"),
+        status=status,
+        people=2,
+        buyer_client=client,
+        product=product,
+    )
+
+
+def _book_from_voucher(voucher):
+    return BookManager.create_booking_from_staff(
+        name="Invitado",
+        email="invitado@example.com",
+        date="2030-01-01",
+        hour="10:00:00",
+        people=2,
+        force=True,
+        creator_type_id=ContentType.objects.get_for_model(GiftVoucher).id,
+        creator_id=voucher.id,
+    )
+
+
+class GiftVoucherRedemptionTests(TestCase):
+
+    def test_redeem_marks_paid_voucher_as_used(self):
+        voucher = _create_voucher()
+
+        booking = _book_from_voucher(voucher)
+
+        voucher.refresh_from_db()
+        self.assertEqual(voucher.status, 'used')
+        self.assertEqual(booking.product_id, voucher.product_id)
+        self.assertEqual(booking.amount_paid, voucher.price)
+
+    def test_second_redemption_fails_and_creates_no_booking(self):
+        voucher = _create_voucher()
+        _book_from_voucher(voucher)
+
+        with self.assertRaisesMessage(ValueError, "ya está marcado como usado"):
+            _book_from_voucher(voucher)
+
+        self.assertEqual(Book.objects.filter(creator_id=voucher.id).count(), 1)
+
+    def test_unpaid_voucher_cannot_be_redeemed(self):
+        voucher = _create_voucher(status='pending_payment')
+
+        with self.assertRaisesMessage(ValueError, "debe estar pagado"):
+            _book_from_voucher(voucher)
+
+        voucher.refresh_from_db()
+        self.assertEqual(voucher.status, 'pending_payment')
+        self.assertFalse(Book.objects.exists())
+
+    def test_redeem_unknown_voucher(self):
+        with self.assertRaisesMessage(ValueError, "No se encontró"):
+            GiftVoucherManager.redeem(999999)
+
+
+@skipUnless(connection.vendor == 'postgresql', "Requiere bloqueos de fila reales (PostgreSQL)")
+class ConcurrentGiftVoucherRedemptionTests(TransactionTestCase):
+
+    THREADS = 8
+
+    def test_simultaneous_redemptions_create_a_single_booking(self):
+        voucher = _create_voucher()
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        lock = threading.Lock()
+
+        def redeem():
+            try:
+                barrier.wait()
+                _book_from_voucher(voucher)
+                outcome = 'ok'
+            except ValueError:
+                outcome = 'rejected'
+            finally:
+                connections.close_all()
+            with lock:
+                results.append(outcome)
+
+        threads = [threading.Thread(target=redeem) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count('ok'), 1)
+        self.assertEqual(results.count('rejected'), self.THREADS - 1)
+        self.assertEqual(Book.objects.filter(creator_id=voucher.id).count(), 1)
+        voucher.refresh_from_db()
+        self.assertEqual(voucher.status, 'used')
@@ -0,0 +1,149 @@
+"""
+Pipeline de logging (``myproject.log``) y ``RequestIdMiddleware``.
+
+    pytest reservations/tests/test_logging.py
+"""
+import json
+import logging
+import sys
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from myproject.log import JsonFormatter, QueueListenerHandler, RequestIdFilter, SamplingFilter, request_id_var
+from reservations.middleware import RequestIdMiddleware
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _record(name='reservations.managers.availability', level=logging.DEBUG, msg='Rangos para %s', args=('x',), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_keeps_one_of_every_n_by_logger_prefix():
+    sampler = SamplingFilter({'reservations.managers': 0.1})
+
+    passed = [sampler.filter(_record()) for _ in range(25)]
+
+    assert sum(passed) == 3
+    assert passed[0] and passed[10] and passed[20]
+    # Otros loggers no se muestrean
+    assert all(sampler.filter(_record(name='reservations.views')) for _ in range(5))
+
+
+def test_sampling_never_drops_warnings_and_honours_extra_rate():
+    sampler = SamplingFilter({'reservations': 0.01})
+
+    assert all(sampler.filter(_record(level=logging.WARNING)) for _ in range(5))
+    passed = [sampler.filter(_record(msg='otro', sample_rate=0.5)) for _ in range(4)]
+    assert passed == [True, False, True, False]
+    assert not sampler.filter(_record(msg='nunca', sample_rate=0))
+
+
+def test_sampling_counts_each_message_separately():
+    sampler = SamplingFilter({'reservations': 0.5})
+    record = _record(msg='a')
+
+    assert sampler.filter(record)
+    assert record.sampled == 2
+    assert sampler.filter(_record(msg='b'))
+
+
+def test_json_formatter_includes_request_id_extra_and_exception():
+    try:
+        raise ValueError("sin aforo")
+    except ValueError:
+        record = logging.LogRecord('api', logging.ERROR, __file__, 1, 'Reserva %s', (7,), sys.exc_info())
+    record.request_id = 'abc'
+    record.book_id = 7
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry['message'] == 'Reserva 7'
+    assert entry['level'] == 'ERROR'
+    assert entry['request_id'] == 'abc'
+    assert entry['book_id'] == 7
+    assert 'ValueError: sin aforo' in entry['exception']
+
+
+def test_queue_handler_delivers_resolved_records_to_target():
+    target = ListHandler()
+    target.setLevel(logging.INFO)
+    handler = QueueListenerHandler([target])
+    handler.addFilter(RequestIdFilter())
+    logger = logging.getLogger('reservations.tests.queue')
+    logger.addHandler(handler)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    items = ['a']
+    token = request_id_var.set('req-1')
+    try:
+        logger.info("Elementos: %s", items)
+        logger.debug("descartado por el nivel del handler de destino")
+        items.append('b')
+    finally:
+        request_id_var.reset(token)
+        logger.removeHandler(handler)
+        handler.stop()
+
+    assert [r.getMessage() for r in target.records] == ["Elementos: ['a']"]
+    assert target.records[0].request_id == 'req-1'
+
+
+def test_queue_handler_drops_records_when_full():
+    target = ListHandler()
+    handler = QueueListenerHandler([target], queue_size=1)
+    handler.stop()
+
+    handler.handle(_record(level=logging.INFO))
+    handler.handle(_record(level=logging.INFO))
+
+    assert handler.queue.qsize() == 1
+
+
+def _middleware_with_logging(**meta):
+    target = ListHandler()
+    target.addFilter(RequestIdFilter())
+    logger = logging.getLogger('reservations.tests.request_id')
+    logger.addHandler(target)
+
+    def view(request):
+        logger.warning("dentro de la petición")
+        return HttpResponse("ok")
+
+    try:
+        response = RequestIdMiddleware(view)(RequestFactory().get('/', **meta))
+    finally:
+        logger.removeHandler(target)
+    return response, target.records
+
+
+def test_request_id_is_generated_and_attached_to_records():
+    response, records = _middleware_with_logging()
+
+    request_id = response['X-Request-ID']
+    assert len(request_id) == 32
+    assert records[0].request_id == request_id
+    assert request_id_var.get() == '-'
+
+
+@pytest.mark.parametrize('incoming, reused', [
+    ('front-1234.abc', True),
+    ('x' * 65, False),
+    ('id con espacios', False),
+])
+def test_request_id_header_is_reused_only_when_valid(incoming, reused):
+    response, records = _middleware_with_logging(HTTP_X_REQUEST_ID=incoming)
+
+    assert (response['X-Request-ID'] == incoming) is reused
+    assert records[0].request_id == response['X-Request-ID']
@@ -0,0 +1,125 @@
+"""
+Métricas en formato Prometheus (``MetricsService`` y ``/metrics``).
+
+    pytest reservations/tests/test_metrics.py
+"""
+import json
+import os
+import subprocess
+import sys
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from reservations.managers.book import BookManager
+from reservations.managers.gift_voucher import GiftVoucherManager
+from reservations.models import Capacity, Client, GiftVoucher, Product
+from reservations.services.metrics import MetricsService
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics(settings):
+    settings.METRICS_DIR = None
+    MetricsService.reset()
+    yield
+    MetricsService.reset()
+
+
+def _sample(text, line_start):
+    """Valor de la primera muestra que empieza por ``line_start``."""
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_render_counters_and_cumulative_histograms():
+    MetricsService.inc('gift_voucher_redemptions_total', result='redeemed')
+    MetricsService.inc('gift_voucher_redemptions_total', 2, result='redeemed')
+    for value in (0.004, 0.02, 0.02, 30):
+        MetricsService.observe('general_search_duration_seconds', value)
+
+    text = MetricsService.render()
+
+    assert '# TYPE gift_voucher_redemptions_total counter' in text
+    assert 'gift_voucher_redemptions_total{result="redeemed"} 3' in text
+    assert 'general_search_duration_seconds_bucket{le="0.005"} 1' in text
+    assert 'general_search_duration_seconds_bucket{le="0.025"} 3' in text
+    assert 'general_search_duration_seconds_bucket{le="10"} 3' in text
+    assert 'general_search_duration_seconds_bucket{le="+Inf"} 4' in text
+    assert 'general_search_duration_seconds_count 4' in text
+    assert _sample(text, 'general_search_duration_seconds_sum') == pytest.approx(30.044)
+
+
+def test_label_values_are_escaped():
+    MetricsService.inc('product_signature_lookups_total', source='a"b\\c\n', result='hit')
+    assert 'source="a\\"b\\\\c\\n"' in MetricsService.render()
+
+
+@pytest.mark.django_db
+def test_middleware_records_route_latency_and_queries(client):
+    Client.objects.create(name="Cliente")
+    client.get(reverse('client-list'))
+    client.get('/no-existe/')
+
+    text = client.get(reverse('metrics')).content.decode()
+
+    assert _sample(
+        text, 'http_request_duration_seconds_count{method="GET",route="client-list",status="200"}'
+    ) == 1
+    assert _sample(text, 'http_request_db_queries_sum{method="GET",route="client-list"}') >= 1
+    assert _sample(text, 'http_request_duration_seconds_count{method="GET",route="<unmatched>",status="404"}') == 1
+
+
+@pytest.mark.django_db
+def test_metrics_token(client, settings):
+    settings.METRICS_TOKEN = 'secreto'
+    assert client.get(reverse('metrics')).status_code == 401
+    assert client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secreto').status_code == 200
+
+
+def test_multiprocess_files_are_aggregated(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    MetricsService.inc('booking_capacity_rejections_total')
+
+    def write(pid, value):
+        (tmp_path / f"{pid}-1.json").write_text(json.dumps({
+            'counters': [['booking_capacity_rejections_total', [], value]],
+            'histograms': [],
+        }))
+
+    # Otro worker vivo (el proceso padre) y uno ya terminado
+    write(os.getppid(), 10)
+    finished = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+    write(int(finished.stdout), 100)
+
+    text = MetricsService.render()
+    assert 'booking_capacity_rejections_total 111' in text
+    # El fichero del proceso terminado se fusiona y el total no cambia
+    assert (tmp_path / MetricsService.DEAD_FILE).exists()
+    assert not (tmp_path / f"{finished.stdout.strip()}-1.json").exists()
+    assert 'booking_capacity_rejections_total 111' in MetricsService.render()
+
+
+@pytest.mark.django_db
+def test_hot_path_counters(django_capture_on_commit_callbacks):
+    Capacity.objects.create(value=2)
+    BookManager.ensure_bath_types_exist()
+    product = Product.objects.create(name="Cheque", price=Decimal("40.00"), visible=False)
+    buyer = Client.objects.create(name="Comprador")
+    voucher = GiftVoucher.objects.create(code="M1", price=Decimal("40.00"), status='paid', buyer_client=buyer, product=product)
+
+    with pytest.raises(ValueError, match="aforo"):
+        BookManager.create_booking_from_staff(
+            name="Grupo", email="grupo@example.com", date="2030-01-01", hour="10:00:00", people=3,
+        )
+    with django_capture_on_commit_callbacks(execute=True):
+        GiftVoucherManager.redeem(voucher.id)
+    with pytest.raises(ValueError):
+        GiftVoucherManager.redeem(voucher.id)
+
+    text = MetricsService.render()
+    assert 'booking_capacity_rejections_total 1' in text
+    assert 'gift_voucher_redemptions_total{result="redeemed"} 1' in text
+    assert 'gift_voucher_redemptions_total{result="rejected"} 1' in text
@@ -0,0 +1,119 @@
+"""
+Mapa de calor de ocupación con un conjunto pequeño y conocido: recuentos
+exactos por tramo, percentiles y uso del aforo y de los masajistas.
+
+    pytest reservations/tests/test_occupancy.py
+"""
+from datetime import date, time
+
+import numpy as np
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from reservations.dtos.availability import AvailabilityRangeDTO
+from reservations.managers.availability import AvailabilityManager
+from reservations.managers.book import BookManager
+from reservations.models import BathType, Book, Capacity, Client, Product, ProductBaths
+from reservations.services.occupancy import OccupancyService
+
+# Dos semanas completas, de lunes a domingo
+START = date(2030, 6, 3)
+END = date(2030, 6, 16)
+N_DAYS = 14
+WEDNESDAY = 2  # fila de la rejilla semanal (0=lunes)
+SLOTS = ['10:00', '10:30', '11:00', '11:30']
+
+
+@pytest.fixture
+def day(db):
+    """
+    Dos miércoles con reservas, aforo 10 y 2 masajistas de 10:00 a 12:00:
+
+    - 05/06 10:00, 4 personas, un masaje de 60 minutos;
+    - 05/06 10:30, 2 personas, dos masajes de 30 minutos;
+    - 12/06 10:00, 10 personas, baño sin masaje (aforo completo).
+    """
+    cache.clear()
+    Capacity.objects.create(value=10)
+    BookManager.ensure_bath_types_exist()
+    client = Client.objects.create(name="Ana", surname="Ruiz", email="ana@example.com", phone_number="600000001")
+
+    def product(duration, quantity):
+        bath_type = BathType.objects.filter(massage_duration=duration).order_by('id').first()
+        product = Product.objects.create(name=f"Baño {duration}x{quantity}", price=50)
+        ProductBaths.objects.create(product=product, bath_type=bath_type, quantity=quantity)
+        return product
+
+    for book_date, hour, people, bought in [
+        (date(2030, 6, 5), time(10, 0), 4, product('60', 1)),
+        (date(2030, 6, 5), time(10, 30), 2, product('30', 2)),
+        (date(2030, 6, 12), time(10, 0), 10, product('0', 1)),
+    ]:
+        Book.objects.create(
+            book_date=book_date, hour=hour, people=people, amount_paid=0, amount_pending=0,
+            client=client, product=bought,
+        )
+
+    AvailabilityManager.create_new_weekday_availability_version(
+        3, [AvailabilityRangeDTO(time(10), time(12), 2)], date(2030, 1, 1),
+    )
+
+
+def test_load_bookings_returns_day_slot_people_and_minutes(day):
+    bookings = OccupancyService.load_bookings(START, END)
+
+    rows = sorted(zip(*(bookings[k].tolist() for k in ('day', 'slot', 'people', 'minutes'))))
+    assert rows == [(2, 20, 4, 60), (2, 21, 2, 60), (9, 20, 10, 0)]
+
+
+def test_grids_spread_people_minutes_and_massagists_per_slot(day):
+    bookings = OccupancyService.load_bookings(START, END)
+    people = OccupancyService.people_grid(bookings, N_DAYS)
+    massage = OccupancyService.massage_grid(bookings, N_DAYS)
+    massagists = OccupancyService.massagist_grid(START, N_DAYS)
+
+    assert people[2, 20:24].tolist() == [4, 2, 0, 0]
+    assert people[9, 20:24].tolist() == [10, 0, 0, 0]
+    assert people.sum() == 16
+    # Cada reserva reparte sus 60 minutos en dos tramos desde su hora de inicio
+    assert massage[2, 20:24].tolist() == [30, 60, 30, 0]
+    assert massage.sum() == 120
+    assert np.array_equal(np.flatnonzero(massagists.any(axis=1)), [2, 9])
+    assert massagists[2, 20:24].tolist() == [2, 2, 2, 2] and massagists[:, 24:].sum() == 0
+
+
+def test_heatmap_statistics_for_known_days(day):
+    heatmap = OccupancyService.build_heatmap(START, END)
+
+    assert heatmap['slots'] == SLOTS
+    assert heatmap['bookings'] == 3
+    assert heatmap['days_per_weekday'] == [2] * 7
+    assert heatmap['people_mean'][WEDNESDAY] == [7.0, 1.0, 0.0, 0.0]
+    assert heatmap['people_p50'][WEDNESDAY] == [7.0, 1.0, 0.0, 0.0]
+    assert heatmap['people_p90'][WEDNESDAY] == [9.4, 1.8, 0.0, 0.0]
+    assert heatmap['people_max'][WEDNESDAY] == [10.0, 2.0, 0.0, 0.0]
+    assert heatmap['capacity_utilization'][WEDNESDAY] == [0.7, 0.1, 0.0, 0.0]
+    assert heatmap['saturated_share'][WEDNESDAY] == [0.5, 0.0, 0.0, 0.0]
+    # 2 miércoles × 2 masajistas × 30 minutos = 120 minutos ofrecidos por tramo
+    assert heatmap['massagist_utilization'][WEDNESDAY] == [0.25, 0.5, 0.25, 0.0]
+    # Sin masajistas el uso no está definido; sin reservas la media es 0
+    assert heatmap['massagist_utilization'][0] == [None] * 4
+    assert heatmap['people_mean'][0] == [0.0] * 4
+
+
+def test_endpoint_returns_cached_heatmap_for_last_months(day, client):
+    response = client.get(reverse('analytics-ocupacion'), {'months': 1, 'end': END.isoformat()})
+
+    assert response.status_code == 200
+    payload = response.json()
+    # Un mes hasta el 16/06 empieza el 18/05: cuatro miércoles, dos sin reservas
+    assert (payload['start'], payload['end']) == ('2030-05-18', '2030-06-16')
+    assert payload['slots'] == SLOTS
+    assert payload['people_mean'][WEDNESDAY] == [3.5, 0.5, 0.0, 0.0]
+    assert payload['massagist_utilization'][WEDNESDAY] == [0.125, 0.25, 0.125, 0.0]
+
+    Book.objects.filter(book_date=date(2030, 6, 12)).delete()
+    assert client.get(reverse('analytics-ocupacion'), {'months': 1, 'end': END.isoformat()}).json() == payload
+    refreshed = client.get(reverse('analytics-ocupacion'), {'months': 1, 'end': END.isoformat(), 'refresh': 1}).json()
+    assert refreshed['people_mean'][WEDNESDAY] == [1.0, 0.5, 0.0, 0.0]
@@ -0,0 +1,101 @@
+"""
+Presupuestos en bloque de carritos de baños/masajes: céntimos exactos,
+producto equivalente y errores por carrito.
+
+    pytest reservations/tests/test_pricing.py
+"""
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from reservations.models import BathType, Product, ProductBaths
+from reservations.services.pricing import PricingService
+
+
+@pytest.fixture
+def bath_types(db):
+    return {
+        'relax': BathType.objects.create(name="Relax 30", massage_type='relax', massage_duration='30', price="0.10"),
+        'rock': BathType.objects.create(name="Piedras 60", massage_type='rock', massage_duration='60', price="19.99"),
+    }
+
+
+def _product(price, *lines):
+    product = Product.objects.create(name=f"Producto {price}", price=price, visible=False)
+    for bath_type, quantity in lines:
+        ProductBaths.objects.create(product=product, bath_type=bath_type, quantity=quantity)
+    return product
+
+
+def _cart(*lines, cart_id=None):
+    return {'id': cart_id, 'baths': [
+        {'massage_type': massage_type, 'minutes': minutes, 'quantity': quantity}
+        for massage_type, minutes, quantity in lines
+    ]}
+
+
+def test_totals_are_exact_in_cents(bath_types):
+    [quote] = PricingService.quote_carts([_cart(('relax', '30', 3), ('rock', 60, 3))])
+
+    # 0.10 * 3 en coma flotante daría 0.30000000000000004
+    assert quote['error'] is None
+    assert quote['total'] == Decimal("60.27")
+    assert [(line['unit_price'], line['subtotal']) for line in quote['lines']] == [
+        (Decimal("0.10"), Decimal("0.30")), (Decimal("19.99"), Decimal("59.97")),
+    ]
+    assert str(quote['total']) == "60.27"
+
+
+def test_cents_conversion_round_trips():
+    assert PricingService._to_cents(Decimal("19.99")) == 1999
+    assert PricingService._to_cents(Decimal("0.1")) == 10
+    assert PricingService._from_cents(1) == Decimal("0.01")
+    assert str(PricingService._from_cents(2000)) == "20.00"
+
+
+def test_matching_product_needs_same_price_and_composition(bath_types):
+    relax, rock = bath_types['relax'], bath_types['rock']
+    oldest = _product("20.19", (relax, 2), (rock, 1))
+    _product("20.19", (relax, 2), (rock, 1))  # más nuevo: no se elige
+    _product("20.19", (relax, 1), (rock, 1))  # mismo precio, otra composición
+    _product("99.00", (rock, 1))  # misma composición, otro precio
+
+    quotes = PricingService.quote_carts([
+        _cart(('rock', '60', 1), ('relax', '30', 2), cart_id='a'),
+        _cart(('rock', '60', 1), cart_id='b'),
+        _cart(('relax', '30', 5), cart_id='c'),
+    ])
+
+    assert [(q['id'], q['product_id']) for q in quotes] == [('a', oldest.id), ('b', None), ('c', None)]
+    assert all('_signature' not in q for q in quotes)
+
+
+def test_invalid_carts_report_errors_without_failing_others(bath_types):
+    quotes = PricingService.quote_carts([
+        _cart(('relax', '30', 1), ('relax', '15', 1)),
+        _cart(('relax', '30', 0)),
+        _cart(),
+        _cart(('relax', '30', 1)),
+    ])
+
+    assert [q['error'] for q in quotes] == [
+        "No existe el tipo de baño: relax de 15 minutos",
+        "La cantidad debe ser mayor que 0",
+        "Debe indicar al menos un tipo de baño/masaje",
+        None,
+    ]
+    assert [q['total'] for q in quotes] == [None, None, None, Decimal("0.10")]
+
+
+def test_endpoint_quotes_carts_and_rejects_too_many(bath_types, client, monkeypatch):
+    url = reverse('quote-list')
+    response = client.post(url, {'carts': [_cart(('rock', '60', 2), cart_id='x')]}, content_type='application/json')
+
+    assert response.status_code == 200
+    [quote] = response.json()['quotes']
+    assert (quote['id'], quote['total'], quote['error']) == ('x', "39.98", None)
+
+    monkeypatch.setattr(PricingService, 'MAX_CARTS', 1)
+    response = client.post(url, {'carts': [_cart(('rock', '60', 1))] * 2}, content_type='application/json')
+    assert response.status_code == 400
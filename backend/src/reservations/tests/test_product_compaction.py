@@ -0,0 +1,140 @@
+"""
+Compactación de productos ocultos duplicados: reasignación de reservas y
+cheques, elección del producto conservado, borrado de huérfanos y dry-run.
+
+    pytest reservations/tests/test_product_compaction.py
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reservations.managers.product import ProductManager
+from reservations.models import BathType, Book, Client, GiftVoucher, Product, ProductBaths
+
+
+def _hidden(bath_type, quantity, price):
+    product = Product.objects.create(name=f"Oculto {price}", price=price, visible=False)
+    ProductBaths.objects.create(product=product, bath_type=bath_type, quantity=quantity)
+    return product
+
+
+def _book(client, product):
+    return Book.objects.create(
+        book_date=date(2030, 6, 12), hour='10:00', amount_paid=0, amount_pending=0,
+        client=client, product=product,
+    )
+
+
+@pytest.fixture
+def catalog(db):
+    """
+    Dos baños de 30 €; para dos unidades del primero hay tres productos
+    ocultos: uno con el precio actual (60), uno antiguo (50) y el más nuevo
+    con otro precio antiguo (55).
+    """
+    relax = BathType.objects.create(name="Relax", massage_type='relax', massage_duration='30', price=30)
+    rock = BathType.objects.create(name="Piedras", massage_type='rock', massage_duration='30', price=30)
+    current = _hidden(relax, 2, 60)
+    old = _hidden(relax, 2, 50)
+    newest = _hidden(relax, 2, 55)
+    unique = _hidden(rock, 1, 30)
+    return {
+        'relax': relax, 'current': current, 'old': old, 'newest': newest, 'unique': unique,
+        'client': Client.objects.create(name="Ana"),
+    }
+
+
+def _voucher(code, client, product):
+    return GiftVoucher.objects.create(code=code, buyer_client=client, product=product)
+
+
+def test_keeps_product_matching_current_price(catalog):
+    [group] = ProductManager.find_duplicate_hidden_products()
+
+    assert group['keep'] == catalog['current'].id
+    assert group['duplicates'] == [catalog['newest'].id, catalog['old'].id]
+    assert group['current_price'] == Decimal("60")
+
+
+def test_keeps_newest_when_no_price_matches(catalog):
+    catalog['relax'].price = 40
+    catalog['relax'].save()
+
+    [group] = ProductManager.find_duplicate_hidden_products()
+    stats = ProductManager.compact_hidden_products()
+
+    assert group['keep'] == catalog['newest'].id
+    assert stats['products_merged'] == 2
+    # El conservado pasa a tener el precio actual de sus baños
+    assert Product.objects.get(id=catalog['newest'].id).price == Decimal("80")
+
+
+def test_books_and_vouchers_are_repointed_and_duplicates_deleted(catalog):
+    client = catalog['client']
+    old_book = _book(client, catalog['old'])
+    newest_book = _book(client, catalog['newest'])
+    voucher = _voucher("COMP1", client, catalog['old'])
+    # Un duplicado que sólo usa un cheque también se reasigna
+    only_voucher = _voucher("COMP2", client, catalog['newest'])
+
+    stats = ProductManager.compact_hidden_products()
+
+    keep = catalog['current'].id
+    assert stats == {
+        'groups': 1, 'products_merged': 2, 'books_updated': 2, 'gift_vouchers_updated': 2, 'products_deleted': 2,
+    }
+    for row in (old_book, newest_book, voucher, only_voucher):
+        row.refresh_from_db()
+        assert row.product_id == keep
+    assert set(Product.objects.values_list('id', flat=True)) == {keep, catalog['unique'].id}
+
+
+def test_empty_hidden_products_are_deleted_unless_referenced(catalog):
+    client = catalog['client']
+    unused = Product.objects.create(name="Vacío", price=0, visible=False)
+    used_by_book = Product.objects.create(name="Vacío reserva", price=0, visible=False)
+    used_by_voucher = Product.objects.create(name="Vacío cheque", price=0, visible=False)
+    visible = Product.objects.create(name="Visible", price=0)
+    _book(client, used_by_book)
+    _voucher("COMP3", client, used_by_voucher)
+
+    ProductManager.compact_hidden_products()
+
+    remaining = set(Product.objects.values_list('id', flat=True))
+    assert unused.id not in remaining
+    assert {used_by_book.id, used_by_voucher.id, visible.id} <= remaining
+
+
+def test_dry_run_counts_without_changes(catalog):
+    client = catalog['client']
+    _book(client, catalog['old'])
+    _voucher("COMP4", client, catalog['newest'])
+    before = list(Product.objects.order_by('id').values_list('id', 'price'))
+
+    stats = ProductManager.compact_hidden_products(dry_run=True)
+
+    assert stats == {
+        'groups': 1, 'products_merged': 2, 'books_updated': 1, 'gift_vouchers_updated': 1, 'products_deleted': 0,
+    }
+    assert list(Product.objects.order_by('id').values_list('id', 'price')) == before
+    assert not Book.objects.filter(product=catalog['current']).exists()
+
+
+def test_batches_are_committed_separately(catalog, monkeypatch):
+    monkeypatch.setattr(ProductManager, 'COMPACTION_BATCH_SIZE', 1)
+    client = catalog['client']
+    for product in (catalog['old'], catalog['newest']):
+        _book(client, product)
+
+    with CaptureQueriesContext(connection) as captured:
+        stats = ProductManager.compact_hidden_products()
+
+    # Dentro del test cada transacción es un savepoint: dos lotes de
+    # reasignación y dos de borrado
+    savepoints = [q['sql'] for q in captured.captured_queries if q['sql'].startswith('SAVEPOINT')]
+    assert len(savepoints) == 4
+    assert (stats['books_updated'], stats['products_deleted']) == (2, 2)
+    assert Book.objects.filter(product=catalog['current']).count() == 2
@@ -0,0 +1,346 @@
+"""
+Presupuestos de consultas SQL y de tiempo por endpoint.
+
+Cada ruta de ``api/v1/urls.py`` (y cada listado del admin de Django) tiene
+una fila en ``query_budgets.csv`` con el máximo de consultas y de
+milisegundos permitidos sobre el conjunto sembrado en ``conftest.py``. Una
+consulta por fila (N+1) o un endpoint que se vuelve lento hace fallar la
+prueba con la lista de consultas ejecutadas.
+
+``PERF_BUDGET_FACTOR`` multiplica los presupuestos de tiempo (por ejemplo en
+máquinas de CI lentas); los de consultas son exactos.
+
+    pytest reservations/tests/test_query_budgets.py
+"""
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+from django.contrib import admin
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+
+from api.v1.urls import urlpatterns as api_urlpatterns
+
+BUDGETS_FILE = Path(__file__).with_name('query_budgets.csv')
+TIME_FACTOR = float(os.environ.get('PERF_BUDGET_FACTOR', '1'))
+
+
+@dataclass(frozen=True)
+class Budget:
+    route: str
+    method: str
+    max_queries: int
+    max_ms: int
+
+
+@dataclass
+class Case:
+    """Petición de prueba para una ruta: argumentos de la URL, datos y estado esperado."""
+
+    kwargs: Callable[[Any], Dict[str, Any]] = lambda s: {}
+    data: Callable[[Any], Optional[Dict[str, Any]]] = lambda s: None
+    status: int = 200
+    admin: bool = False
+
+
+def _load_budgets():
+    with BUDGETS_FILE.open(newline='') as f:
+        return [
+            Budget(row['route'], row['method'], int(row['max_queries']), int(row['max_ms']))
+            for row in csv.DictReader(f)
+        ]
+
+
+BUDGETS = _load_budgets()
+
+
+# ----------------------------------------------------------------------
+# Casos por ruta y método
+# ----------------------------------------------------------------------
+
+def _pk(attr):
+    return lambda s: {'pk': getattr(s, attr).id}
+
+
+def _ranges():
+    return [
+        {'initial_time': '10:00:00', 'end_time': '14:00:00', 'massagists_availability': 3},
+        {'initial_time': '14:00:00', 'end_time': '20:00:00', 'massagists_availability': 4},
+    ]
+
+
+def _staff_voucher(**extra):
+    return {
+        'buyer_name': 'Empresa', 'buyer_email': 'empresa@example.com', 'buyer_phone': '699000000',
+        'gift_name': 'Regalo', 'people': 2,
+        'baths': [{'massage_type': 'relax', 'minutes': '60', 'quantity': 2}],
+        **extra,
+    }
+
+
+_PERSON = {'name': 'Nuevo', 'surname': 'Cliente', 'phone_number': '611111111', 'email': 'nuevo@example.com'}
+
+CASES: Dict[tuple, Case] = {
+    # Clientes
+    ('client-list', 'GET'): Case(),
+    ('client-list', 'POST'): Case(data=lambda s: _PERSON, status=201),
+    ('client-detail', 'GET'): Case(_pk('client')),
+    ('client-detail', 'PUT'): Case(_pk('client'), lambda s: _PERSON),
+    ('client-detail', 'DELETE'): Case(_pk('client'), status=204),
+    ('client-preview-duplicates', 'GET'): Case(data=lambda s: {'page': 1, 'page_size': 50}),
+    ('client-preview-fuzzy-duplicates', 'GET'): Case(data=lambda s: {'limit': 50}),
+    ('client-unify-clients', 'POST'): Case(status=202),
+    ('client-unification-progress', 'GET'): Case(lambda s: {'job_id': s.job.id}),
+    ('client-resume-unification', 'POST'): Case(lambda s: {'job_id': s.job.id}, status=202),
+    ('client-find-similar-clients', 'GET'): Case(data=lambda s: {'name': 'Cliente1', 'email': 'cliente1@example.com'}),
+    # Administradores y agentes
+    ('admin-list', 'GET'): Case(),
+    ('admin-list', 'POST'): Case(data=lambda s: {**_PERSON, 'email': 'otro@example.com', 'password': 'x'}, status=201),
+    ('admin-detail', 'GET'): Case(_pk('admin')),
+    ('admin-detail', 'PUT'): Case(_pk('admin'), lambda s: {**_PERSON, 'password': 'x'}),
+    ('admin-detail', 'DELETE'): Case(_pk('admin'), status=204),
+    ('agent-list', 'GET'): Case(),
+    ('agent-list', 'POST'): Case(data=lambda s: {'name': 'Nuevo', 'platform': 'Web'}, status=201),
+    ('agent-detail', 'GET'): Case(_pk('agent')),
+    ('agent-detail', 'PUT'): Case(_pk('agent'), lambda s: {'name': 'Renombrado', 'platform': 'Web'}),
+    ('agent-detail', 'DELETE'): Case(_pk('agent'), status=204),
+    # Disponibilidades
+    ('availability-list', 'GET'): Case(),
+    ('availability-list', 'POST'): Case(
+        data=lambda s: {'type': 'punctual', 'punctual_day': '2030-07-01', 'ranges': _ranges()}, status=201,
+    ),
+    ('availability-detail', 'GET'): Case(_pk('availability')),
+    ('availability-detail', 'PUT'): Case(
+        _pk('availability'), lambda s: {'type': 'weekday', 'weekday': s.availability.weekday, 'ranges': _ranges()},
+    ),
+    ('availability-detail', 'DELETE'): Case(_pk('availability'), status=204),
+    ('availability-history', 'GET'): Case(lambda s: {'target_date': s.day.isoformat()}),
+    ('availability-by-id', 'GET'): Case(lambda s: {'availability_id': s.availability.id}),
+    ('availability-create-version', 'POST'): Case(
+        data=lambda s: {'target_date': s.day.isoformat(), 'ranges': _ranges()}, status=201,
+    ),
+    ('availability-create-weekday-version', 'POST'): Case(
+        data=lambda s: {'weekday': 3, 'ranges': _ranges()}, status=201,
+    ),
+    # Productos
+    ('product-list', 'GET'): Case(),
+    ('product-list', 'POST'): Case(
+        data=lambda s: {
+            'name': 'Nuevo producto', 'price': '70.00',
+            'baths': [{'bath_type_id': s.bath_type.id, 'quantity': 2}],
+        },
+        status=201,
+    ),
+    ('product-detail', 'GET'): Case(_pk('product')),
+    ('product-detail', 'PUT'): Case(
+        _pk('product'),
+        lambda s: {
+            'name': 'Renombrado', 'price': '75.00',
+            'baths': [{'bath_type_id': s.bath_type.id, 'quantity': 1}],
+        },
+    ),
+    ('product-detail', 'DELETE'): Case(lambda s: {'pk': s.unused_product.id}, status=204),
+    ('product-baths', 'GET'): Case(_pk('product')),
+    # Reservas
+    ('booking-list', 'GET'): Case(),
+    ('booking-list', 'POST'): Case(
+        data=lambda s: {
+            'booking_date': s.day.isoformat(), 'hour': '11:00:00', 'people': 2,
+            'amount_paid': '0', 'amount_pending': '60', 'client_id': s.client.id, 'product_id': s.product.id,
+        },
+        status=201,
+    ),
+    ('booking-detail', 'GET'): Case(_pk('book')),
+    ('booking-detail', 'PUT'): Case(
+        _pk('book'),
+        lambda s: {
+            'booking_date': s.day.isoformat(), 'hour': '12:30:00', 'people': 3,
+            'amount_paid': '10', 'amount_pending': '50', 'client_id': s.book.client_id, 'product_id': s.book.product_id,
+        },
+    ),
+    ('booking-detail', 'DELETE'): Case(_pk('book'), status=204),
+    ('booking-by-date', 'GET'): Case(data=lambda s: {'date': s.day.isoformat()}),
+    ('booking-create-from-staff', 'POST'): Case(
+        data=lambda s: {
+            'product_id': s.product.id, 'price': '60', 'name': 'Nuevo', 'email': 'nuevo-staff@example.com',
+            'phone_number': '622222222', 'date': s.day.isoformat(), 'hour': '11:00:00', 'people': 2,
+        },
+        status=201,
+    ),
+    ('booking-gift-voucher-content-type', 'GET'): Case(),
+    ('booking-manage-detail', 'GET'): Case(_pk('book')),
+    ('booking-manage-detail', 'PUT'): Case(
+        _pk('book'), lambda s: {'comment': 'Cambio de comentario', 'people': 2, 'product_id': s.book.product_id},
+    ),
+    ('booking-manage-detail', 'OPTIONS'): Case(_pk('book')),
+    ('booking-manage-logs', 'GET'): Case(_pk('book')),
+    ('booking-manage-logs', 'POST'): Case(_pk('book'), lambda s: {'comment': 'Llamada al cliente'}, status=201),
+    ('booking-update-massages', 'PUT'): Case(_pk('book'), lambda s: {'massage60Relax': 1, 'people': 2}),
+    # Cheques regalo
+    ('gift-voucher-list', 'GET'): Case(),
+    ('gift-voucher-list', 'POST'): Case(
+        data=lambda s: {'price': '50.00', 'buyer_client_id': s.client.id, 'product_id': s.product.id},
+        status=201,
+    ),
+    ('gift-voucher-detail', 'GET'): Case(_pk('voucher')),
+    ('gift-voucher-detail', 'PUT'): Case(
+        _pk('voucher'),
+        lambda s: {'price': '55.00', 'buyer_client_id': s.voucher.buyer_client_id, 'product_id': s.voucher.product_id},
+    ),
+    ('gift-voucher-detail', 'DELETE'): Case(_pk('voucher'), status=204),
+    ('gift-voucher-create-from-staff', 'POST'): Case(data=lambda s: _staff_voucher(), status=201),
+    ('gift-voucher-bulk-create-from-staff', 'POST'): Case(data=lambda s: _staff_voucher(quantity=25), status=201),
+    # Aforo y tipos de baño
+    ('capacity-list', 'GET'): Case(),
+    ('capacity-detail', 'GET'): Case(_pk('capacity')),
+    ('capacity-detail', 'PUT'): Case(_pk('capacity'), lambda s: {'value': 50}),
+    ('bath-type-list', 'GET'): Case(),
+    ('bath-type-detail', 'GET'): Case(_pk('bath_type')),
+    ('bath-type-detail', 'PUT'): Case(_pk('bath_type'), lambda s: {'price': '32.00'}),
+    ('bath-type-detail', 'PATCH'): Case(_pk('bath_type'), lambda s: {'price': '33.00'}),
+    # Restricciones
+    ('constraint-list', 'GET'): Case(),
+    ('constraint-list', 'POST'): Case(
+        data=lambda s: {'day': '2030-08-01', 'ranges': [{'initial_time': '10:00:00', 'end_time': '12:00:00'}]},
+        status=201,
+    ),
+    ('constraint-detail', 'GET'): Case(_pk('constraint')),
+    ('constraint-detail', 'PUT'): Case(
+        _pk('constraint'),
+        lambda s: {'day': s.day.isoformat(), 'ranges': [{'initial_time': '11:00:00', 'end_time': '12:00:00'}]},
+    ),
+    ('constraint-detail', 'DELETE'): Case(_pk('constraint'), status=204),
+    ('constraint-by-date', 'GET'): Case(lambda s: {'target_date': s.day.isoformat()}),
+    ('constraint-save-for-date', 'POST'): Case(
+        data=lambda s: {'date': s.day.isoformat(), 'cells': [i % 4 == 0 for i in range(28)]}, status=201,
+    ),
+    # Presupuestos, facturación y analítica
+    ('quote-list', 'POST'): Case(
+        data=lambda s: {'carts': [
+            {'id': str(i), 'baths': [{'massage_type': 'relax', 'minutes': '60', 'quantity': 1 + i % 3}]}
+            for i in range(100)
+        ]},
+    ),
+    ('billing-list', 'GET'): Case(data=lambda s: {'start': '2030-01-01', 'end': '2030-12-31', 'granularity': 'week'}),
+    ('analytics-ocupacion', 'GET'): Case(data=lambda s: {'months': 1, 'end': s.day.isoformat()}),
+    ('analytics-prevision-masajistas', 'GET'): Case(),
+    ('analytics-exportar-prevision', 'POST'): Case(data=lambda s: {'weekdays': [1, 2]}, status=201),
+    ('analytics-publicar-prevision', 'POST'): Case(data=lambda s: {'ids': [1, 2]}),
+    ('analytics-backtest-prevision', 'GET'): Case(data=lambda s: {'folds': 4}),
+    # Raíz y búsqueda general
+    ('api-root', 'GET'): Case(),
+    ('general-search', 'GET'): Case(data=lambda s: {'q': 'Cliente1'}),
+    # Feed de cambios
+    ('changes', 'GET'): Case(),
+}
+
+
+def _admin_changelists():
+    """Un caso por listado del admin de los modelos de ``reservations``."""
+    return {
+        (f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist', 'GET'): Case(admin=True)
+        for model in admin.site._registry
+        if model._meta.app_label == 'reservations'
+    }
+
+
+CASES.update(_admin_changelists())
+
+
+# ----------------------------------------------------------------------
+# Rutas registradas
+# ----------------------------------------------------------------------
+
+def _api_routes():
+    """Pares ``(nombre, método)`` de todas las rutas de ``api/v1/urls.py``."""
+    routes = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                actions = getattr(pattern.callback, 'actions', None)
+                if actions:
+                    methods = actions.keys()
+                else:
+                    view_class = pattern.callback.view_class
+                    methods = [m for m in view_class.http_method_names if m != 'options' and hasattr(view_class, m)]
+                # HEAD lo añade DRF a toda ruta con GET y no tiene código propio
+                routes.update((pattern.name, method.upper()) for method in methods if method != 'head')
+
+    walk(api_urlpatterns)
+    return routes
+
+
+def test_every_api_route_has_a_budget():
+    budgeted = {(b.route, b.method) for b in BUDGETS}
+    missing = sorted(_api_routes() - budgeted)
+    assert not missing, f"Rutas sin presupuesto en {BUDGETS_FILE.name}: {missing}"
+
+
+def test_every_admin_changelist_has_a_budget():
+    budgeted = {(b.route, b.method) for b in BUDGETS}
+    missing = sorted(set(_admin_changelists()) - budgeted)
+    assert not missing, f"Listados del admin sin presupuesto en {BUDGETS_FILE.name}: {missing}"
+
+
+def test_every_budget_has_a_case():
+    unknown = sorted({(b.route, b.method) for b in BUDGETS} - set(CASES))
+    assert not unknown, f"Presupuestos sin caso de prueba (¿ruta eliminada?): {unknown}"
+
+
+# ----------------------------------------------------------------------
+# Presupuestos
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def budget_seed(seed):
+    from reservations.models import Capacity, Product
+
+    seed.capacity = Capacity.objects.get()
+    seed.unused_product = Product.objects.create(name="Sin uso", price=1)
+    return seed
+
+
+@pytest.mark.parametrize('budget', BUDGETS, ids=lambda b: f'{b.method} {b.route}')
+def test_endpoint_budget(budget, budget_seed, client):
+    case = CASES[(budget.route, budget.method)]
+    url = reverse(budget.route, kwargs=case.kwargs(budget_seed))
+    data = case.data(budget_seed)
+    if case.admin:
+        client.force_login(budget_seed.superuser)
+
+    if budget.method == 'GET':
+        request = lambda: client.get(url, data or {})
+    else:
+        body = json.dumps(data) if data is not None else ''
+        request = lambda: client.generic(budget.method, url, body, content_type='application/json')
+
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = request()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert response.status_code == case.status, response.content[:500]
+
+    executed = "\n".join(f"  {q['sql']}" for q in queries.captured_queries)
+    assert len(queries) <= budget.max_queries, (
+        f"{budget.method} {budget.route}: {len(queries)} consultas "
+        f"(presupuesto {budget.max_queries})\n{executed}"
+    )
+    assert elapsed_ms <= budget.max_ms * TIME_FACTOR, (
+        f"{budget.method} {budget.route}: {elapsed_ms:.0f} ms (presupuesto {budget.max_ms * TIME_FACTOR:.0f} ms)"
+    )
+
+
+@pytest.mark.parametrize('path', ['/api/v1/reservas/abc/', '/api/v1/reservas/abc/detail/'])
+def test_booking_routes_reject_non_numeric_ids(db, client, path):
+    assert client.get(path).status_code == 404
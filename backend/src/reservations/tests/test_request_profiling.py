@@ -0,0 +1,90 @@
+"""
+Perfilado bajo demanda de peticiones (``RequestProfilingMiddleware``).
+
+    pytest reservations/tests/test_request_profiling.py
+"""
+import marshal
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from reservations.models import Client, RequestProfile
+from reservations.services.profiling import RequestProfilingService
+
+
+@pytest.fixture
+def staff_client(client, db):
+    client.force_login(User.objects.create_superuser('perfil', 'perfil@example.com', 'perfil'))
+    return client
+
+
+@pytest.fixture
+def clients(db):
+    return Client.objects.bulk_create([Client(name=f"Cliente{i}") for i in range(3)])
+
+
+def test_requests_without_flag_skip_profiling(staff_client, clients):
+    with mock.patch.object(RequestProfilingService, 'requested_mode') as requested_mode:
+        response = staff_client.get(reverse('client-list'), {'page': 1})
+    assert response.status_code == 200
+    requested_mode.assert_not_called()
+    assert 'X-Profile-Id' not in response
+    assert not RequestProfile.objects.exists()
+
+
+def test_flag_is_ignored_for_anonymous_users(client, clients):
+    response = client.get(reverse('client-list'), {'_profile': '1'})
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response
+    assert not RequestProfile.objects.exists()
+
+
+def test_header_profiles_request_with_cprofile(staff_client, clients):
+    response = staff_client.get(reverse('client-list'), HTTP_X_PROFILE='1')
+    assert response.status_code == 200
+
+    report = RequestProfile.objects.get(id=response['X-Profile-Id'])
+    assert report.mode == 'cprofile'
+    assert report.path == reverse('client-list')
+    assert report.user == 'perfil'
+    assert report.status_code == 200
+    assert report.query_count == len(report.queries) > 0
+    assert any('reservations_client' in q['sql'] for q in report.queries)
+    # Volcado compatible con pstats
+    assert isinstance(marshal.loads(bytes(report.profile_data)), dict)
+
+
+def test_query_flag_with_sampling_profiler(staff_client, clients):
+    response = staff_client.get(reverse('client-list'), {'_profile': 'sample'})
+    report = RequestProfile.objects.get(id=response['X-Profile-Id'])
+    assert report.mode == 'sample'
+    assert report.summary
+
+
+def test_analyze_queries_counts_duplicates_and_similar():
+    queries = [
+        {'sql': 'SELECT a WHERE id = %s', 'params': '(1,)', 'ms': 1.0},
+        {'sql': 'SELECT a WHERE id = %s', 'params': '(1,)', 'ms': 1.0},
+        {'sql': 'SELECT a WHERE id = %s', 'params': '(2,)', 'ms': 1.0},
+        {'sql': 'SELECT a WHERE id = %s', 'params': '(3,)', 'ms': 1.0},
+        {'sql': 'SELECT b', 'params': '()', 'ms': 5.0},
+    ]
+    duplicates, similar, groups = RequestProfilingService.analyze_queries(queries)
+    assert duplicates == 1
+    assert similar == 2
+    assert groups == [{'sql': 'SELECT a WHERE id = %s', 'count': 4, 'ms': 4.0}]
+    assert queries[0]['duplicates'] == 2 and queries[0]['similar'] == 4
+
+
+def test_reports_are_pruned_and_downloadable(staff_client, clients, settings):
+    settings.REQUEST_PROFILE_KEEP = 2
+    ids = [staff_client.get(reverse('client-list'), HTTP_X_PROFILE='1')['X-Profile-Id'] for _ in range(3)]
+    assert sorted(RequestProfile.objects.values_list('id', flat=True)) == sorted(int(i) for i in ids[1:])
+
+    download = staff_client.get(reverse('admin:reservations_requestprofile_download', args=[ids[-1]]))
+    assert download.status_code == 200
+    assert download['Content-Disposition'].endswith('.prof"')
+    queries = staff_client.get(reverse('admin:reservations_requestprofile_queries', args=[ids[-1]]))
+    assert queries.status_code == 200 and queries.json()
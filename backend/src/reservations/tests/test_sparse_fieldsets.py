@@ -0,0 +1,112 @@
+"""
+Campos dispersos (``?fields=``) en listados y detalle: la respuesta sólo
+trae las claves pedidas y la consulta sólo lee sus columnas.
+
+    pytest reservations/tests/test_sparse_fieldsets.py
+"""
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from reservations.managers.book import BookManager
+from reservations.models import Book
+from reservations.services.synthetic_data import SyntheticDataService
+
+
+@pytest.fixture
+def dataset(db):
+    SyntheticDataService.generate(
+        clients=30, duplicate_ratio=0.1, bookings=60, vouchers=20,
+        start=date(2029, 1, 1), end=date(2029, 1, 31), constraints=0, batch_size=100,
+    )
+
+
+def _get(client, url, params):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url, params)
+    return response, [query['sql'] for query in captured.captured_queries]
+
+
+@pytest.mark.parametrize('route, params, fields', [
+    ('booking-list', {}, 'id,hour'),
+    ('booking-by-date', {'date': None}, 'booking_date,people'),
+    ('client-list', {}, 'name'),
+    ('gift-voucher-list', {}, 'code,buyer_name'),
+    ('gift-voucher-list', {'page_size': 5}, 'code,product_name'),
+    ('gift-voucher-list', {'compact': 1}, 'code,status'),
+])
+def test_list_returns_only_requested_keys(dataset, client, route, params, fields):
+    if 'date' in params:
+        params = {'date': Book.objects.order_by('id').first().book_date.isoformat()}
+    full = client.get(reverse(route), params).json()
+    response = client.get(reverse(route), {**params, 'fields': fields})
+
+    assert response.status_code == 200
+    payload = response.json()
+    items, full_items = (payload['results'], full['results']) if 'results' in payload else (payload, full)
+    assert items
+    wanted = fields.split(',')
+    assert all(list(item) == wanted for item in items)
+    assert items == [{name: item[name] for name in wanted} for item in full_items]
+
+
+def test_list_reads_only_requested_columns(dataset, client):
+    _, queries = _get(client, reverse('booking-list'), {'fields': 'hour'})
+
+    assert len(queries) == 1
+    assert '"comment"' not in queries[0] and '"hour"' in queries[0]
+
+
+def test_voucher_list_skips_unneeded_joins(dataset, client):
+    _, full = _get(client, reverse('gift-voucher-list'), {'page_size': 5})
+    _, sparse = _get(client, reverse('gift-voucher-list'), {'page_size': 5, 'fields': 'code,price'})
+
+    assert 'JOIN' in full[-1]
+    assert 'JOIN' not in sparse[-1]
+
+
+def test_detail_returns_requested_keys_with_fewer_queries(dataset, client):
+    book = Book.objects.order_by('id').first()
+    url = reverse('booking-manage-detail', args=[book.id])
+
+    full, full_queries = _get(client, url, {})
+    sparse, sparse_queries = _get(client, url, {'fields': 'hour,client_name'})
+
+    assert sparse.status_code == 200
+    assert sparse.json() == {'hour': full.json()['hour'], 'client_name': full.json()['client_name']}
+    assert len(sparse_queries) < len(full_queries)
+    assert '"comment"' not in sparse_queries[0]
+
+
+def test_detail_dto_matches_full_detail(dataset):
+    book = Book.objects.order_by('id').first()
+    fields = ('booking_date', 'amount_paid', 'client_email', 'creator_name', 'product_baths')
+
+    full = BookManager.get_book_detail(book.id)
+    sparse = BookManager.get_book_detail(book.id, fields)
+
+    assert all(getattr(sparse, name) == getattr(full, name) for name in fields)
+    assert sparse.id == full.id and sparse.hour is None
+
+
+@pytest.mark.parametrize('route, params', [
+    ('booking-list', {}),
+    ('client-list', {}),
+    ('gift-voucher-list', {'page_size': 5}),
+])
+def test_unknown_fields_are_rejected(dataset, client, route, params):
+    response = client.get(reverse(route), {**params, 'fields': 'id,password'})
+
+    assert response.status_code == 400
+    assert 'password' in str(response.json())
+
+
+def test_unknown_detail_field_is_rejected(dataset, client):
+    book = Book.objects.order_by('id').first()
+
+    response = client.get(reverse('booking-manage-detail', args=[book.id]), {'fields': 'nope'})
+
+    assert response.status_code == 400
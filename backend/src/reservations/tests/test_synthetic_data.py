@@ -0,0 +1,94 @@
+"""
+Generador de datos sintéticos y banco de pruebas.
+
+    pytest reservations/tests/test_synthetic_data.py
+"""
+import json
+from datetime import date
+
+import pytest
+
+from reservations.managers.client import ClientManager
+from reservations.models import Availability, Book, Client, Constraint, DailyStats, GiftVoucher
+from reservations.services.benchmark import BenchmarkService
+from reservations.services.synthetic_data import SyntheticDataService
+
+START = date(2029, 1, 1)
+END = date(2029, 6, 30)
+
+
+def _generate(**kwargs):
+    params = dict(
+        clients=200, duplicate_ratio=0.1, bookings=600, vouchers=120,
+        start=START, end=END, constraints=5, batch_size=250,
+    )
+    params.update(kwargs)
+    return SyntheticDataService.generate(**params)
+
+
+@pytest.mark.django_db
+def test_generate_creates_requested_volume():
+    counts = _generate()
+
+    assert counts['clients'] == 200
+    assert counts['duplicate_clients'] == 20
+    assert Client.objects.count() == 220
+    assert Book.objects.filter(internal_order_id__startswith='SYN').count() == 600
+    assert set(GiftVoucher.objects.values_list('status', flat=True)) == {
+        'paid', 'used', 'pending_payment', 'expired',
+    }
+    assert Book.objects.filter(book_date__range=(START, END)).count() == 600
+    assert Availability.objects.filter(type='weekday').count() == 7 * 3
+    assert Constraint.objects.count() == 5
+    # Las reservas de cheques usados los tienen como creador
+    assert counts['voucher_bookings'] == GiftVoucher.objects.filter(status='used').count()
+    # DailyStats recalculado para el periodo generado
+    assert sum(DailyStats.objects.values_list('bookings', flat=True)) == 600
+    assert not DailyStats.objects.filter(dirty=True).exists()
+    # Los duplicados exactos se detectan con la normalización de la unificación
+    assert ClientManager.get_duplicate_clients_preview()['total_groups'] > 0
+
+
+@pytest.mark.django_db
+def test_generate_is_deterministic_per_seed():
+    _generate(prefix='AAA', seed=7)
+    _generate(prefix='BBB', seed=7)
+
+    def layout(prefix):
+        return list(
+            Book.objects.filter(internal_order_id__startswith=prefix)
+            .order_by('internal_order_id').values_list('book_date', 'hour', 'people', 'amount_paid')
+        )
+
+    assert layout('AAA') == layout('BBB')
+
+
+@pytest.mark.django_db
+def test_benchmark_report_and_compare(tmp_path):
+    _generate(clients=50, bookings=200, vouchers=30)
+
+    report = BenchmarkService.run(repeat=1, warmup=0, day=date(2029, 3, 10))
+    errors = {name: r['error'] for name, r in report['results'].items() if 'error' in r}
+    assert not errors
+    assert report['dataset']['bookings'] == 200
+
+    path = BenchmarkService.save(report, tmp_path / 'bench.json')
+    loaded = BenchmarkService.load(path)
+    assert json.loads(path.read_text())['reference_day'] == '2029-03-10'
+
+    rows = BenchmarkService.compare(report, loaded)
+    assert {row['status'] for row in rows} == {'same'}
+    assert len(rows) == len(report['results'])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_wsgi_transport_goes_through_handler():
+    # Con el WSGIHandler se cierran conexiones al acabar cada petición: sin transacción de test
+    _generate(clients=20, bookings=50, vouchers=5)
+
+    report = BenchmarkService.run(repeat=1, warmup=0, day=date(2029, 3, 10), only=['GET'], transport='wsgi')
+
+    assert report['transport'] == 'wsgi'
+    assert set(report['results']) == set(BenchmarkService.http_cases(date(2029, 3, 10)))
+    assert not [r['error'] for r in report['results'].values() if 'error' in r]
+    assert report['results']['GET booking-by-date']['queries'] > 0
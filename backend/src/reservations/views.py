@@ -1,6 +1,11 @@
-from django.http import JsonResponse
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.contrib.contenttypes.models import ContentType
+from django.views.decorators.http import require_GET
 from .models import Admin, Agent, WebBooking, GiftVoucher
+from .services.metrics import MetricsService
 
 def get_creators(request):
     creator_type_id = request.GET.get('creator_type')
@@ -23,4 +28,15 @@ def get_creators(request):
         
         return JsonResponse(creators, safe=False)
     except ContentType.DoesNotExist:
-        return JsonResponse({'error': 'Invalid creator type'}, status=400) 
\ No newline at end of file
+        return JsonResponse({'error': 'Invalid creator type'}, status=400) 
+
+
+@require_GET
+def metrics(request):
+    """Métricas en formato de texto de Prometheus (``METRICS_TOKEN`` opcional como Bearer)."""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        provided = request.META.get('HTTP_AUTHORIZATION', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(provided, token):
+            return HttpResponse(status=401)
+    return HttpResponse(MetricsService.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
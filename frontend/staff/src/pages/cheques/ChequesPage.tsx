@@ -5,7 +5,10 @@ import PhoneInput from 'react-phone-input-2';
 import esLocale from 'react-phone-input-2/lang/es.json';
 import 'react-phone-input-2/lib/style.css';
 import ManagementTable, { ColumnDef } from '@/components/managetable/ManagementTable';
-import { getCheques, GiftVoucherWithDetails, createGiftVoucher, CreateGiftVoucherRequest, StaffBathRequest } from '@/services/cheques.service';
+import {
+  getChequesPage, GiftVoucherWithDetails, createGiftVoucher, CreateGiftVoucherRequest, StaffBathRequest,
+  ChequesFilters, GiftVoucherStatus, GIFT_VOUCHER_STATUS_LABELS,
+} from '@/services/cheques.service';
 import '../cuadrante/cuadrante.css';
 
 type FormInputs = {
@@ -43,6 +46,13 @@ const ChequesPage: React.FC = () => {
   const [cheques, setCheques] = useState<GiftVoucherWithDetails[]>([]);
   const [loading, setLoading] = useState(false);
   const [creating, setCreating] = useState(false);
+  // Paginación por cursor y filtros de la tabla
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [filters, setFilters] = useState<ChequesFilters>({});
+  const [statusFilter, setStatusFilter] = useState<GiftVoucherStatus | ''>('');
+  const [buyerFilter, setBuyerFilter] = useState('');
+  const [boughtFrom, setBoughtFrom] = useState('');
+  const [boughtTo, setBoughtTo] = useState('');
 
   const {
     register,
@@ -80,21 +90,33 @@ const ChequesPage: React.FC = () => {
   
   const hasValidationError = Number(people) > 0 && totalMassages > Number(people);
 
+  // Carga la primera página con los filtros indicados, o la siguiente con ``cursor``
+  const loadCheques = async (activeFilters: ChequesFilters, cursor: string | null = null) => {
+    try {
+      setLoading(true);
+      const page = await getChequesPage(activeFilters, cursor);
+      setCheques((prev) => (cursor ? [...prev, ...page.results] : page.results));
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.error('Error cargando cheques', err);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   // Cargar datos de cheques
   useEffect(() => {
-    const loadData = async () => {
-      try {
-        setLoading(true);
-        const data = await getCheques();
-        setCheques(data);
-      } catch (err) {
-        console.error('Error cargando cheques', err);
-      } finally {
-        setLoading(false);
-      }
-    };
-    loadData();
-  }, []);
+    loadCheques(filters);
+  }, [filters]);
+
+  const applyFilters = () => {
+    setFilters({
+      status: statusFilter ? [statusFilter] : undefined,
+      buyer: buyerFilter,
+      bought_from: boughtFrom || undefined,
+      bought_to: boughtTo || undefined,
+    });
+  };
 
   const onSubmit = async (data: FormInputs) => {
     try {
@@ -165,9 +187,8 @@ const ChequesPage: React.FC = () => {
       alert('Cheque regalo creado exitosamente');
       reset();
       
-      // Recargar la lista después de crear
-      const newData = await getCheques();
-      setCheques(newData);
+      // Recargar la primera página después de crear
+      await loadCheques(filters);
     } catch (err) {
       console.error('Error creando cheque regalo:', err);
       alert('Error al crear el cheque regalo');
@@ -181,18 +202,7 @@ const ChequesPage: React.FC = () => {
     { header: 'Código', accessor: 'code' },
     { 
       header: 'Estado', 
-      accessor: (r) => {
-        switch (r.status) {
-          case 'pending_payment':
-            return 'Pendiente pago';
-          case 'paid':
-            return 'Pagado';
-          case 'used':
-            return 'Usado';
-          default:
-            return r.status;
-        }
-      }
+      accessor: (r) => GIFT_VOUCHER_STATUS_LABELS[r.status] ?? r.status
     },
     { header: 'Producto', accessor: (r) => r.product_name || `Prod ${r.product_id}` },
     { header: 'Fecha compra', accessor: (r) => r.bought_date?.substring(0, 10) || r.created_at?.substring(0, 10) },
@@ -399,11 +409,43 @@ const ChequesPage: React.FC = () => {
          {/* Tabla de Cheques Regalo */}
          <div className="card" style={{ marginTop: '2rem' }}>
            <h3>Lista de Cheques Regalo</h3>
-           {loading ? (
+           <div style={{ display: 'flex', gap: '0.5rem', alignItems: 'center', marginBottom: '1rem', flexWrap: 'wrap' }}>
+             <select
+               aria-label="Estado"
+               value={statusFilter}
+               onChange={(e) => setStatusFilter(e.target.value as GiftVoucherStatus | '')}
+             >
+               <option value="">Todos los estados</option>
+               {(Object.keys(GIFT_VOUCHER_STATUS_LABELS) as GiftVoucherStatus[]).map((value) => (
+                 <option key={value} value={value}>{GIFT_VOUCHER_STATUS_LABELS[value]}</option>
+               ))}
+             </select>
+             <input
+               placeholder="Comprador (nombre, email o teléfono)"
+               value={buyerFilter}
+               onChange={(e) => setBuyerFilter(e.target.value)}
+               onKeyDown={(e) => e.key === 'Enter' && applyFilters()}
+             />
+             <label>
+               Desde <input type="date" value={boughtFrom} onChange={(e) => setBoughtFrom(e.target.value)} />
+             </label>
+             <label>
+               Hasta <input type="date" value={boughtTo} onChange={(e) => setBoughtTo(e.target.value)} />
+             </label>
+             <button type="button" onClick={applyFilters} disabled={loading}>Buscar</button>
+           </div>
+           {loading && cheques.length === 0 ? (
              <p>Cargando cheques...</p>
            ) : (
              <ManagementTable columns={columns} rows={cheques} />
            )}
+           {nextCursor && (
+             <div style={{ display: 'flex', justifyContent: 'center', marginTop: '1rem' }}>
+               <button type="button" onClick={() => loadCheques(filters, nextCursor)} disabled={loading}>
+                 {loading ? 'Cargando...' : 'Cargar más'}
+               </button>
+             </div>
+           )}
          </div>
   </div>
 );
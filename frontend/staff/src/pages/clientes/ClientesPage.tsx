@@ -1,8 +1,11 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import ReactiveButton from 'reactive-button';
 import ManagementTable, { ColumnDef } from '@/components/managetable/ManagementTable';
 import { DefaultDialog } from '@/components/elements';
-import { getClientes, Client, getDuplicatesPreview, unifyClients, DuplicatesPreview, UnificationResult } from '@/services/clientes.service';
+import {
+  getClientes, Client, getDuplicatesPreview, unifyClients, waitForUnification, DuplicatesPreview, UnificationJob,
+  UnificationTimeoutError,
+} from '@/services/clientes.service';
 
 const ClientesPage: React.FC = () => {
   const [rows, setRows] = useState<Client[]>([]);
@@ -13,7 +16,12 @@ const ClientesPage: React.FC = () => {
   const [duplicatesPreview, setDuplicatesPreview] = useState<DuplicatesPreview | null>(null);
   const [loadingPreview, setLoadingPreview] = useState(false);
   const [unifying, setUnifying] = useState(false);
-  const [unificationResult, setUnificationResult] = useState<UnificationResult | null>(null);
+  const [unificationJob, setUnificationJob] = useState<UnificationJob | null>(null);
+  // Consulta de progreso en curso; se cancela al cerrar el diálogo
+  const pollController = useRef<AbortController | null>(null);
+
+  // Dejar de consultar si se desmonta la página
+  useEffect(() => () => pollController.current?.abort(), []);
 
   useEffect(() => {
     const load = async () => {
@@ -31,14 +39,11 @@ const ClientesPage: React.FC = () => {
     load();
   }, []);
 
-  // Función para abrir el diálogo y cargar vista previa
-  const handleOpenUnificationDialog = async () => {
-    setShowUnificationDialog(true);
+  // Carga una página de la vista previa de duplicados
+  const loadPreviewPage = async (page: number) => {
     setLoadingPreview(true);
-    setUnificationResult(null);
-    
     try {
-      const preview = await getDuplicatesPreview();
+      const preview = await getDuplicatesPreview(page);
       setDuplicatesPreview(preview);
     } catch (err) {
       console.error('Error cargando vista previa de duplicados:', err);
@@ -48,6 +53,13 @@ const ClientesPage: React.FC = () => {
     }
   };
 
+  // Función para abrir el diálogo y cargar vista previa
+  const handleOpenUnificationDialog = async () => {
+    setShowUnificationDialog(true);
+    setUnificationJob(null);
+    await loadPreviewPage(1);
+  };
+
   // Función para ejecutar la unificación
   const handleUnifyClients = async () => {
     // Validaciones antes de ejecutar
@@ -61,19 +73,38 @@ const ClientesPage: React.FC = () => {
     }
     
     setUnifying(true);
+    const controller = new AbortController();
+    pollController.current = controller;
     try {
-      const result = await unifyClients();
-      setUnificationResult(result);
-      
-      if (result.success) {
+      // La unificación se ejecuta en segundo plano: se consulta su progreso
+      const started = await unifyClients();
+      setUnificationJob(started);
+
+      const job = await waitForUnification(started.id, {
+        onProgress: setUnificationJob,
+        signal: controller.signal,
+      });
+
+      if (job.status === 'completed') {
         // Recargar la lista de clientes
         const data = await getClientes();
         setRows(data);
       }
     } catch (err) {
+      if (controller.signal.aborted) {
+        // Diálogo cerrado: la unificación continúa en el servidor
+        return;
+      }
+      if (err instanceof UnificationTimeoutError) {
+        alert(err.message);
+        return;
+      }
       console.error('Error durante la unificación:', err);
       alert('Error durante la unificación de clientes');
     } finally {
+      if (pollController.current === controller) {
+        pollController.current = null;
+      }
       setUnifying(false);
     }
   };
@@ -82,7 +113,8 @@ const ClientesPage: React.FC = () => {
   const handleCloseDialog = () => {
     setShowUnificationDialog(false);
     setDuplicatesPreview(null);
-    setUnificationResult(null);
+    setUnificationJob(null);
+    pollController.current?.abort();
   };
 
   const columns: ColumnDef<Client>[] = [
@@ -112,26 +144,31 @@ const ClientesPage: React.FC = () => {
         open={showUnificationDialog}
         title="Unificar Clientes Duplicados"
         onClose={handleCloseDialog}
-        onSave={unificationResult ? undefined : handleUnifyClients}
-        saveLabel={unificationResult ? undefined : (unifying ? "Unificando..." : "Ejecutar Unificación")}
+        onSave={unificationJob ? undefined : handleUnifyClients}
+        saveLabel={unificationJob ? undefined : (unifying ? "Unificando..." : "Ejecutar Unificación")}
       >
-        {loadingPreview ? (
-          <p>Cargando vista previa de duplicados...</p>
-        ) : unificationResult ? (
+        {unificationJob ? (
           <div>
-            <h4 style={{ color: unificationResult.success ? 'green' : 'red' }}>
-              {unificationResult.success ? '✅ Unificación Completada' : '❌ Error en Unificación'}
-            </h4>
-            <p>{unificationResult.message}</p>
-            {unificationResult.success && (
-              <ul>
-                <li>Grupos unificados: {unificationResult.unified_groups}</li>
-                <li>Clientes eliminados: {unificationResult.clients_removed}</li>
-                <li>Reservas actualizadas: {unificationResult.books_updated}</li>
-                <li>Cheques regalo actualizados: {unificationResult.gift_vouchers_updated}</li>
-              </ul>
+            {unificationJob.status === 'completed' ? (
+              <h4 style={{ color: 'green' }}>✅ Unificación Completada</h4>
+            ) : unificationJob.status === 'failed' ? (
+              <h4 style={{ color: 'red' }}>❌ Error en Unificación</h4>
+            ) : (
+              <h4>
+                ⏳ Unificando… {unificationJob.processed_groups} de {unificationJob.total_groups} grupos
+                ({Math.round(unificationJob.progress)}%)
+              </h4>
             )}
+            {unificationJob.status === 'failed' && <p>{unificationJob.error}</p>}
+            <ul>
+              <li>Grupos unificados: {unificationJob.unified_groups}</li>
+              <li>Clientes eliminados: {unificationJob.clients_removed}</li>
+              <li>Reservas actualizadas: {unificationJob.books_updated}</li>
+              <li>Cheques regalo actualizados: {unificationJob.gift_vouchers_updated}</li>
+            </ul>
           </div>
+        ) : loadingPreview && !duplicatesPreview ? (
+          <p>Cargando vista previa de duplicados...</p>
         ) : duplicatesPreview ? (
           <div>
             {duplicatesPreview.total_groups === 0 ? (
@@ -165,6 +202,26 @@ const ClientesPage: React.FC = () => {
                     </div>
                   ))}
                 </div>
+
+                {duplicatesPreview.total_pages > 1 && (
+                  <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', marginTop: '0.5rem' }}>
+                    <button
+                      type="button"
+                      onClick={() => loadPreviewPage(duplicatesPreview.page - 1)}
+                      disabled={loadingPreview || duplicatesPreview.page <= 1}
+                    >
+                      ← Anterior
+                    </button>
+                    <span>Página {duplicatesPreview.page} de {duplicatesPreview.total_pages}</span>
+                    <button
+                      type="button"
+                      onClick={() => loadPreviewPage(duplicatesPreview.page + 1)}
+                      disabled={loadingPreview || duplicatesPreview.page >= duplicatesPreview.total_pages}
+                    >
+                      Siguiente →
+                    </button>
+                  </div>
+                )}
                 
                 <p style={{ marginTop: '1rem', fontWeight: 'bold', color: '#d9534f' }}>
                   ⚠️ Esta acción es irreversible. ¿Deseas continuar?
@@ -2,6 +2,16 @@ import axios from 'axios';
 
 const BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+export type GiftVoucherStatus = 'pending_payment' | 'paid' | 'used' | 'expired';
+
+// Etiquetas de cada estado, en el orden del filtro de la tabla
+export const GIFT_VOUCHER_STATUS_LABELS: Record<GiftVoucherStatus, string> = {
+  pending_payment: 'Pendiente pago',
+  paid: 'Pagado',
+  used: 'Usado',
+  expired: 'Caducado',
+};
+
 export interface GiftVoucher {
   id: number;
   code: string;
@@ -9,7 +19,7 @@ export interface GiftVoucher {
   payment_date?: string;
   people: number;
   price: string;
-  status: 'pending_payment' | 'paid' | 'used';
+  status: GiftVoucherStatus;
   recipients_email?: string;
   recipients_name?: string;
   recipients_surname?: string;
@@ -27,7 +37,7 @@ export interface GiftVoucherWithDetails {
   code: string;
   price: string;
   used?: boolean;
-  status: 'pending_payment' | 'paid' | 'used';
+  status: GiftVoucherStatus;
   payment_date?: string;
   people: number;
   buyer_client_id: number;
@@ -72,9 +82,50 @@ export interface CreateGiftVoucherRequest {
   send_whatsapp_buyer?: boolean;
 }
 
-export const getCheques = async (): Promise<GiftVoucherWithDetails[]> => {
+export interface GiftVoucherPage {
+  results: GiftVoucherWithDetails[];
+  // ``null`` en la última página
+  next_cursor: string | null;
+  page_size: number;
+}
+
+export interface ChequesFilters {
+  status?: GiftVoucherStatus[];
+  buyer?: string;
+  bought_from?: string; // YYYY-MM-DD
+  bought_to?: string;   // YYYY-MM-DD
+}
+
+export const CHEQUES_PAGE_SIZE = 50;
+
+// Columnas que muestra la tabla: el backend sólo lee esas (``?fields=``)
+const TABLE_FIELDS = [
+  'id', 'code', 'status', 'product_id', 'product_name', 'bought_date', 'created_at',
+  'buyer_client_id', 'buyer_name', 'buyer_surname', 'buyer_phone', 'buyer_email',
+  'recipients_name', 'recipients_surname', 'recipients_email', 'price', 'people',
+];
+
+/**
+ * Obtiene una página de cheques (del más reciente al más antiguo).
+ * Para la siguiente página se envía el ``next_cursor`` de la anterior.
+ */
+export const getChequesPage = async (
+  filters: ChequesFilters = {},
+  cursor: string | null = null,
+  pageSize = CHEQUES_PAGE_SIZE,
+): Promise<GiftVoucherPage> => {
+  const params: Record<string, string> = {
+    page_size: String(pageSize),
+    fields: TABLE_FIELDS.join(','),
+  };
+  if (cursor) params.cursor = cursor;
+  if (filters.status?.length) params.status = filters.status.join(',');
+  if (filters.buyer?.trim()) params.buyer = filters.buyer.trim();
+  if (filters.bought_from) params.bought_from = filters.bought_from;
+  if (filters.bought_to) params.bought_to = filters.bought_to;
+
   try {
-    const response = await axios.get(`${BASE_URL}/cheques/`);
+    const response = await axios.get(`${BASE_URL}/cheques/`, { params });
     return response.data;
   } catch (error) {
     console.error('Error fetching cheques:', error);
@@ -37,16 +37,30 @@ export interface DuplicateGroup {
 export interface DuplicatesPreview {
   total_groups: number;
   total_duplicates: number;
+  page: number;
+  page_size: number;
+  total_pages: number;
   groups: DuplicateGroup[];
 }
 
-export interface UnificationResult {
-  success: boolean;
-  message: string;
+/** Unificación en segundo plano (``POST unificar/`` responde 202 con el proceso creado) */
+export interface UnificationJob {
+  id: number;
+  status: 'pending' | 'running' | 'completed' | 'failed';
+  progress: number;
+  total_groups: number;
+  processed_groups: number;
   unified_groups: number;
   clients_removed: number;
   books_updated: number;
   gift_vouchers_updated: number;
+  error: string | null;
+  created_at: string;
+  updated_at: string;
+  finished_at: string | null;
+  // Sólo en la respuesta de ``unificar/``
+  success?: boolean;
+  message?: string;
 }
 
 const BASE_URL = import.meta.env.VITE_API_URL?.replace(/\/$/, '') ?? '';
@@ -73,21 +87,102 @@ export async function getClientes(): Promise<Client[]> {
 // ------------------------------------------------------------------
 
 /**
- * Obtiene una vista previa de los clientes duplicados sin realizar cambios
+ * Obtiene una página de la vista previa de los clientes duplicados sin realizar cambios
  */
-export async function getDuplicatesPreview(): Promise<DuplicatesPreview> {
-  return http<DuplicatesPreview>(`${CLIENT_ENDPOINT}duplicados-preview/`);
+export async function getDuplicatesPreview(page = 1, pageSize = 50): Promise<DuplicatesPreview> {
+  const searchParams = new URLSearchParams({ page: String(page), page_size: String(pageSize) });
+  return http<DuplicatesPreview>(`${CLIENT_ENDPOINT}duplicados-preview/?${searchParams.toString()}`);
 }
 
 /**
- * Ejecuta la unificación de todos los clientes duplicados
+ * Inicia la unificación de todos los clientes duplicados (en segundo plano)
  */
-export async function unifyClients(): Promise<UnificationResult> {
-  return http<UnificationResult>(`${CLIENT_ENDPOINT}unificar/`, {
+export async function unifyClients(): Promise<UnificationJob> {
+  return http<UnificationJob>(`${CLIENT_ENDPOINT}unificar/`, {
     method: 'POST',
   });
 }
 
+/**
+ * Obtiene el progreso de una unificación
+ */
+export async function getUnificationJob(jobId: number, signal?: AbortSignal): Promise<UnificationJob> {
+  return http<UnificationJob>(`${CLIENT_ENDPOINT}unificacion/${jobId}/`, { signal });
+}
+
+export interface WaitForUnificationOptions {
+  onProgress?: (job: UnificationJob) => void;
+  // Cancela la espera (p. ej. al cerrar el diálogo); la unificación sigue en el servidor
+  signal?: AbortSignal;
+  intervalMs?: number;
+  // Tiempo máximo de espera antes de dejar de consultar
+  maxWaitMs?: number;
+  // Errores de red seguidos permitidos (con espera creciente entre reintentos)
+  maxErrors?: number;
+}
+
+export class UnificationTimeoutError extends Error {
+  constructor(public job: UnificationJob | null) {
+    super('La unificación sigue en curso; consulte su progreso más tarde');
+    this.name = 'UnificationTimeoutError';
+  }
+}
+
+function sleep(ms: number, signal?: AbortSignal): Promise<void> {
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) {
+      reject(new DOMException('Espera cancelada', 'AbortError'));
+      return;
+    }
+    const timer = setTimeout(() => {
+      signal?.removeEventListener('abort', onAbort);
+      resolve();
+    }, ms);
+    const onAbort = () => {
+      clearTimeout(timer);
+      reject(new DOMException('Espera cancelada', 'AbortError'));
+    };
+    signal?.addEventListener('abort', onAbort, { once: true });
+  });
+}
+
+/**
+ * Consulta una unificación hasta que termina (completada o fallida).
+ *
+ * Lanza ``UnificationTimeoutError`` si no termina en ``maxWaitMs`` (por
+ * ejemplo, si no hay ningún worker) y un ``AbortError`` si se cancela con
+ * ``signal``. Los errores de red se reintentan con espera creciente.
+ */
+export async function waitForUnification(
+  jobId: number,
+  {
+    onProgress, signal, intervalMs = 1000, maxWaitMs = 10 * 60 * 1000, maxErrors = 5,
+  }: WaitForUnificationOptions = {},
+): Promise<UnificationJob> {
+  const deadline = Date.now() + maxWaitMs;
+  let lastJob: UnificationJob | null = null;
+  let errors = 0;
+
+  while (Date.now() < deadline) {
+    let delay = intervalMs;
+    try {
+      lastJob = await getUnificationJob(jobId, signal);
+      errors = 0;
+      onProgress?.(lastJob);
+      if (lastJob.status === 'completed' || lastJob.status === 'failed') {
+        return lastJob;
+      }
+    } catch (err) {
+      if (signal?.aborted || ++errors > maxErrors) {
+        throw err;
+      }
+      delay = intervalMs * 2 ** errors;
+    }
+    await sleep(Math.min(delay, Math.max(deadline - Date.now(), 0)), signal);
+  }
+  throw new UnificationTimeoutError(lastJob);
+}
+
 /**
  * Busca clientes similares basándose en criterios de búsqueda
  */
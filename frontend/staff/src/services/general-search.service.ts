@@ -43,7 +43,7 @@ export interface GiftVoucherResult extends SearchResult {
   code: string;
   price: string;
   used: boolean;
-  status: 'pending_payment' | 'paid' | 'used';
+  status: 'pending_payment' | 'paid' | 'used' | 'expired';
   bought_date: string | null;
   recipient: {
     name: string;
@@ -37,6 +37,8 @@ export interface Availability {
   type: 'weekday' | 'punctual';
   punctual_day: string | null; // ISO date YYYY-MM-DD
   weekday: number | null;      // 1-7 cuando type=weekday
+  source?: 'manual' | 'forecast';
+  is_draft?: boolean;          // borradores de la previsión: no aplican hasta publicarlos
   ranges: AvailabilityRange[];
 }
 
@@ -57,6 +59,8 @@ export interface AvailabilityById {
   punctual_day: string | null;
   weekday: number | null;
   created_at: string;
+  source: 'manual' | 'forecast';
+  is_draft: boolean;
   ranges: AvailabilityRange[];
 }
 
@@ -80,7 +84,8 @@ export async function getAvailabilities(): Promise<Availability[]> {
  */
 export async function getDayAvailability(targetDay: Date | string): Promise<Availability | null> {
   const isoDay = toLocalISODate(targetDay);
-  const list = await getAvailabilities();
+  // Los borradores de la previsión no aplican hasta publicarlos
+  const list = (await getAvailabilities()).filter((av) => !av.is_draft);
 
   // 1) puntual
   let found = list.find((av) => av.type === 'punctual' && av.punctual_day === isoDay);
@@ -213,7 +218,7 @@ export async function saveWeekdayAvailability(
   }
 
   const list = await getAvailabilities();
-  const existing = list.find((av) => av.type === 'weekday' && av.weekday === weekday);
+  const existing = list.find((av) => av.type === 'weekday' && av.weekday === weekday && !av.is_draft);
 
   if (existing) {
     const payload = { ...existing, ranges };